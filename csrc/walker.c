@@ -1,15 +1,32 @@
 #define PY_SSIZE_T_CLEAN
 #include <Python.h>
 #include <dirent.h>
+#include <fcntl.h>
+#include <pthread.h>
+#include <stddef.h>
 #include <stdlib.h>
 #include <string.h>
+#include <strings.h>
 #include <sys/stat.h>
+#include <unistd.h>
+
+#ifdef __linux__
+#include <errno.h>
+#include <stdint.h>
+#include <sys/syscall.h>
+#include <sys/sysmacros.h>
+#if defined(__has_include)
+#if __has_include(<linux/io_uring.h>)
+#define DUX_HAVE_URING 1
+#include <linux/io_uring.h>
+#include <sys/mman.h>
+#endif
+#endif
+#endif
 
 #ifdef __APPLE__
 #include <sys/attr.h>
 #include <sys/vnode.h>
-#include <fcntl.h>
-#include <unistd.h>
 #endif
 
 /*
@@ -19,7 +36,51 @@
  *   scan_dir_nodes(path, parent, leaf, kind_dir, kind_file, ScanNode_cls)
  *     -> (dir_nodes, file_count, dir_count, error_count)
  *
+ *   scan_dir_at_nodes(...)     [openat + fstatat/statx, no per-entry paths]
+ *
+ *   scan_dir_getdents_nodes(...) [Linux only, getdents64 + d_type]
+ *
+ *   scan_dir_uring_nodes(..., queue_depth=64)
+ *                              [Linux only, getdents64 + io_uring statx]
+ *   uring_available() -> bool
+ *
+ *   scan_subtree_nodes(..., max_entries, max_depth, dev=-1, skip=(), stop=())
+ *     -> (frontier, file_count, dir_count, error_count, skipped_count)
+ *                              [whole subtree per call, one GIL release]
+ *
+ *   aggregate_subtree(path, dev=-1, skip=())
+ *     -> (size, disk_usage, file_count, dir_count, error_count,
+ *         skipped_count, mounts)
+ *                              [totals only, no ScanNodes]
+ *
  *   scan_dir_bulk_nodes(...)   [macOS only, uses getattrlistbulk]
+ *
+ *   DirReader(threads=4, inodes=None), build_batch_nodes(batch, ...)
+ *                              [reads on C threads, nodes built by the
+ *                               caller; see DirReader below]
+ *
+ *   list_dir(path, split_at, ...), stat_batch(batch, start, stop)
+ *                              [Linux only; one huge directory stat'ed by
+ *                               several threads, see list_dir below]
+ *
+ *   scan_dir_columns(path, inodes=None) -> DirColumns
+ *                              [one directory as buffer-protocol columns]
+ *
+ *   set_io_priority(io_class, level) -> bool
+ *                              [Linux only; ioprio_set for the calling thread]
+ *
+ * Every scan function above also takes an optional trailing
+ * `inodes` argument (an InodeSet or None): files with st_nlink > 1 whose
+ * inode is already in the set are reported with size 0 (see InodeSet).
+ * The node-building ones take a further optional `names` argument (a
+ * NameTable or None) through which node names are interned, and all but
+ * scan_dir_uring_nodes (DirReader and list_dir included) an optional
+ * trailing `inode_order` flag: read each listing in full, then stat it in
+ * d_ino order (see InoSlot).
+ *
+ * ScanNode_cls must be a subclass of Node (see below) and parent one of its
+ * instances.  Nodes are allocated and filled directly, without calling
+ * ScanNode_cls; they hold no path string, only a reference to their parent.
  */
 
 /* Build full child path: parent + "/" + name.
@@ -42,228 +103,3286 @@ join_path(const char *parent, const char *name)
 }
 
 /* ------------------------------------------------------------------ */
-/* Entry buffer: collects results from GIL-free I/O                   */
+/* InodeSet: hard-linked files already counted by a scan              */
+/* ------------------------------------------------------------------ */
+
+/*
+ * Like du, a scan counts a file with several hard links once.  Workers
+ * record the (st_dev, st_ino) of every file with st_nlink > 1 here and
+ * report any later link to a recorded inode with size 0.  Files with a
+ * single link, the vast majority, never touch the set.
+ *
+ * The set is split into INODE_SHARDS shards picked by the top bits of the
+ * key hash.  Each shard is an open-addressing table (linear probing, grown
+ * at half load) behind its own mutex, so workers recording links in
+ * parallel rarely contend and no lookup needs the GIL.  A slot is 16 bytes;
+ * dev is stored + 1 so that an all-zero slot means empty.
+ */
+#define INODE_SHARDS 64
+#define INODE_SHARD_BITS 6
+
+typedef struct {
+    unsigned long long dev;
+    unsigned long long ino;
+} InodeKey;
+
+typedef struct {
+    pthread_mutex_t lock;
+    InodeKey *slots;
+    size_t mask;        /* capacity - 1; capacity is 0 or a power of two */
+    size_t used;
+} InodeShard;
+
+typedef struct {
+    PyObject_HEAD
+    InodeShard shards[INODE_SHARDS];
+    long long duplicates;   /* links found already counted (atomic) */
+} InodeSetObject;
+
+static PyTypeObject InodeSet_Type;
+
+/* splitmix64 finalizer: spreads sequential inode numbers over all bits. */
+static inline unsigned long long
+_inode_hash(unsigned long long dev, unsigned long long ino)
+{
+    unsigned long long x = ino ^ (dev * 0x9E3779B97F4A7C15ULL);
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+    return x ^ (x >> 31);
+}
+
+/* Double *sh*'s table (caller holds the lock).  Returns 0 or -1. */
+static int
+_inode_shard_grow(InodeShard *sh)
+{
+    size_t cap = sh->mask ? (sh->mask + 1) * 2 : 64;
+    InodeKey *slots = (InodeKey *)calloc(cap, sizeof(InodeKey));
+    if (!slots) return -1;
+    if (sh->mask) {
+        for (size_t i = 0; i <= sh->mask; i++) {
+            InodeKey *k = &sh->slots[i];
+            if (!k->dev) continue;
+            size_t j = (size_t)_inode_hash(k->dev - 1, k->ino) & (cap - 1);
+            while (slots[j].dev) j = (j + 1) & (cap - 1);
+            slots[j] = *k;
+        }
+    }
+    free(sh->slots);
+    sh->slots = slots;
+    sh->mask = cap - 1;
+    return 0;
+}
+
+/*
+ * Record (dev, ino).  Returns 1 if it was new, 0 if it was already there
+ * (the caller must not count the link again).  Safe without the GIL.  On
+ * allocation failure the link is treated as new: over-counting a hard
+ * link is better than dropping a file.
+ */
+static int
+_inode_set_add(InodeSetObject *s, unsigned long long dev, unsigned long long ino)
+{
+    unsigned long long h = _inode_hash(dev, ino);
+    InodeShard *sh = &s->shards[h >> (64 - INODE_SHARD_BITS)];
+    int added = 1;
+
+    pthread_mutex_lock(&sh->lock);
+    if ((sh->used + 1) * 2 > (sh->mask ? sh->mask + 1 : 0) &&
+        _inode_shard_grow(sh) < 0) {
+        pthread_mutex_unlock(&sh->lock);
+        return 1;
+    }
+    size_t i = (size_t)h & sh->mask;
+    for (;;) {
+        InodeKey *k = &sh->slots[i];
+        if (!k->dev) {
+            k->dev = dev + 1;
+            k->ino = ino;
+            sh->used++;
+            break;
+        }
+        if (k->dev == dev + 1 && k->ino == ino) {
+            added = 0;
+            break;
+        }
+        i = (i + 1) & sh->mask;
+    }
+    pthread_mutex_unlock(&sh->lock);
+
+    if (!added) __atomic_fetch_add(&s->duplicates, 1, __ATOMIC_RELAXED);
+    return added;
+}
+
+/* True if a file with *nlink* links is a repeat link already counted. */
+static inline int
+_link_counted(InodeSetObject *s, unsigned long long nlink,
+              unsigned long long dev, unsigned long long ino)
+{
+    return s && nlink > 1 && !_inode_set_add(s, dev, ino);
+}
+
+static PyObject *
+InodeSet_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    if (PyTuple_GET_SIZE(args) || (kwds && PyDict_GET_SIZE(kwds))) {
+        PyErr_SetString(PyExc_TypeError, "InodeSet() takes no arguments");
+        return NULL;
+    }
+    InodeSetObject *s = (InodeSetObject *)type->tp_alloc(type, 0);
+    if (!s) return NULL;
+    for (int i = 0; i < INODE_SHARDS; i++)
+        pthread_mutex_init(&s->shards[i].lock, NULL);
+    return (PyObject *)s;
+}
+
+static void
+InodeSet_dealloc(InodeSetObject *s)
+{
+    for (int i = 0; i < INODE_SHARDS; i++) {
+        free(s->shards[i].slots);
+        pthread_mutex_destroy(&s->shards[i].lock);
+    }
+    Py_TYPE(s)->tp_free((PyObject *)s);
+}
+
+static PyObject *
+InodeSet_add(InodeSetObject *s, PyObject *args)
+{
+    unsigned long long dev, ino;
+    if (!PyArg_ParseTuple(args, "KK", &dev, &ino))
+        return NULL;
+    int added;
+    Py_BEGIN_ALLOW_THREADS
+    added = _inode_set_add(s, dev, ino);
+    Py_END_ALLOW_THREADS
+    return PyBool_FromLong(added);
+}
+
+static Py_ssize_t
+InodeSet_len(InodeSetObject *s)
+{
+    size_t n = 0;
+    for (int i = 0; i < INODE_SHARDS; i++) {
+        pthread_mutex_lock(&s->shards[i].lock);
+        n += s->shards[i].used;
+        pthread_mutex_unlock(&s->shards[i].lock);
+    }
+    return (Py_ssize_t)n;
+}
+
+static PyObject *
+InodeSet_get_duplicates(InodeSetObject *s, void *closure)
+{
+    (void)closure;
+    return PyLong_FromLongLong(__atomic_load_n(&s->duplicates, __ATOMIC_RELAXED));
+}
+
+static PyMethodDef InodeSet_methods[] = {
+    {"add", (PyCFunction)InodeSet_add, METH_VARARGS,
+     "add(dev, ino) -> bool\n\nRecord an inode; False if it was already recorded."},
+    {NULL, NULL, 0, NULL}
+};
+
+static PyGetSetDef InodeSet_getset[] = {
+    {"duplicates", (getter)InodeSet_get_duplicates, NULL,
+     "Number of add() calls (including those made by the scan functions)\n"
+     "that found the inode already recorded.", NULL},
+    {NULL, NULL, NULL, NULL, NULL}
+};
+
+static PySequenceMethods InodeSet_as_sequence = {
+    .sq_length = (lenfunc)InodeSet_len,
+};
+
+static PyTypeObject InodeSet_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dux._walker.InodeSet",
+    .tp_basicsize = sizeof(InodeSetObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "InodeSet()\n--\n\n"
+              "Sharded, thread-safe set of (st_dev, st_ino) pairs used to count\n"
+              "hard-linked files once per scan.",
+    .tp_new = InodeSet_new,
+    .tp_dealloc = (destructor)InodeSet_dealloc,
+    .tp_methods = InodeSet_methods,
+    .tp_getset = InodeSet_getset,
+    .tp_as_sequence = &InodeSet_as_sequence,
+};
+
+/* Convert an optional `inodes` argument (InodeSet or None). */
+static int
+_inodes_arg(PyObject *obj, InodeSetObject **out)
+{
+    if (obj == NULL || obj == Py_None) {
+        *out = NULL;
+        return 0;
+    }
+    if (!PyObject_TypeCheck(obj, &InodeSet_Type)) {
+        PyErr_Format(PyExc_TypeError, "inodes must be an InodeSet or None, not %.100s",
+                     Py_TYPE(obj)->tp_name);
+        return -1;
+    }
+    *out = (InodeSetObject *)obj;
+    return 0;
+}
+
+/* ------------------------------------------------------------------ */
+/* NameTable: bounded intern table for entry names                    */
+/* ------------------------------------------------------------------ */
+
+/*
+ * Names such as index.js, __init__.py or package.json occur hundreds of
+ * thousands of times in a large tree.  Node builders look every name up
+ * here and reuse the str already made for it, so all those nodes share one
+ * object instead of holding a copy each.
+ *
+ * The table is direct-mapped: a name hashes to one slot, and a miss
+ * replaces whatever the slot held.  Memory is bounded by the slot count,
+ * no eviction bookkeeping is needed, and names that keep recurring stay
+ * resident while one-off names are pushed out by the next miss.  Only
+ * ASCII names up to NAME_INTERN_MAX bytes are interned: their str data is
+ * the UTF-8 bytes themselves, so a lookup compares without converting.
+ * Slots are guarded by NAME_SHARDS mutexes (slot index modulo the shard
+ * count) so that free-threaded builds can share one table between workers.
+ */
+#define NAME_SHARDS 64
+#define NAME_INTERN_MAX 64
+#define NAME_TABLE_DEFAULT 65536
+
+typedef struct {
+    unsigned long long hash;
+    PyObject *str;      /* strong reference, or NULL for an empty slot */
+} NameSlot;
+
+typedef struct {
+    PyObject_HEAD
+    NameSlot *slots;
+    size_t mask;        /* slot count - 1 (a power of two) */
+    pthread_mutex_t locks[NAME_SHARDS];
+    long long hits;     /* lookups answered from the table (atomic) */
+    long long misses;   /* internable names not found (atomic) */
+} NameTableObject;
+
+static PyTypeObject NameTable_Type;
+
+/* FNV-1a; returns 0 if *name* is not internable (non-ASCII or too long). */
+static inline unsigned long long
+_name_hash(const char *name, Py_ssize_t len)
+{
+    if (len > NAME_INTERN_MAX) return 0;
+    unsigned long long h = 0xcbf29ce484222325ULL;
+    for (Py_ssize_t i = 0; i < len; i++) {
+        unsigned char c = (unsigned char)name[i];
+        if (c & 0x80) return 0;
+        h = (h ^ c) * 0x100000001b3ULL;
+    }
+    return h | 1;
+}
+
+/*
+ * Return a new reference to the str for *name* (UTF-8, *len* bytes).  An
+ * interned str is reused when the table has one; otherwise *candidate*
+ * (if not NULL, a str equal to *name*) or a newly decoded str is stored
+ * and returned.  *t* may be NULL: then nothing is interned.  Requires an
+ * attached thread state; returns NULL with an exception set on error.
+ */
+static PyObject *
+_name_intern(NameTableObject *t, const char *name, Py_ssize_t len, PyObject *candidate)
+{
+    unsigned long long h = t ? _name_hash(name, len) : 0;
+    if (!h) {
+        return candidate ? Py_NewRef(candidate) : PyUnicode_DecodeUTF8(name, len, NULL);
+    }
+    size_t i = (size_t)h & t->mask;
+    NameSlot *slot = &t->slots[i];
+    pthread_mutex_t *lock = &t->locks[i & (NAME_SHARDS - 1)];
+
+    pthread_mutex_lock(lock);
+    if (slot->str && slot->hash == h &&
+        PyUnicode_GET_LENGTH(slot->str) == len &&
+        memcmp(PyUnicode_DATA(slot->str), name, (size_t)len) == 0) {
+        PyObject *str = Py_NewRef(slot->str);
+        pthread_mutex_unlock(lock);
+        __atomic_fetch_add(&t->hits, 1, __ATOMIC_RELAXED);
+        return str;
+    }
+    pthread_mutex_unlock(lock);
+
+    PyObject *str = candidate ? Py_NewRef(candidate) : PyUnicode_DecodeUTF8(name, len, NULL);
+    if (!str) return NULL;
+    pthread_mutex_lock(lock);
+    PyObject *old = slot->str;
+    slot->str = Py_NewRef(str);
+    slot->hash = h;
+    pthread_mutex_unlock(lock);
+    Py_XDECREF(old);
+    __atomic_fetch_add(&t->misses, 1, __ATOMIC_RELAXED);
+    return str;
+}
+
+static PyObject *
+NameTable_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"capacity", NULL};
+    Py_ssize_t capacity = NAME_TABLE_DEFAULT;
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "|n", kwlist, &capacity))
+        return NULL;
+    if (capacity < 1) {
+        PyErr_SetString(PyExc_ValueError, "capacity must be at least 1");
+        return NULL;
+    }
+    size_t n = NAME_SHARDS;
+    while (n < (size_t)capacity) n *= 2;
+
+    NameTableObject *t = (NameTableObject *)type->tp_alloc(type, 0);
+    if (!t) return NULL;
+    t->slots = (NameSlot *)calloc(n, sizeof(NameSlot));
+    if (!t->slots) {
+        Py_DECREF(t);
+        return PyErr_NoMemory();
+    }
+    t->mask = n - 1;
+    for (int i = 0; i < NAME_SHARDS; i++)
+        pthread_mutex_init(&t->locks[i], NULL);
+    return (PyObject *)t;
+}
+
+static void
+NameTable_dealloc(NameTableObject *t)
+{
+    if (t->slots) {
+        for (size_t i = 0; i <= t->mask; i++) Py_XDECREF(t->slots[i].str);
+        free(t->slots);
+        for (int i = 0; i < NAME_SHARDS; i++)
+            pthread_mutex_destroy(&t->locks[i]);
+    }
+    Py_TYPE(t)->tp_free((PyObject *)t);
+}
+
+static PyObject *
+NameTable_intern(NameTableObject *t, PyObject *name)
+{
+    if (!PyUnicode_Check(name)) {
+        PyErr_Format(PyExc_TypeError, "intern() argument must be str, not %.100s",
+                     Py_TYPE(name)->tp_name);
+        return NULL;
+    }
+    /* Only ASCII strs hold their UTF-8 bytes as data; others pass through. */
+    if (!PyUnicode_IS_ASCII(name))
+        return Py_NewRef(name);
+    return _name_intern(t, (const char *)PyUnicode_DATA(name), PyUnicode_GET_LENGTH(name), name);
+}
+
+static Py_ssize_t
+NameTable_len(NameTableObject *t)
+{
+    size_t n = 0;
+    for (size_t i = 0; i <= t->mask; i++) {
+        pthread_mutex_t *lock = &t->locks[i & (NAME_SHARDS - 1)];
+        pthread_mutex_lock(lock);
+        n += t->slots[i].str != NULL;
+        pthread_mutex_unlock(lock);
+    }
+    return (Py_ssize_t)n;
+}
+
+static PyObject *
+NameTable_get_hits(NameTableObject *t, void *closure)
+{
+    (void)closure;
+    return PyLong_FromLongLong(__atomic_load_n(&t->hits, __ATOMIC_RELAXED));
+}
+
+static PyObject *
+NameTable_get_misses(NameTableObject *t, void *closure)
+{
+    (void)closure;
+    return PyLong_FromLongLong(__atomic_load_n(&t->misses, __ATOMIC_RELAXED));
+}
+
+static PyObject *
+NameTable_get_capacity(NameTableObject *t, void *closure)
+{
+    (void)closure;
+    return PyLong_FromSize_t(t->mask + 1);
+}
+
+static PyMethodDef NameTable_methods[] = {
+    {"intern", (PyCFunction)NameTable_intern, METH_O,
+     "intern(name) -> str\n\nReturn the table's str equal to name, storing name if there is none."},
+    {NULL, NULL, 0, NULL}
+};
+
+static PyGetSetDef NameTable_getset[] = {
+    {"hits", (getter)NameTable_get_hits, NULL,
+     "Lookups (including those made by the scan functions) that reused an interned str.", NULL},
+    {"misses", (getter)NameTable_get_misses, NULL,
+     "Lookups of internable names that stored a new str.", NULL},
+    {"capacity", (getter)NameTable_get_capacity, NULL, "Number of slots.", NULL},
+    {NULL, NULL, NULL, NULL, NULL}
+};
+
+static PySequenceMethods NameTable_as_sequence = {
+    .sq_length = (lenfunc)NameTable_len,
+};
+
+static PyTypeObject NameTable_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dux._walker.NameTable",
+    .tp_basicsize = sizeof(NameTableObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "NameTable(capacity=65536)\n--\n\n"
+              "Bounded, thread-safe intern table for entry names, shared by the\n"
+              "scan functions of one scan.",
+    .tp_new = NameTable_new,
+    .tp_dealloc = (destructor)NameTable_dealloc,
+    .tp_methods = NameTable_methods,
+    .tp_getset = NameTable_getset,
+    .tp_as_sequence = &NameTable_as_sequence,
+};
+
+/* Convert an optional `names` argument (NameTable or None). */
+static int
+_names_arg(PyObject *obj, NameTableObject **out)
+{
+    if (obj == NULL || obj == Py_None) {
+        *out = NULL;
+        return 0;
+    }
+    if (!PyObject_TypeCheck(obj, &NameTable_Type)) {
+        PyErr_Format(PyExc_TypeError, "names must be a NameTable or None, not %.100s",
+                     Py_TYPE(obj)->tp_name);
+        return -1;
+    }
+    *out = (NameTableObject *)obj;
+    return 0;
+}
+
+/* ------------------------------------------------------------------ */
+/* Node: C storage for ScanNode                                       */
+/* ------------------------------------------------------------------ */
+
+/*
+ * ScanNode (dux.models.scan) is a Python subclass of Node with no slots of
+ * its own, adding ``path``, ``is_dir``, equality and repr.  Node holds the
+ * fields in a fixed C struct, with the two sizes as C integers instead of
+ * int objects, so the scan functions allocate and fill nodes directly
+ * (_node_make) without running a Python __init__ per entry.
+ */
+
+typedef struct {
+    PyObject_HEAD
+    PyObject *name;
+    PyObject *kind;
+    PyObject *children;
+    PyObject *parent;   /* NULL reads as None */
+    PyObject *path;     /* the cached path (ScanNode._path); NULL reads as None */
+    long long size_bytes;
+    long long disk_usage;
+} NodeObject;
+
+static PyTypeObject Node_Type;
+
+/* New node of *type* (a Node subtype).  Steals *name* and *children*. */
+static PyObject *
+_node_make(PyTypeObject *type, PyObject *name, PyObject *kind,
+           long long size_bytes, long long disk_usage,
+           PyObject *children, PyObject *parent)
+{
+    NodeObject *n = (NodeObject *)type->tp_alloc(type, 0);
+    if (!n) {
+        Py_DECREF(name);
+        Py_DECREF(children);
+        return NULL;
+    }
+    n->name = name;
+    n->kind = Py_NewRef(kind);
+    n->children = children;
+    n->parent = parent == Py_None ? NULL : Py_XNewRef(parent);
+    n->size_bytes = size_bytes;
+    n->disk_usage = disk_usage;
+    return (PyObject *)n;
+}
+
+/* Point the parent of each node in *children* at *parent*. */
+static int
+_node_link_children(PyObject *parent, PyObject *children)
+{
+    PyObject *it = PyObject_GetIter(children);
+    if (!it) return -1;
+    PyObject *child;
+    while ((child = PyIter_Next(it)) != NULL) {
+        int rc;
+        if (PyObject_TypeCheck(child, &Node_Type)) {
+            Py_XSETREF(((NodeObject *)child)->parent, Py_NewRef(parent));
+            rc = 0;
+        } else {
+            rc = PyObject_SetAttrString(child, "parent", parent);
+        }
+        Py_DECREF(child);
+        if (rc < 0) {
+            Py_DECREF(it);
+            return -1;
+        }
+    }
+    Py_DECREF(it);
+    return PyErr_Occurred() ? -1 : 0;
+}
+
+static int
+Node_init(NodeObject *self, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"name", "kind", "size_bytes", "disk_usage",
+                             "children", "parent", "path", NULL};
+    PyObject *name, *kind, *children = Py_None, *parent = Py_None, *path = Py_None;
+    long long size_bytes, disk_usage;
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OOLL|OOO", kwlist, &name, &kind,
+                                     &size_bytes, &disk_usage, &children, &parent, &path))
+        return -1;
+    if (children == Py_None) {
+        children = PyList_New(0);
+        if (!children) return -1;
+    } else {
+        if (_node_link_children((PyObject *)self, children) < 0) return -1;
+        Py_INCREF(children);
+    }
+    Py_XSETREF(self->name, Py_NewRef(name));
+    Py_XSETREF(self->kind, Py_NewRef(kind));
+    Py_XSETREF(self->children, children);
+    Py_XSETREF(self->parent, parent == Py_None ? NULL : Py_NewRef(parent));
+    Py_XSETREF(self->path, path == Py_None ? NULL : Py_NewRef(path));
+    self->size_bytes = size_bytes;
+    self->disk_usage = disk_usage;
+    return 0;
+}
+
+static int
+Node_traverse(NodeObject *self, visitproc visit, void *arg)
+{
+    Py_VISIT(self->name);
+    Py_VISIT(self->kind);
+    Py_VISIT(self->children);
+    Py_VISIT(self->parent);
+    Py_VISIT(self->path);
+    return 0;
+}
+
+static int
+Node_clear(NodeObject *self)
+{
+    Py_CLEAR(self->name);
+    Py_CLEAR(self->kind);
+    Py_CLEAR(self->children);
+    Py_CLEAR(self->parent);
+    Py_CLEAR(self->path);
+    return 0;
+}
+
+/* Subclasses (ScanNode) reach this through subtype_dealloc, which also
+ * releases their reference to the heap type. */
+static void
+Node_dealloc(NodeObject *self)
+{
+    PyObject_GC_UnTrack(self);
+    Py_TRASHCAN_BEGIN(self, Node_dealloc)
+    Node_clear(self);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+    Py_TRASHCAN_END
+}
+
+static PyMemberDef Node_members[] = {
+    {"name", Py_T_OBJECT_EX, offsetof(NodeObject, name), 0, NULL},
+    {"kind", Py_T_OBJECT_EX, offsetof(NodeObject, kind), 0, NULL},
+    {"children", Py_T_OBJECT_EX, offsetof(NodeObject, children), 0, NULL},
+    {"size_bytes", Py_T_LONGLONG, offsetof(NodeObject, size_bytes), 0, NULL},
+    {"disk_usage", Py_T_LONGLONG, offsetof(NodeObject, disk_usage), 0, NULL},
+    {NULL, 0, 0, 0, NULL}
+};
+
+/* parent and _path: optional references, stored as NULL for None. */
+static PyObject *
+Node_get_optional(NodeObject *self, void *offset)
+{
+    PyObject *value = *(PyObject **)((char *)self + (size_t)offset);
+    return Py_NewRef(value ? value : Py_None);
+}
+
+static int
+Node_set_optional(NodeObject *self, PyObject *value, void *offset)
+{
+    PyObject **slot = (PyObject **)((char *)self + (size_t)offset);
+    Py_XSETREF(*slot, value == NULL || value == Py_None ? NULL : Py_NewRef(value));
+    return 0;
+}
+
+static PyGetSetDef Node_getset[] = {
+    {"parent", (getter)Node_get_optional, (setter)Node_set_optional, NULL,
+     (void *)offsetof(NodeObject, parent)},
+    {"_path", (getter)Node_get_optional, (setter)Node_set_optional, NULL,
+     (void *)offsetof(NodeObject, path)},
+    {NULL, NULL, NULL, NULL, NULL}
+};
+
+static PyTypeObject Node_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dux._walker.Node",
+    .tp_basicsize = sizeof(NodeObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC,
+    .tp_doc = "Node(name, kind, size_bytes, disk_usage, children=None, parent=None, path=None)\n--\n\n"
+              "Fixed-layout storage for ScanNode.  Children passed to the\n"
+              "constructor are linked to the new node.",
+    .tp_new = PyType_GenericNew,
+    .tp_init = (initproc)Node_init,
+    .tp_traverse = (traverseproc)Node_traverse,
+    .tp_clear = (inquiry)Node_clear,
+    .tp_dealloc = (destructor)Node_dealloc,
+    .tp_members = Node_members,
+    .tp_getset = Node_getset,
+};
+
+/* Check that the scan functions' node type and parent are Nodes. */
+static int
+_node_args(PyObject *node_type, PyObject *parent)
+{
+    if (!PyType_Check(node_type) ||
+        !PyType_IsSubtype((PyTypeObject *)node_type, &Node_Type)) {
+        PyErr_SetString(PyExc_TypeError, "ScanNode_cls must be a subclass of Node");
+        return -1;
+    }
+    if (!PyObject_TypeCheck(parent, &Node_Type)) {
+        PyErr_Format(PyExc_TypeError, "parent must be a Node, not %.100s",
+                     Py_TYPE(parent)->tp_name);
+        return -1;
+    }
+    return 0;
+}
+
+/* Append the nodes in *batch* to parent.children in one step (the batch
+ * list itself becomes the children list when the parent has none yet). */
+static int
+_node_adopt(PyObject *parent, PyObject *batch)
+{
+    NodeObject *p = (NodeObject *)parent;
+    PyObject *children = p->children;
+    if (PyList_CheckExact(children)) {
+        Py_ssize_t n = PyList_GET_SIZE(children);
+        if (n == 0) {
+            Py_SETREF(p->children, Py_NewRef(batch));
+            return 0;
+        }
+        return PyList_SetSlice(children, n, n, batch);
+    }
+    PyObject *r = PyObject_CallMethod(children, "extend", "O", batch);
+    if (!r) return -1;
+    Py_DECREF(r);
+    return 0;
+}
+
+/* ------------------------------------------------------------------ */
+/* Entry buffer: collects results from GIL-free I/O                   */
+/* ------------------------------------------------------------------ */
+
+typedef struct {
+    char *path;     /* full child path (heap-allocated) */
+    char *name;     /* NOT separately allocated — points into *path* after
+                       the last '/'.  free(path) invalidates name. */
+    int is_dir;
+    long long size;
+    long long disk_usage;
+} ScanDirEntry;
+
+/* is_dir markers (ScanDirEntry, ArenaEntry) used while stats are still
+ * outstanding.  An ENTRY_NEEDS_STAT entry's size field holds its d_ino
+ * until the stat replaces it (see InoSlot).  In one-file-system mode a
+ * directory whose stat shows another device is marked ENTRY_MOUNT_POINT:
+ * it still gets a node, but is never read or handed back for reading. */
+#define ENTRY_NEEDS_STAT  (-1)
+#define ENTRY_STAT_FAILED (-2)
+#define ENTRY_MOUNT_POINT 2
+
+/* is_dir of a stat'ed entry on *st_dev*, given the device *dev* every
+ * directory must be on (-1: any). */
+static inline int
+_dir_kind(int is_dir, unsigned long long st_dev, long long dev)
+{
+    return is_dir && dev >= 0 && (long long)st_dev != dev ? ENTRY_MOUNT_POINT : is_dir;
+}
+
+/*
+ * Inode-order stats.  Filesystems that keep inodes in tables (ext4, XFS,
+ * and the servers behind most NFS exports) place them roughly in inode
+ * number order, while directory order follows a hash of the name.  On a
+ * rotational disk stat'ing a listing in directory order costs a seek per
+ * inode-table block; sorted by d_ino it becomes a forward sweep.  With
+ * inode order on, a listing is read in full first, then its pending
+ * entries are stat'ed in the order of a sorted (d_ino, index) array: the
+ * entries themselves stay in listing order.
+ */
+typedef struct {
+    unsigned long long ino;
+    Py_ssize_t idx;
+} InoSlot;
+
+static int
+_cmp_slot_ino(const void *x, const void *y)
+{
+    unsigned long long a = ((const InoSlot *)x)->ino;
+    unsigned long long b = ((const InoSlot *)y)->ino;
+    return (a > b) - (a < b);
+}
+
+typedef struct {
+    ScanDirEntry *entries;
+    Py_ssize_t size;
+    Py_ssize_t capacity;
+} EntryBuf;
+
+static int
+entrybuf_init(EntryBuf *b, Py_ssize_t cap)
+{
+    b->entries = (ScanDirEntry *)malloc(sizeof(ScanDirEntry) * cap);
+    if (!b->entries) return -1;
+    b->size = 0;
+    b->capacity = cap;
+    return 0;
+}
+
+static int
+entrybuf_push(EntryBuf *b, char *path, char *name, int is_dir,
+              long long size, long long disk_usage)
+{
+    if (b->size >= b->capacity) {
+        Py_ssize_t new_cap = b->capacity * 2;
+        ScanDirEntry *nw = (ScanDirEntry *)realloc(
+            b->entries, sizeof(ScanDirEntry) * new_cap);
+        if (!nw) return -1;
+        b->entries = nw;
+        b->capacity = new_cap;
+    }
+    ScanDirEntry *e = &b->entries[b->size];
+    e->path = path;
+    e->name = name;
+    e->is_dir = is_dir;
+    e->size = size;
+    e->disk_usage = disk_usage;
+    b->size++;
+    return 0;
+}
+
+static void
+entrybuf_free(EntryBuf *b)
+{
+    for (Py_ssize_t i = 0; i < b->size; i++) {
+        free(b->entries[i].path);
+    }
+    free(b->entries);
+    b->entries = NULL;
+    b->size = 0;
+    b->capacity = 0;
+}
+
+/* ------------------------------------------------------------------ */
+/* GIL-free I/O helpers                                               */
+/* ------------------------------------------------------------------ */
+
+/* lstat *path* into entry fields; a repeat hard link gets size 0, and a
+ * directory off device *dev* (>= 0) is marked ENTRY_MOUNT_POINT. */
+static int
+_lstat_sizes(const char *path, InodeSetObject *inodes, long long dev, int *is_dir,
+             long long *size, long long *disk_usage)
+{
+    struct stat st;
+    if (lstat(path, &st) < 0) return -1;
+    *is_dir = S_ISDIR(st.st_mode);
+    *size = *is_dir ? 0 : (long long)st.st_size;
+    *disk_usage = *is_dir ? 0 : (long long)st.st_blocks * 512;
+    if (!*is_dir && _link_counted(inodes, st.st_nlink, st.st_dev, st.st_ino)) {
+        *size = 0;
+        *disk_usage = 0;
+    }
+    *is_dir = _dir_kind(*is_dir, st.st_dev, dev);
+    return 0;
+}
+
+/* Fill EntryBuf via opendir/readdir/lstat (no GIL needed).
+ * With *inode_order* every name is read first and the lstats are issued
+ * in d_ino order (see InoSlot). */
+static long long
+_fill_buf_readdir(const char *dir_path, EntryBuf *buf, InodeSetObject *inodes,
+                  int inode_order, long long dev)
+{
+    long long error_count = 0;
+
+    DIR *dp = opendir(dir_path);
+    if (dp) {
+        size_t plen = strlen(dir_path);
+        struct dirent *ep;
+        while ((ep = readdir(dp)) != NULL) {
+            if (ep->d_name[0] == '.') {
+                if (ep->d_name[1] == '\0') continue;
+                if (ep->d_name[1] == '.' && ep->d_name[2] == '\0') continue;
+            }
+
+            char *child_path = join_path(dir_path, ep->d_name);
+            if (!child_path) break;
+
+            int is_dir = ENTRY_NEEDS_STAT;
+            long long size = (long long)ep->d_ino;
+            long long disk_usage = 0;
+            if (!inode_order &&
+                _lstat_sizes(child_path, inodes, dev, &is_dir, &size, &disk_usage) < 0) {
+                error_count++;
+                free(child_path);
+                continue;
+            }
+
+            char *name = child_path + plen;
+            if (*name == '/') name++;
+
+            if (entrybuf_push(buf, child_path, name, is_dir,
+                              size, disk_usage) < 0) {
+                free(child_path);
+                break;
+            }
+        }
+        closedir(dp);
+    } else {
+        error_count++;
+    }
+
+    if (inode_order && buf->size) {
+        /* Without memory for the slots, stat in listing order. */
+        InoSlot *slots = (InoSlot *)malloc(sizeof(InoSlot) * (size_t)buf->size);
+        if (slots) {
+            for (Py_ssize_t i = 0; i < buf->size; i++) {
+                slots[i].ino = (unsigned long long)buf->entries[i].size;
+                slots[i].idx = i;
+            }
+            qsort(slots, (size_t)buf->size, sizeof(InoSlot), _cmp_slot_ino);
+        }
+        for (Py_ssize_t k = 0; k < buf->size; k++) {
+            ScanDirEntry *e = &buf->entries[slots ? slots[k].idx : k];
+            if (_lstat_sizes(e->path, inodes, dev, &e->is_dir, &e->size,
+                             &e->disk_usage) < 0) {
+                e->is_dir = ENTRY_STAT_FAILED;
+                error_count++;
+            }
+        }
+        free(slots);
+        Py_ssize_t kept = 0;
+        for (Py_ssize_t i = 0; i < buf->size; i++) {
+            ScanDirEntry *e = &buf->entries[i];
+            if (e->is_dir == ENTRY_STAT_FAILED) {
+                free(e->path);
+                continue;
+            }
+            buf->entries[kept++] = *e;
+        }
+        buf->size = kept;
+    }
+
+    return error_count;
+}
+
+/* ------------------------------------------------------------------ */
+/* Node builder: convert EntryBuf into ScanNode objects               */
+/* ------------------------------------------------------------------ */
+
+/*
+ * Create a node per EntryBuf entry, append them all to parent.children at
+ * once, and collect the directory nodes to read next (mount points are
+ * counted but not collected).  *ScanNode_cls* and *parent* have been
+ * checked by _node_args.
+ *
+ * Returns (dir_nodes, file_count, dir_count, error_count) as a Python tuple.
+ */
+static PyObject *
+_build_nodes_from_buf(EntryBuf *buf, long long err_count,
+                      PyObject *parent, PyObject *leaf,
+                      PyObject *kind_dir, PyObject *kind_file,
+                      PyObject *ScanNode_cls, NameTableObject *names)
+{
+    PyTypeObject *type = (PyTypeObject *)ScanNode_cls;
+    PyObject *batch = PyList_New(buf->size);
+    PyObject *dir_nodes = PyList_New(0);
+    if (!batch || !dir_nodes) goto error;
+
+    long long file_count = 0;
+    long long dir_count = 0;
+
+    for (Py_ssize_t i = 0; i < buf->size; i++) {
+        ScanDirEntry *e = &buf->entries[i];
+        PyObject *node;
+        PyObject *name = _name_intern(names, e->name, (Py_ssize_t)strlen(e->name), NULL);
+        if (!name) goto error;
+
+        if (e->is_dir) {
+            PyObject *children = PyList_New(0);
+            if (!children) {
+                Py_DECREF(name);
+                goto error;
+            }
+            /* _node_make steals name and children. */
+            node = _node_make(type, name, kind_dir, 0, 0, children, parent);
+        } else {
+            /* Every file shares the immutable leaf sentinel. */
+            node = _node_make(type, name, kind_file, e->size, e->disk_usage,
+                              Py_NewRef(leaf), parent);
+        }
+        if (!node) goto error;
+        PyList_SET_ITEM(batch, i, node);
+
+        if (e->is_dir) {
+            dir_count++;
+            if (e->is_dir != ENTRY_MOUNT_POINT && PyList_Append(dir_nodes, node) < 0)
+                goto error;
+        } else {
+            file_count++;
+        }
+    }
+
+    if (_node_adopt(parent, batch) < 0) goto error;
+    Py_DECREF(batch);
+    return Py_BuildValue("(NLLL)", dir_nodes, file_count, dir_count, err_count);
+
+error:
+    Py_XDECREF(batch);
+    Py_XDECREF(dir_nodes);
+    return NULL;
+}
+
+/* ------------------------------------------------------------------ */
+/* scan_dir_nodes: create ScanNode objects directly in C              */
+/* ------------------------------------------------------------------ */
+
+static PyObject *
+walker_scan_dir_nodes(PyObject *self, PyObject *args)
+{
+    (void)self;
+    const char *dir_path;
+    PyObject *parent, *leaf, *kind_dir, *kind_file, *ScanNode_cls;
+    PyObject *inodes_obj = NULL;
+    PyObject *names_obj = NULL;
+    InodeSetObject *inodes;
+    NameTableObject *names;
+
+    int inode_order = 0;
+    long long dev = -1;
+
+    if (!PyArg_ParseTuple(args, "sOOOOO|OOpL", &dir_path, &parent, &leaf,
+                          &kind_dir, &kind_file, &ScanNode_cls, &inodes_obj,
+                          &names_obj, &inode_order, &dev))
+        return NULL;
+    if (_inodes_arg(inodes_obj, &inodes) < 0 || _names_arg(names_obj, &names) < 0 ||
+        _node_args(ScanNode_cls, parent) < 0)
+        return NULL;
+
+    EntryBuf buf;
+    if (entrybuf_init(&buf, 128) < 0)
+        return PyErr_NoMemory();
+
+    long long error_count;
+
+    /* Two-phase design: release the GIL during I/O (readdir + lstat), then
+     * reacquire it to create Python objects.  This is the core performance
+     * optimization — other Python threads can run while we do syscalls. */
+    Py_BEGIN_ALLOW_THREADS
+    error_count = _fill_buf_readdir(dir_path, &buf, inodes, inode_order, dev);
+    Py_END_ALLOW_THREADS
+
+    PyObject *result = _build_nodes_from_buf(&buf, error_count, parent, leaf,
+                                              kind_dir, kind_file, ScanNode_cls,
+                                              names);
+    entrybuf_free(&buf);
+    return result;
+}
+
+/* ------------------------------------------------------------------ */
+/* Per-thread arena: names + path scratch reused across directories    */
+/* ------------------------------------------------------------------ */
+
+/*
+ * The readdir backend mallocs a full child path per entry and hands it to
+ * lstat, so the kernel re-resolves every path component for every file.
+ * The openat backend instead stats children relative to the directory fd
+ * and only needs the bare names, which are packed back to back into one
+ * growable buffer owned by the calling thread.  Full paths are assembled in
+ * a second scratch buffer only when the Python string is created.
+ *
+ * Buffers grow but are never shrunk between calls; they are released by
+ * the pthread key destructor when the worker thread exits.
+ */
+
+typedef struct {
+    size_t name_off;    /* offset of the NUL-terminated name in names */
+    size_t name_len;
+    int is_dir;
+    long long size;
+    long long disk_usage;
+    Py_ssize_t sub;     /* subtree walk: DirRec holding this dir's listing */
+} ArenaEntry;
+
+/* One directory read by the subtree walker (see _walk_subtree). */
+typedef struct {
+    size_t path_off;    /* offset of the NUL-terminated path in paths */
+    size_t path_len;
+    Py_ssize_t entry;   /* arena entry naming this directory (-1 for root) */
+    Py_ssize_t first;   /* arena range holding this directory's listing */
+    Py_ssize_t count;
+    int depth;          /* levels below the subtree root */
+} DirRec;
+
+#ifdef DUX_HAVE_URING
+typedef struct UringRing UringRing;
+static void ring_free(UringRing *r);
+#endif
+
+typedef struct {
+    ArenaEntry *entries;
+    Py_ssize_t size;
+    Py_ssize_t capacity;
+    char *names;
+    size_t names_len;
+    size_t names_cap;
+    char *path;         /* scratch for "dir/name" during node building */
+    size_t path_cap;
+    char *dents;        /* getdents64 record buffer (Linux backend only) */
+    DirRec *recs;       /* subtree walker: directories read this call */
+    Py_ssize_t n_recs;
+    Py_ssize_t recs_cap;
+    char *paths;        /* subtree walker: full paths of recs */
+    size_t paths_len;
+    size_t paths_cap;
+    const char **skip;  /* basenames to leave out (ASCII, lowercase); */
+    Py_ssize_t n_skip;  /* borrowed UTF-8 buffers, valid for one call */
+    Py_ssize_t skip_cap;
+    long long skipped;  /* entries left out because of skip */
+    const char **stop;  /* subtree walker: directory names not to enter */
+    Py_ssize_t n_stop;  /* (same representation as skip) */
+    Py_ssize_t stop_cap;
+    InodeSetObject *inodes; /* hard links already counted; NULL = count all */
+    NameTableObject *table; /* intern table for node names; NULL = none */
+    int inode_order;    /* stat each listing in d_ino order */
+    long long dev;      /* one-file-system: device directories must be on
+                           (-1 = any); others become ENTRY_MOUNT_POINT */
+    InoSlot *slots;     /* scratch for the inode-order stat pass */
+    Py_ssize_t slots_cap;
+#ifdef DUX_HAVE_URING
+    UringRing *ring;    /* lazily created io_uring for batched statx */
+    int ring_failed;    /* setup was refused once; stop retrying */
+#endif
+} WalkArena;
+
+static pthread_key_t arena_key;
+static pthread_once_t arena_once = PTHREAD_ONCE_INIT;
+
+static void
+arena_destroy(void *p)
+{
+    WalkArena *a = (WalkArena *)p;
+    free(a->entries);
+    free(a->names);
+    free(a->path);
+    free(a->dents);
+    free(a->recs);
+    free(a->paths);
+    free(a->slots);
+    free((void *)a->skip);
+    free((void *)a->stop);
+#ifdef DUX_HAVE_URING
+    ring_free(a->ring);
+#endif
+    free(a);
+}
+
+static void
+arena_key_init(void)
+{
+    (void)pthread_key_create(&arena_key, arena_destroy);
+}
+
+/* Return this thread's arena, emptied and ready for one directory. */
+static WalkArena *
+arena_acquire(void)
+{
+    pthread_once(&arena_once, arena_key_init);
+    WalkArena *a = (WalkArena *)pthread_getspecific(arena_key);
+    if (!a) {
+        a = (WalkArena *)calloc(1, sizeof(WalkArena));
+        if (!a) return NULL;
+        if (pthread_setspecific(arena_key, a) != 0) {
+            free(a);
+            return NULL;
+        }
+    }
+    a->size = 0;
+    a->names_len = 0;
+    a->n_skip = 0;
+    a->skipped = 0;
+    a->n_stop = 0;
+    a->inodes = NULL;
+    a->table = NULL;
+    a->inode_order = 0;
+    a->dev = -1;
+    return a;
+}
+
+/* True if *name* is one of *names* (ASCII case-insensitive). */
+static int
+_name_listed(const char *const *names, Py_ssize_t n, const char *name)
+{
+    for (Py_ssize_t i = 0; i < n; i++) {
+        if (strcasecmp(name, names[i]) == 0) return 1;
+    }
+    return 0;
+}
+
+/* True if *name* is one of the arena's skip names. */
+static int
+_arena_skips(const WalkArena *a, const char *name)
+{
+    return _name_listed(a->skip, a->n_skip, name);
+}
+
+/*
+ * Point *names* at UTF-8 views of the strings in *tuple* (may be NULL),
+ * growing the array as needed.  The views are borrowed: the caller's
+ * argument tuple keeps them alive for the whole call, including any
+ * GIL-free part.  Returns 0, or -1 with an exception set.
+ */
+static int
+_borrow_names(PyObject *tuple, const char ***names, Py_ssize_t *n,
+              Py_ssize_t *cap)
+{
+    Py_ssize_t count = tuple ? PyTuple_GET_SIZE(tuple) : 0;
+    if (count > *cap) {
+        const char **nw = (const char **)realloc((void *)*names,
+                                                 sizeof(char *) * count);
+        if (!nw) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        *names = nw;
+        *cap = count;
+    }
+    for (Py_ssize_t i = 0; i < count; i++) {
+        const char *name = PyUnicode_AsUTF8(PyTuple_GET_ITEM(tuple, i));
+        if (!name) return -1;
+        (*names)[i] = name;
+    }
+    *n = count;
+    return 0;
+}
+
+static int
+arena_push(WalkArena *a, const char *name, size_t name_len, int is_dir,
+           long long size, long long disk_usage)
+{
+    if (a->size >= a->capacity) {
+        Py_ssize_t new_cap = a->capacity ? a->capacity * 2 : 128;
+        ArenaEntry *nw = (ArenaEntry *)realloc(
+            a->entries, sizeof(ArenaEntry) * new_cap);
+        if (!nw) return -1;
+        a->entries = nw;
+        a->capacity = new_cap;
+    }
+    if (a->names_len + name_len + 1 > a->names_cap) {
+        size_t new_cap = a->names_cap ? a->names_cap : 16 * 1024;
+        while (new_cap < a->names_len + name_len + 1) new_cap *= 2;
+        char *nw = (char *)realloc(a->names, new_cap);
+        if (!nw) return -1;
+        a->names = nw;
+        a->names_cap = new_cap;
+    }
+    memcpy(a->names + a->names_len, name, name_len + 1);
+    ArenaEntry *e = &a->entries[a->size];
+    e->name_off = a->names_len;
+    e->name_len = name_len;
+    e->is_dir = is_dir;
+    e->size = size;
+    e->disk_usage = disk_usage;
+    e->sub = -1;
+    a->names_len += name_len + 1;
+    a->size++;
+    return 0;
+}
+
+/* Stat *name* relative to *dfd* without following symlinks.
+ * On Linux, statx with a minimal mask lets the filesystem skip fields dux
+ * never reads (timestamps, owner, ...), which matters on NFS/FUSE.
+ * A repeat hard link to a file already in *inodes* gets size 0, and a
+ * directory off device *dev* (>= 0) is marked ENTRY_MOUNT_POINT. */
+#define DUX_STATX_MASK (STATX_TYPE | STATX_SIZE | STATX_BLOCKS | STATX_NLINK | STATX_INO)
+
+static int
+_stat_at(int dfd, const char *name, int *is_dir,
+         long long *size, long long *disk_usage, InodeSetObject *inodes,
+         long long dev)
+{
+#if defined(__linux__) && defined(STATX_TYPE)
+    struct statx stx;
+    if (statx(dfd, name, AT_SYMLINK_NOFOLLOW | AT_NO_AUTOMOUNT,
+              DUX_STATX_MASK, &stx) < 0)
+        return -1;
+    *is_dir = S_ISDIR(stx.stx_mode);
+    *size = (long long)stx.stx_size;
+    *disk_usage = (long long)stx.stx_blocks * 512;
+    if (!*is_dir && _link_counted(inodes, stx.stx_nlink,
+                                  makedev(stx.stx_dev_major, stx.stx_dev_minor),
+                                  stx.stx_ino)) {
+        *size = 0;
+        *disk_usage = 0;
+    }
+    *is_dir = _dir_kind(*is_dir, makedev(stx.stx_dev_major, stx.stx_dev_minor), dev);
+#else
+    struct stat st;
+    if (fstatat(dfd, name, &st, AT_SYMLINK_NOFOLLOW) < 0)
+        return -1;
+    *is_dir = S_ISDIR(st.st_mode);
+    *size = (long long)st.st_size;
+    *disk_usage = (long long)st.st_blocks * 512;
+    if (!*is_dir && _link_counted(inodes, st.st_nlink, st.st_dev, st.st_ino)) {
+        *size = 0;
+        *disk_usage = 0;
+    }
+    *is_dir = _dir_kind(*is_dir, st.st_dev, dev);
+#endif
+    return 0;
+}
+
+/* Stat the ENTRY_NEEDS_STAT entries from *first* on relative to *dfd* in
+ * d_ino order, then drop the ones whose stat failed. */
+static long long
+_arena_stat_pending(int dfd, WalkArena *a, Py_ssize_t first)
+{
+    Py_ssize_t n = 0;
+    Py_ssize_t need = a->size - first;
+    if (need > a->slots_cap) {
+        InoSlot *nw = (InoSlot *)realloc(a->slots, sizeof(InoSlot) * (size_t)need);
+        if (nw) {
+            a->slots = nw;
+            a->slots_cap = need;
+        }
+    }
+    /* Without room for the slots, stat in listing order. */
+    InoSlot *slots = need <= a->slots_cap ? a->slots : NULL;
+    if (slots) {
+        for (Py_ssize_t i = first; i < a->size; i++) {
+            if (a->entries[i].is_dir != ENTRY_NEEDS_STAT) continue;
+            slots[n].ino = (unsigned long long)a->entries[i].size;
+            slots[n].idx = i;
+            n++;
+        }
+        qsort(slots, (size_t)n, sizeof(InoSlot), _cmp_slot_ino);
+    } else {
+        n = need;
+    }
+
+    long long error_count = 0;
+    for (Py_ssize_t k = 0; k < n; k++) {
+        ArenaEntry *e = &a->entries[slots ? slots[k].idx : first + k];
+        if (e->is_dir != ENTRY_NEEDS_STAT) continue;
+        if (_stat_at(dfd, a->names + e->name_off, &e->is_dir, &e->size,
+                     &e->disk_usage, a->inodes, a->dev) < 0) {
+            e->is_dir = ENTRY_STAT_FAILED;
+            error_count++;
+        } else if (e->is_dir) {
+            e->size = 0;
+            e->disk_usage = 0;
+        }
+    }
+
+    Py_ssize_t kept = first;
+    for (Py_ssize_t i = first; i < a->size; i++) {
+        if (a->entries[i].is_dir == ENTRY_STAT_FAILED) continue;
+        a->entries[kept++] = a->entries[i];
+    }
+    a->size = kept;
+    return error_count;
+}
+
+/* Fill the arena via openat/readdir/fstatat (no GIL needed). */
+static long long
+_fill_arena_at(const char *dir_path, WalkArena *a)
+{
+    long long error_count = 0;
+    Py_ssize_t first = a->size;
+
+    int dfd = openat(AT_FDCWD, dir_path,
+                     O_RDONLY | O_DIRECTORY | O_NOFOLLOW | O_CLOEXEC);
+    if (dfd < 0) return 1;
+
+    DIR *dp = fdopendir(dfd);
+    if (!dp) {
+        close(dfd);
+        return 1;
+    }
+
+    struct dirent *ep;
+    while ((ep = readdir(dp)) != NULL) {
+        const char *name = ep->d_name;
+        if (name[0] == '.') {
+            if (name[1] == '\0') continue;
+            if (name[1] == '.' && name[2] == '\0') continue;
+        }
+        if (a->n_skip && _arena_skips(a, name)) {
+            a->skipped++;
+            continue;
+        }
+
+        if (a->inode_order) {
+            if (arena_push(a, name, strlen(name), ENTRY_NEEDS_STAT,
+                           (long long)ep->d_ino, 0) < 0)
+                break;
+            continue;
+        }
+
+        int is_dir;
+        long long size, disk_usage;
+        if (_stat_at(dfd, name, &is_dir, &size, &disk_usage, a->inodes, a->dev) < 0) {
+            error_count++;
+            continue;
+        }
+        if (is_dir) {
+            size = 0;
+            disk_usage = 0;
+        }
+
+        if (arena_push(a, name, strlen(name), is_dir, size, disk_usage) < 0)
+            break;
+    }
+    if (a->inode_order)
+        error_count += _arena_stat_pending(dfd, a, first);
+    /* closedir also closes dfd (ownership moved in fdopendir). */
+    closedir(dp);
+
+    return error_count;
+}
+
+/* Make sure the arena's path scratch can hold "dir/<longest name>". */
+static int
+_arena_reserve_path(WalkArena *a, size_t need)
+{
+    if (need <= a->path_cap) return 0;
+    char *nw = (char *)realloc(a->path, need);
+    if (!nw) return -1;
+    a->path = nw;
+    a->path_cap = need;
+    return 0;
+}
+
+/*
+ * Create ScanNodes for the *count* entries at *entries* (names in *names*),
+ * which are all children of *parent*, append them to parent.children in one
+ * step, and append directory nodes to *dir_nodes* in entry order.  Mount
+ * points (ENTRY_MOUNT_POINT) are counted as directories but go to *mounts*
+ * instead, or nowhere if it is NULL.  Nodes get only their name and
+ * *parent*; ScanNode.path is rebuilt from the parent chain on demand.
+ * Names go through *table*, if any.  Returns 0, or -1 with an exception set.
+ */
+static int
+_entries_into(const ArenaEntry *entries, const char *names, NameTableObject *table,
+              Py_ssize_t count, PyObject *parent, PyObject *dir_nodes,
+              PyObject *mounts, PyObject *leaf, PyObject *kind_dir, PyObject *kind_file,
+              PyObject *ScanNode_cls,
+              long long *file_count, long long *dir_count)
+{
+    PyTypeObject *type = (PyTypeObject *)ScanNode_cls;
+    PyObject *batch = PyList_New(count);
+    if (!batch) return -1;
+
+    for (Py_ssize_t i = 0; i < count; i++) {
+        const ArenaEntry *e = &entries[i];
+        PyObject *node;
+        PyObject *name = _name_intern(table, names + e->name_off,
+                                      (Py_ssize_t)e->name_len, NULL);
+        if (!name) goto error;
+
+        if (e->is_dir) {
+            PyObject *children = PyList_New(0);
+            if (!children) {
+                Py_DECREF(name);
+                goto error;
+            }
+            node = _node_make(type, name, kind_dir, 0, 0, children, parent);
+        } else {
+            node = _node_make(type, name, kind_file, e->size, e->disk_usage,
+                              Py_NewRef(leaf), parent);
+        }
+        if (!node) goto error;
+        PyList_SET_ITEM(batch, i, node);
+
+        if (e->is_dir) {
+            (*dir_count)++;
+            PyObject *into = e->is_dir == ENTRY_MOUNT_POINT ? mounts : dir_nodes;
+            if (into && PyList_Append(into, node) < 0) goto error;
+        } else {
+            (*file_count)++;
+        }
+    }
+
+    if (_node_adopt(parent, batch) < 0) goto error;
+    Py_DECREF(batch);
+    return 0;
+
+error:
+    Py_DECREF(batch);
+    return -1;
+}
+
+/* Same contract as _build_nodes_from_buf, but reading names from the arena. */
+static PyObject *
+_build_nodes_from_arena(WalkArena *a, long long err_count,
+                        PyObject *parent, PyObject *leaf,
+                        PyObject *kind_dir, PyObject *kind_file,
+                        PyObject *ScanNode_cls)
+{
+    PyObject *dir_nodes = PyList_New(0);
+    if (!dir_nodes) return NULL;
+
+    long long file_count = 0;
+    long long dir_count = 0;
+
+    if (_entries_into(a->entries, a->names, a->table, a->size, parent, dir_nodes,
+                      NULL, leaf, kind_dir, kind_file, ScanNode_cls,
+                      &file_count, &dir_count) < 0) {
+        Py_DECREF(dir_nodes);
+        return NULL;
+    }
+
+    return Py_BuildValue("(NLLL)", dir_nodes, file_count, dir_count, err_count);
+}
+
+/* ------------------------------------------------------------------ */
+/* scan_dir_at_nodes: openat + fstatat/statx                          */
+/* ------------------------------------------------------------------ */
+
+static PyObject *
+walker_scan_dir_at_nodes(PyObject *self, PyObject *args)
+{
+    (void)self;
+    const char *dir_path;
+    PyObject *parent, *leaf, *kind_dir, *kind_file, *ScanNode_cls;
+    PyObject *inodes = NULL;
+    PyObject *names = NULL;
+    int inode_order = 0;
+    long long dev = -1;
+
+    if (!PyArg_ParseTuple(args, "sOOOOO|OOpL", &dir_path, &parent, &leaf,
+                          &kind_dir, &kind_file, &ScanNode_cls, &inodes, &names,
+                          &inode_order, &dev))
+        return NULL;
+
+    WalkArena *a = arena_acquire();
+    if (!a)
+        return PyErr_NoMemory();
+    if (_inodes_arg(inodes, &a->inodes) < 0 || _names_arg(names, &a->table) < 0 ||
+        _node_args(ScanNode_cls, parent) < 0)
+        return NULL;
+    a->inode_order = inode_order;
+    a->dev = dev;
+
+    long long error_count;
+
+    /* The arena is thread-local, so no other thread touches it while the
+     * GIL is released. */
+    Py_BEGIN_ALLOW_THREADS
+    error_count = _fill_arena_at(dir_path, a);
+    Py_END_ALLOW_THREADS
+
+    return _build_nodes_from_arena(a, error_count, parent, leaf,
+                                   kind_dir, kind_file, ScanNode_cls);
+}
+
+/* ------------------------------------------------------------------ */
+/* scan_dir_getdents_nodes: Linux getdents64 + d_type                 */
+/* ------------------------------------------------------------------ */
+
+#ifdef __linux__
+
+/* Kernel record layout for getdents64(2); glibc does not export it. */
+struct linux_dirent64 {
+    uint64_t       d_ino;
+    int64_t        d_off;
+    unsigned short d_reclen;
+    unsigned char  d_type;
+    char           d_name[];
+};
+
+/* 256 KB per call instead of glibc readdir's 32 KB: a 100k-entry directory
+ * is drained in a handful of syscalls. */
+#define DENTS_BUF_SIZE (256 * 1024)
+
+/*
+ * Read every getdents64 record of *dfd* into the arena (no GIL needed).
+ *
+ * d_type is trusted whenever the filesystem provides it: directories are
+ * recorded with size 0 anyway, and symlinks/fifos/sockets/devices are
+ * leaves whose stat data dux does not need, so only DT_REG (for its size)
+ * and DT_UNKNOWN (for its kind) need a stat.  In one-file-system mode
+ * (a->dev >= 0) DT_DIR entries are stat'ed too, for their device.  With *defer_stat* those are
+ * pushed as ENTRY_NEEDS_STAT for a later batched pass instead of being
+ * stat'ed inline; with DEFER_STAT_ALL every non-directory is, as the lstat
+ * based backends would size symlinks and special files too.
+ */
+#define DEFER_STAT_ALL 2
+
+static long long
+_collect_dents(int dfd, WalkArena *a, int defer_stat)
+{
+    if (!a->dents) {
+        a->dents = (char *)malloc(DENTS_BUF_SIZE);
+        if (!a->dents) return 1;
+    }
+
+    long long error_count = 0;
+    for (;;) {
+        long nread = syscall(SYS_getdents64, dfd, a->dents, DENTS_BUF_SIZE);
+        if (nread < 0) {
+            if (errno == EINTR) continue;
+            error_count++;
+            break;
+        }
+        if (nread == 0) break;
+
+        for (long off = 0; off < nread;) {
+            struct linux_dirent64 *d = (struct linux_dirent64 *)(a->dents + off);
+            off += d->d_reclen;
+
+            const char *name = d->d_name;
+            if (name[0] == '.') {
+                if (name[1] == '\0') continue;
+                if (name[1] == '.' && name[2] == '\0') continue;
+            }
+            if (a->n_skip && _arena_skips(a, name)) {
+                a->skipped++;
+                continue;
+            }
+
+            int is_dir = 0;
+            long long size = 0;
+            long long disk_usage = 0;
+            if (d->d_type == DT_DIR && a->dev < 0) {
+                is_dir = 1;
+            } else if (d->d_type == DT_DIR || d->d_type == DT_REG ||
+                       d->d_type == DT_UNKNOWN || defer_stat == DEFER_STAT_ALL) {
+                if (defer_stat) {
+                    is_dir = ENTRY_NEEDS_STAT;
+                    size = (long long)d->d_ino;
+                } else if (_stat_at(dfd, name, &is_dir, &size, &disk_usage,
+                                    a->inodes, a->dev) < 0) {
+                    error_count++;
+                    continue;
+                } else if (is_dir) {
+                    size = 0;
+                    disk_usage = 0;
+                }
+            }
+
+            if (arena_push(a, name, strlen(name), is_dir, size, disk_usage) < 0)
+                return error_count;
+        }
+    }
+    return error_count;
+}
+
+/* Fill the arena from raw getdents64 records, stat'ing inline (or, in
+ * inode-order mode, after the whole listing is read). */
+static long long
+_fill_arena_getdents(const char *dir_path, WalkArena *a)
+{
+    int dfd = openat(AT_FDCWD, dir_path,
+                     O_RDONLY | O_DIRECTORY | O_NOFOLLOW | O_CLOEXEC);
+    if (dfd < 0) return 1;
+
+    Py_ssize_t first = a->size;
+    long long error_count = _collect_dents(dfd, a, a->inode_order);
+    if (a->inode_order)
+        error_count += _arena_stat_pending(dfd, a, first);
+    close(dfd);
+    return error_count;
+}
+
+static PyObject *
+walker_scan_dir_getdents_nodes(PyObject *self, PyObject *args)
+{
+    (void)self;
+    const char *dir_path;
+    PyObject *parent, *leaf, *kind_dir, *kind_file, *ScanNode_cls;
+    PyObject *inodes = NULL;
+    PyObject *names = NULL;
+    int inode_order = 0;
+    long long dev = -1;
+
+    if (!PyArg_ParseTuple(args, "sOOOOO|OOpL", &dir_path, &parent, &leaf,
+                          &kind_dir, &kind_file, &ScanNode_cls, &inodes, &names,
+                          &inode_order, &dev))
+        return NULL;
+
+    WalkArena *a = arena_acquire();
+    if (!a)
+        return PyErr_NoMemory();
+    if (_inodes_arg(inodes, &a->inodes) < 0 || _names_arg(names, &a->table) < 0 ||
+        _node_args(ScanNode_cls, parent) < 0)
+        return NULL;
+    a->inode_order = inode_order;
+    a->dev = dev;
+
+    long long error_count;
+
+    Py_BEGIN_ALLOW_THREADS
+    error_count = _fill_arena_getdents(dir_path, a);
+    Py_END_ALLOW_THREADS
+
+    return _build_nodes_from_arena(a, error_count, parent, leaf,
+                                   kind_dir, kind_file, ScanNode_cls);
+}
+
+#endif /* __linux__ */
+
+/* ------------------------------------------------------------------ */
+/* scan_dir_uring_nodes: Linux io_uring batched statx                 */
+/* ------------------------------------------------------------------ */
+
+#ifdef DUX_HAVE_URING
+
+/*
+ * Minimal io_uring driver on raw syscalls (no liburing dependency).
+ *
+ * Each worker thread owns one ring, created lazily in its WalkArena.  A
+ * directory is read with getdents64 first; every entry that needs a stat is
+ * then submitted as IORING_OP_STATX relative to the directory fd, keeping up
+ * to *depth* requests in flight so NVMe queues and network round trips
+ * overlap instead of running one lstat at a time.
+ *
+ * The kernel copies the filename at submission, so only the statx result
+ * buffers must stay valid until completion; they live in per-ring slots.
+ */
+struct UringRing {
+    int fd;
+    unsigned depth;             /* max requests in flight (== slot count) */
+    unsigned *sq_head, *sq_tail, *sq_mask, *sq_array;
+    unsigned *cq_head, *cq_tail, *cq_mask;
+    struct io_uring_sqe *sqes;
+    struct io_uring_cqe *cqes;
+    void *sq_map;
+    size_t sq_map_sz;
+    void *cq_map;               /* == sq_map with IORING_FEAT_SINGLE_MMAP */
+    size_t cq_map_sz;
+    void *sqe_map;
+    size_t sqe_map_sz;
+    struct statx *slots;        /* one result buffer per in-flight request */
+    Py_ssize_t *slot_entry;     /* arena entry index owning each slot */
+    unsigned *free_slots;
+    unsigned n_free;
+};
+
+static void
+ring_free(UringRing *r)
+{
+    if (!r) return;
+    if (r->sqe_map) munmap(r->sqe_map, r->sqe_map_sz);
+    if (r->cq_map && r->cq_map != r->sq_map) munmap(r->cq_map, r->cq_map_sz);
+    if (r->sq_map) munmap(r->sq_map, r->sq_map_sz);
+    if (r->fd >= 0) close(r->fd);
+    free(r->slots);
+    free(r->slot_entry);
+    free(r->free_slots);
+    free(r);
+}
+
+static void *
+_ring_mmap(int fd, size_t size, off_t offset)
+{
+    void *p = mmap(NULL, size, PROT_READ | PROT_WRITE,
+                   MAP_SHARED | MAP_POPULATE, fd, offset);
+    return p == MAP_FAILED ? NULL : p;
+}
+
+/* Create a ring with *depth* submission slots, or NULL if the kernel
+ * refuses io_uring (ENOSYS, or EPERM under container seccomp filters). */
+static UringRing *
+ring_open(unsigned depth)
+{
+    struct io_uring_params p;
+    memset(&p, 0, sizeof(p));
+    int fd = (int)syscall(__NR_io_uring_setup, depth, &p);
+    if (fd < 0) return NULL;
+
+    UringRing *r = (UringRing *)calloc(1, sizeof(UringRing));
+    if (!r) {
+        close(fd);
+        return NULL;
+    }
+    r->fd = fd;
+    r->depth = depth;
+
+    r->sq_map_sz = p.sq_off.array + p.sq_entries * sizeof(unsigned);
+    r->cq_map_sz = p.cq_off.cqes + p.cq_entries * sizeof(struct io_uring_cqe);
+    int single = (p.features & IORING_FEAT_SINGLE_MMAP) != 0;
+    if (single) {
+        if (r->cq_map_sz > r->sq_map_sz) r->sq_map_sz = r->cq_map_sz;
+        r->cq_map_sz = r->sq_map_sz;
+    }
+    r->sq_map = _ring_mmap(fd, r->sq_map_sz, IORING_OFF_SQ_RING);
+    if (!r->sq_map) goto fail;
+    r->cq_map = single ? r->sq_map : _ring_mmap(fd, r->cq_map_sz, IORING_OFF_CQ_RING);
+    if (!r->cq_map) goto fail;
+    r->sqe_map_sz = p.sq_entries * sizeof(struct io_uring_sqe);
+    r->sqe_map = _ring_mmap(fd, r->sqe_map_sz, IORING_OFF_SQES);
+    if (!r->sqe_map) goto fail;
+
+    char *sq = (char *)r->sq_map;
+    char *cq = (char *)r->cq_map;
+    r->sq_head = (unsigned *)(sq + p.sq_off.head);
+    r->sq_tail = (unsigned *)(sq + p.sq_off.tail);
+    r->sq_mask = (unsigned *)(sq + p.sq_off.ring_mask);
+    r->sq_array = (unsigned *)(sq + p.sq_off.array);
+    r->cq_head = (unsigned *)(cq + p.cq_off.head);
+    r->cq_tail = (unsigned *)(cq + p.cq_off.tail);
+    r->cq_mask = (unsigned *)(cq + p.cq_off.ring_mask);
+    r->cqes = (struct io_uring_cqe *)(cq + p.cq_off.cqes);
+    r->sqes = (struct io_uring_sqe *)r->sqe_map;
+
+    r->slots = (struct statx *)malloc(sizeof(struct statx) * depth);
+    r->slot_entry = (Py_ssize_t *)malloc(sizeof(Py_ssize_t) * depth);
+    r->free_slots = (unsigned *)malloc(sizeof(unsigned) * depth);
+    if (!r->slots || !r->slot_entry || !r->free_slots) goto fail;
+    for (unsigned i = 0; i < depth; i++) r->free_slots[i] = i;
+    r->n_free = depth;
+    return r;
+
+fail:
+    ring_free(r);
+    return NULL;
+}
+
+/*
+ * Resolve every ENTRY_NEEDS_STAT entry in the arena with IORING_OP_STATX.
+ * Returns the number of failed stats (marked ENTRY_STAT_FAILED), or -1 if
+ * the ring itself broke; the caller then stats leftovers synchronously.
+ */
+static long long
+_uring_stat_pending(UringRing *r, int dfd, WalkArena *a)
+{
+    long long error_count = 0;
+    Py_ssize_t next = 0;
+    unsigned inflight = 0;
+    unsigned unsubmitted = 0;
+
+    for (;;) {
+        /* Queue pending entries into every free slot. */
+        while (r->n_free > 0) {
+            while (next < a->size && a->entries[next].is_dir != ENTRY_NEEDS_STAT)
+                next++;
+            if (next >= a->size) break;
+
+            unsigned slot = r->free_slots[--r->n_free];
+            r->slot_entry[slot] = next;
+
+            /* Single producer: only this thread writes sq_tail. */
+            unsigned tail = *r->sq_tail;
+            unsigned idx = tail & *r->sq_mask;
+            struct io_uring_sqe *sqe = &r->sqes[idx];
+            memset(sqe, 0, sizeof(*sqe));
+            sqe->opcode = IORING_OP_STATX;
+            sqe->fd = dfd;
+            sqe->addr = (uint64_t)(uintptr_t)(a->names + a->entries[next].name_off);
+            sqe->len = DUX_STATX_MASK;
+            sqe->off = (uint64_t)(uintptr_t)&r->slots[slot];
+            sqe->statx_flags = AT_SYMLINK_NOFOLLOW | AT_NO_AUTOMOUNT;
+            sqe->user_data = slot;
+            r->sq_array[idx] = idx;
+            __atomic_store_n(r->sq_tail, tail + 1, __ATOMIC_RELEASE);
+
+            unsubmitted++;
+            inflight++;
+            next++;
+        }
+        if (inflight == 0) break;
+
+        int ret = (int)syscall(__NR_io_uring_enter, r->fd, unsubmitted, 1,
+                               IORING_ENTER_GETEVENTS, NULL, 0);
+        if (ret < 0) {
+            if (errno == EINTR || errno == EAGAIN || errno == EBUSY) continue;
+            return -1;
+        }
+        unsubmitted -= (unsigned)ret;
+
+        unsigned head = *r->cq_head;
+        unsigned ctail = __atomic_load_n(r->cq_tail, __ATOMIC_ACQUIRE);
+        while (head != ctail) {
+            struct io_uring_cqe *cqe = &r->cqes[head & *r->cq_mask];
+            unsigned slot = (unsigned)cqe->user_data;
+            ArenaEntry *e = &a->entries[r->slot_entry[slot]];
+            if (cqe->res < 0) {
+                e->is_dir = ENTRY_STAT_FAILED;
+                error_count++;
+            } else {
+                struct statx *stx = &r->slots[slot];
+                unsigned long long st_dev = makedev(stx->stx_dev_major, stx->stx_dev_minor);
+                e->is_dir = S_ISDIR(stx->stx_mode);
+                e->size = e->is_dir ? 0 : (long long)stx->stx_size;
+                e->disk_usage = e->is_dir ? 0 : (long long)stx->stx_blocks * 512;
+                if (!e->is_dir &&
+                    _link_counted(a->inodes, stx->stx_nlink, st_dev, stx->stx_ino)) {
+                    e->size = 0;
+                    e->disk_usage = 0;
+                }
+                e->is_dir = _dir_kind(e->is_dir, st_dev, a->dev);
+            }
+            r->free_slots[r->n_free++] = slot;
+            inflight--;
+            head++;
+        }
+        __atomic_store_n(r->cq_head, head, __ATOMIC_RELEASE);
+    }
+    return error_count;
+}
+
+/* Drop a ring whose requests may still be in flight.  The statx slots are
+ * deliberately leaked: the kernel may still write completions into them. */
+static void
+ring_abandon(UringRing *r)
+{
+    r->slots = NULL;
+    ring_free(r);
+}
+
+/* Fill the arena via getdents64 + batched io_uring statx (no GIL needed). */
+static long long
+_fill_arena_uring(const char *dir_path, WalkArena *a, unsigned depth)
+{
+    int dfd = openat(AT_FDCWD, dir_path,
+                     O_RDONLY | O_DIRECTORY | O_NOFOLLOW | O_CLOEXEC);
+    if (dfd < 0) return 1;
+
+    long long error_count = _collect_dents(dfd, a, 1);
+
+    if (a->ring && a->ring->depth != depth) {
+        ring_free(a->ring);
+        a->ring = NULL;
+    }
+    if (!a->ring && !a->ring_failed) {
+        a->ring = ring_open(depth);
+        if (!a->ring) a->ring_failed = 1;
+    }
+    if (a->ring) {
+        long long failed = _uring_stat_pending(a->ring, dfd, a);
+        if (failed < 0) {
+            ring_abandon(a->ring);
+            a->ring = NULL;
+            a->ring_failed = 1;
+        } else {
+            error_count += failed;
+        }
+    }
+
+    /* Synchronous fallback for anything the ring did not resolve, then
+     * compact failed entries out so the node builder never sees them. */
+    Py_ssize_t kept = 0;
+    for (Py_ssize_t i = 0; i < a->size; i++) {
+        ArenaEntry *e = &a->entries[i];
+        if (e->is_dir == ENTRY_NEEDS_STAT) {
+            if (_stat_at(dfd, a->names + e->name_off, &e->is_dir,
+                         &e->size, &e->disk_usage, a->inodes, a->dev) < 0) {
+                error_count++;
+                continue;
+            }
+            if (e->is_dir) {
+                e->size = 0;
+                e->disk_usage = 0;
+            }
+        } else if (e->is_dir == ENTRY_STAT_FAILED) {
+            continue;
+        }
+        a->entries[kept++] = *e;
+    }
+    a->size = kept;
+
+    close(dfd);
+    return error_count;
+}
+
+static PyObject *
+walker_scan_dir_uring_nodes(PyObject *self, PyObject *args)
+{
+    (void)self;
+    const char *dir_path;
+    PyObject *parent, *leaf, *kind_dir, *kind_file, *ScanNode_cls;
+    int queue_depth = 64;
+    PyObject *inodes = NULL;
+    PyObject *names = NULL;
+    long long dev = -1;
+
+    if (!PyArg_ParseTuple(args, "sOOOOO|iOOL", &dir_path, &parent, &leaf,
+                          &kind_dir, &kind_file, &ScanNode_cls, &queue_depth,
+                          &inodes, &names, &dev))
+        return NULL;
+    if (queue_depth < 1) queue_depth = 1;
+    if (queue_depth > 4096) queue_depth = 4096;
+
+    WalkArena *a = arena_acquire();
+    if (!a)
+        return PyErr_NoMemory();
+    if (_inodes_arg(inodes, &a->inodes) < 0 || _names_arg(names, &a->table) < 0 ||
+        _node_args(ScanNode_cls, parent) < 0)
+        return NULL;
+    a->dev = dev;
+
+    long long error_count;
+
+    Py_BEGIN_ALLOW_THREADS
+    error_count = _fill_arena_uring(dir_path, a, (unsigned)queue_depth);
+    Py_END_ALLOW_THREADS
+
+    return _build_nodes_from_arena(a, error_count, parent, leaf,
+                                   kind_dir, kind_file, ScanNode_cls);
+}
+
+static int uring_usable = 0;
+static pthread_once_t uring_probe_once = PTHREAD_ONCE_INIT;
+
+/* Set uring_usable if a ring can be created and IORING_OP_STATX works:
+ * setup alone is not enough, kernels before 5.6 reject the opcode. */
+static void
+_uring_probe(void)
+{
+    UringRing *r = ring_open(1);
+    if (!r) return;
+
+    char name[] = ".";
+    ArenaEntry entry = {0, 1, ENTRY_NEEDS_STAT, 0, 0, -1};
+    WalkArena probe;
+    memset(&probe, 0, sizeof(probe));
+    probe.entries = &entry;
+    probe.size = 1;
+    probe.capacity = 1;
+    probe.names = name;
+    probe.dev = -1;
+
+    long long failed = _uring_stat_pending(r, AT_FDCWD, &probe);
+    if (failed < 0) {
+        ring_abandon(r);
+        return;
+    }
+    uring_usable = (failed == 0 && entry.is_dir == 1);
+    ring_free(r);
+}
+
+static PyObject *
+walker_uring_available(PyObject *self, PyObject *unused)
+{
+    (void)self;
+    (void)unused;
+    Py_BEGIN_ALLOW_THREADS
+    pthread_once(&uring_probe_once, _uring_probe);
+    Py_END_ALLOW_THREADS
+    return PyBool_FromLong(uring_usable);
+}
+
+#endif /* DUX_HAVE_URING */
+
+/* ------------------------------------------------------------------ */
+/* scan_subtree_nodes: walk a whole subtree per call                  */
+/* ------------------------------------------------------------------ */
+
+/* Read one directory into the arena, appending after existing entries.
+ * Uses the getdents64/d_type fast path on Linux, openat+fstatat elsewhere. */
+static long long
+_fill_arena_dir(const char *dir_path, WalkArena *a)
+{
+#ifdef __linux__
+    return _fill_arena_getdents(dir_path, a);
+#else
+    return _fill_arena_at(dir_path, a);
+#endif
+}
+
+static int
+_arena_push_rec(WalkArena *a, const char *parent_path, size_t plen,
+                const char *name, size_t nlen, Py_ssize_t entry, int depth)
+{
+    if (a->n_recs >= a->recs_cap) {
+        Py_ssize_t new_cap = a->recs_cap ? a->recs_cap * 2 : 64;
+        DirRec *nw = (DirRec *)realloc(a->recs, sizeof(DirRec) * new_cap);
+        if (!nw) return -1;
+        a->recs = nw;
+        a->recs_cap = new_cap;
+    }
+    int needs_slash = (plen > 0 && parent_path && parent_path[plen - 1] != '/');
+    size_t len = plen + needs_slash + nlen;
+    if (a->paths_len + len + 1 > a->paths_cap) {
+        size_t new_cap = a->paths_cap ? a->paths_cap : 64 * 1024;
+        while (new_cap < a->paths_len + len + 1) new_cap *= 2;
+        /* parent_path may point into a->paths: rebase it after realloc. */
+        ptrdiff_t rebase = (parent_path && a->paths && parent_path >= a->paths &&
+                            parent_path < a->paths + a->paths_len)
+                               ? parent_path - a->paths : -1;
+        char *nw = (char *)realloc(a->paths, new_cap);
+        if (!nw) return -1;
+        a->paths = nw;
+        a->paths_cap = new_cap;
+        if (rebase >= 0) parent_path = a->paths + rebase;
+    }
+    char *dst = a->paths + a->paths_len;
+    if (plen) memcpy(dst, parent_path, plen);
+    if (needs_slash) dst[plen] = '/';
+    memcpy(dst + plen + needs_slash, name, nlen);
+    dst[len] = '\0';
+
+    DirRec *rec = &a->recs[a->n_recs++];
+    rec->path_off = a->paths_len;
+    rec->path_len = len;
+    rec->entry = entry;
+    rec->first = 0;
+    rec->count = 0;
+    rec->depth = depth;
+    a->paths_len += len + 1;
+    return 0;
+}
+
+/*
+ * Breadth-first walk below *root_path* with no GIL (no Python objects).
+ *
+ * Every directory that is read becomes a DirRec whose entries occupy a
+ * contiguous arena range; a directory entry's `sub` field links it to the
+ * DirRec of its own listing.  Reading stops once *max_entries* entries are
+ * buffered (the directory in progress is always finished) or below
+ * *max_depth* levels (-1 = unlimited); directories left unread keep
+ * sub == -1 and are returned to Python as the frontier.  Mount points
+ * (one-file-system mode, see a->dev) are never read nor part of the
+ * frontier.  Subdirectories named in the arena's stop list are not entered
+ * either and go back as frontier, for the caller to summarize.
+ */
+static long long
+_walk_subtree(const char *root_path, WalkArena *a,
+              Py_ssize_t max_entries, int max_depth)
+{
+    long long error_count = 0;
+    a->n_recs = 0;
+    a->paths_len = 0;
+    if (_arena_push_rec(a, NULL, 0, root_path, strlen(root_path), -1, 0) < 0)
+        return 1;
+
+    for (Py_ssize_t r = 0; r < a->n_recs; r++) {
+        if (a->size >= max_entries) {
+            /* Budget spent: un-link the queued directories so they are
+             * handed back as frontier instead of being read here. */
+            for (Py_ssize_t q = r; q < a->n_recs; q++)
+                a->entries[a->recs[q].entry].sub = -1;
+            a->n_recs = r;
+            break;
+        }
+
+        Py_ssize_t first = a->size;
+        error_count += _fill_arena_dir(a->paths + a->recs[r].path_off, a);
+        a->recs[r].first = first;
+        a->recs[r].count = a->size - first;
+
+        int depth = a->recs[r].depth;
+        if (max_depth >= 0 && depth >= max_depth) continue;
+        for (Py_ssize_t i = first; i < a->size; i++) {
+            if (!a->entries[i].is_dir || a->entries[i].is_dir == ENTRY_MOUNT_POINT)
+                continue;
+            if (a->n_stop &&
+                _name_listed(a->stop, a->n_stop, a->names + a->entries[i].name_off))
+                continue;
+            /* Re-read the parent path each time: pushing may move a->paths. */
+            if (_arena_push_rec(a, a->paths + a->recs[r].path_off,
+                                a->recs[r].path_len,
+                                a->names + a->entries[i].name_off,
+                                a->entries[i].name_len, i, depth + 1) < 0) {
+                error_count++;
+                break;
+            }
+            a->entries[i].sub = a->n_recs - 1;
+        }
+    }
+    return error_count;
+}
+
+/* Build nodes for every DirRec and collect the unread frontier, and the
+ * mount points into *mounts* (if not NULL). */
+static PyObject *
+_build_subtree_nodes(WalkArena *a, long long err_count, PyObject *parent,
+                     PyObject *mounts, PyObject *leaf, PyObject *kind_dir,
+                     PyObject *kind_file, PyObject *ScanNode_cls)
+{
+    PyObject *result = NULL;
+    PyObject *frontier = PyList_New(0);
+    if (!frontier) return NULL;
+
+    /* rec_nodes[r] is the ScanNode whose listing DirRec r holds.  Records
+     * are created breadth-first, so a parent is always built before its
+     * children and rec_nodes[r] is set by the time record r is reached. */
+    PyObject **rec_nodes = (PyObject **)PyMem_Calloc(
+        (size_t)(a->n_recs ? a->n_recs : 1), sizeof(PyObject *));
+    if (!rec_nodes) {
+        Py_DECREF(frontier);
+        return PyErr_NoMemory();
+    }
+    Py_INCREF(parent);
+    rec_nodes[0] = parent;
+
+    long long file_count = 0;
+    long long dir_count = 0;
+
+    for (Py_ssize_t r = 0; r < a->n_recs; r++) {
+        DirRec *rec = &a->recs[r];
+        PyObject *dir_nodes = PyList_New(0);
+        if (!dir_nodes) goto done;
+
+        int rc = _entries_into(a->entries + rec->first, a->names, a->table,
+                               rec->count, rec_nodes[r], dir_nodes, mounts, leaf,
+                               kind_dir, kind_file, ScanNode_cls,
+                               &file_count, &dir_count);
+        if (rc < 0) {
+            Py_DECREF(dir_nodes);
+            goto done;
+        }
+
+        Py_ssize_t k = 0;
+        for (Py_ssize_t i = rec->first; i < rec->first + rec->count; i++) {
+            ArenaEntry *e = &a->entries[i];
+            if (!e->is_dir || e->is_dir == ENTRY_MOUNT_POINT) continue;
+            PyObject *dn = PyList_GET_ITEM(dir_nodes, k++);
+            if (e->sub >= 0) {
+                Py_INCREF(dn);
+                rec_nodes[e->sub] = dn;
+                continue;
+            }
+            PyObject *item = Py_BuildValue("(Oi)", dn, rec->depth + 1);
+            if (!item || PyList_Append(frontier, item) < 0) {
+                Py_XDECREF(item);
+                Py_DECREF(dir_nodes);
+                goto done;
+            }
+            Py_DECREF(item);
+        }
+        Py_DECREF(dir_nodes);
+    }
+
+    result = Py_BuildValue("(OLLLL)", frontier, file_count, dir_count, err_count,
+                           a->skipped);
+
+done:
+    for (Py_ssize_t r = 0; r < a->n_recs; r++) Py_XDECREF(rec_nodes[r]);
+    PyMem_Free(rec_nodes);
+    Py_DECREF(frontier);
+    return result;
+}
+
+static PyObject *
+walker_scan_subtree_nodes(PyObject *self, PyObject *args)
+{
+    (void)self;
+    const char *dir_path;
+    PyObject *parent, *leaf, *kind_dir, *kind_file, *ScanNode_cls;
+    Py_ssize_t max_entries;
+    int max_depth;
+    long long dev = -1;
+    PyObject *skip = NULL;
+    PyObject *stop = NULL;
+    PyObject *inodes = NULL;
+    PyObject *names = NULL;
+    int inode_order = 0;
+    PyObject *mounts = NULL;
+
+    if (!PyArg_ParseTuple(args, "sOOOOOni|LO!O!OOpO", &dir_path, &parent, &leaf,
+                          &kind_dir, &kind_file, &ScanNode_cls,
+                          &max_entries, &max_depth, &dev,
+                          &PyTuple_Type, &skip, &PyTuple_Type, &stop, &inodes,
+                          &names, &inode_order, &mounts))
+        return NULL;
+    if (mounts == Py_None) mounts = NULL;
+    if (mounts && !PyList_Check(mounts)) {
+        PyErr_SetString(PyExc_TypeError, "mounts must be a list or None");
+        return NULL;
+    }
+
+    WalkArena *a = arena_acquire();
+    if (!a)
+        return PyErr_NoMemory();
+    if (_borrow_names(skip, &a->skip, &a->n_skip, &a->skip_cap) < 0 ||
+        _borrow_names(stop, &a->stop, &a->n_stop, &a->stop_cap) < 0 ||
+        _inodes_arg(inodes, &a->inodes) < 0 || _names_arg(names, &a->table) < 0 ||
+        _node_args(ScanNode_cls, parent) < 0)
+        return NULL;
+    a->inode_order = inode_order;
+    a->dev = dev;
+
+    long long error_count;
+
+    /* One GIL release for the whole subtree, however many directories. */
+    Py_BEGIN_ALLOW_THREADS
+    error_count = _walk_subtree(dir_path, a, max_entries, max_depth);
+    Py_END_ALLOW_THREADS
+
+    return _build_subtree_nodes(a, error_count, parent, mounts, leaf, kind_dir,
+                                kind_file, ScanNode_cls);
+}
+
+/* ------------------------------------------------------------------ */
+/* DirReader: directory reads on C threads, nodes built by Python     */
+/* ------------------------------------------------------------------ */
+
+/*
+ * A pool of pthreads that read directories without ever taking the GIL.
+ * Python submits (path, token) jobs; a reader thread fills its own arena
+ * with _fill_arena_dir, copies the entries into the job, and moves the job
+ * to the ready ring.  Builder threads take() ready jobs as (token, batch)
+ * pairs and turn each DirBatch into nodes with build_batch_nodes, so node
+ * construction (the only GIL-held part) is confined to the builders.
+ *
+ * Both queues are intrusive linked lists under one mutex, held only to
+ * link or unlink a job; idle threads wait on a condition variable (readers
+ * without the GIL, builders with it released).  The ready ring's depth at
+ * each take() is recorded: batches piling up mean the builders are the
+ * bottleneck, an empty ring means the readers are.
+ */
+
+typedef struct ReadJob {
+    struct ReadJob *next;
+    char *path;             /* NULL: pass the token through unread */
+    PyObject *token;
+    ArenaEntry *entries;
+    Py_ssize_t count;
+    char *names;
+    long long errors;
+} ReadJob;
+
+typedef struct {
+    PyObject_HEAD
+    pthread_mutex_t lock;
+    pthread_cond_t todo_cond;
+    pthread_cond_t ready_cond;
+    ReadJob *todo_head, *todo_tail;
+    ReadJob *ready_head, *ready_tail;
+    Py_ssize_t n_todo, n_ready;
+    pthread_t *threads;
+    int n_threads;
+    int closing;
+    int inode_order;
+    long long dev;          /* one-file-system device, -1 = any (see WalkArena) */
+    InodeSetObject *inodes;
+    long long takes;        /* jobs handed to builders */
+    long long depth_sum;    /* n_ready summed over takes */
+    Py_ssize_t depth_peak;
+    long long builder_waits;    /* take() found the ready ring empty */
+    long long reader_waits;     /* a reader found no directory queued */
+} DirReaderObject;
+
+typedef struct {
+    PyObject_HEAD
+    ArenaEntry *entries;
+    Py_ssize_t count;
+    char *names;
+    long long errors;
+    char *path;             /* list_dir batches: the directory, for stat_batch */
+    long long dev;          /* list_dir batches: one-file-system device, -1 = any */
+    Py_ssize_t pending;     /* entries still ENTRY_NEEDS_STAT */
+    Py_ssize_t *order;      /* stat order (entry indices by d_ino); NULL = listing order */
+} DirBatchObject;
+
+static void
+_job_free(ReadJob *job)
+{
+    free(job->path);
+    free(job->entries);
+    free(job->names);
+    free(job);
+}
+
+/* Append *job* to a queue (caller holds the lock). */
+static void
+_job_link(ReadJob **head, ReadJob **tail, ReadJob *job)
+{
+    job->next = NULL;
+    if (*tail) (*tail)->next = job;
+    else *head = job;
+    *tail = job;
+}
+
+static ReadJob *
+_job_unlink(ReadJob **head, ReadJob **tail)
+{
+    ReadJob *job = *head;
+    *head = job->next;
+    if (!*head) *tail = NULL;
+    return job;
+}
+
+/* Read job->path into the calling thread's arena and copy the result out. */
+static void
+_job_read(ReadJob *job, InodeSetObject *inodes, int inode_order, long long dev)
+{
+    WalkArena *a = arena_acquire();
+    if (!a) {
+        job->errors = 1;
+        return;
+    }
+    a->inodes = inodes;
+    a->inode_order = inode_order;
+    a->dev = dev;
+    job->errors = _fill_arena_dir(job->path, a);
+    a->inodes = NULL;
+    if (a->size == 0) return;
+    job->entries = (ArenaEntry *)malloc(sizeof(ArenaEntry) * (size_t)a->size);
+    job->names = (char *)malloc(a->names_len);
+    if (!job->entries || !job->names) {
+        free(job->entries);
+        free(job->names);
+        job->entries = NULL;
+        job->names = NULL;
+        job->errors++;
+        return;
+    }
+    memcpy(job->entries, a->entries, sizeof(ArenaEntry) * (size_t)a->size);
+    memcpy(job->names, a->names, a->names_len);
+    job->count = a->size;
+}
+
+static void *
+_reader_main(void *arg)
+{
+    DirReaderObject *r = (DirReaderObject *)arg;
+    pthread_mutex_lock(&r->lock);
+    for (;;) {
+        while (!r->todo_head && !r->closing) {
+            r->reader_waits++;
+            pthread_cond_wait(&r->todo_cond, &r->lock);
+        }
+        if (r->closing) break;
+        ReadJob *job = _job_unlink(&r->todo_head, &r->todo_tail);
+        r->n_todo--;
+        pthread_mutex_unlock(&r->lock);
+
+        _job_read(job, r->inodes, r->inode_order, r->dev);
+
+        pthread_mutex_lock(&r->lock);
+        _job_link(&r->ready_head, &r->ready_tail, job);
+        r->n_ready++;
+        pthread_cond_signal(&r->ready_cond);
+    }
+    pthread_mutex_unlock(&r->lock);
+    return NULL;
+}
+
+/* Stop and join the reader threads, then drop every queued job. */
+static void
+_reader_close(DirReaderObject *r)
+{
+    if (!r->threads) return;
+    pthread_mutex_lock(&r->lock);
+    r->closing = 1;
+    pthread_cond_broadcast(&r->todo_cond);
+    pthread_cond_broadcast(&r->ready_cond);
+    pthread_mutex_unlock(&r->lock);
+
+    Py_BEGIN_ALLOW_THREADS
+    for (int i = 0; i < r->n_threads; i++)
+        pthread_join(r->threads[i], NULL);
+    Py_END_ALLOW_THREADS
+    free(r->threads);
+    r->threads = NULL;
+
+    ReadJob **queues[2][2] = {{&r->todo_head, &r->todo_tail},
+                              {&r->ready_head, &r->ready_tail}};
+    for (int q = 0; q < 2; q++) {
+        while (*queues[q][0]) {
+            ReadJob *job = _job_unlink(queues[q][0], queues[q][1]);
+            Py_DECREF(job->token);
+            _job_free(job);
+        }
+    }
+    r->n_todo = r->n_ready = 0;
+}
+
+static PyObject *
+DirReader_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"threads", "inodes", "inode_order", "dev", NULL};
+    int n_threads = 4;
+    PyObject *inodes_obj = NULL;
+    InodeSetObject *inodes;
+    int inode_order = 0;
+    long long dev = -1;
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "|iOpL", kwlist, &n_threads, &inodes_obj,
+                                     &inode_order, &dev))
+        return NULL;
+    if (n_threads < 1) {
+        PyErr_SetString(PyExc_ValueError, "threads must be at least 1");
+        return NULL;
+    }
+    if (_inodes_arg(inodes_obj, &inodes) < 0)
+        return NULL;
+
+    DirReaderObject *r = (DirReaderObject *)type->tp_alloc(type, 0);
+    if (!r) return NULL;
+    pthread_mutex_init(&r->lock, NULL);
+    pthread_cond_init(&r->todo_cond, NULL);
+    pthread_cond_init(&r->ready_cond, NULL);
+    r->inodes = (InodeSetObject *)Py_XNewRef((PyObject *)inodes);
+    r->inode_order = inode_order;
+    r->dev = dev;
+    r->threads = (pthread_t *)calloc((size_t)n_threads, sizeof(pthread_t));
+    if (!r->threads) {
+        Py_DECREF(r);
+        return PyErr_NoMemory();
+    }
+    for (int i = 0; i < n_threads; i++) {
+        if (pthread_create(&r->threads[i], NULL, _reader_main, r) != 0) {
+            r->n_threads = i;
+            _reader_close(r);
+            Py_DECREF(r);
+            return PyErr_SetFromErrno(PyExc_OSError);
+        }
+        r->n_threads = i + 1;
+    }
+    return (PyObject *)r;
+}
+
+static void
+DirReader_dealloc(DirReaderObject *r)
+{
+    _reader_close(r);
+    pthread_cond_destroy(&r->todo_cond);
+    pthread_cond_destroy(&r->ready_cond);
+    pthread_mutex_destroy(&r->lock);
+    Py_XDECREF(r->inodes);
+    Py_TYPE(r)->tp_free((PyObject *)r);
+}
+
+static PyObject *
+DirReader_submit(DirReaderObject *r, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"path", "token", "read", NULL};
+    PyObject *path_bytes, *token;
+    int read = 1;
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O&O|p", kwlist,
+                                     PyUnicode_FSConverter, &path_bytes, &token, &read))
+        return NULL;
+    ReadJob *job = (ReadJob *)calloc(1, sizeof(ReadJob));
+    if (job && read) job->path = strdup(PyBytes_AS_STRING(path_bytes));
+    Py_DECREF(path_bytes);
+    if (!job || (read && !job->path)) {
+        if (job) _job_free(job);
+        return PyErr_NoMemory();
+    }
+    job->token = Py_NewRef(token);
+
+    pthread_mutex_lock(&r->lock);
+    if (r->closing) {
+        pthread_mutex_unlock(&r->lock);
+        Py_DECREF(job->token);
+        _job_free(job);
+        PyErr_SetString(PyExc_ValueError, "DirReader is closed");
+        return NULL;
+    }
+    if (read) {
+        _job_link(&r->todo_head, &r->todo_tail, job);
+        r->n_todo++;
+        pthread_cond_signal(&r->todo_cond);
+    } else {
+        _job_link(&r->ready_head, &r->ready_tail, job);
+        r->n_ready++;
+        pthread_cond_signal(&r->ready_cond);
+    }
+    pthread_mutex_unlock(&r->lock);
+    Py_RETURN_NONE;
+}
+
+static PyTypeObject DirBatch_Type;
+
+static PyObject *
+DirReader_take(DirReaderObject *r, PyObject *Py_UNUSED(ignored))
+{
+    ReadJob *job = NULL;
+    Py_BEGIN_ALLOW_THREADS
+    pthread_mutex_lock(&r->lock);
+    if (!r->ready_head && !r->closing) {
+        r->builder_waits++;
+        while (!r->ready_head && !r->closing)
+            pthread_cond_wait(&r->ready_cond, &r->lock);
+    }
+    if (!r->closing && r->ready_head) {
+        r->takes++;
+        r->depth_sum += r->n_ready;
+        if (r->n_ready > r->depth_peak) r->depth_peak = r->n_ready;
+        job = _job_unlink(&r->ready_head, &r->ready_tail);
+        r->n_ready--;
+    }
+    pthread_mutex_unlock(&r->lock);
+    Py_END_ALLOW_THREADS
+    if (!job) Py_RETURN_NONE;
+
+    PyObject *token = job->token;
+    PyObject *batch = Py_None;
+    if (job->path) {
+        DirBatchObject *b = PyObject_New(DirBatchObject, &DirBatch_Type);
+        if (!b) {
+            Py_DECREF(token);
+            _job_free(job);
+            return NULL;
+        }
+        b->entries = job->entries;
+        b->count = job->count;
+        b->names = job->names;
+        b->errors = job->errors;
+        b->path = NULL;
+        b->dev = -1;
+        b->pending = 0;
+        b->order = NULL;
+        job->entries = NULL;
+        job->names = NULL;
+        batch = (PyObject *)b;
+    } else {
+        Py_INCREF(batch);
+    }
+    _job_free(job);
+    return Py_BuildValue("(NN)", token, batch);
+}
+
+static PyObject *
+DirReader_close_method(DirReaderObject *r, PyObject *Py_UNUSED(ignored))
+{
+    _reader_close(r);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+DirReader_stats(DirReaderObject *r, PyObject *Py_UNUSED(ignored))
+{
+    pthread_mutex_lock(&r->lock);
+    PyObject *result = Py_BuildValue("(LLnLL)", r->takes, r->depth_sum, r->depth_peak,
+                                     r->builder_waits, r->reader_waits);
+    pthread_mutex_unlock(&r->lock);
+    return result;
+}
+
+static PyObject *
+DirReader_get_pending(DirReaderObject *r, void *closure)
+{
+    (void)closure;
+    pthread_mutex_lock(&r->lock);
+    Py_ssize_t n = r->n_todo + r->n_ready;
+    pthread_mutex_unlock(&r->lock);
+    return PyLong_FromSsize_t(n);
+}
+
+static PyObject *
+DirReader_get_threads(DirReaderObject *r, void *closure)
+{
+    (void)closure;
+    return PyLong_FromLong(r->n_threads);
+}
+
+static PyMethodDef DirReader_methods[] = {
+    {"submit", (PyCFunction)(void (*)(void))DirReader_submit, METH_VARARGS | METH_KEYWORDS,
+     "submit(path, token, read=True)\n\nQueue path for a reader thread; with read=False the\n"
+     "token goes straight to the ready ring with no batch."},
+    {"take", (PyCFunction)DirReader_take, METH_NOARGS,
+     "take() -> (token, DirBatch | None) | None\n\nWait (GIL released) for the next ready job;\n"
+     "None once the reader is closed."},
+    {"close", (PyCFunction)DirReader_close_method, METH_NOARGS,
+     "close()\n\nStop the reader threads, wake blocked take() calls, drop queued jobs."},
+    {"stats", (PyCFunction)DirReader_stats, METH_NOARGS,
+     "stats() -> (takes, depth_sum, depth_peak, builder_waits, reader_waits)\n\n"
+     "Ready-ring depth summed and maximized over take() calls, and how often each\n"
+     "stage had to wait for the other."},
+    {NULL, NULL, 0, NULL}
+};
+
+static PyGetSetDef DirReader_getset[] = {
+    {"pending", (getter)DirReader_get_pending, NULL,
+     "Jobs submitted and not yet taken.", NULL},
+    {"threads", (getter)DirReader_get_threads, NULL, "Number of reader threads.", NULL},
+    {NULL, NULL, NULL, NULL, NULL}
+};
+
+static PyTypeObject DirReader_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dux._walker.DirReader",
+    .tp_basicsize = sizeof(DirReaderObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "DirReader(threads=4, inodes=None, inode_order=False, dev=-1)\n--\n\n"
+              "Pool of C threads reading directories into DirBatch objects.\n"
+              "dev is as in scan_dir_nodes.",
+    .tp_new = DirReader_new,
+    .tp_dealloc = (destructor)DirReader_dealloc,
+    .tp_methods = DirReader_methods,
+    .tp_getset = DirReader_getset,
+};
+
+static void
+DirBatch_dealloc(DirBatchObject *b)
+{
+    free(b->entries);
+    free(b->names);
+    free(b->path);
+    free(b->order);
+    PyObject_Free(b);
+}
+
+static Py_ssize_t
+DirBatch_len(DirBatchObject *b)
+{
+    return b->count;
+}
+
+static PyObject *
+DirBatch_get_pending(DirBatchObject *b, void *closure)
+{
+    (void)closure;
+    return PyLong_FromSsize_t(b->pending);
+}
+
+static PySequenceMethods DirBatch_as_sequence = {
+    .sq_length = (lenfunc)DirBatch_len,
+};
+
+static PyGetSetDef DirBatch_getset[] = {
+    {"pending", (getter)DirBatch_get_pending, NULL,
+     "Entries list_dir left for stat_batch (0 once it stat'ed them itself).", NULL},
+    {NULL, NULL, NULL, NULL, NULL}
+};
+
+static PyTypeObject DirBatch_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dux._walker.DirBatch",
+    .tp_basicsize = sizeof(DirBatchObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "Entries of one directory, from a DirReader or list_dir (see build_batch_nodes).",
+    .tp_dealloc = (destructor)DirBatch_dealloc,
+    .tp_as_sequence = &DirBatch_as_sequence,
+    .tp_getset = DirBatch_getset,
+};
+
+#ifdef __linux__
+
+/*
+ * Splitting the stat work of one huge directory across threads.
+ *
+ * list_dir reads a directory's names with getdents64 and leaves the
+ * entries that need a stat as ENTRY_NEEDS_STAT when there are more than
+ * *split_at* of them; smaller directories are stat'ed in the same call.
+ * stat_batch then resolves any index range [start, stop) of such a batch
+ * with the GIL released, so several threads can stat disjoint ranges of
+ * one batch at once.  build_batch_nodes drops entries whose stat failed;
+ * the node order is the getdents order however the ranges were split.
+ * With inode_order, the ranges index the batch's d_ino-sorted order
+ * instead of the listing, so each chunk is a forward sweep.
+ */
+
+/* Stat the ENTRY_NEEDS_STAT entries of b[start:stop] relative to *dfd*. */
+static long long
+_batch_stat_range(DirBatchObject *b, int dfd, Py_ssize_t start, Py_ssize_t stop,
+                  InodeSetObject *inodes)
+{
+    long long error_count = 0;
+    for (Py_ssize_t i = start; i < stop; i++) {
+        ArenaEntry *e = &b->entries[b->order ? b->order[i] : i];
+        if (e->is_dir != ENTRY_NEEDS_STAT) continue;
+        if (dfd < 0 || _stat_at(dfd, b->names + e->name_off, &e->is_dir,
+                                &e->size, &e->disk_usage, inodes, b->dev) < 0) {
+            e->is_dir = ENTRY_STAT_FAILED;
+            error_count++;
+        } else if (e->is_dir) {
+            e->size = 0;
+            e->disk_usage = 0;
+        }
+    }
+    return error_count;
+}
+
+/* Set b->order to the entry indices sorted by d_ino (pending entries carry
+ * it in their size field; the others sort first).  Without memory for it
+ * the batch is stat'ed in listing order. */
+static void
+_batch_sort_ino(DirBatchObject *b)
+{
+    InoSlot *slots = (InoSlot *)malloc(sizeof(InoSlot) * (size_t)b->count);
+    b->order = (Py_ssize_t *)malloc(sizeof(Py_ssize_t) * (size_t)b->count);
+    if (slots && b->order) {
+        for (Py_ssize_t i = 0; i < b->count; i++) {
+            ArenaEntry *e = &b->entries[i];
+            slots[i].ino = e->is_dir == ENTRY_NEEDS_STAT ? (unsigned long long)e->size : 0;
+            slots[i].idx = i;
+        }
+        qsort(slots, (size_t)b->count, sizeof(InoSlot), _cmp_slot_ino);
+        for (Py_ssize_t i = 0; i < b->count; i++)
+            b->order[i] = slots[i].idx;
+    } else {
+        free(b->order);
+        b->order = NULL;
+    }
+    free(slots);
+}
+
+/* Drop failed (and never stat'ed) entries before nodes are built. */
+static void
+_batch_compact(DirBatchObject *b)
+{
+    Py_ssize_t kept = 0;
+    for (Py_ssize_t i = 0; i < b->count; i++) {
+        ArenaEntry *e = &b->entries[i];
+        if (e->is_dir == ENTRY_NEEDS_STAT) {
+            b->errors++;
+            continue;
+        }
+        if (e->is_dir == ENTRY_STAT_FAILED) continue;
+        b->entries[kept++] = *e;
+    }
+    b->count = kept;
+    b->pending = 0;
+    free(b->order);
+    b->order = NULL;
+}
+
+static PyObject *
+walker_list_dir(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    (void)self;
+    static char *kwlist[] = {"path", "split_at", "stat_links", "inodes", "inode_order", "dev", NULL};
+    PyObject *path_bytes;
+    Py_ssize_t split_at = 0;
+    int stat_links = 0;
+    PyObject *inodes = NULL;
+    int inode_order = 0;
+    long long dev = -1;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O&|npOpL", kwlist, PyUnicode_FSConverter,
+                                     &path_bytes, &split_at, &stat_links, &inodes,
+                                     &inode_order, &dev))
+        return NULL;
+    WalkArena *a = arena_acquire();
+    if (!a || _inodes_arg(inodes, &a->inodes) < 0) {
+        Py_DECREF(path_bytes);
+        return a ? NULL : PyErr_NoMemory();
+    }
+    a->dev = dev;
+    DirBatchObject *b = PyObject_New(DirBatchObject, &DirBatch_Type);
+    if (!b) {
+        Py_DECREF(path_bytes);
+        return NULL;
+    }
+    b->entries = NULL;
+    b->names = NULL;
+    b->count = 0;
+    b->errors = 0;
+    b->pending = 0;
+    b->order = NULL;
+    b->dev = dev;
+    b->path = strdup(PyBytes_AS_STRING(path_bytes));
+    Py_DECREF(path_bytes);
+    if (!b->path) {
+        Py_DECREF(b);
+        return PyErr_NoMemory();
+    }
+
+    int nomem = 0;
+    Py_BEGIN_ALLOW_THREADS
+    int dfd = openat(AT_FDCWD, b->path, O_RDONLY | O_DIRECTORY | O_NOFOLLOW | O_CLOEXEC);
+    if (dfd < 0) {
+        b->errors = 1;
+    } else {
+        b->errors = _collect_dents(dfd, a, stat_links ? DEFER_STAT_ALL : 1);
+        if (a->size) {
+            b->entries = (ArenaEntry *)malloc(sizeof(ArenaEntry) * (size_t)a->size);
+            b->names = (char *)malloc(a->names_len);
+            if (b->entries && b->names) {
+                memcpy(b->entries, a->entries, sizeof(ArenaEntry) * (size_t)a->size);
+                memcpy(b->names, a->names, a->names_len);
+                b->count = a->size;
+            } else {
+                nomem = 1;
+            }
+        }
+        for (Py_ssize_t i = 0; i < b->count; i++)
+            b->pending += b->entries[i].is_dir == ENTRY_NEEDS_STAT;
+        if (inode_order && b->count > 1)
+            _batch_sort_ino(b);
+        if (b->pending && b->pending <= split_at) {
+            b->errors += _batch_stat_range(b, dfd, 0, b->count, a->inodes);
+            b->pending = 0;
+        }
+        close(dfd);
+    }
+    Py_END_ALLOW_THREADS
+    if (nomem) {
+        Py_DECREF(b);
+        return PyErr_NoMemory();
+    }
+    return (PyObject *)b;
+}
+
+static PyObject *
+walker_stat_batch(PyObject *self, PyObject *args)
+{
+    (void)self;
+    PyObject *batch_obj;
+    Py_ssize_t start, stop;
+    PyObject *inodes_obj = NULL;
+    InodeSetObject *inodes;
+
+    if (!PyArg_ParseTuple(args, "O!nn|O", &DirBatch_Type, &batch_obj, &start, &stop, &inodes_obj))
+        return NULL;
+    if (_inodes_arg(inodes_obj, &inodes) < 0)
+        return NULL;
+    DirBatchObject *b = (DirBatchObject *)batch_obj;
+    if (!b->path) {
+        PyErr_SetString(PyExc_ValueError, "stat_batch needs a batch from list_dir");
+        return NULL;
+    }
+    if (start < 0) start = 0;
+    if (stop > b->count) stop = b->count;
+
+    long long error_count = 0;
+    Py_BEGIN_ALLOW_THREADS
+    int dfd = openat(AT_FDCWD, b->path, O_RDONLY | O_DIRECTORY | O_NOFOLLOW | O_CLOEXEC);
+    error_count = _batch_stat_range(b, dfd, start, stop, inodes);
+    if (dfd >= 0) close(dfd);
+    Py_END_ALLOW_THREADS
+    return PyLong_FromLongLong(error_count);
+}
+
+#endif /* __linux__ */
+
+static PyObject *
+walker_build_batch_nodes(PyObject *self, PyObject *args)
+{
+    (void)self;
+    PyObject *batch_obj, *parent, *leaf, *kind_dir, *kind_file, *ScanNode_cls;
+    PyObject *names_obj = NULL;
+    NameTableObject *names;
+
+    if (!PyArg_ParseTuple(args, "O!OOOOO|O", &DirBatch_Type, &batch_obj, &parent, &leaf,
+                          &kind_dir, &kind_file, &ScanNode_cls, &names_obj))
+        return NULL;
+    if (_names_arg(names_obj, &names) < 0 || _node_args(ScanNode_cls, parent) < 0)
+        return NULL;
+
+    DirBatchObject *b = (DirBatchObject *)batch_obj;
+#ifdef __linux__
+    if (b->path) _batch_compact(b);
+#endif
+    PyObject *dir_nodes = PyList_New(0);
+    if (!dir_nodes) return NULL;
+    long long file_count = 0;
+    long long dir_count = 0;
+    if (b->count && _entries_into(b->entries, b->names, names, b->count, parent, dir_nodes,
+                                  NULL, leaf, kind_dir, kind_file, ScanNode_cls,
+                                  &file_count, &dir_count) < 0) {
+        Py_DECREF(dir_nodes);
+        return NULL;
+    }
+    return Py_BuildValue("(NLLL)", dir_nodes, file_count, dir_count, b->errors);
+}
+
+/* ------------------------------------------------------------------ */
+/* scan_dir_columns: one directory as columnar buffers                */
 /* ------------------------------------------------------------------ */
 
-typedef struct {
-    char *path;     /* full child path (heap-allocated) */
-    char *name;     /* NOT separately allocated — points into *path* after
-                       the last '/'.  free(path) invalidates name. */
-    int is_dir;
-    long long size;
-    long long disk_usage;
-} ScanDirEntry;
+/*
+ * For consumers that never need a node per entry (exports, analytics,
+ * top-K over millions of files), scan_dir_columns returns a directory's
+ * entries as parallel C arrays instead of ScanNodes:
+ *
+ *   sizes         int64 ('q')   apparent size (0 for directories)
+ *   disk_usage    int64 ('q')   allocated bytes
+ *   kinds         int8  ('b')   0 directory, 1 file (PackedTree codes)
+ *   name_offsets  int64 ('q')   count + 1 offsets: name i is
+ *                               names[name_offsets[i]:name_offsets[i + 1]]
+ *   names         uint8 ('B')   names back to back, filesystem bytes
+ *
+ * The arena holds one struct per entry, so the columns are filled by a
+ * single transposing pass with the GIL released.  From there on nothing is
+ * copied: each attribute is a read-only memoryview of the DirColumns'
+ * own memory, which memoryview.cast, array.frombytes, numpy.frombuffer,
+ * etc. consume as is.
+ */
+
+#define COLUMN_DIRECTORY 0
+#define COLUMN_FILE 1
 
 typedef struct {
-    ScanDirEntry *entries;
-    Py_ssize_t size;
-    Py_ssize_t capacity;
-} EntryBuf;
+    PyObject_HEAD
+    Py_ssize_t count;
+    long long *sizes;
+    long long *disk_usage;
+    signed char *kinds;
+    long long *name_offsets;
+    char *names;
+    size_t names_len;
+    long long errors;
+} DirColumnsObject;
+
+/* Exporter of one column: keeps its DirColumns alive while viewed. */
+typedef struct {
+    PyObject_HEAD
+    PyObject *owner;
+    void *data;
+    Py_ssize_t len;         /* items */
+    Py_ssize_t itemsize;
+    char *format;
+} ColumnObject;
 
 static int
-entrybuf_init(EntryBuf *b, Py_ssize_t cap)
+Column_getbuffer(ColumnObject *c, Py_buffer *view, int flags)
 {
-    b->entries = (ScanDirEntry *)malloc(sizeof(ScanDirEntry) * cap);
-    if (!b->entries) return -1;
-    b->size = 0;
-    b->capacity = cap;
+    if (PyBuffer_FillInfo(view, (PyObject *)c, c->data, c->len * c->itemsize, 1, flags) < 0)
+        return -1;
+    view->itemsize = c->itemsize;
+    if (flags & PyBUF_FORMAT)
+        view->format = c->format;
+    if (flags & PyBUF_ND) {
+        /* PyBuffer_FillInfo points shape at len (bytes); use items. */
+        view->shape = &c->len;
+    }
     return 0;
 }
 
+static void
+Column_dealloc(ColumnObject *c)
+{
+    Py_XDECREF(c->owner);
+    PyObject_Free(c);
+}
+
+static PyBufferProcs Column_as_buffer = {
+    .bf_getbuffer = (getbufferproc)Column_getbuffer,
+};
+
+static PyTypeObject Column_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dux._walker._Column",
+    .tp_basicsize = sizeof(ColumnObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "Buffer exporter for one DirColumns column.",
+    .tp_dealloc = (destructor)Column_dealloc,
+    .tp_as_buffer = &Column_as_buffer,
+};
+
+static void
+_columns_free(DirColumnsObject *d)
+{
+    free(d->sizes);
+    free(d->disk_usage);
+    free(d->kinds);
+    free(d->name_offsets);
+    free(d->names);
+    d->sizes = d->disk_usage = d->name_offsets = NULL;
+    d->kinds = NULL;
+    d->names = NULL;
+}
+
+static void
+DirColumns_dealloc(DirColumnsObject *d)
+{
+    _columns_free(d);
+    PyObject_Free(d);
+}
+
+/* Transpose the arena into *d*'s columns (no GIL needed).  Returns 0 or -1. */
 static int
-entrybuf_push(EntryBuf *b, char *path, char *name, int is_dir,
-              long long size, long long disk_usage)
+_columns_fill(DirColumnsObject *d, const WalkArena *a)
 {
-    if (b->size >= b->capacity) {
-        Py_ssize_t new_cap = b->capacity * 2;
-        ScanDirEntry *nw = (ScanDirEntry *)realloc(
-            b->entries, sizeof(ScanDirEntry) * new_cap);
-        if (!nw) return -1;
-        b->entries = nw;
-        b->capacity = new_cap;
+    Py_ssize_t n = a->size;
+    size_t names_len = 0;
+    for (Py_ssize_t i = 0; i < n; i++)
+        names_len += a->entries[i].name_len;
+    d->sizes = (long long *)malloc(sizeof(long long) * (size_t)(n ? n : 1));
+    d->disk_usage = (long long *)malloc(sizeof(long long) * (size_t)(n ? n : 1));
+    d->kinds = (signed char *)malloc((size_t)(n ? n : 1));
+    d->name_offsets = (long long *)malloc(sizeof(long long) * (size_t)(n + 1));
+    d->names = (char *)malloc(names_len ? names_len : 1);
+    if (!d->sizes || !d->disk_usage || !d->kinds || !d->name_offsets || !d->names) {
+        _columns_free(d);
+        return -1;
     }
-    ScanDirEntry *e = &b->entries[b->size];
-    e->path = path;
-    e->name = name;
-    e->is_dir = is_dir;
-    e->size = size;
-    e->disk_usage = disk_usage;
-    b->size++;
+    size_t off = 0;
+    for (Py_ssize_t i = 0; i < n; i++) {
+        const ArenaEntry *e = &a->entries[i];
+        d->sizes[i] = e->is_dir ? 0 : e->size;
+        d->disk_usage[i] = e->is_dir ? 0 : e->disk_usage;
+        d->kinds[i] = e->is_dir ? COLUMN_DIRECTORY : COLUMN_FILE;
+        d->name_offsets[i] = (long long)off;
+        memcpy(d->names + off, a->names + e->name_off, e->name_len);
+        off += e->name_len;
+    }
+    d->name_offsets[n] = (long long)off;
+    d->names_len = names_len;
+    d->count = n;
     return 0;
 }
 
-static void
-entrybuf_free(EntryBuf *b)
+static PyObject *
+_column_view(DirColumnsObject *d, void *data, Py_ssize_t len, Py_ssize_t itemsize, char *format)
 {
-    for (Py_ssize_t i = 0; i < b->size; i++) {
-        free(b->entries[i].path);
-    }
-    free(b->entries);
-    b->entries = NULL;
-    b->size = 0;
-    b->capacity = 0;
+    ColumnObject *c = PyObject_New(ColumnObject, &Column_Type);
+    if (!c) return NULL;
+    c->owner = Py_NewRef((PyObject *)d);
+    c->data = data;
+    c->len = len;
+    c->itemsize = itemsize;
+    c->format = format;
+    PyObject *view = PyMemoryView_FromObject((PyObject *)c);
+    Py_DECREF(c);
+    return view;
 }
 
-/* ------------------------------------------------------------------ */
-/* GIL-free I/O helpers                                               */
-/* ------------------------------------------------------------------ */
+static PyObject *
+DirColumns_get_sizes(DirColumnsObject *d, void *closure)
+{
+    (void)closure;
+    return _column_view(d, d->sizes, d->count, sizeof(long long), "q");
+}
 
-/* Fill EntryBuf via opendir/readdir/lstat (no GIL needed). */
-static long long
-_fill_buf_readdir(const char *dir_path, EntryBuf *buf)
+static PyObject *
+DirColumns_get_disk_usage(DirColumnsObject *d, void *closure)
 {
-    long long error_count = 0;
+    (void)closure;
+    return _column_view(d, d->disk_usage, d->count, sizeof(long long), "q");
+}
 
-    DIR *dp = opendir(dir_path);
-    if (dp) {
-        struct dirent *ep;
-        while ((ep = readdir(dp)) != NULL) {
-            if (ep->d_name[0] == '.') {
-                if (ep->d_name[1] == '\0') continue;
-                if (ep->d_name[1] == '.' && ep->d_name[2] == '\0') continue;
-            }
+static PyObject *
+DirColumns_get_kinds(DirColumnsObject *d, void *closure)
+{
+    (void)closure;
+    return _column_view(d, d->kinds, d->count, 1, "b");
+}
 
-            char *child_path = join_path(dir_path, ep->d_name);
-            if (!child_path) break;
+static PyObject *
+DirColumns_get_name_offsets(DirColumnsObject *d, void *closure)
+{
+    (void)closure;
+    return _column_view(d, d->name_offsets, d->count + 1, sizeof(long long), "q");
+}
 
-            struct stat st;
-            if (lstat(child_path, &st) < 0) {
-                error_count++;
-                free(child_path);
-                continue;
-            }
+static PyObject *
+DirColumns_get_names(DirColumnsObject *d, void *closure)
+{
+    (void)closure;
+    return _column_view(d, d->names, (Py_ssize_t)d->names_len, 1, "B");
+}
 
-            int is_dir = S_ISDIR(st.st_mode);
-            long long size = is_dir ? 0 : (long long)st.st_size;
-            long long disk_usage = is_dir ? 0 : (long long)st.st_blocks * 512;
+static PyObject *
+DirColumns_get_errors(DirColumnsObject *d, void *closure)
+{
+    (void)closure;
+    return PyLong_FromLongLong(d->errors);
+}
 
-            size_t plen = strlen(dir_path);
-            char *name = child_path + plen;
-            if (*name == '/') name++;
+static Py_ssize_t
+DirColumns_len(DirColumnsObject *d)
+{
+    return d->count;
+}
 
-            if (entrybuf_push(buf, child_path, name, is_dir,
-                              size, disk_usage) < 0) {
-                free(child_path);
-                break;
-            }
-        }
-        closedir(dp);
-    } else {
-        error_count++;
-    }
+static PyGetSetDef DirColumns_getset[] = {
+    {"sizes", (getter)DirColumns_get_sizes, NULL, "Apparent sizes (int64; 0 for directories).", NULL},
+    {"disk_usage", (getter)DirColumns_get_disk_usage, NULL, "Allocated bytes (int64).", NULL},
+    {"kinds", (getter)DirColumns_get_kinds, NULL, "Kind codes (int8): 0 directory, 1 file.", NULL},
+    {"name_offsets", (getter)DirColumns_get_name_offsets, NULL,
+     "len + 1 offsets (int64) of each name in names.", NULL},
+    {"names", (getter)DirColumns_get_names, NULL, "All names back to back (filesystem bytes).", NULL},
+    {"errors", (getter)DirColumns_get_errors, NULL, "Entries (or the directory) that could not be read.", NULL},
+    {NULL, NULL, NULL, NULL, NULL}
+};
 
-    return error_count;
-}
+static PySequenceMethods DirColumns_as_sequence = {
+    .sq_length = (lenfunc)DirColumns_len,
+};
 
-/* ------------------------------------------------------------------ */
-/* Node builder: convert EntryBuf into ScanNode objects               */
-/* ------------------------------------------------------------------ */
+static PyTypeObject DirColumns_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "dux._walker.DirColumns",
+    .tp_basicsize = sizeof(DirColumnsObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_doc = "One directory's entries as columns (see scan_dir_columns).",
+    .tp_dealloc = (destructor)DirColumns_dealloc,
+    .tp_getset = DirColumns_getset,
+    .tp_as_sequence = &DirColumns_as_sequence,
+};
 
-/*
- * Iterate EntryBuf, create ScanNode per entry, append to parent.children,
- * and collect directory nodes.
- *
- * Returns (dir_nodes, file_count, dir_count, error_count) as a Python tuple.
- */
 static PyObject *
-_build_nodes_from_buf(EntryBuf *buf, long long err_count,
-                      PyObject *parent, PyObject *leaf,
-                      PyObject *kind_dir, PyObject *kind_file,
-                      PyObject *ScanNode_cls)
+walker_scan_dir_columns(PyObject *self, PyObject *args)
 {
-    PyObject *parent_children = PyObject_GetAttrString(parent, "children");
-    if (!parent_children) return NULL;
+    (void)self;
+    PyObject *path_bytes;
+    PyObject *inodes = NULL;
 
-    PyObject *dir_nodes = PyList_New(0);
-    if (!dir_nodes) {
-        Py_DECREF(parent_children);
+    if (!PyArg_ParseTuple(args, "O&|O", PyUnicode_FSConverter, &path_bytes, &inodes))
+        return NULL;
+    WalkArena *a = arena_acquire();
+    if (!a || _inodes_arg(inodes, &a->inodes) < 0) {
+        Py_DECREF(path_bytes);
+        return a ? NULL : PyErr_NoMemory();
+    }
+    DirColumnsObject *d = PyObject_New(DirColumnsObject, &DirColumns_Type);
+    if (!d) {
+        Py_DECREF(path_bytes);
         return NULL;
     }
+    d->count = 0;
+    d->names_len = 0;
+    d->sizes = d->disk_usage = d->name_offsets = NULL;
+    d->kinds = NULL;
+    d->names = NULL;
+
+    const char *dir_path = PyBytes_AS_STRING(path_bytes);
+    int rc;
+    Py_BEGIN_ALLOW_THREADS
+    d->errors = _fill_arena_dir(dir_path, a);
+    rc = _columns_fill(d, a);
+    Py_END_ALLOW_THREADS
+    Py_DECREF(path_bytes);
+    if (rc < 0) {
+        Py_DECREF(d);
+        return PyErr_NoMemory();
+    }
+    return (PyObject *)d;
+}
 
-    long long file_count = 0;
-    long long dir_count = 0;
+/* ------------------------------------------------------------------ */
+/* aggregate_subtree: totals for a subtree without building nodes     */
+/* ------------------------------------------------------------------ */
 
-    for (Py_ssize_t i = 0; i < buf->size; i++) {
-        ScanDirEntry *e = &buf->entries[i];
-        PyObject *node;
+typedef struct {
+    long long size;
+    long long disk_usage;
+    long long files;
+    long long dirs;
+    long long errors;
+    char *mounts;       /* NUL-separated paths of mount points not entered */
+    size_t mounts_len;
+    size_t mounts_cap;
+} SubtreeTotals;
 
-        if (e->is_dir) {
-            PyObject *children = PyList_New(0);
-            if (!children) goto error;
-            /* "N" steals the reference to children (transfers ownership).
-             * "O" would increment the refcount, leaking the list. */
-            node = PyObject_CallFunction(ScanNode_cls, "ssOLLN",
-                                         e->path, e->name, kind_dir,
-                                         (long long)0, (long long)0, children);
-        } else {
-            /* "O" borrows leaf (increments refcount) — the shared
-             * immutable sentinel is reused across all file nodes. */
-            node = PyObject_CallFunction(ScanNode_cls, "ssOLLO",
-                                         e->path, e->name, kind_file,
-                                         e->size, e->disk_usage, leaf);
-        }
+static int
+_totals_add_mount(SubtreeTotals *t, const char *path, size_t len)
+{
+    if (t->mounts_len + len + 1 > t->mounts_cap) {
+        size_t new_cap = t->mounts_cap ? t->mounts_cap : 256;
+        while (new_cap < t->mounts_len + len + 1) new_cap *= 2;
+        char *nw = (char *)realloc(t->mounts, new_cap);
+        if (!nw) return -1;
+        t->mounts = nw;
+        t->mounts_cap = new_cap;
+    }
+    memcpy(t->mounts + t->mounts_len, path, len + 1);
+    t->mounts_len += len + 1;
+    return 0;
+}
 
-        if (!node) goto error;
+/*
+ * Depth-first walk below *root_path* that only sums (no GIL, no nodes).
+ *
+ * Pending directories sit on the arena's DirRec stack.  A popped record's
+ * path is copied to the path scratch before its children are pushed over
+ * it, and every listing refills the arena from entry 0, so memory is
+ * bounded by the widest directory plus the pending paths, not by the size
+ * of the subtree.  Mount points (one-file-system mode, see a->dev) are
+ * counted but not entered, and their paths are collected in t->mounts.
+ */
+static void
+_aggregate_walk(const char *root_path, WalkArena *a, SubtreeTotals *t)
+{
+    a->n_recs = 0;
+    a->paths_len = 0;
+    if (_arena_push_rec(a, NULL, 0, root_path, strlen(root_path), -1, 0) < 0) {
+        t->errors++;
+        return;
+    }
 
-        if (PyList_Append(parent_children, node) < 0) {
-            Py_DECREF(node);
-            goto error;
+    while (a->n_recs > 0) {
+        DirRec *rec = &a->recs[--a->n_recs];
+        size_t plen = rec->path_len;
+        if (_arena_reserve_path(a, plen + 1) < 0) {
+            t->errors++;
+            return;
         }
-
-        if (e->is_dir) {
-            dir_count++;
-            if (PyList_Append(dir_nodes, node) < 0) {
-                Py_DECREF(node);
-                goto error;
+        memcpy(a->path, a->paths + rec->path_off, plen + 1);
+        a->paths_len = rec->path_off;
+
+        a->size = 0;
+        a->names_len = 0;
+        t->errors += _fill_arena_dir(a->path, a);
+
+        for (Py_ssize_t i = 0; i < a->size; i++) {
+            ArenaEntry *e = &a->entries[i];
+            if (!e->is_dir) {
+                t->files++;
+                t->size += e->size;
+                t->disk_usage += e->disk_usage;
+                continue;
+            }
+            t->dirs++;
+            if (_arena_push_rec(a, a->path, plen, a->names + e->name_off,
+                                e->name_len, -1, 0) < 0) {
+                t->errors++;
+                return;
+            }
+            if (e->is_dir == ENTRY_MOUNT_POINT) {
+                DirRec *child = &a->recs[a->n_recs - 1];
+                if (_totals_add_mount(t, a->paths + child->path_off,
+                                      child->path_len) < 0)
+                    t->errors++;
+                a->paths_len = child->path_off;
+                a->n_recs--;
             }
-        } else {
-            file_count++;
         }
-
-        Py_DECREF(node);
     }
-
-    Py_DECREF(parent_children);
-    return Py_BuildValue("(NLLL)", dir_nodes, file_count, dir_count, err_count);
-
-error:
-    Py_DECREF(parent_children);
-    Py_DECREF(dir_nodes);
-    return NULL;
 }
 
-/* ------------------------------------------------------------------ */
-/* scan_dir_nodes: create ScanNode objects directly in C              */
-/* ------------------------------------------------------------------ */
-
 static PyObject *
-walker_scan_dir_nodes(PyObject *self, PyObject *args)
+walker_aggregate_subtree(PyObject *self, PyObject *args)
 {
     (void)self;
     const char *dir_path;
-    PyObject *parent, *leaf, *kind_dir, *kind_file, *ScanNode_cls;
+    long long dev = -1;
+    PyObject *skip = NULL;
+    PyObject *inodes = NULL;
+    int inode_order = 0;
 
-    if (!PyArg_ParseTuple(args, "sOOOOO", &dir_path, &parent, &leaf,
-                          &kind_dir, &kind_file, &ScanNode_cls))
+    if (!PyArg_ParseTuple(args, "s|LO!Op", &dir_path, &dev, &PyTuple_Type, &skip,
+                          &inodes, &inode_order))
         return NULL;
 
-    EntryBuf buf;
-    if (entrybuf_init(&buf, 128) < 0)
+    WalkArena *a = arena_acquire();
+    if (!a)
         return PyErr_NoMemory();
+    if (_borrow_names(skip, &a->skip, &a->n_skip, &a->skip_cap) < 0 ||
+        _inodes_arg(inodes, &a->inodes) < 0)
+        return NULL;
+    a->inode_order = inode_order;
+    a->dev = dev;
 
-    long long error_count;
+    SubtreeTotals t = {0};
 
-    /* Two-phase design: release the GIL during I/O (readdir + lstat), then
-     * reacquire it to create Python objects.  This is the core performance
-     * optimization — other Python threads can run while we do syscalls. */
     Py_BEGIN_ALLOW_THREADS
-    error_count = _fill_buf_readdir(dir_path, &buf);
+    _aggregate_walk(dir_path, a, &t);
     Py_END_ALLOW_THREADS
 
-    PyObject *result = _build_nodes_from_buf(&buf, error_count, parent, leaf,
-                                              kind_dir, kind_file, ScanNode_cls);
-    entrybuf_free(&buf);
-    return result;
+    PyObject *mounts = PyList_New(0);
+    for (size_t off = 0; mounts && off < t.mounts_len;) {
+        size_t len = strlen(t.mounts + off);
+        PyObject *item = PyUnicode_FromStringAndSize(t.mounts + off,
+                                                     (Py_ssize_t)len);
+        if (!item || PyList_Append(mounts, item) < 0) {
+            Py_XDECREF(item);
+            Py_CLEAR(mounts);
+            break;
+        }
+        Py_DECREF(item);
+        off += len + 1;
+    }
+    free(t.mounts);
+    if (!mounts) return NULL;
+
+    return Py_BuildValue("(LLLLLLN)", t.size, t.disk_usage, t.files, t.dirs,
+                         t.errors, a->skipped, mounts);
 }
 
 /* ------------------------------------------------------------------ */
@@ -279,9 +3398,11 @@ typedef struct {
     /* variable-length entries follow */
 } BulkAttrBuf;
 
-/* Fill EntryBuf via getattrlistbulk (no GIL needed). */
+/* Fill EntryBuf via getattrlistbulk (no GIL needed).  Directories off
+ * device *dev* (>= 0) are marked ENTRY_MOUNT_POINT. */
 static long long
-_fill_buf_bulk(const char *dir_path, EntryBuf *buf)
+_fill_buf_bulk(const char *dir_path, EntryBuf *buf, InodeSetObject *inodes,
+               long long dev)
 {
     long long error_count = 0;
 
@@ -290,12 +3411,13 @@ _fill_buf_bulk(const char *dir_path, EntryBuf *buf)
         struct attrlist alist;
         memset(&alist, 0, sizeof(alist));
         alist.bitmapcount = ATTR_BIT_MAP_COUNT;
-        alist.commonattr  = ATTR_CMN_RETURNED_ATTRS | ATTR_CMN_NAME | ATTR_CMN_OBJTYPE;
-        alist.fileattr    = ATTR_FILE_DATALENGTH | ATTR_FILE_ALLOCSIZE;
+        alist.commonattr  = ATTR_CMN_RETURNED_ATTRS | ATTR_CMN_NAME | ATTR_CMN_DEVID |
+                            ATTR_CMN_OBJTYPE | ATTR_CMN_FILEID;
+        alist.fileattr    = ATTR_FILE_LINKCOUNT | ATTR_FILE_DATALENGTH | ATTR_FILE_ALLOCSIZE;
         /* NOTE: the kernel returns attributes in a canonical order defined
          * by bit position, NOT the order listed in the C expression above.
-         * The parse loop below MUST read ALLOCSIZE before DATALENGTH to
-         * match the kernel's packing order. */
+         * The parse loop below MUST read NAME, DEVID, OBJTYPE, FILEID, then
+         * LINKCOUNT, ALLOCSIZE, DATALENGTH to match the kernel's packing. */
 
         char attrbuf[256 * 1024];
         int count;
@@ -315,13 +3437,30 @@ _fill_buf_bulk(const char *dir_path, EntryBuf *buf)
                 char *name = ((char *)cursor) + name_ref.attr_dataoffset;
                 cursor += sizeof(attrreference_t);
 
+                dev_t devid = 0;
+                if (returned.commonattr & ATTR_CMN_DEVID) {
+                    devid = *(dev_t *)cursor;
+                    cursor += sizeof(dev_t);
+                }
+
                 fsobj_type_t obj_type = *(fsobj_type_t *)cursor;
                 cursor += sizeof(fsobj_type_t);
 
+                uint64_t fileid = 0;
+                if (returned.commonattr & ATTR_CMN_FILEID) {
+                    memcpy(&fileid, cursor, sizeof(fileid));
+                    cursor += sizeof(uint64_t);
+                }
+
                 int is_dir = (obj_type == VDIR);
                 long long size = 0;
                 long long disk_usage = 0;
+                uint32_t nlink = 1;
 
+                if (returned.fileattr & ATTR_FILE_LINKCOUNT) {
+                    nlink = *(uint32_t *)cursor;
+                    cursor += sizeof(uint32_t);
+                }
                 if (returned.fileattr & ATTR_FILE_ALLOCSIZE) {
                     disk_usage = *(off_t *)cursor;
                     cursor += sizeof(off_t);
@@ -336,10 +3475,11 @@ _fill_buf_bulk(const char *dir_path, EntryBuf *buf)
                     if (name[1] == '.' && name[2] == '\0') goto next_entry;
                 }
 
-                if (is_dir) {
+                if (is_dir || _link_counted(inodes, nlink, (unsigned long long)devid, fileid)) {
                     size = 0;
                     disk_usage = 0;
                 }
+                is_dir = _dir_kind(is_dir, (unsigned long long)devid, dev);
 
                 {
                     char *child_path = join_path(dir_path, name);
@@ -380,9 +3520,19 @@ walker_scan_dir_bulk_nodes(PyObject *self, PyObject *args)
     (void)self;
     const char *dir_path;
     PyObject *parent, *leaf, *kind_dir, *kind_file, *ScanNode_cls;
-
-    if (!PyArg_ParseTuple(args, "sOOOOO", &dir_path, &parent, &leaf,
-                          &kind_dir, &kind_file, &ScanNode_cls))
+    PyObject *inodes_obj = NULL;
+    PyObject *names_obj = NULL;
+    InodeSetObject *inodes;
+    NameTableObject *names;
+    int inode_order = 0;    /* accepted for symmetry; attributes come with the listing */
+    long long dev = -1;
+
+    if (!PyArg_ParseTuple(args, "sOOOOO|OOpL", &dir_path, &parent, &leaf,
+                          &kind_dir, &kind_file, &ScanNode_cls, &inodes_obj,
+                          &names_obj, &inode_order, &dev))
+        return NULL;
+    if (_inodes_arg(inodes_obj, &inodes) < 0 || _names_arg(names_obj, &names) < 0 ||
+        _node_args(ScanNode_cls, parent) < 0)
         return NULL;
 
     EntryBuf buf;
@@ -393,23 +3543,123 @@ walker_scan_dir_bulk_nodes(PyObject *self, PyObject *args)
 
     /* GIL released during I/O, reacquired for Python object creation. */
     Py_BEGIN_ALLOW_THREADS
-    error_count = _fill_buf_bulk(dir_path, &buf);
+    error_count = _fill_buf_bulk(dir_path, &buf, inodes, dev);
     Py_END_ALLOW_THREADS
 
     PyObject *result = _build_nodes_from_buf(&buf, error_count, parent, leaf,
-                                              kind_dir, kind_file, ScanNode_cls);
+                                              kind_dir, kind_file, ScanNode_cls,
+                                              names);
     entrybuf_free(&buf);
     return result;
 }
 
 #endif /* __APPLE__ */
 
+#ifdef __linux__
+/* ------------------------------------------------------------------ */
+/* set_io_priority: ioprio_set(2) for the calling thread               */
+/* ------------------------------------------------------------------ */
+
+/* From linux/ioprio.h, which not every libc ships. */
+#define DUX_IOPRIO_WHO_PROCESS 1
+#define DUX_IOPRIO_CLASS_SHIFT 13
+
+static PyObject *
+walker_set_io_priority(PyObject *self, PyObject *args)
+{
+    (void)self;
+    int io_class, level;
+    if (!PyArg_ParseTuple(args, "ii", &io_class, &level))
+        return NULL;
+#ifdef SYS_ioprio_set
+    /* who = 0 is the calling thread: each thread has its own I/O context
+     * unless it was cloned with CLONE_IO, which pthreads are not. */
+    long rc = syscall(SYS_ioprio_set, DUX_IOPRIO_WHO_PROCESS, 0,
+                      (io_class << DUX_IOPRIO_CLASS_SHIFT) | level);
+    return PyBool_FromLong(rc == 0);
+#else
+    (void)io_class;
+    (void)level;
+    Py_RETURN_FALSE;
+#endif
+}
+#endif /* __linux__ */
+
 static PyMethodDef walker_methods[] = {
     {"scan_dir_nodes", walker_scan_dir_nodes, METH_VARARGS,
      "scan_dir_nodes(path, parent, leaf, kind_dir, kind_file, ScanNode_cls)\n"
      "  -> (dir_nodes, file_count, dir_count, error_count)\n\n"
      "Scan a directory, create ScanNode objects directly, append to parent.children.\n"
-     "GIL released during I/O."},
+     "GIL released during I/O.  With a trailing dev >= 0 (one-file-system mode),\n"
+     "subdirectories whose st_dev differs get a node and are counted, but are left\n"
+     "out of dir_nodes; the other node-building scan functions take dev likewise."},
+    {"scan_dir_at_nodes", walker_scan_dir_at_nodes, METH_VARARGS,
+     "scan_dir_at_nodes(path, parent, leaf, kind_dir, kind_file, ScanNode_cls)\n"
+     "  -> (dir_nodes, file_count, dir_count, error_count)\n\n"
+     "Like scan_dir_nodes, but opens the directory once and stats children\n"
+     "relative to its fd (fstatat/statx) using a per-thread name arena."},
+#ifdef __linux__
+    {"scan_dir_getdents_nodes", walker_scan_dir_getdents_nodes, METH_VARARGS,
+     "scan_dir_getdents_nodes(path, parent, leaf, kind_dir, kind_file, ScanNode_cls)\n"
+     "  -> (dir_nodes, file_count, dir_count, error_count)\n\n"
+     "Linux only: read entries with getdents64 into a 256 KB buffer and classify\n"
+     "them by d_type, stat'ing only regular files and DT_UNKNOWN entries (and\n"
+     "directories, for their st_dev, when dev >= 0)."},
+#endif
+#ifdef DUX_HAVE_URING
+    {"scan_dir_uring_nodes", walker_scan_dir_uring_nodes, METH_VARARGS,
+     "scan_dir_uring_nodes(path, parent, leaf, kind_dir, kind_file, ScanNode_cls, queue_depth=64)\n"
+     "  -> (dir_nodes, file_count, dir_count, error_count)\n\n"
+     "Linux only: like scan_dir_getdents_nodes, but submits the directory's statx\n"
+     "calls through a per-thread io_uring with up to queue_depth in flight."},
+    {"uring_available", walker_uring_available, METH_NOARGS,
+     "uring_available() -> bool\n\n"
+     "True if the kernel allows io_uring and supports IORING_OP_STATX."},
+#endif
+    {"scan_subtree_nodes", walker_scan_subtree_nodes, METH_VARARGS,
+     "scan_subtree_nodes(path, parent, leaf, kind_dir, kind_file, ScanNode_cls, max_entries, max_depth, dev=-1, skip=(), stop=(),\n"
+     "                   inodes=None, names=None, inode_order=False, mounts=None)\n"
+     "  -> (frontier, file_count, dir_count, error_count, skipped_count)\n\n"
+     "Walk the subtree below path breadth-first with the GIL released, stopping once\n"
+     "max_entries entries are buffered or max_depth levels (-1 = unlimited) are read.\n"
+     "Builds nodes for everything read; frontier lists (dir_node, relative_depth)\n"
+     "for directories left unread.  With dev >= 0, subdirectories whose st_dev differs\n"
+     "are not entered nor put in the frontier; their nodes are appended to the mounts\n"
+     "list, if one is given.  Entries whose name is in\n"
+     "skip (ASCII case-insensitive) are left out before being stat'ed and only counted.\n"
+     "Subdirectories whose name is in stop are not entered and go to the frontier."},
+    {"build_batch_nodes", walker_build_batch_nodes, METH_VARARGS,
+     "build_batch_nodes(batch, parent, leaf, kind_dir, kind_file, ScanNode_cls, names=None)\n"
+     "  -> (dir_nodes, file_count, dir_count, error_count)\n\n"
+     "Create ScanNodes for a DirBatch taken from a DirReader, as scan_dir_nodes does\n"
+     "for a directory it reads itself."},
+#ifdef __linux__
+    {"list_dir", (PyCFunction)(void (*)(void))walker_list_dir, METH_VARARGS | METH_KEYWORDS,
+     "list_dir(path, split_at=0, stat_links=False, inodes=None, inode_order=False, dev=-1) -> DirBatch\n\n"
+     "Read a directory with getdents64.  If more than split_at entries need a\n"
+     "stat, leave them for stat_batch (batch.pending); otherwise stat them now.\n"
+     "With stat_links, symlinks and special files are stat'ed too; with\n"
+     "inode_order, entries are sorted by inode number before any stat.  dev is\n"
+     "as in scan_dir_nodes and applies to stat_batch as well."},
+    {"stat_batch", walker_stat_batch, METH_VARARGS,
+     "stat_batch(batch, start, stop, inodes=None) -> error_count\n\n"
+     "Stat the pending entries of batch[start:stop] with the GIL released.\n"
+     "Threads may stat disjoint ranges of one batch concurrently."},
+    {"set_io_priority", walker_set_io_priority, METH_VARARGS,
+     "set_io_priority(io_class, level) -> bool\n\n"
+     "Linux only: set the calling thread's I/O scheduling class (1 realtime,\n"
+     "2 best-effort, 3 idle) and level with ioprio_set.  False if refused."},
+#endif
+    {"scan_dir_columns", walker_scan_dir_columns, METH_VARARGS,
+     "scan_dir_columns(path, inodes=None) -> DirColumns\n\n"
+     "Read one directory into columnar buffers (sizes, disk_usage, kinds,\n"
+     "name_offsets, names) without creating a Python object per entry."},
+    {"aggregate_subtree", walker_aggregate_subtree, METH_VARARGS,
+     "aggregate_subtree(path, dev=-1, skip=(), inodes=None, inode_order=False)\n"
+     "  -> (size, disk_usage, file_count, dir_count, error_count, skipped_count, mounts)\n\n"
+     "Sum file sizes and count entries below path with the GIL released, without\n"
+     "creating any ScanNode.  dev and skip behave as in scan_subtree_nodes; mounts\n"
+     "lists subdirectories not entered because their st_dev differs."},
 #ifdef __APPLE__
     {"scan_dir_bulk_nodes", walker_scan_dir_bulk_nodes, METH_VARARGS,
      "scan_dir_bulk_nodes(path, parent, leaf, kind_dir, kind_file, ScanNode_cls)\n"
@@ -419,12 +3669,30 @@ static PyMethodDef walker_methods[] = {
     {NULL, NULL, 0, NULL}
 };
 
-#ifdef Py_GIL_DISABLED
+static int
+walker_exec(PyObject *module)
+{
+    if (PyType_Ready(&InodeSet_Type) < 0 || PyType_Ready(&NameTable_Type) < 0 ||
+        PyType_Ready(&Node_Type) < 0 || PyType_Ready(&DirReader_Type) < 0 ||
+        PyType_Ready(&DirBatch_Type) < 0 || PyType_Ready(&Column_Type) < 0 ||
+        PyType_Ready(&DirColumns_Type) < 0)
+        return -1;
+    if (PyModule_AddObjectRef(module, "InodeSet", (PyObject *)&InodeSet_Type) < 0 ||
+        PyModule_AddObjectRef(module, "Node", (PyObject *)&Node_Type) < 0 ||
+        PyModule_AddObjectRef(module, "DirReader", (PyObject *)&DirReader_Type) < 0 ||
+        PyModule_AddObjectRef(module, "DirBatch", (PyObject *)&DirBatch_Type) < 0 ||
+        PyModule_AddObjectRef(module, "DirColumns", (PyObject *)&DirColumns_Type) < 0)
+        return -1;
+    return PyModule_AddObjectRef(module, "NameTable", (PyObject *)&NameTable_Type);
+}
+
 static PyModuleDef_Slot walker_slots[] = {
+    {Py_mod_exec, walker_exec},
+#ifdef Py_GIL_DISABLED
     {Py_mod_gil, Py_MOD_GIL_NOT_USED},
+#endif
     {0, NULL}
 };
-#endif
 
 static struct PyModuleDef walker_module = {
     PyModuleDef_HEAD_INIT,
@@ -432,9 +3700,7 @@ static struct PyModuleDef walker_module = {
     .m_doc = "Fast C directory scanner for dux.",
     .m_size = 0,
     .m_methods = walker_methods,
-#ifdef Py_GIL_DISABLED
     .m_slots = walker_slots,
-#endif
 };
 
 PyMODINIT_FUNC
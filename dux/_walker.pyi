@@ -1,6 +1,102 @@
+from collections.abc import Sequence
+from typing import Any
+
 from dux.models.enums import NodeKind
 from dux.models.scan import ScanNode
 
+class InodeSet:
+    @property
+    def duplicates(self) -> int: ...
+    def add(self, dev: int, ino: int, /) -> bool: ...
+    def __len__(self) -> int: ...
+
+class NameTable:
+    def __init__(self, capacity: int = 65536) -> None: ...
+    @property
+    def capacity(self) -> int: ...
+    @property
+    def hits(self) -> int: ...
+    @property
+    def misses(self) -> int: ...
+    def intern(self, name: str, /) -> str: ...
+    def __len__(self) -> int: ...
+
+class Node:
+    name: str
+    kind: NodeKind
+    size_bytes: int
+    disk_usage: int
+    # Typed by ScanNode, the subclass the scanners use.
+    children: Any
+    parent: Any
+    _path: str | None
+    def __init__(
+        self,
+        name: str,
+        kind: NodeKind,
+        size_bytes: int,
+        disk_usage: int,
+        children: Sequence[Node] | None = None,
+        parent: Node | None = None,
+        path: str | None = None,
+    ) -> None: ...
+
+class DirBatch:
+    @property
+    def pending(self) -> int: ...
+    def __len__(self) -> int: ...
+
+class DirReader:
+    def __init__(
+        self, threads: int = 4, inodes: InodeSet | None = None, inode_order: bool = False, dev: int = -1
+    ) -> None: ...
+    @property
+    def threads(self) -> int: ...
+    @property
+    def pending(self) -> int: ...
+    def submit(self, path: str, token: object, read: bool = True) -> None: ...
+    def take(self) -> tuple[Any, DirBatch | None] | None: ...
+    def close(self) -> None: ...
+    def stats(self) -> tuple[int, int, int, int, int]: ...
+
+class DirColumns:
+    # Read-only memoryviews over the object's own arrays.
+    @property
+    def sizes(self) -> memoryview: ...
+    @property
+    def disk_usage(self) -> memoryview: ...
+    @property
+    def kinds(self) -> memoryview: ...
+    @property
+    def name_offsets(self) -> memoryview: ...
+    @property
+    def names(self) -> memoryview: ...
+    @property
+    def errors(self) -> int: ...
+    def __len__(self) -> int: ...
+
+# Linux only.
+def list_dir(
+    path: str,
+    split_at: int = 0,
+    stat_links: bool = False,
+    inodes: InodeSet | None = None,
+    inode_order: bool = False,
+    dev: int = -1,
+) -> DirBatch: ...
+def stat_batch(batch: DirBatch, start: int, stop: int, inodes: InodeSet | None = None) -> int: ...
+def set_io_priority(io_class: int, level: int) -> bool: ...
+def scan_dir_columns(path: str, inodes: InodeSet | None = None) -> DirColumns: ...
+def build_batch_nodes(
+    batch: DirBatch,
+    parent: ScanNode,
+    leaf: tuple[()],
+    kind_dir: NodeKind,
+    kind_file: NodeKind,
+    scan_node_cls: type[ScanNode],
+    names: NameTable | None = None,
+    inode_order: bool = False,
+) -> tuple[list[ScanNode], int, int, int]: ...
 def scan_dir_nodes(
     path: str,
     parent: ScanNode,
@@ -8,7 +104,72 @@ def scan_dir_nodes(
     kind_dir: NodeKind,
     kind_file: NodeKind,
     scan_node_cls: type[ScanNode],
+    inodes: InodeSet | None = None,
+    names: NameTable | None = None,
+    inode_order: bool = False,
+    dev: int = -1,
+) -> tuple[list[ScanNode], int, int, int]: ...
+def scan_dir_at_nodes(
+    path: str,
+    parent: ScanNode,
+    leaf: tuple[()],
+    kind_dir: NodeKind,
+    kind_file: NodeKind,
+    scan_node_cls: type[ScanNode],
+    inodes: InodeSet | None = None,
+    names: NameTable | None = None,
+    inode_order: bool = False,
+    dev: int = -1,
 ) -> tuple[list[ScanNode], int, int, int]: ...
+def scan_dir_getdents_nodes(
+    path: str,
+    parent: ScanNode,
+    leaf: tuple[()],
+    kind_dir: NodeKind,
+    kind_file: NodeKind,
+    scan_node_cls: type[ScanNode],
+    inodes: InodeSet | None = None,
+    names: NameTable | None = None,
+    inode_order: bool = False,
+    dev: int = -1,
+) -> tuple[list[ScanNode], int, int, int]: ...
+def scan_dir_uring_nodes(
+    path: str,
+    parent: ScanNode,
+    leaf: tuple[()],
+    kind_dir: NodeKind,
+    kind_file: NodeKind,
+    scan_node_cls: type[ScanNode],
+    queue_depth: int = 64,
+    inodes: InodeSet | None = None,
+    names: NameTable | None = None,
+    dev: int = -1,
+) -> tuple[list[ScanNode], int, int, int]: ...
+def uring_available() -> bool: ...
+def scan_subtree_nodes(
+    path: str,
+    parent: ScanNode,
+    leaf: tuple[()],
+    kind_dir: NodeKind,
+    kind_file: NodeKind,
+    scan_node_cls: type[ScanNode],
+    max_entries: int,
+    max_depth: int,
+    dev: int = -1,
+    skip: tuple[str, ...] = (),
+    stop: tuple[str, ...] = (),
+    inodes: InodeSet | None = None,
+    names: NameTable | None = None,
+    inode_order: bool = False,
+    mounts: list[ScanNode] | None = None,
+) -> tuple[list[tuple[ScanNode, int]], int, int, int, int]: ...
+def aggregate_subtree(
+    path: str,
+    dev: int = -1,
+    skip: tuple[str, ...] = (),
+    inodes: InodeSet | None = None,
+    inode_order: bool = False,
+) -> tuple[int, int, int, int, int, int, list[str]]: ...
 def scan_dir_bulk_nodes(
     path: str,
     parent: ScanNode,
@@ -16,4 +177,8 @@ def scan_dir_bulk_nodes(
     kind_dir: NodeKind,
     kind_file: NodeKind,
     scan_node_cls: type[ScanNode],
+    inodes: InodeSet | None = None,
+    names: NameTable | None = None,
+    inode_order: bool = False,
+    dev: int = -1,
 ) -> tuple[list[ScanNode], int, int, int]: ...
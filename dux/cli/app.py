@@ -5,7 +5,7 @@ import time
 from dataclasses import dataclass, replace
 from pathlib import Path
 import sys
-from typing import Annotated
+from typing import Annotated, cast
 
 import typer
 from rich.console import Console, Group
@@ -18,14 +18,22 @@ from result import Err
 
 from dux.config.defaults import default_config
 from dux.config.loader import load_config, sample_config_json
-from dux.models.scan import ScanError, ScanErrorCode, ScanOptions, ScanResult
-from dux.scan import PythonScanner, Scanner, default_scanner
+from dux.models.enums import IoClass, ScanScheduler
+from dux.models.insight import InsightBundle
+from dux.models.packed import PackedNode
+from dux.models.scan import ScanError, ScanErrorCode, ScanNode, ScanOptions, ScanResult
+from dux.scan import PythonScanner, Scanner, default_scanner, uring_scanner
+from dux.services.formatting import format_bytes
 from dux.services.insights import generate_insights
+from dux.services.memory import memory_report
 from dux.services.summary import render_focused_summary, render_summary
 from dux.ui.app import DuxApp
 
 console = Console()
 
+# Unscanned directories -v lists by path before summing up the rest.
+_MAX_UNSCANNED_LISTED = 20
+
 
 @dataclass(slots=True)
 class _ScanProgress:
@@ -42,8 +50,13 @@ def _truncate_path(path: str, max_width: int = 110) -> str:
     return f"...{path[-keep:]}"
 
 
-def _render_scan_panel(progress: _ScanProgress, workers: int, phase: str) -> Panel:
+def _render_scan_panel(progress: _ScanProgress, workers: int | str, phase: str, max_iops: int = 0) -> Panel:
     elapsed = time.perf_counter() - progress.start_time
+    # With an I/O budget, show the rate it is actually holding the scan to.
+    budget = ""
+    if max_iops:
+        rate = (progress.files + 2 * progress.directories) / elapsed if elapsed > 0 else 0.0
+        budget = f"    [#b294bb]I/O:[/] {rate:,.0f}/s of {max_iops:,}"
     body = Group(
         Spinner("dots", text=phase, style="bold #8abeb7"),
         Text.from_markup(f"[#81a2be]Path:[/] {escape(_truncate_path(progress.current_path))}"),
@@ -51,6 +64,7 @@ def _render_scan_panel(progress: _ScanProgress, workers: int, phase: str) -> Pan
             f"[#b5bd68]Scanned:[/] {progress.directories:,} dirs, {progress.files:,} files"
             + f"    [#f0c674]Workers:[/] {workers}"
             + f"    [#de935f]Elapsed:[/] {elapsed:.1f}s"
+            + budget
         ),
     )
     return Panel(
@@ -60,16 +74,20 @@ def _render_scan_panel(progress: _ScanProgress, workers: int, phase: str) -> Pan
     )
 
 
-def _scan_with_progress(path: Path, options: ScanOptions, workers: int, scanner: Scanner) -> ScanResult:
+def _scan_with_progress(path: Path, options: ScanOptions, workers: int | str, scanner: Scanner) -> ScanResult:
     """Run the scan in a background thread while the main thread drives a Rich Live display.
 
     A shared ``_ScanProgress`` struct (protected by *lock*) carries approximate
     counts from the scan callback to the render loop.  The main thread takes
     a shallow copy via ``dataclasses.replace`` to avoid holding the lock during
     (relatively slow) terminal rendering.
+
+    The first Ctrl-C asks the scan to stop (see ScanOptions.partial_on_cancel)
+    and waits for it to return what it has; a second one aborts.
     """
     lock = threading.Lock()
     done = threading.Event()
+    interrupted = threading.Event()
     result: ScanResult | None = None
     progress = _ScanProgress(
         current_path=str(path),
@@ -87,7 +105,7 @@ def _scan_with_progress(path: Path, options: ScanOptions, workers: int, scanner:
     def scan_worker() -> None:
         nonlocal result
         try:
-            result = scanner.scan(str(path), options, progress_callback=on_progress)
+            result = scanner.scan(str(path), options, progress_callback=on_progress, cancel_check=interrupted.is_set)
         except Exception as exc:  # noqa: BLE001
             result = Err(
                 ScanError(
@@ -103,21 +121,30 @@ def _scan_with_progress(path: Path, options: ScanOptions, workers: int, scanner:
     thread.start()
 
     with Live(
-        _render_scan_panel(progress, workers, "Scanning directory tree..."),
+        _render_scan_panel(progress, workers, "Scanning directory tree...", options.max_iops),
         console=console,
         refresh_per_second=12,
         transient=True,
     ) as live:
-        while not done.wait(timeout=0.08):
+        phase = "Scanning directory tree..."
+        while True:
+            try:
+                if done.wait(timeout=0.08):
+                    break
+            except KeyboardInterrupt:
+                if interrupted.is_set():
+                    raise
+                interrupted.set()
+                phase = "Interrupted, keeping what was scanned (Ctrl-C again to abort)..."
             # Shallow-copy progress under the lock so we don't hold it
             # during rendering (which is slow relative to the lock).
             with lock:
                 snapshot = replace(progress)
-            live.update(_render_scan_panel(snapshot, workers, "Scanning directory tree..."))
+            live.update(_render_scan_panel(snapshot, workers, phase, options.max_iops))
 
         with lock:
             final = replace(progress)
-        live.update(_render_scan_panel(final, workers, "Finalizing scan..."))
+        live.update(_render_scan_panel(final, workers, "Finalizing scan...", options.max_iops))
 
     thread.join()
     if result is None:
@@ -140,7 +167,9 @@ def run(
     interactive: Annotated[bool, typer.Option("--interactive", "-i", help="Launch interactive TUI.")] = False,
     sample_config: Annotated[bool, typer.Option("--sample-config", help="Print sample config JSON.")] = False,
     max_depth: Annotated[int | None, typer.Option("--max-depth", help="Max directory depth to scan.")] = None,
-    workers: Annotated[int | None, typer.Option("--workers", "-w", help="Number of scan workers.")] = None,
+    workers: Annotated[
+        str | None, typer.Option("--workers", "-w", help="Number of scan workers, or 'auto' to adapt while scanning.")
+    ] = None,
     top: Annotated[
         int | None,
         typer.Option("--top", help="Number of items in --top-* views."),
@@ -153,8 +182,106 @@ def run(
         bool, typer.Option("--apparent-size", "-A", help="Show apparent size column (logical file size).")
     ] = False,
     scanner: Annotated[
-        str, typer.Option("--scanner", "-S", help="Scanner variant: auto, python, posix, macos.")
+        str,
+        typer.Option(
+            "--scanner",
+            "-S",
+            help="Scanner variant: auto, python, posix, openat, getdents, uring, subtree, pipeline, macos, process.",
+        ),
     ] = "auto",
+    uring_depth: Annotated[
+        int | None, typer.Option("--uring-depth", help="In-flight statx requests per worker for --scanner uring.")
+    ] = None,
+    processes: Annotated[
+        int | None, typer.Option("--processes", help="Worker processes for --scanner process (default: CPU count).")
+    ] = None,
+    exclude: Annotated[
+        list[str] | None,
+        typer.Option("--exclude", "-e", help="Glob pattern or absolute path to leave out of the scan (repeatable)."),
+    ] = None,
+    aggregate: Annotated[
+        bool,
+        typer.Option(
+            "--aggregate", help="Sum stop-recursion dirs (node_modules, .venv, ...) without listing their contents."
+        ),
+    ] = False,
+    count_links: Annotated[
+        bool, typer.Option("--count-links", "-l", help="Count every hard link at full size (default: once per file).")
+    ] = False,
+    packed: Annotated[
+        bool, typer.Option("--packed", help="Keep the scan tree in compact arrays (for very large trees).")
+    ] = False,
+    stream: Annotated[
+        bool | None,
+        typer.Option(
+            "--stream/--no-stream",
+            help="Keep only directories and the largest files while scanning (default: on unless -i, -t or -c).",
+        ),
+    ] = None,
+    compact: Annotated[
+        bool, typer.Option("--compact", help="Shrink the finished tree (children lists become tuples).")
+    ] = False,
+    split_dir: Annotated[
+        int | None,
+        typer.Option("--split-dir", help="Stat directories with more entries than this on several workers (0: off)."),
+    ] = None,
+    device_workers: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--device-workers",
+            help="Concurrency limit for one filesystem, as MOUNT=N or CLASS=N with CLASS network, rotational or local"
+            + " (repeatable).",
+        ),
+    ] = None,
+    network_workers: Annotated[
+        int | None,
+        typer.Option(
+            "--network-workers", help="Workers when the scan root is on a network filesystem (default: 64; 0: off)."
+        ),
+    ] = None,
+    dir_timeout: Annotated[
+        float | None,
+        typer.Option(
+            "--dir-timeout",
+            help="Seconds before giving up on a directory the scan is stuck on, e.g. a hung mount (default: 0, off).",
+        ),
+    ] = None,
+    max_iops: Annotated[
+        int | None,
+        typer.Option("--max-iops", help="Limit directory listings plus entries read per second (0: unlimited)."),
+    ] = None,
+    io_class: Annotated[
+        str | None,
+        typer.Option("--io-class", help="I/O priority of the scan workers: normal, or idle (idle I/O class, nice 19)."),
+    ] = None,
+    time_limit: Annotated[
+        float | None,
+        typer.Option(
+            "--time-limit",
+            help="Stop after this many seconds and show what was scanned so far, as lower bounds (0: no limit).",
+        ),
+    ] = None,
+    max_entries: Annotated[
+        int | None,
+        typer.Option(
+            "--max-entries",
+            help="Stop after reading about this many entries and show what was scanned so far (0: no limit).",
+        ),
+    ] = None,
+    inode_order: Annotated[
+        bool | None,
+        typer.Option(
+            "--inode-order/--no-inode-order",
+            help="Stat each directory's entries in inode order (default: on for spinning disks and NFS).",
+        ),
+    ] = None,
+    one_file_system: Annotated[
+        bool, typer.Option("--one-file-system", "-x", help="Do not descend into other filesystems (mount points).")
+    ] = False,
+    scheduler: Annotated[
+        str | None,
+        typer.Option("--scheduler", help="Work scheduler: fifo (shared queue) or steal (per-worker deques)."),
+    ] = None,
     verbose: Annotated[
         bool, typer.Option("--verbose", "-v", help="Print GIL status, scanner, and timing info.")
     ] = False,
@@ -175,8 +302,15 @@ def run(
         config = config_result.unwrap()
 
     overrides: dict[str, object] = {}
-    if workers is not None:
-        overrides["scan_workers"] = max(1, workers)
+    if workers == "auto":
+        overrides["adaptive_workers"] = True
+    elif workers is not None:
+        try:
+            overrides["scan_workers"] = max(1, int(workers))
+        except ValueError:
+            console.print(f"[red]Invalid --workers value: {workers}. Use a number or 'auto'.[/]")
+            raise typer.Exit(1) from None
+        overrides["adaptive_workers"] = False
     if top is not None:
         overrides["top_count"] = max(1, top)
     if max_insights is not None:
@@ -189,12 +323,90 @@ def run(
         overrides["page_size"] = max(10, page_size)
     if max_depth is not None:
         overrides["max_depth"] = max(1, max_depth)
+    if uring_depth is not None:
+        overrides["uring_queue_depth"] = min(4096, max(1, uring_depth))
+    if one_file_system:
+        overrides["one_file_system"] = True
+    if exclude:
+        overrides["exclude_patterns"] = [*config.exclude_patterns, *exclude]
+    if aggregate:
+        overrides["aggregate_stop_recursion"] = True
+    if count_links:
+        overrides["count_hard_links"] = True
+    if packed:
+        overrides["packed_tree"] = True
+    if compact:
+        overrides["compact_tree"] = True
+    if processes is not None:
+        overrides["scan_processes"] = max(1, processes)
+    if split_dir is not None:
+        overrides["split_dir_entries"] = max(0, split_dir)
+    if inode_order is not None:
+        overrides["inode_order"] = inode_order
+    if device_workers:
+        limits = dict(config.device_workers)
+        for item in device_workers:
+            key, sep, value = item.rpartition("=")
+            if not sep or not key or not value.isdigit():
+                console.print(f"[red]Invalid --device-workers value: {item}. Use MOUNT=N or CLASS=N.[/]")
+                raise typer.Exit(1)
+            limits[key] = max(1, int(value))
+        overrides["device_workers"] = limits
+    if network_workers is not None:
+        overrides["network_workers"] = max(0, network_workers)
+    if dir_timeout is not None:
+        overrides["dir_timeout"] = max(0.0, dir_timeout)
+    if max_iops is not None:
+        overrides["max_iops"] = max(0, max_iops)
+    if io_class is not None:
+        try:
+            overrides["io_class"] = IoClass(io_class)
+        except ValueError:
+            console.print(f"[red]Unknown I/O class: {io_class}. Use: normal, idle.[/]")
+            raise typer.Exit(1) from None
+    if scheduler is not None:
+        try:
+            overrides["scan_scheduler"] = ScanScheduler(scheduler)
+        except ValueError:
+            console.print(f"[red]Unknown scheduler: {scheduler}. Use: fifo, steal.[/]")
+            raise typer.Exit(1) from None
     if overrides:
         config = replace(config, **overrides)
 
+    # Insights are only shown by the TUI and -t/-c.  Without them nothing
+    # reads the file nodes except -f, which the streamed top-K covers.
+    needs_insights = interactive or top_temp or top_cache
+    if stream is None:
+        stream = not needs_insights
+    elif stream and needs_insights:
+        console.print("[red]--stream cannot be combined with --interactive, --top-temp or --top-cache.[/]")
+        raise typer.Exit(1)
+
     scan_options = ScanOptions(
         max_depth=config.max_depth,
+        scheduler=config.scan_scheduler,
+        adaptive_workers=config.adaptive_workers,
+        one_file_system=config.one_file_system,
+        exclude=tuple(config.exclude_patterns),
+        aggregate=tuple(rule.pattern for rule in config.patterns if rule.stop_recursion)
+        if config.aggregate_stop_recursion
+        else (),
+        count_links=config.count_hard_links,
+        packed=config.packed_tree,
+        compact=config.compact_tree,
+        stream_top_files=config.top_count if stream else 0,
+        split_dir_entries=config.split_dir_entries,
+        inode_order=config.inode_order,
+        device_workers=tuple(config.device_workers.items()),
+        network_workers=config.network_workers,
+        dir_timeout=config.dir_timeout,
+        max_iops=config.max_iops,
+        io_class=config.io_class,
+        time_limit=max(0.0, time_limit or 0.0),
+        max_entries=max(0, max_entries or 0),
+        partial_on_cancel=True,
     )
+    workers_label = "auto" if config.adaptive_workers else str(config.scan_workers)
 
     # Lazy imports for posix/macos: avoids loading the C extension on
     # platforms where it may not be compiled (or when --scanner=auto/python).
@@ -209,6 +421,36 @@ def run(
         from dux.scan.native_scanner import NativeScanner
 
         scanner_impl = NativeScanner(scan_dir_nodes, workers=config.scan_workers)
+    elif scanner == "openat":
+        from dux._walker import scan_dir_at_nodes
+        from dux.scan.native_scanner import NativeScanner
+
+        scanner_impl = NativeScanner(scan_dir_at_nodes, workers=config.scan_workers)
+    elif scanner == "getdents":
+        from dux._walker import scan_dir_getdents_nodes
+        from dux.scan.native_scanner import NativeScanner
+
+        scanner_impl = NativeScanner(scan_dir_getdents_nodes, workers=config.scan_workers)
+    elif scanner == "uring":
+        scanner_impl = uring_scanner(workers=config.scan_workers, queue_depth=config.uring_queue_depth)
+    elif scanner == "subtree":
+        from dux._walker import scan_subtree_nodes
+        from dux.scan.native_scanner import SubtreeScanner
+
+        scanner_impl = SubtreeScanner(
+            scan_subtree_nodes,
+            workers=config.scan_workers,
+            entry_budget=config.subtree_entry_budget,
+            depth_budget=config.subtree_depth_budget,
+        )
+    elif scanner == "pipeline":
+        from dux.scan.native_scanner import PipelinedScanner
+
+        scanner_impl = PipelinedScanner(io_threads=config.scan_workers)
+    elif scanner == "process":
+        from dux.scan.process_scanner import ProcessPoolScanner
+
+        scanner_impl = ProcessPoolScanner(processes=config.scan_processes, threads=config.scan_workers, config=config)
     elif scanner == "macos":
         from dux._walker import scan_dir_bulk_nodes
 
@@ -216,16 +458,21 @@ def run(
 
         scanner_impl = NativeScanner(scan_dir_bulk_nodes, workers=config.scan_workers)
     else:
-        console.print(f"[red]Unknown scanner: {scanner}. Use: auto, python, posix, macos.[/]")
+        console.print(
+            f"[red]Unknown scanner: {scanner}. Use: auto, python, posix, openat, getdents, uring, subtree, pipeline, macos, process.[/]"
+        )
         raise typer.Exit(1)
 
     if verbose:
         gil_status = "enabled" if sys._is_gil_enabled() else "disabled"  # pyright: ignore[reportPrivateUsage]  # noqa: SLF001
         scanner_name = getattr(scanner_impl, "label", type(scanner_impl).__name__)
-        console.print(f"[#969896]GIL: {gil_status} | Scanner: {scanner_name} | Workers: {config.scan_workers}[/]")
+        console.print(
+            f"[#969896]GIL: {gil_status} | Scanner: {scanner_name} | Workers: {workers_label}"
+            + f" | Scheduler: {config.scan_scheduler.value}[/]"
+        )
 
     t0 = time.perf_counter()
-    scan_result = _scan_with_progress(Path(path), scan_options, workers=config.scan_workers, scanner=scanner_impl)
+    scan_result = _scan_with_progress(Path(path), scan_options, workers=workers_label, scanner=scanner_impl)
     if isinstance(scan_result, Err):
         error = scan_result.unwrap_err()
         console.print(f"[red]Scan failed for {escape(error.path)}: {escape(error.message)}[/]")
@@ -234,14 +481,63 @@ def run(
     scan_elapsed = time.perf_counter() - t0
 
     t1 = time.perf_counter()
-    with console.status("[bold #8abeb7]Generating insights...[/]"):
-        bundle = generate_insights(snapshot.root, config)
+    bundle = InsightBundle(insights=[])
+    if needs_insights:
+        with console.status("[bold #8abeb7]Generating insights...[/]"):
+            bundle = generate_insights(snapshot.root, config, snapshot.subtree_insights)
     insight_elapsed = time.perf_counter() - t1
 
     if verbose:
         stats = snapshot.stats
         msg = f"[#969896]Scan: {scan_elapsed:.2f}s | Insights: {insight_elapsed:.2f}s | {stats.files:,} files, {stats.directories:,} dirs[/]"
         console.print(msg)
+        usage = snapshot.workers
+        if usage is not None and usage.adaptive:
+            console.print(
+                f"[#969896]Workers: auto {usage.initial} → {usage.final} (peak {usage.peak}, bounds {usage.low}-{usage.high})[/]"
+            )
+        pipeline = snapshot.pipeline
+        if pipeline is not None:
+            console.print(
+                f"[#969896]Pipeline: {pipeline.batches:,} batches"
+                + f" | hand-off depth {pipeline.mean_depth:.1f} mean, {pipeline.peak_depth:,} peak"
+                + f" | waits: builders {pipeline.builder_waits:,}, I/O {pipeline.io_waits:,}"
+                + f" | bottleneck: {pipeline.bottleneck}[/]"
+            )
+        if snapshot.inode_order:
+            console.print("[#969896]Stat order: inode number[/]")
+        if snapshot.network:
+            console.print(f"[#969896]Network mode: {config.network_workers} workers[/]")
+        throttle = snapshot.throttle
+        if throttle is not None:
+            console.print(
+                f"[#969896]I/O budget: {throttle.limit:,}/s | {throttle.operations:,} operations"
+                + f" at {throttle.rate:,.0f}/s | workers waited {throttle.waited:.1f}s[/]"
+            )
+        for stuck in snapshot.timed_out:
+            console.print(f"[#969896]Timed out: {stuck} (after {config.dir_timeout:g}s, left empty)[/]")
+        for unread in snapshot.unscanned[:_MAX_UNSCANNED_LISTED]:
+            console.print(f"[#969896]Not scanned: {unread}[/]")
+        if len(snapshot.unscanned) > _MAX_UNSCANNED_LISTED:
+            console.print(f"[#969896]Not scanned: {len(snapshot.unscanned) - _MAX_UNSCANNED_LISTED:,} more[/]")
+        for device in snapshot.devices:
+            console.print(
+                f"[#969896]Device: {device.mount} ({device.device_class}) | {device.directories:,} dirs"
+                + f" | peak {device.peak} of {device.limit} workers[/]"
+            )
+        root = snapshot.root
+        if isinstance(root, PackedNode):
+            report = memory_report(root)
+            console.print(f"[#969896]Tree: packed, {report.nodes:,} entries in {format_bytes(report.packed_bytes)}[/]")
+        else:
+            # Unpacked snapshots hold ScanNodes.
+            report = memory_report(cast(ScanNode, root))
+            console.print(
+                f"[#969896]Tree: {report.nodes:,} nodes in {format_bytes(report.node_bytes)} | "
+                + f"names {format_bytes(report.name_bytes)} ({report.names:,} distinct, "
+                + f"sharing saves {format_bytes(report.shared_name_bytes)}) | "
+                + f"child lists {format_bytes(report.children_bytes)} | total {format_bytes(report.total_bytes)}[/]"
+            )
 
     if interactive:
         DuxApp(
@@ -250,13 +546,28 @@ def run(
             bundle=bundle,
             config=config,
             apparent_size=apparent_size,
+            unscanned=snapshot.unscanned,
         ).run()
         raise typer.Exit(0)
 
     root_prefix = snapshot.root.path.rstrip("/") + "/"
     if snapshot.stats.access_errors:
         console.print(f"[red]{snapshot.stats.access_errors:,} access errors during scan[/red]")
-    render_summary(console, snapshot.root, snapshot.stats, root_prefix, apparent_size=apparent_size)
+    if snapshot.timed_out:
+        console.print(f"[red]{len(snapshot.timed_out):,} directories timed out and were left empty (see -v)[/red]")
+    if snapshot.partial:
+        console.print(
+            f"[red]Partial scan: {len(snapshot.unscanned):,} directories not scanned, sizes are lower bounds (see -v)[/red]"
+        )
+    render_summary(
+        console,
+        snapshot.root,
+        snapshot.stats,
+        root_prefix,
+        apparent_size=apparent_size,
+        skipped_mounts=snapshot.skipped_mounts,
+        unscanned=snapshot.unscanned,
+    )
     render_focused_summary(
         console,
         snapshot.root,
@@ -268,6 +579,7 @@ def run(
         top_dirs=top_dirs,
         top_files=top_files,
         apparent_size=apparent_size,
+        largest_files=snapshot.top_files,
     )
 
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 
 from dux.config.schema import AppConfig, PatternRule
-from dux.models.enums import ApplyTo, InsightCategory
+from dux.models.enums import ApplyTo, InsightCategory, IoClass, ScanScheduler
 
 
 def default_config() -> AppConfig:
@@ -98,9 +98,28 @@ def default_config() -> AppConfig:
         additional_paths={InsightCategory.CACHE: [f"{home}/.cache"]},
         max_depth=None,
         scan_workers=4,
+        adaptive_workers=False,
         top_count=15,
         page_size=100,
         max_insights_per_category=1000,
         overview_top_dirs=100,
         scroll_step=20,
+        uring_queue_depth=64,
+        subtree_entry_budget=10_000,
+        subtree_depth_budget=None,
+        scan_scheduler=ScanScheduler.FIFO,
+        scan_processes=None,
+        one_file_system=False,
+        exclude_patterns=[],
+        aggregate_stop_recursion=False,
+        count_hard_links=False,
+        packed_tree=False,
+        compact_tree=False,
+        split_dir_entries=50_000,
+        inode_order=None,
+        device_workers={},
+        network_workers=64,
+        dir_timeout=0.0,
+        max_iops=0,
+        io_class=IoClass.NORMAL,
     )
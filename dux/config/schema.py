@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any
 
-from dux.models.enums import ApplyTo, InsightCategory
+from dux.models.enums import ApplyTo, InsightCategory, IoClass, ScanScheduler
 
 
 @dataclass(slots=True)
@@ -40,29 +40,78 @@ class AppConfig:
     additional_paths: dict[InsightCategory, list[str]] = field(default_factory=dict)
     max_depth: int | None = None
     scan_workers: int = 4
+    adaptive_workers: bool = False
     top_count: int = 15
     page_size: int = 100
     max_insights_per_category: int = 1000
     overview_top_dirs: int = 100
     scroll_step: int = 20
+    uring_queue_depth: int = 64
+    subtree_entry_budget: int = 10_000
+    subtree_depth_budget: int | None = None
+    scan_scheduler: ScanScheduler = ScanScheduler.FIFO
+    scan_processes: int | None = None
+    one_file_system: bool = False
+    exclude_patterns: list[str] = field(default_factory=list)
+    aggregate_stop_recursion: bool = False
+    count_hard_links: bool = False
+    packed_tree: bool = False
+    compact_tree: bool = False
+    split_dir_entries: int = 50_000
+    # None: stat in inode order when the scanned disk is rotational or remote.
+    inode_order: bool | None = None
+    # Concurrency limit per mount path or device class (network, rotational, local).
+    device_workers: dict[str, int] = field(default_factory=dict)
+    # Workers when the scan root is on a network filesystem (0: no network mode).
+    network_workers: int = 64
+    # Seconds before a scan gives up on a directory it is stuck on (0: never).
+    dir_timeout: float = 0.0
+    # Directory listings plus entries read per second (0: unlimited).
+    max_iops: int = 0
+    io_class: IoClass = IoClass.NORMAL
 
     def to_dict(self) -> dict[str, Any]:
         additional: dict[str, list[str]] = {cat.value: paths for cat, paths in self.additional_paths.items()}
         return {
             "additionalPaths": additional,
             "maxDepth": self.max_depth,
-            "scanWorkers": self.scan_workers,
+            "scanWorkers": "auto" if self.adaptive_workers else self.scan_workers,
             "topCount": self.top_count,
             "pageSize": self.page_size,
             "maxInsightsPerCategory": self.max_insights_per_category,
             "overviewTopDirs": self.overview_top_dirs,
             "scrollStep": self.scroll_step,
+            "uringQueueDepth": self.uring_queue_depth,
+            "subtreeEntryBudget": self.subtree_entry_budget,
+            "subtreeDepthBudget": self.subtree_depth_budget,
+            "scanScheduler": self.scan_scheduler.value,
+            "scanProcesses": self.scan_processes,
+            "oneFileSystem": self.one_file_system,
+            "excludePatterns": list(self.exclude_patterns),
+            "aggregateStopRecursion": self.aggregate_stop_recursion,
+            "countHardLinks": self.count_hard_links,
+            "packedTree": self.packed_tree,
+            "compactTree": self.compact_tree,
+            "splitDirEntries": self.split_dir_entries,
+            "inodeOrder": "auto" if self.inode_order is None else self.inode_order,
+            "deviceWorkers": dict(self.device_workers),
+            "networkWorkers": self.network_workers,
+            "dirTimeout": self.dir_timeout,
+            "maxIops": self.max_iops,
+            "ioClass": self.io_class.value,
             "patterns": [rule.to_dict() for rule in self.patterns],
         }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any], defaults: AppConfig) -> AppConfig:
         max_depth_raw = data.get("maxDepth", defaults.max_depth)
+        subtree_depth_raw = data.get("subtreeDepthBudget", defaults.subtree_depth_budget)
+        processes_raw = data.get("scanProcesses", defaults.scan_processes)
+        # "scanWorkers": "auto" selects the adaptive controller, which starts
+        # from the default worker count.
+        workers_raw = data.get("scanWorkers", "auto" if defaults.adaptive_workers else defaults.scan_workers)
+        adaptive_workers = workers_raw == "auto"
+        inode_order_raw = data.get("inodeOrder", "auto" if defaults.inode_order is None else defaults.inode_order)
 
         # Parse additional paths
         additional_raw = data.get("additionalPaths")
@@ -82,7 +131,8 @@ class AppConfig:
             patterns=patterns,
             additional_paths=additional_paths,
             max_depth=int(max_depth_raw) if max_depth_raw is not None else None,
-            scan_workers=max(1, int(data.get("scanWorkers", defaults.scan_workers))),
+            scan_workers=defaults.scan_workers if adaptive_workers else max(1, int(workers_raw)),
+            adaptive_workers=adaptive_workers,
             top_count=max(1, int(data.get("topCount", defaults.top_count))),
             page_size=max(10, int(data.get("pageSize", defaults.page_size))),
             max_insights_per_category=max(
@@ -91,4 +141,25 @@ class AppConfig:
             ),
             overview_top_dirs=max(5, int(data.get("overviewTopDirs", defaults.overview_top_dirs))),
             scroll_step=max(1, int(data.get("scrollStep", defaults.scroll_step))),
+            uring_queue_depth=min(4096, max(1, int(data.get("uringQueueDepth", defaults.uring_queue_depth)))),
+            subtree_entry_budget=max(1, int(data.get("subtreeEntryBudget", defaults.subtree_entry_budget))),
+            subtree_depth_budget=max(0, int(subtree_depth_raw)) if subtree_depth_raw is not None else None,
+            scan_scheduler=ScanScheduler(str(data.get("scanScheduler", defaults.scan_scheduler.value))),
+            scan_processes=max(1, int(processes_raw)) if processes_raw is not None else None,
+            one_file_system=bool(data.get("oneFileSystem", defaults.one_file_system)),
+            exclude_patterns=[str(p) for p in data.get("excludePatterns", defaults.exclude_patterns)],
+            aggregate_stop_recursion=bool(data.get("aggregateStopRecursion", defaults.aggregate_stop_recursion)),
+            count_hard_links=bool(data.get("countHardLinks", defaults.count_hard_links)),
+            packed_tree=bool(data.get("packedTree", defaults.packed_tree)),
+            compact_tree=bool(data.get("compactTree", defaults.compact_tree)),
+            split_dir_entries=max(0, int(data.get("splitDirEntries", defaults.split_dir_entries))),
+            inode_order=None if inode_order_raw == "auto" else bool(inode_order_raw),
+            device_workers={
+                str(key): max(1, int(value))
+                for key, value in data.get("deviceWorkers", defaults.device_workers).items()
+            },
+            network_workers=max(0, int(data.get("networkWorkers", defaults.network_workers))),
+            dir_timeout=max(0.0, float(data.get("dirTimeout", defaults.dir_timeout))),
+            max_iops=max(0, int(data.get("maxIops", defaults.max_iops))),
+            io_class=IoClass(str(data.get("ioClass", defaults.io_class.value))),
         )
@@ -0,0 +1,47 @@
+"""Storage base class for ``ScanNode``.
+
+The C walker's ``Node`` is used when the extension is built: it keeps the
+fields in a fixed struct and lets the scan functions allocate nodes
+without running a Python ``__init__``.  The fallback below has the same
+attributes and constructor for builds without it.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+__all__ = ["Node"]
+
+
+class _PyNode:
+    """Slotted node storage (pure-Python fallback)."""
+
+    __slots__ = ("_path", "children", "disk_usage", "kind", "name", "parent", "size_bytes")
+
+    def __init__(
+        self,
+        name: str,
+        kind: Any,
+        size_bytes: int,
+        disk_usage: int,
+        children: Any = None,
+        parent: Any = None,
+        path: str | None = None,
+    ) -> None:
+        self.name = name
+        self.kind = kind
+        self.size_bytes = size_bytes
+        self.disk_usage = disk_usage
+        if children is None:
+            children = []
+        for child in children:
+            child.parent = self
+        self.children = children
+        self.parent = parent
+        self._path = path
+
+
+try:
+    from dux._walker import Node
+except ImportError:
+    Node = _PyNode  # type: ignore[assignment,misc]
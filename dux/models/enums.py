@@ -7,6 +7,20 @@ from typing import Any
 class NodeKind(str, Enum):
     FILE = "file"
     DIRECTORY = "directory"
+    # Leaf standing in for the contents of a directory that was summed
+    # without building nodes (see ScanOptions.aggregate).
+    AGGREGATE = "aggregate"
+
+
+class ScanScheduler(str, Enum):
+    FIFO = "fifo"
+    WORK_STEALING = "steal"
+
+
+class IoClass(str, Enum):
+    NORMAL = "normal"
+    # Idle I/O scheduling class and lowest CPU priority for scan workers.
+    IDLE = "idle"
 
 
 class InsightCategory(str, Enum):
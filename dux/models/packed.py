@@ -0,0 +1,275 @@
+"""Struct-of-arrays scan tree for very large scans.
+
+A ``ScanNode`` costs a dataclass instance, a name string and, for
+directories, a children list: well over a hundred bytes per entry.  A
+``PackedTree`` keeps the same information in parallel typed arrays indexed
+by entry number, with all names concatenated into one UTF-8 blob:
+
+    parents      array('i')  parent index (-1 for the root)
+    name_ends    array('q')  end offset of each name in the blob
+    kinds        array('b')  index into _KINDS
+    sizes        array('q')  apparent size in bytes
+    disk_usage   array('q')  allocated bytes
+    child_starts array('i')  CSR offsets into child_index (after finalize)
+    child_index  array('i')  children of each directory, largest first
+
+which is about 40 bytes plus the name per entry.  Entries are appended with
+``add`` (a parent before its children); ``finalize`` then sums directory
+sizes and builds the children index.  Consumers read the tree through
+``PackedNode`` views, which have the same read-only attributes as
+``ScanNode`` (see ``TreeNode``) and are created on demand.
+"""
+
+from __future__ import annotations
+
+import itertools
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, override
+
+from dux.models.enums import NodeKind
+
+if TYPE_CHECKING:
+    from dux.models.scan import TreeNode
+
+_KINDS = (NodeKind.DIRECTORY, NodeKind.FILE, NodeKind.AGGREGATE)
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+_DIRECTORY = _KIND_CODES[NodeKind.DIRECTORY]
+# os.fsencode/fsdecode, minus a function call per name.
+_FS_ENCODING = sys.getfilesystemencoding()
+_FS_ERRORS = sys.getfilesystemencodeerrors()
+
+
+class PackedTree:
+    """Append-only scan tree stored as parallel arrays (see module docstring)."""
+
+    __slots__ = (
+        "_child_index",
+        "_child_starts",
+        "_disk_usage",
+        "_kinds",
+        "_name_ends",
+        "_names",
+        "_parents",
+        "_sizes",
+        "root_path",
+    )
+
+    def __init__(self, root_path: str, root_name: str) -> None:
+        self.root_path = root_path
+        self._names = bytearray()
+        self._name_ends: array[int] = array("q")
+        self._parents: array[int] = array("i")
+        self._kinds: array[int] = array("b")
+        self._sizes: array[int] = array("q")
+        self._disk_usage: array[int] = array("q")
+        self._child_starts: array[int] | None = None
+        self._child_index: array[int] = array("i")
+        self.add(-1, root_name, NodeKind.DIRECTORY, 0, 0)
+
+    def __len__(self) -> int:
+        return len(self._parents)
+
+    @property
+    def finalized(self) -> bool:
+        return self._child_starts is not None
+
+    def add(self, parent: int, name: str, kind: NodeKind, size_bytes: int, disk_usage: int) -> int:
+        """Append an entry below *parent* and return its index.
+
+        Directory sizes are ignored: ``finalize`` sums them from their
+        children.
+        """
+        if self._child_starts is not None:
+            raise ValueError("PackedTree is finalized")
+        code = _KIND_CODES[kind]
+        if code == _DIRECTORY:
+            size_bytes = disk_usage = 0
+        self._names += name.encode(_FS_ENCODING, _FS_ERRORS)
+        self._name_ends.append(len(self._names))
+        self._parents.append(parent)
+        self._kinds.append(code)
+        self._sizes.append(size_bytes)
+        self._disk_usage.append(disk_usage)
+        return len(self._parents) - 1
+
+    def add_children(self, parent: int, nodes: Sequence[TreeNode]) -> range:
+        """Append copies of *nodes* below *parent*; return their indices.
+
+        The batch form of ``add`` used by the scanners: one ``extend`` per
+        array instead of one ``append`` per field and node.
+        """
+        if self._child_starts is not None:
+            raise ValueError("PackedTree is finalized")
+        first = len(self._parents)
+        names = self._names
+        encoded = [node.name.encode(_FS_ENCODING, _FS_ERRORS) for node in nodes]
+        ends = itertools.accumulate(map(len, encoded), initial=len(names))
+        self._name_ends.extend(itertools.islice(ends, 1, None))
+        names += b"".join(encoded)
+        codes = [_KIND_CODES[node.kind] for node in nodes]
+        self._kinds.extend(codes)
+        self._parents.extend(itertools.repeat(parent, len(nodes)))
+        self._sizes.extend(0 if code == _DIRECTORY else node.size_bytes for node, code in zip(nodes, codes))
+        self._disk_usage.extend(0 if code == _DIRECTORY else node.disk_usage for node, code in zip(nodes, codes))
+        return range(first, len(self._parents))
+
+    def finalize(self) -> None:
+        """Sum directory sizes bottom-up and index children, largest first.
+
+        The counterpart of ``finalize_sizes`` for ``ScanNode`` trees; calling
+        it again does nothing.
+        """
+        if self._child_starts is not None:
+            return
+        parents = self._parents
+        sizes = self._sizes
+        disk_usage = self._disk_usage
+        n = len(parents)
+        # Parents precede their children, so one reverse pass sees every
+        # subtree complete before adding it to its parent.
+        for i in range(n - 1, 0, -1):
+            p = parents[i]
+            sizes[p] += sizes[i]
+            disk_usage[p] += disk_usage[i]
+
+        # Counting sort by parent into CSR form.
+        starts = array("i", bytes(4 * (n + 1)))
+        for i in range(1, n):
+            starts[parents[i] + 1] += 1
+        for i in range(n):
+            starts[i + 1] += starts[i]
+        fill = array("i", starts)
+        index = array("i", bytes(4 * max(0, n - 1)))
+        for i in range(1, n):
+            p = parents[i]
+            index[fill[p]] = i
+            fill[p] += 1
+        del fill
+        key = disk_usage.__getitem__
+        for p in range(n):
+            lo, hi = starts[p], starts[p + 1]
+            if hi - lo > 1:
+                index[lo:hi] = array("i", sorted(index[lo:hi], key=key, reverse=True))
+        self._child_starts = starts
+        self._child_index = index
+
+    def compact(self) -> None:
+        """Copy each array and the name blob to drop the spare capacity left by appends."""
+        self._names = self._names[:]
+        self._name_ends = self._name_ends[:]
+        self._parents = self._parents[:]
+        self._kinds = self._kinds[:]
+        self._sizes = self._sizes[:]
+        self._disk_usage = self._disk_usage[:]
+
+    def nbytes(self) -> int:
+        """Bytes held by the arrays and the name blob."""
+        arrays = (self._name_ends, self._parents, self._kinds, self._sizes, self._disk_usage, self._child_index)
+        total = len(self._names) + sum(a.itemsize * len(a) for a in arrays)
+        if self._child_starts is not None:
+            total += self._child_starts.itemsize * len(self._child_starts)
+        return total
+
+    def root(self) -> PackedNode:
+        return PackedNode(self, 0, self.root_path)
+
+    def name(self, index: int) -> str:
+        start = self._name_ends[index - 1] if index else 0
+        return self._names[start : self._name_ends[index]].decode(_FS_ENCODING, _FS_ERRORS)
+
+    def kind(self, index: int) -> NodeKind:
+        return _KINDS[self._kinds[index]]
+
+    def size_bytes(self, index: int) -> int:
+        return self._sizes[index]
+
+    def disk_usage(self, index: int) -> int:
+        return self._disk_usage[index]
+
+    def parent(self, index: int) -> int:
+        return self._parents[index]
+
+    def path(self, index: int) -> str:
+        """Absolute path of entry *index*, rebuilt from the parent chain."""
+        names: list[str] = []
+        while index > 0:
+            names.append(self.name(index))
+            index = self._parents[index]
+        if not names:
+            return self.root_path
+        names.append(self.root_path.rstrip("/"))
+        return "/".join(reversed(names))
+
+    def children(self, index: int) -> array[int]:
+        """Indices of the children of *index*, largest disk usage first."""
+        starts = self._child_starts
+        if starts is None:
+            raise ValueError("PackedTree is not finalized")
+        return self._child_index[starts[index] : starts[index + 1]]
+
+
+class PackedNode:
+    """Read-only view of one ``PackedTree`` entry with ``ScanNode``'s attributes.
+
+    Views are cheap and not cached: ``children`` builds new ones on every
+    access, passing down the parent's path so that a walk from the root
+    never rebuilds a path from the parent chain.
+    """
+
+    __slots__ = ("_path", "index", "tree")
+
+    def __init__(self, tree: PackedTree, index: int, path: str | None = None) -> None:
+        self.tree = tree
+        self.index = index
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            self._path = self.tree.path(self.index)
+        return self._path
+
+    @property
+    def name(self) -> str:
+        return self.tree.name(self.index)
+
+    @property
+    def kind(self) -> NodeKind:
+        return self.tree.kind(self.index)
+
+    @property
+    def is_dir(self) -> bool:
+        return self.tree.kind(self.index) is NodeKind.DIRECTORY
+
+    @property
+    def size_bytes(self) -> int:
+        return self.tree.size_bytes(self.index)
+
+    @property
+    def disk_usage(self) -> int:
+        return self.tree.disk_usage(self.index)
+
+    @property
+    def parent(self) -> PackedNode | None:
+        index = self.tree.parent(self.index)
+        return None if index < 0 else PackedNode(self.tree, index)
+
+    @property
+    def children(self) -> list[PackedNode]:
+        tree = self.tree
+        prefix = self.path.rstrip("/") + "/"
+        return [PackedNode(tree, i, prefix + tree.name(i)) for i in tree.children(self.index)]
+
+    @override
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, PackedNode) and other.tree is self.tree and other.index == self.index
+
+    @override
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    @override
+    def __repr__(self) -> str:
+        return f"PackedNode({self.path!r}, {self.kind.value}, {self.disk_usage})"
@@ -1,48 +1,293 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from collections.abc import Sequence
+from dataclasses import dataclass
 from enum import Enum
-from typing import Callable
+from typing import Callable, Protocol, override
 
 from result import Result
 
-from dux.models.enums import NodeKind
+from dux.models._node import Node
+from dux.models.enums import IoClass, NodeKind, ScanScheduler
+from dux.models.insight import InsightBundle
 
 
 ProgressCallback = Callable[[str, int, int], None]
 CancelCheck = Callable[[], bool]
 
 
-@dataclass(slots=True)
-class ScanNode:
-    path: str
+class ScanNode(Node):
+    """One scanned entry.
+
+    Nodes store their name and a reference to their parent, not their
+    absolute path: the shared directory prefixes would otherwise be stored
+    once per entry.  ``path`` is rebuilt from the parent chain on first
+    access and cached on the node, so only nodes that are actually displayed
+    or reported pay for a path string.  A root node (no parent) is created
+    with its *path*; *children* passed to the constructor are linked to the
+    new node.
+
+    The fields live in ``Node`` (a C struct when the walker extension is
+    built), which the scan functions fill directly.  Two nodes are equal
+    when their name, kind, sizes and children are.
+    """
+
+    __slots__ = ()
+
     name: str
     kind: NodeKind
     size_bytes: int
     disk_usage: int
-    children: list[ScanNode] = field(default_factory=list)
+    children: list[ScanNode]
+    parent: ScanNode | None
+    _path: str | None
+
+    @property
+    def path(self) -> str:
+        path = self._path
+        if path is None:
+            names: list[str] = []
+            node = self
+            while node._path is None and node.parent is not None:
+                names.append(node.name)
+                node = node.parent
+            names.append((node.name if node._path is None else node._path).rstrip("/"))
+            path = self._path = "/".join(reversed(names))
+        return path
 
     @property
     def is_dir(self) -> bool:
         return self.kind is NodeKind.DIRECTORY
 
+    @override
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        assert isinstance(other, ScanNode)
+        return (self.name, self.kind, self.size_bytes, self.disk_usage, self.children) == (
+            other.name,
+            other.kind,
+            other.size_bytes,
+            other.disk_usage,
+            other.children,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"ScanNode(name={self.name!r}, kind={self.kind!r}, size_bytes={self.size_bytes!r}, "
+            f"disk_usage={self.disk_usage!r}, children={self.children!r})"
+        )
+
+
+class TreeNode(Protocol):
+    """Read-only node interface shared by ``ScanNode`` and ``PackedNode``.
+
+    Code that only reads a finished tree (insights, summaries, the TUI)
+    takes a ``TreeNode`` so that it runs on either representation.
+    """
+
+    @property
+    def path(self) -> str: ...
+    @property
+    def name(self) -> str: ...
+    @property
+    def kind(self) -> NodeKind: ...
+    @property
+    def size_bytes(self) -> int: ...
+    @property
+    def disk_usage(self) -> int: ...
+    @property
+    def children(self) -> Sequence[TreeNode]: ...
+    @property
+    def parent(self) -> TreeNode | None: ...
+    @property
+    def is_dir(self) -> bool: ...
+
 
 @dataclass(slots=True)
 class ScanStats:
     files: int = 0
     directories: int = 0
     access_errors: int = 0
+    # Entries left out by exclude patterns (an excluded directory counts once).
+    excluded: int = 0
+    # Extra links to files already counted; these add 0 bytes to the totals.
+    hardlinks: int = 0
 
 
 @dataclass(slots=True)
 class ScanOptions:
     max_depth: int | None = None
+    scheduler: ScanScheduler = ScanScheduler.FIFO
+    adaptive_workers: bool = False
+    # Do not descend into directories on a different device than the root.
+    one_file_system: bool = False
+    # Glob patterns (PatternRule syntax) or absolute paths to leave out.
+    exclude: tuple[str, ...] = ()
+    # Directories matching these patterns are summed without building
+    # nodes: each gets a single AGGREGATE child carrying the totals.
+    aggregate: tuple[str, ...] = ()
+    # Summarize directories below max_depth the same way; when False they
+    # are left empty (size 0).
+    aggregate_below_depth: bool = True
+    # Count every hard link to a file at full size instead of once per scan.
+    count_links: bool = False
+    # Store the result in a PackedTree (struct of arrays) instead of ScanNodes.
+    packed: bool = False
+    # Run compact_tree on the finished tree (children lists become tuples).
+    compact: bool = False
+    # Streaming top-K: as soon as a directory below the root is read, its
+    # files are folded into one AGGREGATE child, so only directories stay
+    # in the tree; the largest stream_top_files files are kept in
+    # ScanSnapshot.top_files.  0 keeps every file node.
+    stream_top_files: int = 0
+    # A directory with more entries to stat than this has its stat calls
+    # split into chunks of this size that idle workers help with (native
+    # Linux scanners only).  0 reads every directory in one worker.
+    split_dir_entries: int = 0
+    # Read each directory's listing in full, then stat it in inode-number
+    # order (native scanners only).  None turns it on when the root is on a
+    # rotational disk or a network filesystem (see prefers_inode_order).
+    inode_order: bool | None = None
+    # Concurrency limits per filesystem, as (key, workers) pairs: the key
+    # is a mount path or a device class ("network", "rotational", "local").
+    # When set, each mount point below the root gets its own task pool.
+    device_workers: tuple[tuple[str, int], ...] = ()
+    # Network mode: when the root is on a network filesystem, where every
+    # opendir/lstat waits for a round trip, run this many workers so that
+    # as many directory reads are in flight.  Each network mount below the
+    # root is limited to that many, every other mount to the normal worker
+    # count.  0 keeps the normal count everywhere.
+    network_workers: int = 0
+    # Seconds a worker may spend on one work item (reading a directory, or
+    # a subtree for the subtree scanners) before a watchdog gives up on it:
+    # the directory is left empty, listed in ScanSnapshot.timed_out, and a
+    # new worker takes over.  0 waits forever.
+    dir_timeout: float = 0.0
+    # I/O budget shared by all workers, in directory listings plus entries
+    # read per second (see _throttle.py); 0 is unlimited.
+    max_iops: int = 0
+    # IoClass.IDLE moves the worker threads to the idle I/O scheduling
+    # class and nice 19 (Linux).
+    io_class: IoClass = IoClass.NORMAL
+    # Budgets: once time_limit seconds have passed or max_entries entries
+    # were read, directories still queued are left unread (listed in
+    # ScanSnapshot.unscanned) and the tree scanned so far is returned.
+    # Checked between work items, and the root is always read.  0 is
+    # unlimited.
+    time_limit: float = 0.0
+    max_entries: int = 0
+    # When cancel_check fires, return the partial tree the same way instead
+    # of ScanErrorCode.CANCELLED.
+    partial_on_cancel: bool = False
+
+
+@dataclass(slots=True, frozen=True)
+class WorkerUsage:
+    """Worker concurrency of a finished scan (fixed unless *adaptive*)."""
+
+    initial: int
+    final: int
+    peak: int
+    low: int
+    high: int
+    adaptive: bool = False
+
+
+@dataclass(slots=True, frozen=True)
+class DeviceUsage:
+    """One filesystem's task pool in a scan with ScanOptions.device_workers.
+
+    *peak* is the largest number of its directories read at once, at most
+    *limit*.
+    """
+
+    mount: str
+    device_class: str
+    limit: int
+    directories: int = 0
+    peak: int = 0
+
+
+@dataclass(slots=True, frozen=True)
+class ThrottleUsage:
+    """Operations counted against ScanOptions.max_iops, and the time workers waited for budget."""
+
+    limit: int
+    operations: int
+    seconds: float
+    waited: float
+
+    @property
+    def rate(self) -> float:
+        """Effective operations per second over the scan."""
+        return self.operations / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass(slots=True, frozen=True)
+class PipelineUsage:
+    """Hand-off between the I/O and builder stages of a pipelined scan.
+
+    *mean_depth* and *peak_depth* are the number of read directories
+    waiting for a builder each time one was taken.  A deep hand-off queue
+    means the builders are the bottleneck; *builder_waits* (a builder found
+    nothing to take) and *io_waits* (an I/O thread found nothing to read)
+    count how often each stage sat idle.
+    """
+
+    io_threads: int
+    builders: int
+    batches: int = 0
+    mean_depth: float = 0.0
+    peak_depth: int = 0
+    builder_waits: int = 0
+    io_waits: int = 0
+
+    @property
+    def bottleneck(self) -> str:
+        """``"io"`` if builders waited for at least every other batch, else ``"builders"``."""
+        return "io" if self.builder_waits * 2 >= self.batches else "builders"
 
 
 @dataclass(slots=True, frozen=True)
 class ScanSnapshot:
-    root: ScanNode
+    # A ScanNode tree, or a PackedNode view with ScanOptions.packed.
+    root: TreeNode
     stats: ScanStats
+    workers: WorkerUsage | None = None
+    # Insight bundles keyed by directory path, precomputed for those
+    # subtrees by the scanner (see generate_insights).
+    subtree_insights: dict[str, InsightBundle] | None = None
+    # Mount points not entered because of ScanOptions.one_file_system.
+    skipped_mounts: tuple[str, ...] = ()
+    # Largest files, largest first, when the scan streamed them (see
+    # ScanOptions.stream_top_files); None when the tree holds every file.
+    top_files: tuple[ScanNode, ...] | None = None
+    # Stage metrics when a PipelinedScanner produced the snapshot.
+    pipeline: PipelineUsage | None = None
+    # Whether stats were issued in inode order (ScanOptions.inode_order,
+    # after auto-detection).
+    inode_order: bool = False
+    # Per-filesystem pools when ScanOptions.device_workers was set or
+    # network mode applied.
+    devices: tuple[DeviceUsage, ...] = ()
+    # Whether ScanOptions.network_workers applied (the root was remote).
+    network: bool = False
+    # Directories given up on after ScanOptions.dir_timeout, left empty.
+    timed_out: tuple[str, ...] = ()
+    # The I/O budget's figures when ScanOptions.max_iops was set.
+    throttle: ThrottleUsage | None = None
+    # Directories left unread because a budget ran out or the scan was
+    # interrupted (see ScanOptions.time_limit); they are empty in the tree,
+    # so every size above them is a lower bound.
+    unscanned: tuple[str, ...] = ()
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.unscanned)
 
 
 class ScanErrorCode(str, Enum):
@@ -42,10 +42,30 @@ def default_scanner(workers: int = 4) -> ThreadedScannerBase:
     return PythonScanner(workers=workers)
 
 
+def uring_scanner(workers: int = 4, queue_depth: int = 64) -> ThreadedScannerBase:
+    """Return the io_uring scanner, or the posix scanner if io_uring is unusable.
+
+    io_uring is missing on non-Linux builds and older kernels, and is often
+    blocked by container seccomp profiles, so availability is probed at runtime.
+    """
+    from dux._walker import scan_dir_nodes
+    from dux.scan.native_scanner import NativeScanner, UringScanner
+
+    try:
+        from dux._walker import scan_dir_uring_nodes, uring_available
+    except ImportError:
+        return NativeScanner(scan_dir_nodes, workers=workers)
+
+    if not uring_available():
+        return NativeScanner(scan_dir_nodes, workers=workers)
+    return UringScanner(scan_dir_uring_nodes, workers=workers, queue_depth=queue_depth)
+
+
 __all__ = [
     "PythonScanner",
     "Scanner",
     "ThreadedScannerBase",
     "default_scanner",
     "resolve_root",
+    "uring_scanner",
 ]
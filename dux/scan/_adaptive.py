@@ -0,0 +1,231 @@
+# Adaptive worker-count controller for ThreadedScannerBase.
+#
+# In auto mode the scan starts an upper-bound number of worker threads, but
+# only the first `active` of them take work; the rest park on a Condition.
+# A sampler thread measures entries/second and queue depth every interval
+# and hill-climbs `active` between the bounds:
+#
+#   * queue shorter than the active set  → workers are starved, shrink by one
+#   * throughput dropped after a move     → the move hurt, reverse direction
+#   * throughput improved after a move    → keep moving the same way
+#   * first sample / flat throughput      → grow first, then hold
+#
+# The upper bound is derived from the CPUs the process may actually use,
+# including cgroup CPU quotas (containers, systemd slices), so an
+# `auto` scan never oversubscribes a throttled container.
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from dux.models.scan import WorkerUsage
+
+# Scanner threads spend most of their time blocked in syscalls, so the pool
+# may exceed the CPU count; beyond this factor extra threads only contend.
+_THREADS_PER_CPU = 4
+_MAX_WORKERS = 64
+
+
+def _read_first_line(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="ascii").split("\n", 1)[0].strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _own_cgroups(proc_cgroup: str) -> dict[str, str]:
+    """Map each hierarchy's controller list to this process's cgroup in it.
+
+    Lines of ``/proc/self/cgroup`` read ``id:controllers:path``; the cgroup v2
+    hierarchy has an empty controller list.
+    """
+    groups: dict[str, str] = {}
+    try:
+        with open(proc_cgroup, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                _, sep, rest = line.rstrip("\n").partition(":")
+                controllers, sep2, path = rest.partition(":")
+                if sep and sep2:
+                    groups[controllers] = path
+    except OSError:
+        pass
+    return groups
+
+
+def _ancestors(base: Path, cgroup: str) -> list[Path]:
+    """*base*/*cgroup* and each of its parents up to *base*, deepest first."""
+    parts = [part for part in cgroup.split("/") if part]
+    return [base.joinpath(*parts[:depth]) for depth in range(len(parts), -1, -1)]
+
+
+def _v2_quota(directory: Path) -> float | None:
+    line = _read_first_line(directory / "cpu.max")
+    if line is None:
+        return None
+    quota, _, period = line.partition(" ")
+    if quota == "max":
+        return None
+    try:
+        return int(quota) / int(period or "100000")
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _v1_quota(directory: Path) -> float | None:
+    quota_line = _read_first_line(directory / "cpu.cfs_quota_us")
+    period_line = _read_first_line(directory / "cpu.cfs_period_us")
+    if quota_line is None or period_line is None:
+        return None
+    try:
+        quota_us, period_us = int(quota_line), int(period_line)
+    except ValueError:
+        return None
+    if quota_us <= 0 or period_us <= 0:
+        return None
+    return quota_us / period_us
+
+
+def cgroup_cpu_limit(root: str = "/sys/fs/cgroup", proc_cgroup: str = "/proc/self/cgroup") -> float | None:
+    """Return the cgroup CPU quota in CPUs, or None when unlimited/unknown.
+
+    The process's own cgroup is looked up in *proc_cgroup*, and ``cpu.max``
+    (cgroup v2) or ``cpu.cfs_quota_us`` / ``cpu.cfs_period_us`` (cgroup v1)
+    are read there and in every parent up to *root*: a quota set on an
+    enclosing slice limits everything below it, so the smallest one applies.
+    """
+    base = Path(root)
+    groups = _own_cgroups(proc_cgroup)
+    if (base / "cpu.max").exists() or (base / "cgroup.controllers").exists():
+        quotas = [_v2_quota(d) for d in _ancestors(base, groups.get("", "/"))]
+    else:
+        v1_group = next((path for names, path in groups.items() if "cpu" in names.split(",")), "/")
+        quotas = [
+            _v1_quota(d) for mount in (base / "cpu", base / "cpu,cpuacct", base) for d in _ancestors(mount, v1_group)
+        ]
+    limits = [quota for quota in quotas if quota is not None]
+    return min(limits) if limits else None
+
+
+def effective_cpu_count(cgroup_root: str = "/sys/fs/cgroup", proc_cgroup: str = "/proc/self/cgroup") -> int:
+    """CPUs this process may use: affinity mask capped by the cgroup quota."""
+    cpus = os.process_cpu_count() or 1
+    limit = cgroup_cpu_limit(cgroup_root, proc_cgroup)
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return cpus
+
+
+def adaptive_bounds(cpus: int | None = None) -> tuple[int, int]:
+    """Return ``(min_workers, max_workers)`` for auto mode."""
+    if cpus is None:
+        cpus = effective_cpu_count()
+    return 1, min(_MAX_WORKERS, max(2, cpus * _THREADS_PER_CPU))
+
+
+class WorkerController:
+    """Grows or shrinks the active worker set while a scan runs.
+
+    *entries* and *depth* are sampled each interval: the former returns the
+    running total of scanned entries, the latter the number of queued
+    directories.  Workers call ``admit(index)`` before taking a task.
+    """
+
+    INTERVAL = 0.1
+    # Relative throughput change treated as noise.
+    TOLERANCE = 0.05
+
+    def __init__(
+        self,
+        initial: int,
+        bounds: tuple[int, int],
+        entries: Callable[[], int],
+        depth: Callable[[], int],
+    ) -> None:
+        self.low, self.high = bounds
+        self.initial = min(self.high, max(self.low, initial))
+        self.active = self.initial
+        self.peak = self.initial
+        self._entries = entries
+        self._depth = depth
+        self._direction = 1
+        self._last_rate: float | None = None
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def decide(self, rate: float, depth: int) -> int:
+        """Return the next active worker count for one sample."""
+        active = self.active
+        step = max(1, active // 4)
+        last = self._last_rate
+        self._last_rate = rate
+        if depth < active:
+            self._direction = -1
+            target = active - 1
+        elif last is None:
+            self._direction = 1
+            target = active + step
+        elif rate < last * (1 - self.TOLERANCE):
+            self._direction = -self._direction
+            target = active + self._direction * step
+        elif rate > last * (1 + self.TOLERANCE):
+            target = active + self._direction * step
+        else:
+            target = active
+        return min(self.high, max(self.low, target))
+
+    def _set_active(self, count: int) -> None:
+        with self._cond:
+            self.active = count
+            self.peak = max(self.peak, count)
+            self._cond.notify_all()
+
+    def admit(self, index: int) -> bool:
+        """Block while worker *index* is parked; False once the scan ends."""
+        if index < self.active:
+            return True
+        with self._cond:
+            while index >= self.active and not self._stopped:
+                self._cond.wait()
+            return not self._stopped
+
+    def _run(self) -> None:
+        prev_entries = self._entries()
+        prev_time = time.perf_counter()
+        while True:
+            with self._cond:
+                if self._cond.wait_for(lambda: self._stopped, timeout=self.INTERVAL):
+                    return
+            now = time.perf_counter()
+            entries = self._entries()
+            rate = (entries - prev_entries) / max(now - prev_time, 1e-9)
+            prev_entries, prev_time = entries, now
+            target = self.decide(rate, self._depth())
+            if target != self.active:
+                self._set_active(target)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=0.3)
+
+    def usage(self) -> WorkerUsage:
+        return WorkerUsage(
+            initial=self.initial,
+            final=self.active,
+            peak=self.peak,
+            low=self.low,
+            high=self.high,
+            adaptive=True,
+        )
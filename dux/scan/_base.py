@@ -4,7 +4,8 @@
 #   ThreadedScannerBase uses the Template Method pattern: subclasses implement
 #   _scan_dir (read one directory, create ScanNode children), while the base
 #   class handles threading, work distribution, progress, cancellation, and
-#   tree finalization.
+#   tree finalization.  Subclasses that walk more than one directory per work
+#   item override _scan_tree instead, returning the unread frontier.
 #
 # Thread safety model:
 #   The scan tree is built concurrently, but each directory node is processed
@@ -15,24 +16,59 @@
 #
 # Lifecycle (scan method):
 #   1. Validate root path → create root ScanNode → enqueue it.
-#   2. Workers loop: dequeue a directory, call _scan_dir, enqueue child dirs.
+#   2. Workers loop: dequeue a directory, call _scan_tree (by default one
+#      _scan_dir call), enqueue the directories it returns.  Directories
+#      below max_depth or matching ScanOptions.aggregate are instead summed
+#      by _aggregate_tree and get a single AGGREGATE child with the totals.
+#      A file with more than one hard link is sized only at the first link
+#      reached; later ones get size 0 (see _repeat_link, count_links).
 #   3. When _outstanding hits 0, all dirs are scanned → workers exit.
-#   4. finalize_sizes aggregates child sizes bottom-up and sorts children.
+#      In auto mode (ScanOptions.adaptive_workers) a WorkerController
+#      parks and unparks workers meanwhile; see _adaptive.py.
+#      With ScanOptions.packed, each work item's entries are moved into a
+#      PackedTree as soon as it is done (see _pack_children).  With
+#      ScanOptions.stream_top_files, each work item's files first pass
+#      through a per-worker top-K heap and are folded into one AGGREGATE
+#      child per directory (see _stream_files).
+#      A scanner reading a directory with more than
+#      ScanOptions.split_dir_entries entries to stat can share the stat
+#      calls out in chunks: helper tasks wake idle workers, which stat
+#      chunks until none are left, and the reading worker builds the nodes
+#      in listing order once every chunk is done (see _stat_split).
+#      In network mode (ScanOptions.network_workers, root on a network
+#      filesystem) many small-stack workers run, each mount capped by a
+#      _DeviceQueue pool so that only network mounts see them all.
+#      With ScanOptions.dir_timeout a Watchdog gives up on directories a
+#      worker is stuck on (a hung mount) and starts a replacement worker.
+#      With ScanOptions.max_iops, workers charge what they read to a shared
+#      TokenBucket and wait out its debt before each task (see _throttle.py).
+#      Once a budget (ScanOptions.time_limit / max_entries) is spent, the
+#      directories still queued are drained unread and reported as
+#      ScanSnapshot.unscanned; the tree read so far is finalized as usual.
+#   4. finalize_sizes aggregates child sizes bottom-up and sorts children;
+#      with ScanOptions.compact, compact_tree then freezes the result.
 #   5. Return frozen ScanSnapshot wrapping the completed tree.
 
 from __future__ import annotations
 
 import collections
 import collections.abc
+import heapq
+import itertools
 import threading
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Protocol
 
 from result import Err, Ok
 
-from dux.models.enums import NodeKind
+from dux.models.enums import IoClass, NodeKind, ScanScheduler
+from dux.models.packed import PackedNode, PackedTree
 from dux.models.scan import (
     CancelCheck,
+    DeviceUsage,
+    PipelineUsage,
     ProgressCallback,
     ScanError,
     ScanErrorCode,
@@ -41,17 +77,155 @@ from dux.models.scan import (
     ScanResult,
     ScanSnapshot,
     ScanStats,
+    WorkerUsage,
 )
-from dux.services.fs import DEFAULT_FS, FileSystem
-from dux.services.tree import finalize_sizes
+from dux.scan._adaptive import WorkerController, adaptive_bounds
+from dux.scan._inodes import InodeSet
+from dux.scan._names import NameTable
+from dux.scan._throttle import TokenBucket, lower_thread_priority
+from dux.scan._watchdog import Lease, Watchdog
+from dux.services.devices import Mount, device_class, mount_of, mount_table, prefers_inode_order
+from dux.services.fs import DEFAULT_FS, FileSystem, StatResult
+from dux.services.patterns import PathRules, compile_path_rules, path_matches
+from dux.services.tree import LEAF_CHILDREN, aggregate_node, compact_tree, finalize_sizes
+
+# Streamed file: (disk_usage, path, size_bytes), ordered by disk usage.
+type _FileEntry = tuple[int, str, int]
 
 
 @dataclass(slots=True, frozen=True)
-class _Task:
-    """Work queue item: a directory node to scan and its depth in the tree."""
+class ScanContext:
+    """Per-scan settings handed to ``_scan_tree``.
+
+    *device* is the root's st_dev in one-file-system mode; *excludes* and
+    *aggregate* hold the compiled exclude and aggregate patterns, if any.
+    With *aggregate_below_depth*, directories below *max_depth* are still
+    queued, to be summarized rather than read.  *root* is the resolved
+    scan root; *network* is set when network mode applies to it (see
+    ScanOptions.network_workers).  *entries_left*, set when
+    ScanOptions.max_entries is, returns how many entries the scan may
+    still read.
+    """
+
+    root: str = ""
+    network: bool = False
+    max_depth: int | None = None
+    device: int | None = None
+    excludes: PathRules | None = None
+    aggregate: PathRules | None = None
+    aggregate_below_depth: bool = False
+    entries_left: collections.abc.Callable[[], int] | None = None
+
+    def aggregates(self, node: ScanNode, path: str, depth: int) -> bool:
+        """True if directory *node* at *path* and *depth* is summed instead of read."""
+        if self.aggregate_below_depth and self.max_depth is not None and depth > self.max_depth:
+            return True
+        # The scan root itself is always read.
+        return depth > 0 and self.aggregate is not None and path_matches(self.aggregate, path, node.name, True)
+
+
+@dataclass(slots=True)
+class SubtreeTotals:
+    """What ``_aggregate_tree`` found below a summarized directory."""
+
+    size_bytes: int = 0
+    disk_usage: int = 0
+    files: int = 0
+    directories: int = 0
+    access_errors: int = 0
+    excluded: int = 0
+    # Mount points not entered in one-file-system mode.
+    mounts: list[str] = field(default_factory=list)
+    # Repeat hard links found by a standalone walk (see _aggregate_shard);
+    # within a scan they are counted by the scan's InodeSet instead.
+    hardlinks: int = 0
+
+
+class _SplitDir:
+    """Stat work of one large directory, in chunks any worker can take.
+
+    *stat_range(start, stop)* stats entries ``start:stop`` of the listing
+    and returns the number of failures.  Chunks are taken in order, but
+    they may finish in any order; the listing keeps the entry order.
+    """
+
+    __slots__ = ("_active", "_chunks", "_finished", "_lock", "_stat_range", "errors")
+
+    def __init__(self, stat_range: collections.abc.Callable[[int, int], int], count: int, chunk: int) -> None:
+        self._stat_range = stat_range
+        self._chunks = collections.deque((start, min(start + chunk, count)) for start in range(0, count, chunk))
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._active = 0
+        self.errors = 0
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def help(self) -> None:
+        """Stat chunks until none are left to take."""
+        while True:
+            with self._lock:
+                if not self._chunks:
+                    return
+                start, stop = self._chunks.popleft()
+                self._active += 1
+            errors = 1
+            try:
+                errors = self._stat_range(start, stop)
+            finally:
+                with self._lock:
+                    self.errors += errors
+                    self._active -= 1
+                    if not self._active:
+                        self._finished.notify_all()
+
+    def wait(self) -> int:
+        """Help until every chunk is taken, then wait for the others; return the failures."""
+        self.help()
+        with self._finished:
+            while self._active:
+                self._finished.wait()
+        return self.errors
+
+
+@dataclass(slots=True, frozen=True)
+class Task:
+    """Work queue item: a directory node to scan, its path and its depth.
+
+    The path lives only as long as the task: nodes do not store it (see
+    ``ScanNode.path``).  A task with *split* set is a helper: it stats
+    chunks of a large directory another worker is reading.
+    """
 
     node: ScanNode
+    path: str
     depth: int
+    split: _SplitDir | None = None
+
+
+class TaskPort(Protocol):
+    """One worker's end of a task queue (see ``ThreadedScannerBase._make_queue``)."""
+
+    def put_many(self, tasks: collections.abc.Iterable[Task]) -> None: ...
+
+    def get(self) -> Task | None: ...
+
+    def task_done(self) -> None: ...
+
+
+class TaskQueue(Protocol):
+    """What ``scan`` needs from a task queue besides the worker ports."""
+
+    def put(self, task: Task) -> None: ...
+
+    def worker(self, index: int) -> TaskPort: ...
+
+    def pending(self) -> int: ...
+
+    def join(self) -> None: ...
+
+    def shutdown(self) -> None: ...
 
 
 class _WorkQueue:
@@ -66,7 +240,7 @@ class _WorkQueue:
     __slots__ = ("_deque", "_lock", "_not_empty", "_outstanding", "_done", "_shutdown")
 
     def __init__(self) -> None:
-        self._deque: collections.deque[_Task] = collections.deque()
+        self._deque: collections.deque[Task] = collections.deque()
         self._lock = threading.Lock()
         # Condition wraps _lock: `with self._not_empty` also acquires _lock.
         self._not_empty = threading.Condition(self._lock)
@@ -76,13 +250,13 @@ class _WorkQueue:
         self._done = threading.Event()
         self._shutdown = False
 
-    def put(self, task: _Task) -> None:
+    def put(self, task: Task) -> None:
         with self._lock:
             self._deque.append(task)
             self._outstanding += 1
             self._not_empty.notify(1)
 
-    def put_many(self, tasks: collections.abc.Iterable[_Task]) -> None:
+    def put_many(self, tasks: collections.abc.Iterable[Task]) -> None:
         with self._lock:
             # tasks is often a generator (can't len()), so measure the
             # deque before/after to count how many were added.
@@ -93,7 +267,7 @@ class _WorkQueue:
             if added:
                 self._not_empty.notify(added)
 
-    def get(self) -> _Task | None:
+    def get(self) -> Task | None:
         """Block until a task is available.  Returns None on shutdown (exit sentinel)."""
         with self._not_empty:
             while not self._deque:
@@ -116,6 +290,407 @@ class _WorkQueue:
             self._shutdown = True
             self._not_empty.notify_all()
 
+    def pending(self) -> int:
+        """Number of queued (not yet started) tasks; approximate, lock-free."""
+        return len(self._deque)
+
+    def worker(self, index: int) -> _WorkQueue:
+        """All workers share the single FIFO; see ``_WorkStealingQueue.worker``."""
+        return self
+
+
+class _StealingPort:
+    """One worker's view of a ``_WorkStealingQueue`` (same API as ``_WorkQueue``)."""
+
+    __slots__ = ("_index", "_q")
+
+    def __init__(self, q: _WorkStealingQueue, index: int) -> None:
+        self._q = q
+        self._index = index
+
+    def put_many(self, tasks: collections.abc.Iterable[Task]) -> None:
+        self._q.push_many(self._index, tasks)
+
+    def get(self) -> Task | None:
+        return self._q.get(self._index)
+
+    def task_done(self) -> None:
+        self._q.finish(self._index)
+
+
+class _WorkStealingQueue:
+    """Work-stealing scheduler: one deque per worker, no shared lock.
+
+    Owners push and pop at the right end of their own deque (LIFO), so each
+    worker descends depth-first into the subtree it just listed: the queue
+    stays small on wide trees and consecutive directories share dentry-cache
+    locality.  An idle worker steals from the left (FIFO) end of another
+    worker's deque, which holds the oldest and typically largest subtrees.
+    ``deque.append``/``pop``/``popleft`` are atomic, both under the GIL and in
+    free-threaded builds, so no lock is taken on the hot path.
+
+    Termination without a shared counter: each worker owns a ``busy`` flag,
+    raised *before* it looks for work and lowered after it has pushed the
+    children of its task, and an ``epoch`` bumped on every completed task.
+    A worker that finds nothing runs ``_all_idle``: epochs snapshot → all
+    deques empty → all workers idle → epochs unchanged.  A task can only be
+    in flight inside a busy worker or sitting in a deque, and any worker
+    that finished work during the check changed its epoch, so a clean pass
+    means the scan is complete.
+    """
+
+    # Idle workers poll with exponential backoff instead of blocking on a
+    # Condition; this caps wake-up latency at _MAX_BACKOFF.
+    _MIN_BACKOFF = 0.00001
+    _MAX_BACKOFF = 0.001
+
+    def __init__(self, workers: int) -> None:
+        n = max(1, workers)
+        self._deques: list[collections.deque[Task]] = [collections.deque() for _ in range(n)]
+        self._busy = [False] * n
+        self._epochs = [0] * n
+        self._done = threading.Event()
+        self._shutdown = False
+
+    def put(self, task: Task) -> None:
+        """Seed work before the workers start (lands on worker 0)."""
+        self._deques[0].append(task)
+
+    def worker(self, index: int) -> _StealingPort:
+        return _StealingPort(self, index)
+
+    def pending(self) -> int:
+        return sum(len(d) for d in self._deques)
+
+    def push_many(self, index: int, tasks: collections.abc.Iterable[Task]) -> None:
+        """Push *tasks* onto worker *index*'s own deque."""
+        self._deques[index].extend(tasks)
+
+    def finish(self, index: int) -> None:
+        """Mark worker *index*'s current task done and the worker idle."""
+        # Publish "produced something" before "idle" so a concurrent
+        # termination check that sees us idle also sees the epoch change.
+        self._epochs[index] += 1
+        self._busy[index] = False
+
+    def _take(self, index: int) -> Task | None:
+        try:
+            return self._deques[index].pop()
+        except IndexError:
+            pass
+        n = len(self._deques)
+        for offset in range(1, n):
+            try:
+                return self._deques[(index + offset) % n].popleft()
+            except IndexError:
+                continue
+        return None
+
+    def _all_idle(self) -> bool:
+        before = list(self._epochs)
+        if any(self._deques):
+            return False
+        if any(self._busy):
+            return False
+        return self._epochs == before
+
+    def get(self, index: int) -> Task | None:
+        """Pop from worker *index*'s deque or steal; None once the scan is complete."""
+        delay = self._MIN_BACKOFF
+        while True:
+            if self._shutdown or self._done.is_set():
+                return None
+            self._busy[index] = True
+            task = self._take(index)
+            if task is not None:
+                return task
+            self._busy[index] = False
+            if self._all_idle():
+                self._done.set()
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, self._MAX_BACKOFF)
+
+    def join(self) -> None:
+        self._done.wait()
+
+    def shutdown(self) -> None:
+        self._shutdown = True
+
+
+class _DevicePool:
+    """Tasks of one mount point in a ``_DeviceQueue`` and its concurrency limit."""
+
+    __slots__ = ("active", "device_class", "directories", "limit", "mount", "peak", "prefix", "tasks")
+
+    def __init__(self, mount: str, device_class: str, limit: int) -> None:
+        self.mount = mount
+        self.prefix = mount.rstrip("/") + "/"
+        self.device_class = device_class
+        self.limit = max(1, limit)
+        self.tasks: collections.deque[Task] = collections.deque()
+        self.active = 0
+        self.peak = 0
+        self.directories = 0
+
+    def usage(self) -> DeviceUsage:
+        return DeviceUsage(self.mount, self.device_class, self.limit, self.directories, self.peak)
+
+
+def _device_pools(root: str, limits: collections.abc.Iterable[tuple[str, int]], workers: int) -> list[_DevicePool]:
+    """One pool per mount point at or below *root*, longest mount path first.
+
+    A pool's limit comes from *limits* by mount path, else by device class
+    (see ``device_class``), else it is *workers*.  Without a mount table
+    (non-Linux) everything lands in a single pool for *root*.
+    """
+    by_key = dict(limits)
+    mounts: dict[str, Mount] = {}
+    for mount in mount_table():
+        # Of stacked mounts on one path, the last one is visible.
+        mounts[mount.path] = mount
+    prefix = root.rstrip("/") + "/"
+    owner = mount_of(root, mounts.values())
+    pools: list[_DevicePool] = []
+    for mount in mounts.values():
+        if mount is not owner and not mount.path.startswith(prefix):
+            continue
+        # Mounts above the root stand for the root itself.
+        path = root if mount is owner else mount.path
+        cls = device_class(mount)
+        pools.append(_DevicePool(path, cls, by_key.get(mount.path, by_key.get(cls, workers))))
+    if owner is None:
+        pools.append(_DevicePool(root, "local", by_key.get(root, by_key.get("local", workers))))
+    pools.sort(key=lambda pool: len(pool.mount), reverse=True)
+    return pools
+
+
+def _on_network(root: str) -> bool:
+    """True if *root* lies on a network filesystem (see ``device_class``)."""
+    mount = mount_of(root, mount_table())
+    return mount is not None and device_class(mount) == "network"
+
+
+# Stack size of network-mode worker threads.  Workers keep no deep
+# recursion, and a pool of a hundred threads with the default 8 MiB
+# stacks reserves close to a gigabyte of address space.
+_NETWORK_STACK_SIZE = 256 * 1024
+
+
+class _DevicePort:
+    """One worker's view of a ``_DeviceQueue``: remembers which pool its task came from."""
+
+    __slots__ = ("_pool", "_q")
+
+    def __init__(self, q: _DeviceQueue) -> None:
+        self._q = q
+        self._pool: _DevicePool | None = None
+
+    def put_many(self, tasks: collections.abc.Iterable[Task]) -> None:
+        self._q.put_many(tasks)
+
+    def get(self) -> Task | None:
+        item = self._q.get()
+        if item is None:
+            return None
+        self._pool, task = item
+        return task
+
+    def task_done(self) -> None:
+        self._q.task_done(self._pool)
+
+
+class _DeviceQueue:
+    """FIFO work queue with a separate concurrency limit per filesystem.
+
+    Each task is filed under the mount point its path lies on (the longest
+    matching pool).  A worker takes the oldest task of the next pool, in
+    round-robin order, that has fewer than its limit of tasks running, so
+    a slow device with all its slots busy leaves the remaining workers to
+    the others instead of collecting every worker in its ``lstat`` calls.
+    Completion is tracked with an outstanding-task count as in
+    ``_WorkQueue``.
+    """
+
+    __slots__ = ("_done", "_lock", "_next", "_outstanding", "_pools", "_queued", "_ready", "_shutdown")
+
+    def __init__(self, pools: list[_DevicePool]) -> None:
+        self._pools = pools
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._queued = 0
+        self._next = 0
+        self._done = threading.Event()
+        self._shutdown = False
+
+    def _pool(self, path: str) -> _DevicePool:
+        for pool in self._pools:
+            if path == pool.mount or path.startswith(pool.prefix):
+                return pool
+        return self._pools[-1]
+
+    def put(self, task: Task) -> None:
+        self.put_many((task,))
+
+    def put_many(self, tasks: collections.abc.Iterable[Task]) -> None:
+        with self._lock:
+            added = 0
+            for task in tasks:
+                self._pool(task.path).tasks.append(task)
+                added += 1
+            self._outstanding += added
+            self._queued += added
+            if added:
+                self._ready.notify(added)
+
+    def _take(self) -> tuple[_DevicePool, Task] | None:
+        pools = self._pools
+        n = len(pools)
+        for offset in range(n):
+            pool = pools[(self._next + offset) % n]
+            if pool.tasks and pool.active < pool.limit:
+                self._next = (self._next + offset + 1) % n
+                task = pool.tasks.popleft()
+                self._queued -= 1
+                pool.active += 1
+                pool.peak = max(pool.peak, pool.active)
+                if task.split is None:
+                    pool.directories += 1
+                return pool, task
+        return None
+
+    def get(self) -> tuple[_DevicePool, Task] | None:
+        """Block until some pool below its limit has a task.  Returns None on shutdown."""
+        with self._ready:
+            while True:
+                item = self._take()
+                if item is not None:
+                    return item
+                if self._shutdown:
+                    return None
+                self._ready.wait()
+
+    def task_done(self, pool: _DevicePool | None) -> None:
+        with self._lock:
+            if pool is not None:
+                pool.active -= 1
+                if pool.tasks:
+                    self._ready.notify()
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._done.set()
+
+    def worker(self, index: int) -> _DevicePort:
+        return _DevicePort(self)
+
+    def pending(self) -> int:
+        return self._queued
+
+    def join(self) -> None:
+        self._done.wait()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._shutdown = True
+            self._ready.notify_all()
+
+    def usage(self) -> tuple[DeviceUsage, ...]:
+        """Per-pool figures, largest first; pools that read nothing are left out."""
+        used = [pool.usage() for pool in self._pools if pool.directories]
+        return tuple(sorted(used, key=lambda u: u.directories, reverse=True))
+
+
+def _pack_children(
+    tree: PackedTree, index_of: dict[int, int], node: ScanNode, pending: list[tuple[ScanNode, int]]
+) -> None:
+    """Move everything read below work item *node* into *tree*.
+
+    *index_of* maps ``id()`` of each queued directory node to its index in
+    *tree*; the nodes in *pending* are added to it so that their children
+    can be attached when they are scanned.  *node*'s children and the
+    queued nodes' parent links are then dropped, so between work items
+    only queued directories exist as ScanNodes.
+    """
+    queued = {id(n) for n, _ in pending}
+    stack = [(node, index_of.pop(id(node)))]
+    while stack:
+        current, index = stack.pop()
+        children = current.children
+        for child, child_index in zip(children, tree.add_children(index, children)):
+            if child.children:
+                stack.append((child, child_index))
+            elif id(child) in queued:
+                index_of[id(child)] = child_index
+                child.parent = None
+        # Unlink top-down so that no parent/child cycle is left for the
+        # cyclic GC to find.
+        current.children = []
+
+
+def _detach(node: ScanNode) -> None:
+    """Put an empty directory of the same name in *node*'s place in its parent.
+
+    Used for a directory whose worker was abandoned by the watchdog: that
+    worker may still add children to *node* if its syscall ever returns,
+    and those must not reach the finished tree.
+    """
+    parent = node.parent
+    if parent is None:
+        return
+    children = parent.children
+    for i, child in enumerate(children):
+        if child is node:
+            children[i] = ScanNode(node.name, NodeKind.DIRECTORY, 0, 0, [], parent=parent)
+            return
+
+
+def _stream_files(node: ScanNode, path: str, heap: list[_FileEntry], limit: int, fold_top: bool) -> None:
+    """Push the files read below work item *node* into *heap*, then fold them.
+
+    *heap* is a min-heap of at most *limit* entries, so a file's path is
+    only built if it is among the largest seen so far.  The files of every
+    directory read in this work item are then replaced by one AGGREGATE
+    child carrying their totals, except those of *node* itself unless
+    *fold_top* (the scan root keeps its files).  Directories still queued
+    have no children yet and are folded when they are read.
+    """
+    file_kind = NodeKind.FILE
+    stack = [(node, path, fold_top)]
+    while stack:
+        current, current_path, fold = stack.pop()
+        prefix = current_path.rstrip("/") + "/"
+        kept: list[ScanNode] = []
+        size_bytes = disk_usage = files = 0
+        for child in current.children:
+            if child.kind is file_kind:
+                usage = child.disk_usage
+                if len(heap) < limit:
+                    heapq.heappush(heap, (usage, prefix + child.name, child.size_bytes))
+                elif usage > heap[0][0]:
+                    heapq.heapreplace(heap, (usage, prefix + child.name, child.size_bytes))
+                if fold:
+                    size_bytes += child.size_bytes
+                    disk_usage += usage
+                    files += 1
+                    continue
+            elif child.children:
+                stack.append((child, prefix + child.name, True))
+            kept.append(child)
+        if files:
+            kept.append(aggregate_node(current, size_bytes, disk_usage, files, 0))
+            current.children = kept
+
+
+def _path_below(node: ScanNode, top: ScanNode, top_path: str) -> str:
+    """Path of *node*, a descendant of *top*, built without caching it on the nodes."""
+    names: list[str] = []
+    while node is not top:
+        names.append(node.name)
+        node = node.parent  # type: ignore[assignment]  # descendants have parents
+    names.append(top_path.rstrip("/"))
+    return "/".join(reversed(names))
+
 
 def resolve_root(path: str, fs: FileSystem) -> str | ScanError:
     """Validate and resolve a scan root path.
@@ -156,16 +731,221 @@ class ThreadedScannerBase(ABC):
     reporting, cancellation, and tree finalization.
     """
 
+    # Scanners whose _scan_dir can stat a listing in inode order.
+    _supports_inode_order = False
+    # Whether network mode raises the worker count (PipelinedScanner
+    # raises its reader threads instead).
+    _network_threads = True
+
     def __init__(self, workers: int = 4, fs: FileSystem = DEFAULT_FS) -> None:
         self._workers = max(1, workers)
         self._fs = fs
+        # Inodes of multiply-linked files seen by the running scan; None
+        # counts every link.  Subclasses hand it to the C walker.
+        self._inodes: InodeSet | None = None
+        # Intern table for entry names during a scan (see NameTable).
+        self._names: NameTable | None = None
+        # ScanOptions.split_dir_entries of the running scan, and the queue
+        # port of the calling worker thread (for _stat_split).
+        self._split_entries = 0
+        self._worker = threading.local()
+        # ScanOptions.inode_order of the running scan, auto-detection applied.
+        self._inode_order = False
+        # The root's st_dev in one-file-system mode, None otherwise.  Subclasses
+        # hand it to the C walker, which compares it with each subdirectory's
+        # own stat.
+        self._root_dev: int | None = None
 
     @abstractmethod
     def _scan_dir(self, parent: ScanNode, path: str) -> tuple[list[ScanNode], int, int, int]:
         """Read a directory, create nodes, and append them to *parent*.children.
 
         Returns ``(dir_child_nodes, file_count, dir_count, error_count)``.
+        Subdirectories whose device differs from ``_root_dev`` (when set)
+        get a node and are counted, but are left out of *dir_child_nodes*.
+        """
+
+    def _scan_tree(
+        self, node: ScanNode, path: str, depth: int, ctx: ScanContext
+    ) -> tuple[list[tuple[ScanNode, int]], int, int, int, int, list[str]]:
+        """Scan the work item *node* (at *path* and *depth*) and return follow-up work.
+
+        Returns ``(pending, file_count, dir_count, error_count,
+        excluded_count, mounts)`` where *pending* holds ``(dir_node,
+        depth)`` pairs still to be scanned and *mounts* the paths of
+        subdirectories left unread because their device differs from
+        ``ctx.device``.  The default reads one directory via
+        ``_scan_dir``; scanners that can walk several levels per call
+        override this and return only the unread frontier.  Such scanners
+        must not enter mount points nor excluded directories.
+        """
+        dir_children, files, dirs, errs = self._scan_dir(node, path)
+        excluded = 0
+        if ctx.excludes is not None:
+            dir_children, dropped_files, dropped_dirs = self._prune_excluded(node, path, dir_children, ctx.excludes)
+            files -= dropped_files
+            dirs -= dropped_dirs
+            excluded = dropped_files + dropped_dirs
+        mounts: list[str] = []
+        if ctx.device is not None and dirs > len(dir_children):
+            queued = {id(n) for n in dir_children}
+            mounts = self._mount_paths(node, path, [n for n in node.children if n.is_dir and id(n) not in queued])
+        # Depth gate: the current directory is always scanned, but its
+        # subdirectories are only enqueued if we haven't hit max_depth
+        # (or if they are to be summarized).
+        if ctx.max_depth is not None and depth >= ctx.max_depth and not ctx.aggregate_below_depth:
+            return [], files, dirs, errs, excluded, mounts
+        next_depth = depth + 1
+        return [(n, next_depth) for n in dir_children], files, dirs, errs, excluded, mounts
+
+    @staticmethod
+    def _mount_paths(node: ScanNode, path: str, mounts: list[ScanNode]) -> list[str]:
+        """Paths of the mount points *mounts* found below work item *node* at *path*."""
+        return [_path_below(n, node, path) for n in mounts]
+
+    def _repeat_link(self, st: StatResult) -> bool:
+        """True if *st* is another link to a file this scan already counted."""
+        inodes = self._inodes
+        return inodes is not None and st.nlink > 1 and not st.is_dir and not inodes.add(st.dev, st.ino)
+
+    @staticmethod
+    def _prune_excluded(
+        parent: ScanNode, path: str, dir_children: list[ScanNode], excludes: PathRules
+    ) -> tuple[list[ScanNode], int, int]:
+        """Drop excluded entries from *parent*.children before they are queued.
+
+        *path* is *parent*'s path.  Returns ``(remaining_dir_children,
+        dropped_files, dropped_dirs)``.
+        """
+        kept: list[ScanNode] = []
+        dropped_files = dropped_dirs = 0
+        prefix = path.rstrip("/") + "/"
+        for child in parent.children:
+            if path_matches(excludes, prefix + child.name, child.name, child.is_dir):
+                if child.is_dir:
+                    dropped_dirs += 1
+                else:
+                    dropped_files += 1
+            else:
+                kept.append(child)
+        if not (dropped_files or dropped_dirs):
+            return dir_children, 0, 0
+        parent.children = kept
+        # From dir_children, not kept: mount points stay unqueued.
+        remaining = {id(n) for n in kept}
+        return [n for n in dir_children if id(n) in remaining], dropped_files, dropped_dirs
+
+    def _aggregate_tree(self, path: str, ctx: ScanContext) -> SubtreeTotals:
+        """Sum everything below *path* without building nodes.
+
+        Honors ``ctx.excludes`` and ``ctx.device`` like a full scan.  The
+        default walks the FileSystem; native scanners override this to do
+        the whole walk in C.
+        """
+        totals = SubtreeTotals()
+        excludes = ctx.excludes
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            try:
+                for entry in self._fs.scandir(current):
+                    st = entry.stat
+                    if st is None:
+                        totals.access_errors += 1
+                        continue
+                    if excludes is not None and path_matches(excludes, entry.path, entry.name, st.is_dir):
+                        totals.excluded += 1
+                        continue
+                    if not st.is_dir:
+                        totals.files += 1
+                        if not self._repeat_link(st):
+                            totals.size_bytes += st.size
+                            totals.disk_usage += st.disk_usage
+                        continue
+                    totals.directories += 1
+                    if ctx.device is not None and st.dev != ctx.device:
+                        totals.mounts.append(entry.path)
+                    else:
+                        stack.append(entry.path)
+            except OSError:
+                totals.access_errors += 1
+        return totals
+
+    def aggregate(self, path: str, ctx: ScanContext, inodes: InodeSet | None = None) -> SubtreeTotals:
+        """Sum everything below *path* outside of a scan, as ``_aggregate_tree`` does.
+
+        Multiply-linked files are counted once per *inodes*; None counts
+        every link.
         """
+        self._inodes = inodes
+        return self._aggregate_tree(path, ctx)
+
+    def _summarize(self, node: ScanNode, path: str, ctx: ScanContext) -> SubtreeTotals:
+        """Aggregate the subtree of *node* at *path* and attach the result as its only child."""
+        totals = self._aggregate_tree(path, ctx)
+        if totals.files or totals.directories:
+            node.children = [
+                aggregate_node(node, totals.size_bytes, totals.disk_usage, totals.files, totals.directories)
+            ]
+        return totals
+
+    def _stat_split(
+        self, node: ScanNode, path: str, count: int, stat_range: collections.abc.Callable[[int, int], int]
+    ) -> int:
+        """Stat the *count* entries of directory *node* with the help of idle workers.
+
+        Called from ``_scan_dir`` by scanners that list a directory before
+        stat'ing it, when more than ``split_dir_entries`` entries need a
+        stat.  The entries are cut into chunks of that size; one helper
+        task per further chunk (up to the worker count) is queued, and the
+        calling worker stats chunks too until all are done.  Returns the
+        number of failed stats.
+        """
+        split = _SplitDir(stat_range, count, max(1, self._split_entries))
+        port = getattr(self._worker, "port", None)
+        helpers = min(len(split) - 1, self._workers - 1)
+        if port is not None and helpers > 0:
+            port.put_many(Task(node, path, 0, split) for _ in range(helpers))
+        return split.wait()
+
+    def _make_queue(self, workers: int, options: ScanOptions, ctx: ScanContext) -> TaskQueue:
+        """Create the task queue for one scan with *workers* worker threads.
+
+        The default follows ``options.scheduler``, or is a ``_DeviceQueue``
+        when ``options.device_workers`` sets per-device limits or network
+        mode applies; scanners that feed their workers from elsewhere (see
+        ``PipelinedScanner``) return their own.
+        """
+        if ctx.network:
+            # All workers may wait on network mounts; the others keep the
+            # normal count.  Explicit device_workers limits come last and win.
+            limits = (("network", workers), *options.device_workers)
+            return _DeviceQueue(_device_pools(ctx.root, limits, self._workers))
+        if options.device_workers:
+            return _DeviceQueue(_device_pools(ctx.root, options.device_workers, workers))
+        if options.scheduler is ScanScheduler.WORK_STEALING:
+            return _WorkStealingQueue(workers)
+        return _WorkQueue()
+
+    def _pipeline_usage(self) -> PipelineUsage | None:
+        """Stage metrics of the last scan's queue, for scanners that have one."""
+        return None
+
+    def _resolve_inode_order(self, root: str, options: ScanOptions, root_dev: int | None) -> bool:
+        """Apply ScanOptions.inode_order, detecting the root's device when it is None."""
+        if not self._supports_inode_order:
+            return False
+        if options.inode_order is not None:
+            return options.inode_order
+        dev = root_dev if root_dev is not None else self._device(root)
+        return dev is not None and prefers_inode_order(dev)
+
+    def _device(self, path: str) -> int | None:
+        """Return the st_dev of *path*, or None if it cannot be stat'ed."""
+        try:
+            return self._fs.stat(path).dev
+        except OSError:
+            return None
 
     def scan(
         self,
@@ -181,18 +961,72 @@ class ThreadedScannerBase(ABC):
 
         root_name = resolved_root.rsplit("/", 1)[-1] or resolved_root
         root_node = ScanNode(
-            path=resolved_root,
             name=root_name,
             kind=NodeKind.DIRECTORY,
             size_bytes=0,
             disk_usage=0,
             children=[],
+            path=resolved_root,
         )
 
-        q = _WorkQueue()
-        q.put(_Task(root_node, 0))
+        # Network mode replaces auto mode: round trips, not CPUs, bound the
+        # scan, so the worker count is fixed at network_workers.
+        network = options.network_workers > 0 and _on_network(resolved_root)
+        network_threads = network and self._network_threads
+        adaptive = options.adaptive_workers and not network
+        # Auto mode starts the upper bound of threads up front and lets the
+        # controller decide how many of them may take work at a time.
+        if network_threads:
+            count = max(self._workers, options.network_workers)
+            bounds = (count, count)
+        elif adaptive:
+            bounds = adaptive_bounds()
+        else:
+            bounds = (self._workers, self._workers)
+        num_workers = bounds[1]
 
+        # One-file-system mode: subdirectories on another device than the
+        # root are told apart by the stat that lists them (see _scan_dir)
+        # and are never queued.
+        root_dev = self._device(resolved_root) if options.one_file_system else None
+        skipped_mounts: list[str] = []
         stats = ScanStats(files=0, directories=1, access_errors=0)
+        max_entries = options.max_entries
+
+        def _entries_left() -> int:
+            # Read without the lock, as in _out_of_budget below.
+            return max(0, max_entries - stats.files - stats.directories)
+
+        ctx = ScanContext(
+            root=resolved_root,
+            network=network,
+            max_depth=options.max_depth,
+            device=root_dev,
+            excludes=compile_path_rules(options.exclude),
+            aggregate=compile_path_rules(options.aggregate),
+            aggregate_below_depth=options.aggregate_below_depth,
+            entries_left=_entries_left if max_entries else None,
+        )
+        self._root_dev = root_dev
+
+        inodes = None if options.count_links else InodeSet()
+        self._inodes = inodes
+        self._names = NameTable()
+        self._split_entries = options.split_dir_entries
+        self._inode_order = self._resolve_inode_order(resolved_root, options, root_dev)
+
+        q = self._make_queue(num_workers, options, ctx)
+        q.put(Task(root_node, resolved_root, 0))
+
+        # Packed mode: ScanNodes only live until their work item is packed.
+        packed = PackedTree(resolved_root, root_name) if options.packed else None
+        packed_index: dict[int, int] = {id(root_node): 0}
+        packed_lock = threading.Lock()
+
+        # Streaming mode: one bounded file heap per worker, merged at the end.
+        stream_limit = options.stream_top_files
+        file_heaps: list[list[_FileEntry]] = [[] for _ in range(num_workers)]
+
         stats_lock = threading.Lock()
         cancelled = threading.Event()
 
@@ -207,6 +1041,26 @@ class ThreadedScannerBase(ABC):
                 return True
             return False
 
+        # Budgets (time_limit, max_entries): once one is spent, queued
+        # directories are no longer read but listed in unscanned, and the
+        # tree scanned so far is returned.  A partial_on_cancel cancellation
+        # ends the scan the same way.
+        deadline = time.monotonic() + options.time_limit if options.time_limit > 0 else None
+        budget_spent = threading.Event()
+        unscanned: list[str] = []
+
+        def _out_of_budget() -> bool:
+            if budget_spent.is_set():
+                return True
+            # stats is read without the lock: flushed once per directory,
+            # it is close enough for a budget.
+            if (deadline is not None and time.monotonic() >= deadline) or (
+                max_entries and stats.files + stats.directories >= max_entries
+            ):
+                budget_spent.set()
+                return True
+            return False
+
         def emit_progress(current_path: str, local_files: int, local_dirs: int) -> None:
             """Report approximate totals: flushed global stats + unflushed local counts."""
             if progress_callback is None:
@@ -216,76 +1070,201 @@ class ThreadedScannerBase(ABC):
                 d = stats.directories + local_dirs
             progress_callback(current_path, f, d)
 
-        def run_worker() -> None:
+        controller: WorkerController | None = None
+        if adaptive:
+            controller = WorkerController(
+                self._workers,
+                bounds,
+                entries=lambda: stats.files + stats.directories,
+                depth=q.pending,
+            )
+
+        # Hung-mount watchdog (see _watchdog.py): a directory a worker has
+        # held for longer than dir_timeout is left empty and listed in
+        # timed_out, and a new worker takes the stuck one's place.
+        timed_out: list[str] = []
+        abandoned: set[threading.Thread] = set()
+
+        def abandon(lease: Lease) -> None:
+            task = lease.task
+            timed_out.append(task.path)
+            if task.split is None:
+                _detach(task.node)
+                if packed is not None:
+                    with packed_lock:
+                        packed_index.pop(id(task.node), None)
+            abandoned.add(lease.thread)
+            lease.port.task_done()
+            replacement = threading.Thread(target=run_worker, args=(lease.index,), daemon=True)
+            threads.append(replacement)
+            replacement.start()
+
+        watchdog = Watchdog(options.dir_timeout, abandon) if options.dir_timeout > 0 else None
+
+        # Polite mode: a shared I/O budget, and idle priority for the workers.
+        bucket = TokenBucket(options.max_iops) if options.max_iops > 0 else None
+        idle = options.io_class is IoClass.IDLE
+
+        def _end(lease: Lease | None) -> bool:
+            """Release *lease*; False if the watchdog gave up on its task (the worker must exit)."""
+            return lease is None or watchdog is None or watchdog.end(lease)
+
+        def run_worker(index: int) -> None:
+            if idle:
+                lower_thread_priority()
+            port = q.worker(index)
+            self._worker.port = port
+            file_heap = file_heaps[index]
             # Workers batch stat updates locally and flush under the shared lock
             # once per directory (in the finally block).  This reduces lock
             # contention from once-per-file to once-per-directory.
             local_files = 0
             local_dirs = 0
             local_errors = 0
+            local_excluded = 0
 
             def _flush_local() -> None:
-                nonlocal local_files, local_dirs, local_errors
-                if local_files or local_dirs or local_errors:
+                nonlocal local_files, local_dirs, local_errors, local_excluded
+                if local_files or local_dirs or local_errors or local_excluded:
                     with stats_lock:
                         stats.files += local_files
                         stats.directories += local_dirs
                         stats.access_errors += local_errors
-                    local_files = local_dirs = local_errors = 0
+                        stats.excluded += local_excluded
+                    local_files = local_dirs = local_errors = local_excluded = 0
 
             while True:
-                task = q.get()
+                if controller is not None and not controller.admit(index):
+                    _flush_local()
+                    break
+                if bucket is not None:
+                    bucket.wait()
+                task = port.get()
                 if task is None:
                     _flush_local()
                     break
 
-                if _is_cancelled():
-                    q.task_done()
+                # With a dir_timeout the watchdog may complete the task in
+                # this thread's place while it is stuck in a syscall; once
+                # _end() says so, the thread exits without publishing.
+                lease = watchdog.begin(index, task, port) if watchdog is not None else None
+
+                if task.split is not None:
+                    # Helper task: the chunks are stat'ed even after a
+                    # cancellation, as the reading worker waits for them.
+                    try:
+                        task.split.help()
+                    finally:
+                        kept = _end(lease)
+                        if kept:
+                            port.task_done()
+                    if not kept:
+                        return
                     continue
 
+                if _is_cancelled() or (task.depth > 0 and _out_of_budget()):
+                    if not _end(lease):
+                        return
+                    # The node stays in the tree as an empty directory.
+                    unscanned.append(task.path)
+                    if packed is not None:
+                        with packed_lock:
+                            del packed_index[id(task.node)]
+                    port.task_done()
+                    continue
+
+                aggregated = ctx.aggregates(task.node, task.path, task.depth)
+                mounts: list[str] = []
+                try:
+                    if aggregated:
+                        totals = self._summarize(task.node, task.path, ctx)
+                        pending: list[tuple[ScanNode, int]] = []
+                        files, dirs = totals.files, totals.directories
+                        errs, excluded = totals.access_errors, totals.excluded
+                        mounts = totals.mounts
+                    else:
+                        pending, files, dirs, errs, excluded, mounts = self._scan_tree(
+                            task.node, task.path, task.depth, ctx
+                        )
+                except Exception:  # noqa: BLE001
+                    # Broad catch is intentional: _scan_dir may raise on
+                    # permission errors, broken symlinks, etc.  We count
+                    # the error and keep the worker alive for other dirs.
+                    pending, files, dirs, errs, excluded = [], 0, 0, 1, 0
+                if not _end(lease):
+                    return
+                if bucket is not None:
+                    # The listing itself, then one per entry read.
+                    bucket.charge(1 + files + dirs)
+
                 try:
-                    dir_children, files, dirs, errs = self._scan_dir(task.node, task.node.path)
+                    skipped_mounts.extend(mounts)
+                    if stream_limit and not aggregated:
+                        _stream_files(task.node, task.path, file_heap, stream_limit, task.depth > 0)
                     prev_total = local_files + local_dirs
                     local_files += files
                     local_dirs += dirs
                     local_errors += errs
+                    local_excluded += excluded
+
+                    # Paths first: packing detaches the queued nodes.
+                    tasks = [Task(n, _path_below(n, task.node, task.path), d) for n, d in pending]
+                    if packed is not None:
+                        # Before put_many: queued nodes must be indexed
+                        # before another worker can pick them up.
+                        with packed_lock:
+                            _pack_children(packed, packed_index, task.node, pending)
 
-                    # Depth gate: the current directory is always scanned, but its
-                    # subdirectories are only enqueued if we haven't hit max_depth.
-                    within_depth = options.max_depth is None or task.depth < options.max_depth
-                    if within_depth:
-                        next_depth = task.depth + 1
-                        q.put_many(_Task(n, next_depth) for n in dir_children)
+                    if tasks:
+                        port.put_many(tasks)
 
                     # Emit progress roughly every 100 items (integer division
                     # trick: fires when the count crosses a 100-boundary).
                     new_total = local_files + local_dirs
                     if new_total // 100 > prev_total // 100:
-                        emit_progress(task.node.path, local_files, local_dirs)
+                        emit_progress(task.path, local_files, local_dirs)
                 except Exception:  # noqa: BLE001
-                    # Broad catch is intentional: _scan_dir may raise on
-                    # permission errors, broken symlinks, etc.  We count
-                    # the error and keep the worker alive for other dirs.
                     local_errors += 1
                 finally:
                     _flush_local()
-                    q.task_done()
+                    port.task_done()
 
-        num_workers = self._workers
-        threads = [threading.Thread(target=run_worker, daemon=True) for _ in range(num_workers)]
-        for thread in threads:
-            thread.start()
+        threads = [threading.Thread(target=run_worker, args=(i,), daemon=True) for i in range(num_workers)]
+        if controller is not None:
+            controller.start()
+        # stack_size() is process-wide: threads started elsewhere meanwhile
+        # get the small stack too, which is ample for any of dux's threads.
+        saved_stack = threading.stack_size(_NETWORK_STACK_SIZE) if network_threads else None
+        try:
+            for thread in threads:
+                thread.start()
+        finally:
+            if saved_stack is not None:
+                threading.stack_size(saved_stack)
+        if watchdog is not None:
+            watchdog.start()
         # join() waits until all enqueued tasks are done.  Only then do we
         # call shutdown() to unblock workers stuck in get().  Reversing this
         # order would let workers exit before all tasks are processed.
         q.join()
+        if controller is not None:
+            controller.stop()
+        if watchdog is not None:
+            # Waits for an abandon() in progress, so threads is final below.
+            watchdog.stop()
         q.shutdown()
         for thread in threads:
+            if thread in abandoned:
+                # Still blocked in a syscall; it exits on its own if that
+                # ever returns.
+                continue
             # Defensive timeout — workers should already be exiting after
             # shutdown(); this prevents hanging if one gets stuck.
             thread.join(timeout=0.3)
+        # The per-scan tables are only needed while the workers run.
+        self._inodes = self._names = None
 
-        if cancelled.is_set():
+        if cancelled.is_set() and not options.partial_on_cancel:
             return Err(
                 ScanError(
                     code=ScanErrorCode.CANCELLED,
@@ -296,5 +1275,40 @@ class ThreadedScannerBase(ABC):
 
         # All workers are done.  Aggregate child sizes bottom-up and sort
         # children by disk_usage descending, then freeze into a snapshot.
-        finalize_sizes(root_node)
-        return Ok(ScanSnapshot(root=root_node, stats=stats))
+        root: ScanNode | PackedNode = root_node
+        if packed is not None:
+            packed.finalize()
+            root = packed.root()
+        else:
+            finalize_sizes(root_node)
+        if options.compact:
+            compact_tree(root)
+        if inodes is not None:
+            stats.hardlinks = inodes.duplicates
+        top_files: tuple[ScanNode, ...] | None = None
+        if stream_limit:
+            largest = heapq.nlargest(stream_limit, itertools.chain.from_iterable(file_heaps))
+            top_files = tuple(
+                ScanNode(path.rsplit("/", 1)[1], NodeKind.FILE, size_bytes, disk_usage, LEAF_CHILDREN, path=path)  # type: ignore[arg-type]
+                for disk_usage, path, size_bytes in largest
+            )
+        if controller is not None:
+            usage = controller.usage()
+        else:
+            usage = WorkerUsage(num_workers, num_workers, num_workers, num_workers, num_workers)
+        return Ok(
+            ScanSnapshot(
+                root=root,
+                stats=stats,
+                workers=usage,
+                skipped_mounts=tuple(sorted(skipped_mounts)),
+                top_files=top_files,
+                pipeline=self._pipeline_usage(),
+                inode_order=self._inode_order,
+                devices=q.usage() if isinstance(q, _DeviceQueue) else (),
+                network=network,
+                timed_out=tuple(sorted(set(timed_out))),
+                throttle=bucket.usage() if bucket is not None else None,
+                unscanned=tuple(sorted(unscanned)),
+            )
+        )
@@ -0,0 +1,42 @@
+"""Per-scan set of hard-linked inodes already counted.
+
+The C walker's ``InodeSet`` is used when the extension is built; the
+fallback below has the same interface for the Python scanner on builds
+without it.
+"""
+
+from __future__ import annotations
+
+import threading
+
+__all__ = ["InodeSet"]
+
+
+class _PyInodeSet:
+    """Thread-safe set of ``(st_dev, st_ino)`` pairs (pure-Python fallback)."""
+
+    __slots__ = ("_lock", "_seen", "duplicates")
+
+    def __init__(self) -> None:
+        self._seen: set[tuple[int, int]] = set()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def add(self, dev: int, ino: int, /) -> bool:
+        """Record an inode; False if it was already recorded."""
+        key = (dev, ino)
+        with self._lock:
+            if key in self._seen:
+                self.duplicates += 1
+                return False
+            self._seen.add(key)
+            return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+try:
+    from dux._walker import InodeSet
+except ImportError:
+    InodeSet = _PyInodeSet  # type: ignore[assignment,misc]
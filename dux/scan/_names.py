@@ -0,0 +1,61 @@
+"""Per-scan intern table for entry names.
+
+The C walker's ``NameTable`` is used when the extension is built; the
+fallback below has the same interface for the Python scanner on builds
+without it.
+"""
+
+from __future__ import annotations
+
+import threading
+
+__all__ = ["NameTable"]
+
+# Longer names rarely repeat; like the C table, only short ASCII names
+# are interned.
+_MAX_LEN = 64
+
+
+class _PyNameTable:
+    """Bounded, thread-safe, direct-mapped name table (pure-Python fallback)."""
+
+    __slots__ = ("_lock", "_mask", "_slots", "hits", "misses")
+
+    def __init__(self, capacity: int = 65536) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        size = 64
+        while size < capacity:
+            size *= 2
+        self._slots: list[str | None] = [None] * size
+        self._mask = size - 1
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._slots)
+
+    def intern(self, name: str, /) -> str:
+        """Return the table's str equal to *name*, storing *name* if there is none."""
+        if len(name) > _MAX_LEN or not name.isascii():
+            return name
+        index = hash(name) & self._mask
+        with self._lock:
+            current = self._slots[index]
+            if current is not None and current == name:
+                self.hits += 1
+                return current
+            self._slots[index] = name
+            self.misses += 1
+            return name
+
+    def __len__(self) -> int:
+        return sum(name is not None for name in self._slots)
+
+
+try:
+    from dux._walker import NameTable
+except ImportError:
+    NameTable = _PyNameTable  # type: ignore[assignment,misc]
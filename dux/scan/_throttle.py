@@ -0,0 +1,104 @@
+# I/O budget for ThreadedScannerBase (ScanOptions.max_iops / io_class).
+#
+# The native scanners issue a directory's getdents and stat calls inside
+# one C call, so operations cannot be metered one by one.  The budget is a
+# token bucket that goes into debt instead: a worker charges the listing
+# and entries of each work item once it has read them, and before taking
+# its next task waits until the bucket is out of debt.  All workers share
+# the bucket, so the scan as a whole averages at most max_iops operations
+# per second; a single directory larger than the burst is read at full
+# speed and paid for afterwards.
+#
+# The idle I/O class additionally moves each worker thread to the kernel's
+# idle I/O scheduling class (honoured by BFQ; mq-deadline and none ignore
+# it) and to the lowest CPU priority.
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable
+
+from dux.models.scan import ThrottleUsage
+
+# IOPRIO_CLASS_IDLE: only served when no other I/O is pending.
+_IOPRIO_CLASS_IDLE = 3
+_IDLE_NICE = 19
+
+try:
+    from dux._walker import set_io_priority
+except ImportError:
+    # Non-Linux builds and builds without the extension.
+    set_io_priority = None  # type: ignore[assignment]
+
+
+def lower_thread_priority() -> None:
+    """Move the calling thread to the idle I/O class and nice 19 (Linux; no-op elsewhere)."""
+    if set_io_priority is not None:
+        set_io_priority(_IOPRIO_CLASS_IDLE, 0)
+    try:
+        # On Linux a thread id is accepted as PRIO_PROCESS and affects that
+        # thread only.
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), _IDLE_NICE)
+    except (AttributeError, OSError):
+        pass
+
+
+class TokenBucket:
+    """Shared budget of *rate* operations per second, holding up to *burst* unused.
+
+    ``charge`` records operations already issued and may leave the bucket
+    in debt; ``wait`` blocks until it is not.  *clock* and *sleep* are
+    injectable for tests.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        # A tenth of a second's worth by default: enough to let a few small
+        # directories through back to back, small next to a scan's total.
+        self.burst = rate / 10 if burst is None else burst
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._last = clock()
+        self._started = self._last
+        self.operations = 0
+        self.waited = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def charge(self, count: int) -> None:
+        """Spend *count* tokens for operations already issued."""
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= count
+            self.operations += count
+
+    def wait(self) -> float:
+        """Sleep until the bucket is out of debt; returns the seconds slept."""
+        with self._lock:
+            self._refill(self._clock())
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            self._sleep(delay)
+            with self._lock:
+                self.waited += delay
+        return delay
+
+    def usage(self) -> ThrottleUsage:
+        return ThrottleUsage(
+            limit=int(self.rate),
+            operations=self.operations,
+            seconds=self._clock() - self._started,
+            waited=self.waited,
+        )
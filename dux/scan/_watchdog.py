@@ -0,0 +1,97 @@
+# Hung-directory watchdog for ThreadedScannerBase.
+#
+# A worker blocked in opendir/getdents/lstat on a stale NFS or FUSE mount
+# cannot be interrupted from Python, and the task it holds keeps the work
+# queue from ever draining, so the whole scan hangs with it.  With
+# ScanOptions.dir_timeout each worker takes a Lease before it handles a
+# task and ends it before it publishes anything (stats, child tasks, packed
+# entries).  A sampler thread expires leases older than the timeout and
+# hands each to the scan's *on_expire* callback, which completes the task
+# in the worker's place and starts a replacement worker.
+#
+# The stuck thread cannot be stopped, only left behind: once its call
+# returns, end() reports the lease as expired and the thread exits without
+# touching the scan.  The lock makes end() and expiry mutually exclusive,
+# so each task is completed exactly once.
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from dux.scan._base import Task, TaskPort
+
+
+class Lease:
+    """A worker's claim on one task, from ``Watchdog.begin`` to ``Watchdog.end``."""
+
+    __slots__ = ("expired", "index", "port", "started", "task", "thread")
+
+    def __init__(self, index: int, task: Task, port: TaskPort) -> None:
+        self.index = index
+        self.task = task
+        self.port = port
+        self.thread = threading.current_thread()
+        self.started = time.monotonic()
+        self.expired = False
+
+
+class Watchdog:
+    """Gives up on tasks that a worker has held for more than *timeout* seconds."""
+
+    # Longest wait between checks; shorter timeouts are checked 4x as often.
+    MAX_INTERVAL = 1.0
+
+    def __init__(self, timeout: float, on_expire: Callable[[Lease], None]) -> None:
+        self.timeout = timeout
+        self._on_expire = on_expire
+        self._interval = min(self.MAX_INTERVAL, timeout / 4)
+        self._leases: set[Lease] = set()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def begin(self, index: int, task: Task, port: TaskPort) -> Lease:
+        lease = Lease(index, task, port)
+        with self._cond:
+            self._leases.add(lease)
+        return lease
+
+    def end(self, lease: Lease) -> bool:
+        """Release *lease*; False if it expired, in which case the caller must exit."""
+        with self._cond:
+            if lease.expired:
+                return False
+            self._leases.discard(lease)
+            return True
+
+    def expire(self, now: float) -> list[Lease]:
+        """Mark every lease older than the timeout at *now* as expired and return them."""
+        with self._cond:
+            stale = [lease for lease in self._leases if now - lease.started > self.timeout]
+            for lease in stale:
+                lease.expired = True
+                self._leases.discard(lease)
+        return stale
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._cond.wait_for(lambda: self._stopped, timeout=self._interval):
+                    return
+            for lease in self.expire(time.monotonic()):
+                self._on_expire(lease)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
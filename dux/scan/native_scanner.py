@@ -1,36 +1,426 @@
 from __future__ import annotations
 
+import collections.abc
+import threading
 from collections.abc import Callable
 from typing import override
 
+from dux._walker import DirBatch, DirReader, InodeSet, NameTable, aggregate_subtree, build_batch_nodes, scan_dir_nodes
 from dux.models.enums import NodeKind
-from dux.models.scan import ScanNode
-from dux.scan._base import ThreadedScannerBase
+from dux.models.scan import PipelineUsage, ScanNode, ScanOptions
+from dux.scan._base import ScanContext, SubtreeTotals, Task, TaskQueue, ThreadedScannerBase
 from dux.services.tree import LEAF_CHILDREN
 
+try:
+    from dux._walker import list_dir, stat_batch
+except ImportError:  # getdents64 is Linux-only
+    list_dir = stat_batch = None
+
 # C extension calling convention:
-#   (path, parent_node, leaf_sentinel, kind_dir, kind_file, ScanNode_class)
+#   (path, parent_node, leaf_sentinel, kind_dir, kind_file, ScanNode_class, inodes, names, inode_order, dev)
 #   -> (dir_child_nodes, file_count, dir_count, error_count)
 type _ScanFn = Callable[
-    [str, ScanNode, tuple[()], NodeKind, NodeKind, type[ScanNode]],
+    [str, ScanNode, tuple[()], NodeKind, NodeKind, type[ScanNode], InodeSet | None, NameTable | None, bool, int],
     tuple[list[ScanNode], int, int, int],
 ]
 
+type _UringScanFn = Callable[
+    [str, ScanNode, tuple[()], NodeKind, NodeKind, type[ScanNode], int, InodeSet | None, NameTable | None, int],
+    tuple[list[ScanNode], int, int, int],
+]
+
+# (path, parent_node, leaf, kind_dir, kind_file, ScanNode_class, max_entries, max_depth, dev, skip_names,
+#  stop_names, inodes, names, inode_order, mounts) -> (frontier [(dir_node, relative_depth)], file_count, dir_count,
+#  error_count, skipped_count)
+type _SubtreeScanFn = Callable[
+    [
+        str,
+        ScanNode,
+        tuple[()],
+        NodeKind,
+        NodeKind,
+        type[ScanNode],
+        int,
+        int,
+        int,
+        tuple[str, ...],
+        tuple[str, ...],
+        InodeSet | None,
+        NameTable | None,
+        bool,
+        list[ScanNode] | None,
+    ],
+    tuple[list[tuple[ScanNode, int]], int, int, int, int],
+]
+
 
 _SCAN_FN_LABELS: dict[str, str] = {
     "scan_dir_nodes": "posix/readdir",
+    "scan_dir_at_nodes": "posix/openat",
+    "scan_dir_getdents_nodes": "linux/getdents64",
     "scan_dir_bulk_nodes": "macos/getattrlistbulk",
 }
 
 
-class NativeScanner(ThreadedScannerBase):
+def _dev_arg(dev: int | None) -> int:
+    """The C walker's form of a one-file-system device: -1 for none."""
+    return -1 if dev is None else dev
+
+
+class _NativeTotalsMixin(ThreadedScannerBase):
+    """Sums aggregated subtrees with the C walker instead of the FileSystem."""
+
+    _supports_inode_order = True
+
+    @override
+    def _aggregate_tree(self, path: str, ctx: ScanContext) -> SubtreeTotals:
+        excludes = ctx.excludes
+        if excludes is not None and not excludes.names_only:
+            return super()._aggregate_tree(path, ctx)
+        size, disk_usage, files, dirs, errs, excluded, mounts = aggregate_subtree(
+            path,
+            _dev_arg(ctx.device),
+            tuple(excludes.names) if excludes is not None else (),
+            self._inodes,
+            self._inode_order,
+        )
+        return SubtreeTotals(size, disk_usage, files, dirs, errs, excluded, mounts)
+
+
+class _SplitDirMixin(ThreadedScannerBase):
+    """Reads directories with ``list_dir`` when ScanOptions.split_dir_entries is set.
+
+    Directories with more entries to stat than that are stat'ed in chunks
+    by ``stat_batch`` on several workers (see ``_stat_split``).  With
+    *_stat_links*, symlinks and special files are stat'ed like regular
+    files, matching scan functions that lstat every entry.
+    """
+
+    _stat_links = True
+
+    def _scan_dir_split(self, parent: ScanNode, path: str) -> tuple[list[ScanNode], int, int, int] | None:
+        """Read *path* as ``_scan_dir`` does, or None if splitting is off or unavailable."""
+        stat = stat_batch
+        if not self._split_entries or list_dir is None or stat is None:
+            return None
+        inodes = self._inodes
+        batch = list_dir(
+            path, self._split_entries, self._stat_links, inodes, self._inode_order, _dev_arg(self._root_dev)
+        )
+        errs = 0
+        if batch.pending:
+            errs = self._stat_split(parent, path, len(batch), lambda start, stop: stat(batch, start, stop, inodes))
+        dir_children, files, dirs, list_errs = build_batch_nodes(
+            batch, parent, LEAF_CHILDREN, NodeKind.DIRECTORY, NodeKind.FILE, ScanNode, self._names
+        )
+        return dir_children, files, dirs, list_errs + errs
+
+
+class NativeScanner(_SplitDirMixin, _NativeTotalsMixin):
     """Threaded scanner delegating to a C extension scan function."""
 
     def __init__(self, scan_fn: _ScanFn, *, workers: int = 4) -> None:
         super().__init__(workers=workers)
         self._scan_fn = scan_fn
         self.label = _SCAN_FN_LABELS.get(getattr(scan_fn, "__name__", ""), "native")
+        # getdents64 trusts d_type and leaves symlinks unsized, as does list_dir.
+        self._stat_links = self.label != "linux/getdents64"
+
+    @override
+    def _scan_dir(self, parent: ScanNode, path: str) -> tuple[list[ScanNode], int, int, int]:
+        split = self._scan_dir_split(parent, path)
+        if split is not None:
+            return split
+        return self._scan_fn(
+            path,
+            parent,
+            LEAF_CHILDREN,
+            NodeKind.DIRECTORY,
+            NodeKind.FILE,
+            ScanNode,
+            self._inodes,
+            self._names,
+            self._inode_order,
+            _dev_arg(self._root_dev),
+        )
+
+
+class UringScanner(_SplitDirMixin, _NativeTotalsMixin):
+    """Threaded scanner submitting each directory's statx calls through io_uring.
+
+    Use ``dux.scan.uring_scanner`` to construct one: it falls back to the
+    posix scanner when the kernel refuses io_uring.  ScanOptions.inode_order
+    does not apply: the ring keeps a queue of statx calls in flight and the
+    block layer orders them.
+    """
+
+    _supports_inode_order = False
+
+    def __init__(self, scan_fn: _UringScanFn, *, workers: int = 4, queue_depth: int = 64) -> None:
+        super().__init__(workers=workers)
+        self._scan_fn = scan_fn
+        self._queue_depth = max(1, queue_depth)
+        self.label = f"linux/io_uring (depth {self._queue_depth})"
+        self._stat_links = False
+
+    @override
+    def _scan_dir(self, parent: ScanNode, path: str) -> tuple[list[ScanNode], int, int, int]:
+        split = self._scan_dir_split(parent, path)
+        if split is not None:
+            return split
+        return self._scan_fn(
+            path,
+            parent,
+            LEAF_CHILDREN,
+            NodeKind.DIRECTORY,
+            NodeKind.FILE,
+            ScanNode,
+            self._queue_depth,
+            self._inodes,
+            self._names,
+            _dev_arg(self._root_dev),
+        )
+
+
+class SubtreeScanner(_NativeTotalsMixin):
+    """Threaded scanner that walks a whole subtree in C per work item.
+
+    Each call reads directories breadth-first with the GIL released until
+    *entry_budget* entries are buffered or *depth_budget* levels below the
+    work item are read, then builds every node in one pass.  Only the unread
+    frontier goes back to the work queue, so small subtrees cost a single
+    call and only large ones are split across workers.
+    """
+
+    def __init__(
+        self,
+        scan_fn: _SubtreeScanFn,
+        *,
+        workers: int = 4,
+        entry_budget: int = 10_000,
+        depth_budget: int | None = None,
+    ) -> None:
+        super().__init__(workers=workers)
+        self._scan_fn = scan_fn
+        self._entry_budget = max(1, entry_budget)
+        self._depth_budget = depth_budget
+        self.label = "native/subtree"
+
+    @override
+    def _scan_dir(self, parent: ScanNode, path: str) -> tuple[list[ScanNode], int, int, int]:
+        frontier, files, dirs, errs, _ = self._scan_fn(
+            path,
+            parent,
+            LEAF_CHILDREN,
+            NodeKind.DIRECTORY,
+            NodeKind.FILE,
+            ScanNode,
+            self._entry_budget,
+            0,
+            _dev_arg(self._root_dev),
+            (),
+            (),
+            self._inodes,
+            self._names,
+            self._inode_order,
+            None,
+        )
+        return [node for node, _ in frontier], files, dirs, errs
+
+    @override
+    def _scan_tree(
+        self, node: ScanNode, path: str, depth: int, ctx: ScanContext
+    ) -> tuple[list[tuple[ScanNode, int]], int, int, int, int, list[str]]:
+        levels = -1 if self._depth_budget is None else max(0, self._depth_budget)
+        max_depth = ctx.max_depth
+        if max_depth is not None:
+            remaining = max(0, max_depth - depth)
+            levels = remaining if levels < 0 else min(levels, remaining)
+        # Plain-name excludes are applied by the C walker before stat, and
+        # plain-name aggregate directories are left unread in the frontier
+        # for the base class to summarize.  Any other pattern needs Python
+        # to see every directory before it is entered, so fall back to one
+        # level per call.
+        excludes = ctx.excludes
+        skip: tuple[str, ...] = ()
+        if excludes is not None:
+            if excludes.names_only:
+                skip = tuple(excludes.names)
+            else:
+                levels = 0
+        stop: tuple[str, ...] = ()
+        if ctx.aggregate is not None:
+            if ctx.aggregate.names_only:
+                stop = tuple(ctx.aggregate.names)
+            else:
+                levels = 0
+        # One call may cover the whole tree, so it must not read past the
+        # scan's max_entries; the base class only checks it between tasks.
+        budget = self._entry_budget
+        if ctx.entries_left is not None:
+            budget = max(1, min(budget, ctx.entries_left()))
+        mounts: list[ScanNode] = []
+        frontier, files, dirs, errs, excluded = self._scan_fn(
+            path,
+            node,
+            LEAF_CHILDREN,
+            NodeKind.DIRECTORY,
+            NodeKind.FILE,
+            ScanNode,
+            budget,
+            levels,
+            _dev_arg(ctx.device),
+            skip,
+            stop,
+            self._inodes,
+            self._names,
+            self._inode_order,
+            mounts,
+        )
+        if excludes is not None and not excludes.names_only:
+            kept, dropped_files, dropped_dirs = self._prune_excluded(node, path, [n for n, _ in frontier], excludes)
+            frontier = [(n, 1) for n in kept]
+            files -= dropped_files
+            dirs -= dropped_dirs
+            excluded += dropped_files + dropped_dirs
+            if mounts and dropped_dirs:
+                remaining = {id(n) for n in node.children}
+                mounts = [n for n in mounts if id(n) in remaining]
+        pending = [(child, depth + rel) for child, rel in frontier]
+        if max_depth is not None and not ctx.aggregate_below_depth:
+            pending = [(child, d) for child, d in pending if d <= max_depth]
+        return pending, files, dirs, errs, excluded, self._mount_paths(node, path, mounts)
+
+
+class _PipelineQueue:
+    """Task queue whose directories are read by a ``DirReader`` before a builder gets them.
+
+    ``put`` hands the task's path to the reader's C threads; ``get`` returns
+    the next task whose directory has been read and keeps its ``DirBatch``
+    for the calling builder (see ``batch``).  Tasks for which *read* is
+    false (directories to be summarized) pass through unread.  Every
+    builder shares this one queue; completion is tracked with an
+    outstanding-task count as in ``_WorkQueue``.
+    """
+
+    __slots__ = ("_done", "_local", "_lock", "_outstanding", "_read", "_reader")
+
+    def __init__(self, reader: DirReader, read: Callable[[Task], bool]) -> None:
+        self._reader = reader
+        self._read = read
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._done = threading.Event()
+        self._local = threading.local()
+
+    def put(self, task: Task) -> None:
+        with self._lock:
+            self._outstanding += 1
+        self._reader.submit(task.path, task, self._read(task))
+
+    def put_many(self, tasks: collections.abc.Iterable[Task]) -> None:
+        tasks = list(tasks)
+        with self._lock:
+            self._outstanding += len(tasks)
+        for task in tasks:
+            self._reader.submit(task.path, task, self._read(task))
+
+    def get(self) -> Task | None:
+        """Block until a read directory is ready.  Returns None on shutdown."""
+        item = self._reader.take()
+        if item is None:
+            return None
+        task, batch = item
+        self._local.batch = (task.node, batch)
+        return task
+
+    def batch(self, node: ScanNode) -> DirBatch | None:
+        """The entries read for *node*, if it is this builder's current task."""
+        current = getattr(self._local, "batch", None)
+        if current is None or current[0] is not node:
+            return None
+        self._local.batch = None
+        return current[1]
+
+    def task_done(self) -> None:
+        with self._lock:
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._done.set()
+
+    def join(self) -> None:
+        self._done.wait()
+
+    def shutdown(self) -> None:
+        self._reader.close()
+
+    def pending(self) -> int:
+        return self._reader.pending
+
+    def worker(self, index: int) -> _PipelineQueue:
+        return self
+
+    def usage(self, builders: int) -> PipelineUsage:
+        batches, depth_sum, peak, builder_waits, io_waits = self._reader.stats()
+        return PipelineUsage(
+            io_threads=self._reader.threads,
+            builders=builders,
+            batches=batches,
+            mean_depth=depth_sum / batches if batches else 0.0,
+            peak_depth=peak,
+            builder_waits=builder_waits,
+            io_waits=io_waits,
+        )
+
+
+class PipelinedScanner(_NativeTotalsMixin):
+    """Threaded scanner splitting directory reads from node construction.
+
+    *io_threads* C threads read directories (``getdents``/``readdir`` and
+    ``lstat``) without ever taking the GIL and hand the entries over as
+    ``DirBatch`` objects; *builders* Python worker threads turn each batch
+    into nodes and queue its subdirectories for reading.  With the GIL
+    enabled, this keeps the syscalls of many directories in flight while
+    node construction, the part that needs the GIL, runs in few threads.
+    ``ScanSnapshot.pipeline`` reports which stage waited on the other.
+    In network mode the reader pool grows to ``network_workers`` threads.
+    """
+
+    _network_threads = False
+
+    def __init__(self, *, io_threads: int = 4, builders: int = 1) -> None:
+        super().__init__(workers=builders)
+        self._io_threads = max(1, io_threads)
+        self._queue: _PipelineQueue | None = None
+        plural = "" if self._workers == 1 else "s"
+        self.label = f"native/pipeline ({self._io_threads} I/O, {self._workers} builder{plural})"
+
+    @override
+    def _make_queue(self, workers: int, options: ScanOptions, ctx: ScanContext) -> TaskQueue:
+        threads = max(self._io_threads, options.network_workers) if ctx.network else self._io_threads
+        reader = DirReader(threads, self._inodes, self._inode_order, _dev_arg(self._root_dev))
+        self._queue = _PipelineQueue(reader, lambda task: not ctx.aggregates(task.node, task.path, task.depth))
+        return self._queue
+
+    @override
+    def _pipeline_usage(self) -> PipelineUsage | None:
+        return self._queue.usage(self._workers) if self._queue is not None else None
 
     @override
     def _scan_dir(self, parent: ScanNode, path: str) -> tuple[list[ScanNode], int, int, int]:
-        return self._scan_fn(path, parent, LEAF_CHILDREN, NodeKind.DIRECTORY, NodeKind.FILE, ScanNode)
+        batch = self._queue.batch(parent) if self._queue is not None else None
+        if batch is None:
+            # Not reached through the queue: read it here.
+            return scan_dir_nodes(
+                path,
+                parent,
+                LEAF_CHILDREN,
+                NodeKind.DIRECTORY,
+                NodeKind.FILE,
+                ScanNode,
+                self._inodes,
+                self._names,
+                self._inode_order,
+                _dev_arg(self._root_dev),
+            )
+        return build_batch_nodes(batch, parent, LEAF_CHILDREN, NodeKind.DIRECTORY, NodeKind.FILE, ScanNode, self._names)
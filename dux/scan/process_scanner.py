@@ -0,0 +1,514 @@
+# Process-pool sharded scanner.
+#
+# On GIL-enabled CPython only the syscall half of a threaded scan runs in
+# parallel: ScanNode construction, finalize_sizes, and insight matching are
+# serialized on the GIL.  ProcessPoolScanner sidesteps that by sharding:
+#
+#   1. The parent lists the root (and, if that yields too few directories to
+#      keep the pool busy, one more level) with an in-process scanner.
+#   2. Each remaining directory becomes a shard.  A worker process scans it
+#      with its own threaded scanner, finalizes it, optionally runs insight
+#      matching on it, and returns a compact encoding of the subtree.
+#   3. The parent decodes each shard straight into the placeholder node as
+#      results arrive, then finalizes only the levels it listed itself.
+#
+# Directories the parent finds that are to be summarized (ScanOptions.aggregate
+# or below max_depth) are summed in a worker as well, and only their totals
+# come back.
+#
+# Shard encoding: a pre-order walk flattened into parallel arrays (sizes,
+# disk usage, child counts with -1 marking files) plus all names joined by
+# NUL, which cannot occur in a file name.  Nodes only hold names (see
+# ScanNode.path), so the pickle carries each name once and no per-node objects.
+# AGGREGATE leaves are marked with a child count of -2.
+#
+# With ScanOptions.packed the finished tree is copied into a PackedTree at
+# the end; shards and listings always build ScanNodes.
+#
+# Hard links are deduplicated within each shard and each listing, not across
+# them: a file linked from two shards is counted in both.
+#
+# Budgets (ScanOptions.time_limit / max_entries) are handed to the shards: each
+# shard stops at the shared deadline or its share of the entries, and shards
+# not yet started when the parent runs out are skipped and reported unscanned.
+
+from __future__ import annotations
+
+import multiprocessing
+import multiprocessing.context
+import sys
+import time
+from array import array
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Any, cast
+
+from result import Err, Ok
+
+from dux.config.schema import AppConfig
+from dux.models.enums import NodeKind
+from dux.models.insight import InsightBundle
+from dux.models.packed import PackedNode
+from dux.models.scan import (
+    CancelCheck,
+    ProgressCallback,
+    ScanError,
+    ScanErrorCode,
+    ScanNode,
+    ScanOptions,
+    ScanResult,
+    ScanSnapshot,
+    ScanStats,
+    TreeNode,
+)
+from dux.scan import ThreadedScannerBase, default_scanner
+from dux.scan._base import ScanContext, SubtreeTotals
+from dux.scan._inodes import InodeSet
+from dux.scan._names import NameTable
+from dux.services.fs import DEFAULT_FS
+from dux.services.patterns import compile_path_rules
+from dux.services.tree import LEAF_CHILDREN, aggregate_node, compact_tree, pack_tree
+
+type ScannerFactory = Callable[..., ThreadedScannerBase]
+
+_FILE_MARK = -1
+_AGGREGATE_MARK = -2
+
+# Aim for this many shards per process so a few huge subtrees don't leave
+# the rest of the pool idle at the end of the scan.
+_SHARDS_PER_PROCESS = 4
+# Levels below the root the parent may list itself to find enough shards.
+_MAX_EXPAND_DEPTH = 2
+# How often the parent polls cancel_check while shards are running.
+_POLL_INTERVAL = 0.1
+# Time limit for a shard that starts after the deadline: just its root.
+_MIN_TIME_LIMIT = 1e-3
+
+
+@dataclass(slots=True, frozen=True)
+class _Shard:
+    """Compact, picklable encoding of a finalized subtree (see module header)."""
+
+    names: str
+    sizes: array[int]
+    disk_usage: array[int]
+    child_counts: array[int]
+    files: int
+    directories: int
+    access_errors: int
+    excluded: int
+    hardlinks: int
+    insights: InsightBundle | None
+    skipped_mounts: tuple[str, ...]
+    timed_out: tuple[str, ...] = ()
+    unscanned: tuple[str, ...] = ()
+
+
+def _encode(
+    root: TreeNode,
+    stats: ScanStats,
+    insights: InsightBundle | None,
+    skipped_mounts: tuple[str, ...] = (),
+    timed_out: tuple[str, ...] = (),
+    unscanned: tuple[str, ...] = (),
+) -> _Shard:
+    names: list[str] = []
+    sizes: array[int] = array("q")
+    disk_usage: array[int] = array("q")
+    child_counts: array[int] = array("q")
+    stack: list[TreeNode] = [root]
+    while stack:
+        node = stack.pop()
+        names.append(node.name)
+        sizes.append(node.size_bytes)
+        disk_usage.append(node.disk_usage)
+        if node.is_dir:
+            child_counts.append(len(node.children))
+            stack.extend(reversed(node.children))
+        elif node.kind is NodeKind.AGGREGATE:
+            child_counts.append(_AGGREGATE_MARK)
+        else:
+            child_counts.append(_FILE_MARK)
+    return _Shard(
+        names="\0".join(names),
+        sizes=sizes,
+        disk_usage=disk_usage,
+        child_counts=child_counts,
+        # The shard root was already counted by the parent's listing.
+        files=stats.files,
+        directories=stats.directories - 1,
+        access_errors=stats.access_errors,
+        excluded=stats.excluded,
+        hardlinks=stats.hardlinks,
+        insights=insights,
+        skipped_mounts=skipped_mounts,
+        timed_out=timed_out,
+        unscanned=unscanned,
+    )
+
+
+def _decode_into(node: ScanNode, shard: _Shard, table: NameTable | None = None) -> None:
+    """Rebuild *shard* below the existing placeholder *node* (pre-order).
+
+    Names are interned through *table*, if given, so that names repeated
+    across shards share one str.
+    """
+    names = shard.names.split("\0")
+    if table is not None:
+        names = list(map(table.intern, names))
+    sizes = shard.sizes
+    disk_usage = shard.disk_usage
+    counts = shard.child_counts
+    node.size_bytes = sizes[0]
+    node.disk_usage = disk_usage[0]
+    directory = NodeKind.DIRECTORY
+    file = NodeKind.FILE
+    aggregate = NodeKind.AGGREGATE
+    # Open directories and how many children each still expects.
+    parents: list[ScanNode] = [node]
+    remaining: list[int] = [counts[0]]
+    for idx in range(1, len(names)):
+        while remaining[-1] == 0:
+            parents.pop()
+            remaining.pop()
+        remaining[-1] -= 1
+        parent = parents[-1]
+        name = names[idx]
+        count = counts[idx]
+        if count < 0:
+            kind = aggregate if count == _AGGREGATE_MARK else file
+            child = ScanNode(name, kind, sizes[idx], disk_usage[idx], LEAF_CHILDREN, parent)  # type: ignore[arg-type]
+        else:
+            child = ScanNode(name, directory, sizes[idx], disk_usage[idx], [], parent)
+            if count:
+                parents.append(child)
+                remaining.append(count)
+        parent.children.append(child)
+
+
+def _scan_shard(
+    path: str,
+    options: ScanOptions,
+    factory: ScannerFactory,
+    threads: int,
+    config: AppConfig | None,
+    deadline: float | None = None,
+) -> _Shard | ScanError:
+    """Worker-process entry point: scan, finalize, and match one subtree.
+
+    *deadline* is the parent's time budget on the monotonic clock, which
+    all processes share; a shard that starts late gets what is left of it.
+    """
+    if deadline is not None:
+        options = replace(options, time_limit=max(deadline - time.monotonic(), _MIN_TIME_LIMIT))
+    result = factory(workers=threads).scan(path, options)
+    if isinstance(result, Err):
+        return result.unwrap_err()
+    snapshot = result.unwrap()
+    insights = None
+    if config is not None:
+        from dux.services.insights import generate_insights
+
+        insights = generate_insights(snapshot.root, config)
+    return _encode(
+        snapshot.root, snapshot.stats, insights, snapshot.skipped_mounts, snapshot.timed_out, snapshot.unscanned
+    )
+
+
+def _aggregate_shard(
+    path: str, factory: ScannerFactory, device: int | None, exclude: tuple[str, ...], count_links: bool
+) -> SubtreeTotals:
+    """Worker-process entry point: sum one subtree without building nodes."""
+    ctx = ScanContext(device=device, excludes=compile_path_rules(exclude))
+    scanner = factory(workers=1)
+    inodes = None if count_links else InodeSet()
+    totals = scanner.aggregate(path, ctx, inodes)
+    if inodes is not None:
+        totals.hardlinks = inodes.duplicates
+    return totals
+
+
+def _listing_options(options: ScanOptions) -> ScanOptions:
+    """Options for the one-level listings the parent does itself."""
+    return ScanOptions(
+        max_depth=0,
+        scheduler=options.scheduler,
+        exclude=options.exclude,
+        aggregate_below_depth=False,
+        count_links=options.count_links,
+    )
+
+
+def _device(path: str) -> int | None:
+    try:
+        return DEFAULT_FS.stat(path).dev
+    except OSError:
+        return None
+
+
+def _terminate(pool: ProcessPoolExecutor) -> None:
+    """Drop queued shards and kill the running ones, without waiting for them."""
+    terminate_workers = getattr(pool, "terminate_workers", None)  # Python 3.14+
+    if terminate_workers is not None:
+        terminate_workers()
+        return
+    processes = getattr(pool, "_processes", None) or {}
+    for process in list(processes.values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    # The CLI scans from a background thread, and forking a multi-threaded
+    # process is unsafe, so never use the "fork" start method.
+    if sys.platform == "linux":
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+class ProcessPoolScanner:
+    """Scanner that shards the root's subtrees across worker processes.
+
+    *factory* builds the threaded scanner used in the parent and in each
+    worker (``factory(workers=threads)``; must be picklable, e.g. a module
+    level function or class).  When *config* is given, workers also run
+    insight matching and the snapshot carries ``subtree_insights`` for
+    ``generate_insights``.
+    """
+
+    def __init__(
+        self,
+        *,
+        processes: int | None = None,
+        threads: int = 2,
+        factory: ScannerFactory = default_scanner,
+        config: AppConfig | None = None,
+    ) -> None:
+        self._processes = max(1, processes or multiprocessing.cpu_count())
+        self._threads = max(1, threads)
+        self._factory = factory
+        self._config = config
+        self.label = f"process-pool ({self._processes} x {self._threads} threads)"
+
+    def _list(
+        self, scanner: ThreadedScannerBase, node: ScanNode, stats: ScanStats, options: ScanOptions
+    ) -> list[ScanNode]:
+        """List *node* one level deep in-process; return its subdirectories."""
+        result = scanner.scan(node.path, _listing_options(options))
+        if isinstance(result, Err):
+            stats.access_errors += 1
+            return []
+        listed = result.unwrap()
+        node.children = cast(ScanNode, listed.root).children  # listings are never packed
+        for child in node.children:
+            child.parent = node
+        stats.files += listed.stats.files
+        stats.directories += listed.stats.directories - 1
+        stats.access_errors += listed.stats.access_errors
+        stats.excluded += listed.stats.excluded
+        stats.hardlinks += listed.stats.hardlinks
+        return [child for child in node.children if child.is_dir]
+
+    def scan(
+        self,
+        path: str,
+        options: ScanOptions,
+        progress_callback: ProgressCallback | None = None,
+        cancel_check: CancelCheck | None = None,
+    ) -> ScanResult:
+        local = self._factory(workers=self._threads)
+        first = local.scan(path, _listing_options(options))
+        if isinstance(first, Err):
+            return first
+        listed = first.unwrap()
+        root = cast(ScanNode, listed.root)  # listings are never packed
+        stats = listed.stats
+        max_depth = options.max_depth
+
+        # One-file-system mode: directories the parent hands out or lists
+        # itself are checked here; shards check everything below them.
+        root_dev = _device(root.path) if options.one_file_system else None
+        skipped_mounts: list[str] = []
+        timed_out: list[str] = []
+        ctx = ScanContext(
+            max_depth=max_depth,
+            aggregate=compile_path_rules(options.aggregate),
+            aggregate_below_depth=options.aggregate_below_depth,
+        )
+        summarize: list[ScanNode] = []
+
+        def sort_out(nodes: list[tuple[ScanNode, int]]) -> list[tuple[ScanNode, int]]:
+            """Drop mount points and set aside directories to summarize."""
+            kept: list[tuple[ScanNode, int]] = []
+            for node, d in nodes:
+                if root_dev is not None:
+                    dev = _device(node.path)
+                    if dev is not None and dev != root_dev:
+                        skipped_mounts.append(node.path)
+                        continue
+                if ctx.aggregates(node, node.path, d):
+                    summarize.append(node)
+                else:
+                    kept.append((node, d))
+            return kept
+
+        # Expand breadth-first until there are enough shards for the pool.
+        # A directory at depth d is listed only if d <= max_depth.
+        expanded = [root]
+        frontier = sort_out([(child, 1) for child in root.children if child.is_dir])
+        depth = 1
+        while (
+            frontier
+            and len(frontier) < self._processes * _SHARDS_PER_PROCESS
+            and depth < _MAX_EXPAND_DEPTH
+            and (max_depth is None or depth < max_depth)
+        ):
+            next_frontier: list[tuple[ScanNode, int]] = []
+            for node, d in frontier:
+                expanded.append(node)
+                next_frontier.extend((child, d + 1) for child in self._list(local, node, stats, options))
+            frontier = sort_out(next_frontier)
+            depth += 1
+        if max_depth is not None:
+            frontier = [(node, d) for node, d in frontier if d <= max_depth]
+
+        subtree_insights: dict[str, InsightBundle] | None = {} if self._config is not None else None
+        names = NameTable()
+        cancelled = False
+        # Budgets: each shard gets the deadline and a share of the entries
+        # left after the listings; once either runs out here, shards that
+        # have not started are dropped and their roots reported unscanned.
+        unscanned: list[str] = []
+        deadline = time.monotonic() + options.time_limit if options.time_limit > 0 else None
+        shard_entries = 0
+        if options.max_entries and frontier:
+            left = max(options.max_entries - stats.files - stats.directories, len(frontier))
+            shard_entries = -(-left // len(frontier))
+
+        def out_of_budget() -> bool:
+            return (deadline is not None and time.monotonic() >= deadline) or bool(
+                options.max_entries and stats.files + stats.directories >= options.max_entries
+            )
+
+        if frontier or summarize:
+            # Not a with block: its exit would wait for every running shard,
+            # however long, after a cancellation.
+            pool = ProcessPoolExecutor(max_workers=self._processes, mp_context=_mp_context())
+            try:
+                # Future is invariant: shard and summary futures share Any.
+                futures: dict[Future[Any], ScanNode] = {}
+                for node, d in frontier:
+                    shard_options = ScanOptions(
+                        max_depth=None if max_depth is None else max_depth - d,
+                        scheduler=options.scheduler,
+                        adaptive_workers=options.adaptive_workers,
+                        one_file_system=options.one_file_system,
+                        exclude=options.exclude,
+                        aggregate=options.aggregate,
+                        aggregate_below_depth=options.aggregate_below_depth,
+                        count_links=options.count_links,
+                        split_dir_entries=options.split_dir_entries,
+                        inode_order=options.inode_order,
+                        device_workers=options.device_workers,
+                        network_workers=options.network_workers,
+                        dir_timeout=options.dir_timeout,
+                        # Up to _processes shards run at once; each gets
+                        # its share of the budget.
+                        max_iops=-(-options.max_iops // self._processes),
+                        io_class=options.io_class,
+                        max_entries=shard_entries,
+                    )
+                    future = pool.submit(
+                        _scan_shard, node.path, shard_options, self._factory, self._threads, self._config, deadline
+                    )
+                    futures[future] = node
+                for node in summarize:
+                    futures[
+                        pool.submit(
+                            _aggregate_shard, node.path, self._factory, root_dev, options.exclude, options.count_links
+                        )
+                    ] = node
+                pending = set(futures)
+                while pending:
+                    if cancel_check is not None and cancel_check():
+                        cancelled = True
+                        # Shards still running are stopped, not merged.
+                        unscanned.extend(futures[future].path for future in pending)
+                        break
+                    if out_of_budget():
+                        for future in list(pending):
+                            if future.cancel():
+                                pending.discard(future)
+                                unscanned.append(futures[future].path)
+                    done, pending = wait(pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        node = futures[future]
+                        shard: _Shard | ScanError | SubtreeTotals = future.result()
+                        if isinstance(shard, ScanError):
+                            stats.access_errors += 1
+                            continue
+                        if isinstance(shard, SubtreeTotals):
+                            # Arrives summed, like a shard: set the totals here.
+                            node.size_bytes = shard.size_bytes
+                            node.disk_usage = shard.disk_usage
+                            if shard.files or shard.directories:
+                                node.children = [
+                                    aggregate_node(
+                                        node, shard.size_bytes, shard.disk_usage, shard.files, shard.directories
+                                    )
+                                ]
+                            stats.files += shard.files
+                            stats.directories += shard.directories
+                            stats.access_errors += shard.access_errors
+                            stats.excluded += shard.excluded
+                            stats.hardlinks += shard.hardlinks
+                            skipped_mounts.extend(shard.mounts)
+                            continue
+                        _decode_into(node, shard, names)
+                        stats.files += shard.files
+                        stats.directories += shard.directories
+                        stats.access_errors += shard.access_errors
+                        stats.excluded += shard.excluded
+                        stats.hardlinks += shard.hardlinks
+                        skipped_mounts.extend(shard.skipped_mounts)
+                        timed_out.extend(shard.timed_out)
+                        unscanned.extend(shard.unscanned)
+                        if subtree_insights is not None and shard.insights is not None:
+                            subtree_insights[node.path] = shard.insights
+                        if progress_callback is not None:
+                            progress_callback(node.path, stats.files, stats.directories)
+            finally:
+                if cancelled:
+                    _terminate(pool)
+                else:
+                    pool.shutdown()
+
+        if cancelled and not options.partial_on_cancel:
+            return Err(
+                ScanError(
+                    code=ScanErrorCode.CANCELLED,
+                    path=root.path,
+                    message="Scan cancelled",
+                )
+            )
+
+        # Shards arrive finalized; only the levels listed here need summing.
+        for node in reversed(expanded):
+            node.size_bytes = sum(child.size_bytes for child in node.children)
+            node.disk_usage = sum(child.disk_usage for child in node.children)
+            node.children.sort(key=lambda x: x.disk_usage, reverse=True)
+
+        final: ScanNode | PackedNode = pack_tree(root).root() if options.packed else root
+        if options.compact:
+            compact_tree(final)
+        return Ok(
+            ScanSnapshot(
+                root=final,
+                stats=stats,
+                subtree_insights=subtree_insights,
+                skipped_mounts=tuple(sorted(skipped_mounts)),
+                timed_out=tuple(sorted(timed_out)),
+                unscanned=tuple(sorted(unscanned)),
+            )
+        )
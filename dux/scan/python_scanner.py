@@ -15,31 +15,36 @@ class PythonScanner(ThreadedScannerBase):
         errors = 0
         files = 0
         dirs = 0
+        names = self._names
+        root_dev = self._root_dev
         for entry in self._fs.scandir(path):
             st = entry.stat
             if st is None:
                 errors += 1
                 continue
+            name = entry.name if names is None else names.intern(entry.name)
             if st.is_dir:
                 node = ScanNode(
-                    path=entry.path,
-                    name=entry.name,
+                    name=name,
                     kind=NodeKind.DIRECTORY,
                     size_bytes=0,
                     disk_usage=0,
                     children=[],
+                    parent=parent,
                 )
                 parent.children.append(node)
-                dir_children.append(node)
+                if root_dev is None or st.dev == root_dev:
+                    dir_children.append(node)
                 dirs += 1
             else:
+                repeat = self._repeat_link(st)
                 node = ScanNode(
-                    path=entry.path,
-                    name=entry.name,
+                    name=name,
                     kind=NodeKind.FILE,
-                    size_bytes=st.size,
-                    disk_usage=st.disk_usage,
+                    size_bytes=0 if repeat else st.size,
+                    disk_usage=0 if repeat else st.disk_usage,
                     children=LEAF_CHILDREN,  # type: ignore[arg-type]  # immutable sentinel
+                    parent=parent,
                 )
                 parent.children.append(node)
                 files += 1
@@ -12,6 +12,11 @@ class StatResult:
     size: int
     is_dir: bool
     disk_usage: int = 0
+    # st_dev: identifies the filesystem, for --one-file-system.
+    dev: int = 0
+    # st_ino / st_nlink: hard links are counted once per scan.
+    ino: int = 0
+    nlink: int = 1
 
 
 @dataclass(slots=True, frozen=True)
@@ -53,6 +58,9 @@ class OsFileSystem:
             # st_blocks is always in 512-byte units (POSIX convention),
             # regardless of the filesystem's actual block size.
             disk_usage=st.st_blocks * 512,
+            dev=st.st_dev,
+            ino=st.st_ino,
+            nlink=st.st_nlink,
         )
 
     def scandir(self, path: str) -> Iterable[DirEntry]:
@@ -64,6 +72,9 @@ class OsFileSystem:
                         size=st.st_size,
                         is_dir=statmod.S_ISDIR(st.st_mode),
                         disk_usage=st.st_blocks * 512,
+                        dev=st.st_dev,
+                        ino=st.st_ino,
+                        nlink=st.st_nlink,
                     )
                 except OSError:
                     sr = None
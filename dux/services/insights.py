@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import heapq
+from collections.abc import Mapping
 from pathlib import Path
 
 from dux.config.schema import AppConfig, PatternRule
-from dux.models.enums import ApplyTo, InsightCategory
+from dux.models.enums import ApplyTo, InsightCategory, NodeKind
 from dux.models.insight import CategoryStats, Insight, InsightBundle
-from dux.models.scan import ScanNode
+from dux.models.scan import TreeNode
 from dux.services.patterns import CompiledRuleSet, compile_ruleset, match_all
 
 # Heap entry: (disk_usage, path, Insight).  Using disk usage as the key so the
@@ -38,7 +39,11 @@ def _heap_push(
         heapq.heapreplace(heap, entry)
 
 
-def generate_insights(root: ScanNode, config: AppConfig) -> InsightBundle:
+def generate_insights(
+    root: TreeNode,
+    config: AppConfig,
+    subtree_insights: Mapping[str, InsightBundle] | None = None,
+) -> InsightBundle:
     """Walk the scan tree and produce an InsightBundle.
 
     Pipeline:
@@ -49,6 +54,11 @@ def generate_insights(root: ScanNode, config: AppConfig) -> InsightBundle:
          bounded min-heaps (top-K by disk_usage) and unbounded aggregate
          counters (for overview totals in the TUI).
       4. Extract and deduplicate the heaps into a flat sorted list.
+
+    *subtree_insights* maps directory paths to bundles already generated
+    for those subtrees with the same *config* (e.g. by the worker processes
+    of ``ProcessPoolScanner``).  Such a directory is merged instead of
+    walked, unless an ancestor match prunes it as usual.
     """
     # --- build additional path rules ---
     additional_paths: list[tuple[str, PatternRule]] = []
@@ -91,9 +101,22 @@ def generate_insights(root: ScanNode, config: AppConfig) -> InsightBundle:
         cs.paths.add(insight.path)
         _heap_push(heaps[insight.category], seen[insight.category], insight, config.max_insights_per_category)
 
+    def _merge(bundle: InsightBundle) -> None:
+        # The subtree's heaps already hold its top-K per category, which is
+        # a superset of what it can contribute to the global top-K.
+        for insight in bundle.insights:
+            _heap_push(heaps[insight.category], seen[insight.category], insight, config.max_insights_per_category)
+        for cat, sub in bundle.by_category.items():
+            cs = by_category[cat]
+            cs.count += sub.count
+            cs.size_bytes += sub.size_bytes
+            cs.disk_usage += sub.disk_usage
+            cs.paths |= sub.paths
+
     # --- main traversal ---
     _TEMP = InsightCategory.TEMP
     _CACHE = InsightCategory.CACHE
+    _AGGREGATE = NodeKind.AGGREGATE
     # Using .value strings because rule.category.value is compared below
     # (avoids repeated attribute access in the hot loop).
     _temp_cache = {_TEMP.value, _CACHE.value}
@@ -103,14 +126,22 @@ def generate_insights(root: ScanNode, config: AppConfig) -> InsightBundle:
     #      or CACHE, because the parent's aggregate size already covers them.
     #   2. stop_recursion (via build_rule) — skips children of dirs like
     #      node_modules to avoid wasting time on uninteresting subtrees.
-    stack: list[tuple[ScanNode, bool]] = [(root, False)]
+    #
+    # Paths are built alongside the walk instead of read from node.path,
+    # which would make every ScanNode cache its path.
+    stack: list[tuple[TreeNode, str, bool]] = [(root, root.path, False)]
     while stack:
-        node, in_temp_or_cache = stack.pop()
+        node, path, in_temp_or_cache = stack.pop()
 
-        if in_temp_or_cache:
+        # Aggregate leaves are totals, not paths: nothing to match.
+        if in_temp_or_cache or node.kind is _AGGREGATE:
             continue
 
-        path = node.path
+        if subtree_insights is not None:
+            precomputed = subtree_insights.get(path)
+            if precomputed is not None:
+                _merge(precomputed)
+                continue
         basename = node.name
         is_dir = node.is_dir
 
@@ -124,7 +155,7 @@ def generate_insights(root: ScanNode, config: AppConfig) -> InsightBundle:
         local_in_temp_cache = False
         build_rule: PatternRule | None = None
         for rule in matched_rules:
-            _record(_insight_from_rule(node, rule))
+            _record(_insight_from_rule(node, path, rule))
             if rule.category.value in _temp_cache:
                 local_in_temp_cache = True
             if rule.stop_recursion:
@@ -135,8 +166,9 @@ def generate_insights(root: ScanNode, config: AppConfig) -> InsightBundle:
                 continue
             # Reverse before pushing onto the LIFO stack so children are
             # visited in their original order (largest disk_usage first).
+            prefix = path.rstrip("/") + "/"
             for child in reversed(node.children):
-                stack.append((child, local_in_temp_cache))
+                stack.append((child, prefix + child.name, local_in_temp_cache))
 
     # --- merge heaps into a single sorted list ---
     # Phase 2 of the lazy dedup strategy (see _heap_push): stale entries
@@ -161,9 +193,9 @@ def generate_insights(root: ScanNode, config: AppConfig) -> InsightBundle:
     )
 
 
-def _insight_from_rule(node: ScanNode, rule: PatternRule) -> Insight:
+def _insight_from_rule(node: TreeNode, path: str, rule: PatternRule) -> Insight:
     return Insight(
-        path=node.path,
+        path=path,
         size_bytes=node.size_bytes,
         category=rule.category,
         summary=rule.name,
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+
+from dux.models.packed import PackedNode
+from dux.models.scan import ScanNode
+
+
+@dataclass(slots=True, frozen=True)
+class MemoryReport:
+    """Bytes held by a finished scan tree, by kind of object.
+
+    Sizes are ``sys.getsizeof`` values, counting every shared object once.
+    *shared_name_bytes* is what the nodes sharing a name str (see
+    ``NameTable``) would add if each held its own copy.  For a packed tree
+    only *nodes* and *packed_bytes* are set.
+    """
+
+    nodes: int = 0
+    node_bytes: int = 0
+    names: int = 0
+    name_bytes: int = 0
+    shared_name_bytes: int = 0
+    # Children containers: lists while scanning, tuples after compact_tree.
+    children_bytes: int = 0
+    packed_bytes: int = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self.node_bytes + self.name_bytes + self.children_bytes + self.packed_bytes
+
+
+def memory_report(root: ScanNode | PackedNode) -> MemoryReport:
+    """Measure the tree under *root* (one pass over every node)."""
+    if isinstance(root, PackedNode):
+        return MemoryReport(nodes=len(root.tree), packed_bytes=root.tree.nbytes())
+    getsizeof = sys.getsizeof
+    nodes = node_bytes = name_bytes = shared_name_bytes = children_bytes = 0
+    seen_names: set[int] = set()
+    seen_children: set[int] = set()
+    stack: list[ScanNode] = [root]
+    while stack:
+        node = stack.pop()
+        nodes += 1
+        node_bytes += getsizeof(node)
+        name = node.name
+        if id(name) in seen_names:
+            shared_name_bytes += getsizeof(name)
+        else:
+            seen_names.add(id(name))
+            name_bytes += getsizeof(name)
+        children = node.children
+        if id(children) not in seen_children:
+            seen_children.add(id(children))
+            children_bytes += getsizeof(children)
+        stack.extend(children)
+    return MemoryReport(
+        nodes=nodes,
+        node_bytes=node_bytes,
+        names=len(seen_names),
+        name_bytes=name_bytes,
+        shared_name_bytes=shared_name_bytes,
+        children_bytes=children_bytes,
+    )
@@ -64,7 +64,7 @@ from fnmatch import fnmatch
 from dux._matcher import AhoCorasick
 
 from dux.config.schema import PatternRule
-from dux.models.enums import ApplyTo
+from dux.models.enums import ApplyTo, InsightCategory
 
 _FILE = ApplyTo.FILE
 _DIR = ApplyTo.DIR
@@ -346,3 +346,70 @@ def match_all(
                 _try(rule)
 
     return matched
+
+
+# ---------------------------------------------------------------------------
+# Scan-time path rules (exclude / aggregate)
+# ---------------------------------------------------------------------------
+
+
+@dataclass(slots=True, frozen=True)
+class PathRules:
+    """Compiled scan-time patterns (``--exclude``, aggregated subtrees).
+
+    *names* holds the lowercased basenames of patterns that are plain
+    names (``**/.snapshot``, ``.snapshot`` or ``**/node_modules/**``).
+    Native walkers can check those without calling back into Python;
+    *names_only* is True when no other kind of pattern is present, so
+    checking *names* alone is complete.
+    """
+
+    patterns: tuple[str, ...]
+    ruleset: CompiledRuleSet
+    names: frozenset[str]
+    names_only: bool
+
+
+def compile_path_rules(patterns: list[str] | tuple[str, ...]) -> PathRules | None:
+    """Compile scan-time patterns with the insight rule machinery.
+
+    Glob patterns follow the PatternRule syntax and apply to files and
+    directories alike.  Absolute paths without glob characters match that
+    exact path.  Returns None when there are no patterns.
+    """
+    if not patterns:
+        return None
+    rules: list[PatternRule] = []
+    additional: list[tuple[str, PatternRule]] = []
+    names: set[str] = set()
+    names_only = True
+    for pattern in patterns:
+        # Only whether a rule matches is used; the category just satisfies
+        # PatternRule and is never reported.
+        rule = PatternRule(pattern, pattern, InsightCategory.TEMP, ApplyTo.BOTH)
+        if pattern.startswith("/") and not _has_glob_chars(pattern):
+            additional.append((pattern.rstrip("/") or "/", rule))
+            names_only = False
+            continue
+        rules.append(rule)
+        for expanded in _expand_braces(pattern):
+            rest = expanded.removeprefix("**/")
+            if rest != expanded:
+                # "**/name/**" matches the name at any depth, but "name/**"
+                # is anchored and must go through the ruleset.
+                rest = rest.removesuffix("/**")
+            if rest and rest.isascii() and "/" not in rest and not _has_glob_chars(rest):
+                names.add(rest.lower())
+            else:
+                names_only = False
+    return PathRules(
+        patterns=tuple(patterns),
+        ruleset=compile_ruleset(rules, additional_paths=additional or None),
+        names=frozenset(names),
+        names_only=names_only,
+    )
+
+
+def path_matches(rules: PathRules, path: str, name: str, is_dir: bool) -> bool:
+    """Return True if the entry at *path* matches one of *rules*."""
+    return bool(match_all(rules.ruleset, path.lower(), name.lower(), is_dir, path))
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+
 from rich.console import Console
 from rich.markup import escape
 from rich.table import Table
 
 from dux.models.enums import InsightCategory, NodeKind
 from dux.models.insight import Insight, InsightBundle
-from dux.models.scan import ScanNode, ScanStats
+from dux.models.scan import ScanStats, TreeNode
 from dux.services.formatting import format_bytes, format_size_colored
 from dux.services.insights import filter_insights
 from dux.services.tree import top_nodes
@@ -56,13 +58,21 @@ def _insights_table(
 
 
 def _top_nodes_table(
-    title: str, root: ScanNode, top_n: int, kind: NodeKind, root_prefix: str, *, apparent_size: bool = False
+    title: str,
+    root: TreeNode,
+    top_n: int,
+    kind: NodeKind,
+    root_prefix: str,
+    *,
+    apparent_size: bool = False,
+    nodes: Sequence[TreeNode] | None = None,
 ) -> Table:
+    """Table of the *top_n* largest nodes of *kind*, or of *nodes* when the scan already picked them."""
     table = Table(title=title, header_style="bold yellow", box=None, show_lines=False)
     table.add_column("Path", ratio=3)
     _add_size_column(table, apparent_size)
     table.add_column("Disk", justify="right")
-    for node in top_nodes(root, top_n, kind):
+    for node in top_nodes(root, top_n, kind) if nodes is None else nodes[:top_n]:
         row: list[str] = [_format_path(node.path, kind, root_prefix)]
         _append_size(row, node.size_bytes, apparent_size)
         row.append(format_size_colored(node.disk_usage))
@@ -72,12 +82,24 @@ def _top_nodes_table(
 
 def render_summary(
     console: Console,
-    root: ScanNode,
+    root: TreeNode,
     stats: ScanStats,
     root_prefix: str,
     *,
     apparent_size: bool = False,
+    skipped_mounts: Sequence[str] = (),
+    unscanned: Sequence[str] = (),
 ) -> None:
+    """Print the top-level table and totals.
+
+    After a partial scan (*unscanned* directories, see ScanSnapshot.unscanned)
+    the total and every top-level entry containing an unscanned directory are
+    shown as lower bounds (``≥``).
+    """
+    # Top-level paths with an unscanned directory at or below them.
+    partial = {
+        root_prefix + path[len(root_prefix) :].split("/", 1)[0] for path in unscanned if path.startswith(root_prefix)
+    }
     table = Table(title="Top Level Summary", header_style="bold cyan", box=None, show_lines=False)
     table.add_column("Path", ratio=3)
     table.add_column("Type", justify="center")
@@ -89,27 +111,45 @@ def render_summary(
             _format_path(child.path, child.kind, root_prefix),
             "DIR" if child.kind is NodeKind.DIRECTORY else "FILE",
         ]
-        _append_size(row, child.size_bytes, apparent_size)
-        row.append(format_size_colored(child.disk_usage))
+        bound = "≥ " if child.path in partial else ""
+        if apparent_size:
+            row.append(bound + format_size_colored(child.size_bytes))
+        row.append(bound + format_size_colored(child.disk_usage))
         table.add_row(*row)
 
     table.add_section()
     total_row: list[str] = ["[bold]Total[/bold]", ""]
+    bound = "≥ " if unscanned else ""
     if apparent_size:
-        total_row.append(f"[bold]{format_bytes(root.size_bytes)}[/bold]")
-    total_row.append(f"[bold]{format_bytes(root.disk_usage)}[/bold]")
+        total_row.append(f"[bold]{bound}{format_bytes(root.size_bytes)}[/bold]")
+    total_row.append(f"[bold]{bound}{format_bytes(root.disk_usage)}[/bold]")
     table.add_row(*total_row)
     table.add_section()
     extra_cols = 1 + int(apparent_size)
     table.add_row(f"[bold]{stats.directories:,}[/bold] dirs", "", *[""] * extra_cols)
     table.add_row(f"[bold]{stats.files:,}[/bold] files", "", *[""] * extra_cols)
+    if stats.excluded:
+        table.add_row(f"[bold]{stats.excluded:,}[/bold] excluded", "", *[""] * extra_cols)
+    if stats.hardlinks:
+        table.add_row(f"[bold]{stats.hardlinks:,}[/bold] duplicate hard links", "", *[""] * extra_cols)
+    if skipped_mounts:
+        table.add_row(f"[bold]{len(skipped_mounts):,}[/bold] mount points skipped", "", *[""] * extra_cols)
+    if unscanned:
+        table.add_row(f"[bold]{len(unscanned):,}[/bold] directories not scanned", "", *[""] * extra_cols)
 
     console.print(table)
 
+    if skipped_mounts:
+        mounts = Table(title="Skipped Mount Points", header_style="bold yellow", box=None, show_lines=False)
+        mounts.add_column("Path", ratio=3)
+        for mount in skipped_mounts:
+            mounts.add_row(f"📁 [dim]{escape(mount)}[/]")
+        console.print(mounts)
+
 
 def render_focused_summary(
     console: Console,
-    root: ScanNode,
+    root: TreeNode,
     bundle: InsightBundle,
     top_n: int,
     root_prefix: str,
@@ -119,7 +159,13 @@ def render_focused_summary(
     top_dirs: bool = False,
     top_files: bool = False,
     apparent_size: bool = False,
+    largest_files: Sequence[TreeNode] | None = None,
 ) -> None:
+    """Print the tables selected by the ``top_*`` flags.
+
+    *largest_files* replaces the file search of *top_files* when the scan
+    streamed its files (see ``ScanSnapshot.top_files``).
+    """
     if top_temp:
         insights = filter_insights(bundle, {InsightCategory.TEMP, InsightCategory.BUILD_ARTIFACT})
         console.print(
@@ -143,5 +189,13 @@ def render_focused_summary(
         )
     if top_files:
         console.print(
-            _top_nodes_table("Largest Files", root, top_n, NodeKind.FILE, root_prefix, apparent_size=apparent_size)
+            _top_nodes_table(
+                "Largest Files",
+                root,
+                top_n,
+                NodeKind.FILE,
+                root_prefix,
+                apparent_size=apparent_size,
+                nodes=largest_files,
+            )
         )
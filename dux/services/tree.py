@@ -1,18 +1,35 @@
 from __future__ import annotations
 
 import heapq
+import itertools
 from collections.abc import Iterator
 
 from dux.models.enums import NodeKind
-from dux.models.scan import ScanNode
+from dux.models.packed import PackedNode, PackedTree
+from dux.models.scan import ScanNode, TreeNode
 
 # Shared empty tuple for file nodes — saves ~56 bytes per file vs a unique [].
 # Immutable: directory nodes get their own mutable list; file nodes share this.
 LEAF_CHILDREN: tuple[()] = ()
 
 
-def finalize_sizes(root: ScanNode) -> None:
+def aggregate_node(parent: ScanNode, size_bytes: int, disk_usage: int, files: int, dirs: int) -> ScanNode:
+    """Return the AGGREGATE leaf holding the summarized directory *parent*'s totals."""
+    return ScanNode(
+        name=f"[{files:,} files, {dirs:,} dirs]",
+        kind=NodeKind.AGGREGATE,
+        size_bytes=size_bytes,
+        disk_usage=disk_usage,
+        children=LEAF_CHILDREN,  # type: ignore[arg-type]  # immutable sentinel
+        parent=parent,
+    )
+
+
+def finalize_sizes(root: ScanNode | PackedNode) -> None:
     """Bottom-up pass: sum children sizes into directory nodes and sort by disk_usage."""
+    if isinstance(root, PackedNode):
+        root.tree.finalize()
+        return
     # Two-pass iterative approach (avoids recursion on deep trees):
     #   Pass 1: DFS collects directory nodes in pre-order into `stack`.
     #   Pass 2: reversed(stack) gives post-order (leaves before parents),
@@ -31,19 +48,55 @@ def finalize_sizes(root: ScanNode) -> None:
         node.children.sort(key=lambda x: x.disk_usage, reverse=True)
 
 
-def iter_nodes(root: ScanNode) -> Iterator[ScanNode]:
+def compact_tree(root: ScanNode | PackedNode) -> None:
+    """Shrink a finalized tree to what reading it needs.
+
+    Children lists become tuples: a tuple is smaller than a list and has no
+    spare capacity, and empty directories share the empty tuple.  A packed
+    tree copies its arrays to drop their growth slack.  The tree must not be
+    modified afterwards.
+    """
+    if isinstance(root, PackedNode):
+        root.tree.compact()
+        return
+    stack: list[ScanNode] = [root]
+    while stack:
+        node = stack.pop()
+        children = node.children
+        if not children:
+            node.children = LEAF_CHILDREN  # type: ignore[assignment]  # immutable sentinel
+            continue
+        node.children = tuple(children)  # type: ignore[assignment]  # frozen after compaction
+        stack.extend(child for child in children if child.is_dir)
+
+
+def pack_tree(root: ScanNode) -> PackedTree:
+    """Copy the ScanNode tree under *root* into a finalized PackedTree."""
+    tree = PackedTree(root.path, root.name)
+    stack = [(root, 0)]
+    while stack:
+        node, index = stack.pop()
+        for child, child_index in zip(node.children, tree.add_children(index, node.children)):
+            if child.children:
+                stack.append((child, child_index))
+    tree.finalize()
+    return tree
+
+
+def iter_nodes(root: TreeNode) -> Iterator[TreeNode]:
     """Iterate all nodes in the tree rooted at *root* (depth-first)."""
-    stack = [root]
+    stack: list[TreeNode] = [root]
     while stack:
         node = stack.pop()
         yield node
         stack.extend(node.children)
 
 
-def top_nodes(root: ScanNode, n: int, kind: NodeKind | None = None) -> list[ScanNode]:
+def top_nodes(root: TreeNode, n: int, kind: NodeKind | None = None) -> list[TreeNode]:
     """Return the *n* largest nodes, excluding *root*.
 
     When *kind* is given, only nodes of that kind are considered.
     """
-    items = (node for node in iter_nodes(root) if node.path != root.path and (kind is None or node.kind is kind))
+    # iter_nodes yields root first.
+    items = (node for node in itertools.islice(iter_nodes(root), 1, None) if kind is None or node.kind is kind)
     return heapq.nlargest(n, items, key=lambda node: node.disk_usage)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import shlex
 import subprocess
 import sys
+from collections.abc import Sequence
 from dataclasses import dataclass
 from typing import Callable, override
 
@@ -17,7 +18,7 @@ from textual.widgets import DataTable, Input, Static
 from dux.config.schema import AppConfig
 from dux.models.enums import InsightCategory, NodeKind
 from dux.models.insight import CategoryStats, Insight, InsightBundle
-from dux.models.scan import ScanNode, ScanStats
+from dux.models.scan import ScanStats, TreeNode
 from dux.services.formatting import format_bytes, format_size_colored, relative_bar
 from dux.services.tree import top_nodes
 
@@ -41,6 +42,8 @@ class DisplayRow:
     type_label: str = ""
     category: str | None = None
     disk_usage: int = 0
+    # The tree node shown by this row, if any (browse and top-N views).
+    node: TreeNode | None = None
 
 
 _PAGED_VIEWS = {"temp", "large_dir", "large_file"}
@@ -230,12 +233,13 @@ class DuxApp(App[None]):
 
     def __init__(
         self,
-        root: ScanNode,
+        root: TreeNode,
         stats: ScanStats,
         bundle: InsightBundle,
         config: AppConfig,
         initial_view: str = "overview",
         apparent_size: bool = False,
+        unscanned: Sequence[str] = (),
     ) -> None:
         super().__init__()
         self.root = root
@@ -243,6 +247,8 @@ class DuxApp(App[None]):
         self.bundle = bundle
         self.config = config
         self._apparent_size = apparent_size
+        # Directories a partial scan left unread (ScanSnapshot.unscanned).
+        self._unscanned = frozenset(unscanned)
         self.current_view = initial_view if initial_view in TABS else "overview"
 
         self._page_size = config.page_size
@@ -251,11 +257,7 @@ class DuxApp(App[None]):
         self._top_n_limit = config.max_insights_per_category
         self._root_prefix = root.path.rstrip("/") + "/"
 
-        self.node_by_path: dict[str, ScanNode] = {}
-        self.parent_by_path: dict[str, str] = {}
-        self._index_tree(self.root)
-
-        self.browse_root_path = self.root.path
+        self.browse_root: TreeNode = self.root
         self.expanded: set[str] = {self.root.path}
 
         self.rows: list[DisplayRow] = []
@@ -270,16 +272,6 @@ class DuxApp(App[None]):
             return absolute_path[len(self._root_prefix) :]
         return absolute_path
 
-    def _index_tree(self, root: ScanNode) -> None:
-        stack: list[tuple[ScanNode, str | None]] = [(root, None)]
-        while stack:
-            node, parent = stack.pop()
-            self.node_by_path[node.path] = node
-            if parent is not None:
-                self.parent_by_path[node.path] = parent
-            for child in node.children:
-                stack.append((child, node.path))
-
     @override
     def compose(self) -> ComposeResult:
         yield Container(
@@ -554,10 +546,13 @@ class DuxApp(App[None]):
         build_sz = self._category_size_bytes(InsightCategory.BUILD_ARTIFACT)
         build_du = self._category_disk_usage(InsightCategory.BUILD_ARTIFACT)
 
+        total = f"Total Disk: {format_bytes(self.root.disk_usage)}"
+        if self._unscanned:
+            total = f"Total Disk: ≥ {format_bytes(self.root.disk_usage)} (partial scan)"
         rows: list[DisplayRow] = [
             DisplayRow(
                 path="",
-                name=f"Total Disk: {format_bytes(self.root.disk_usage)}",
+                name=total,
                 size_bytes=self.root.size_bytes,
                 disk_usage=self.root.disk_usage,
             ),
@@ -596,6 +591,9 @@ class DuxApp(App[None]):
             ),
         ]
 
+        if self._unscanned:
+            rows.insert(3, DisplayRow(path="", name=f"Not scanned: {len(self._unscanned):,} directories", size_bytes=0))
+
         top_dirs = top_nodes(self.root, self._overview_top, NodeKind.DIRECTORY)
         for node in top_dirs:
             display_path = self._relative_path(node.path)
@@ -607,19 +605,23 @@ class DuxApp(App[None]):
                     name=name_styled,
                     size_bytes=node.size_bytes,
                     disk_usage=node.disk_usage,
+                    node=node,
                 )
             )
         return rows
 
     def _browse_rows(self) -> list[DisplayRow]:
-        browse_root = self.node_by_path.get(self.browse_root_path, self.root)
         rows: list[DisplayRow] = []
-        stack: list[tuple[ScanNode, int]] = [(browse_root, 0)]
+        stack: list[tuple[TreeNode, int]] = [(self.browse_root, 0)]
         while stack:
             node, depth = stack.pop()
             if node.kind is NodeKind.DIRECTORY:
                 marker = "▼" if node.path in self.expanded else "▶"
                 label = Text("  " * depth) + Text(f"{marker} ", style="bold yellow") + Text(node.name, style="bold blue")
+                if node.path in self._unscanned:
+                    label += Text(" (not scanned)", style="dim italic")
+            elif node.kind is NodeKind.AGGREGATE:
+                label = Text("  " * depth) + Text("  ", style="default") + Text("Σ ", style="dim") + Text(node.name, style="dim italic")
             else:
                 label = Text("  " * depth) + Text("  ", style="default") + Text("📄 ", style="default") + Text(node.name, style="white")
             rows.append(
@@ -628,6 +630,7 @@ class DuxApp(App[None]):
                     name=label,
                     size_bytes=node.size_bytes,
                     disk_usage=node.disk_usage,
+                    node=node,
                 )
             )
             if node.kind is NodeKind.DIRECTORY and node.path in self.expanded:
@@ -644,8 +647,7 @@ class DuxApp(App[None]):
                 continue
             display_path = self._relative_path(item.path)
             label = item.category.label
-            node = self.node_by_path.get(item.path)
-            is_dir = node is not None and node.is_dir
+            is_dir = item.kind is NodeKind.DIRECTORY
             type_label = "Dir" if is_dir else "File"
             
             if is_dir:
@@ -680,6 +682,7 @@ class DuxApp(App[None]):
                     name=name_styled,
                     size_bytes=node.size_bytes,
                     disk_usage=node.disk_usage,
+                    node=node,
                 )
             )
         return rows
@@ -742,21 +745,19 @@ class DuxApp(App[None]):
             return
         self.selected_index = max(0, min(len(self.rows) - 1, cursor_row))
 
-    def _selected_path(self) -> str | None:
+    def _selected_node(self) -> TreeNode | None:
         self._sync_selection_from_table()
         if not self.rows:
             return None
-        return self.rows[self.selected_index].path
+        return self.rows[self.selected_index].node
 
     def _toggle_expand(self) -> None:
         if self.current_view != "browse":
             return
-        path = self._selected_path()
-        if path is None:
-            return
-        node = self.node_by_path.get(path)
+        node = self._selected_node()
         if node is None or node.kind is not NodeKind.DIRECTORY:
             return
+        path = node.path
         if path in self.expanded:
             self.expanded.remove(path)
         else:
@@ -768,29 +769,25 @@ class DuxApp(App[None]):
         """Vim-tree 'h' key: collapse if expanded, otherwise jump to parent."""
         if self.current_view != "browse":
             return
-        path = self._selected_path()
-        if path is None:
+        node = self._selected_node()
+        if node is None:
             return
 
         # Phase 1: if the node is an expanded directory, collapse it.
-        node = self.node_by_path.get(path)
-        if (
-            node is not None
-            and node.kind is NodeKind.DIRECTORY
-            and path in self.expanded
-            and path != self.browse_root_path
-        ):
+        path = node.path
+        if node.kind is NodeKind.DIRECTORY and path in self.expanded and path != self.browse_root.path:
             self.expanded.remove(path)
             self._invalidate_browse_rows()
             self._refresh_all()
             return
 
         # Phase 2: already collapsed (or a file) — move cursor to parent.
-        parent = self.parent_by_path.get(path)
+        parent = node.parent
         if parent is None:
             return
+        parent_path = parent.path
         for index, row in enumerate(self.rows):
-            if row.path == parent:
+            if row.path == parent_path:
                 self.selected_index = index
                 break
         self._refresh_all()
@@ -799,20 +796,18 @@ class DuxApp(App[None]):
         """Vim-tree 'l' key: expand if collapsed, drill in if already expanded."""
         if self.current_view != "browse":
             return
-        path = self._selected_path()
-        if path is None:
-            return
-        node = self.node_by_path.get(path)
+        node = self._selected_node()
         if node is None or node.kind is not NodeKind.DIRECTORY:
             return
 
+        path = node.path
         if path not in self.expanded:
             self.expanded.add(path)
             self._invalidate_browse_rows()
             self._refresh_all()
             return
 
-        self.browse_root_path = path
+        self.browse_root = node
         self.expanded.add(path)
         self.selected_index = 0
         self._invalidate_browse_rows()
@@ -822,13 +817,13 @@ class DuxApp(App[None]):
         """Move browse root up to parent, repositioning cursor on the old root."""
         if self.current_view != "browse":
             return
-        if self.browse_root_path == self.root.path:
+        if self.browse_root.path == self.root.path:
             return
-        parent = self.parent_by_path.get(self.browse_root_path)
+        parent = self.browse_root.parent
         if parent is None:
             return
-        old_root = self.browse_root_path
-        self.browse_root_path = parent
+        old_root = self.browse_root.path
+        self.browse_root = parent
         self.selected_index = 0
         self._invalidate_browse_rows()
         # Rebuild rows for the new root, then place cursor on the directory
@@ -16,3 +16,12 @@ def test_windows_platform_exits_with_not_implemented(
     assert exc_info.value.exit_code == 1
     out = capsys.readouterr().out
     assert "Windows support is not implemented yet." in out
+
+
+@pytest.mark.parametrize("flag", ["interactive", "top_temp", "top_cache"])
+def test_stream_rejects_insight_views(flag: str, capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(cli_app.typer.Exit) as exc_info:
+        cli_app.run(stream=True, **{flag: True})
+
+    assert exc_info.value.exit_code == 1
+    assert "--stream cannot be combined" in capsys.readouterr().out
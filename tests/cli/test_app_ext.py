@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import time
 
+from rich.console import Console
 from rich.panel import Panel
 
 from dux.cli.app import _ScanProgress, _render_scan_panel, _truncate_path
@@ -37,3 +38,14 @@ class TestRenderScanPanel:
         )
         result = _render_scan_panel(progress, workers=4, phase="Scanning...")
         assert isinstance(result, Panel)
+
+    def test_shows_io_rate_with_budget(self) -> None:
+        progress = _ScanProgress(
+            current_path="/some/path",
+            files=80,
+            directories=10,
+            start_time=time.perf_counter() - 1.0,
+        )
+        console = Console(width=200, record=True)
+        console.print(_render_scan_panel(progress, workers=4, phase="Scanning...", max_iops=500))
+        assert "of 500" in console.export_text()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dux.config.schema import AppConfig, PatternRule
-from dux.models.enums import ApplyTo, InsightCategory
+from dux.models.enums import ApplyTo, InsightCategory, ScanScheduler
 
 
 class TestToDict:
@@ -17,6 +17,24 @@ class TestToDict:
             "maxInsightsPerCategory",
             "overviewTopDirs",
             "scrollStep",
+            "uringQueueDepth",
+            "subtreeEntryBudget",
+            "subtreeDepthBudget",
+            "scanScheduler",
+            "scanProcesses",
+            "oneFileSystem",
+            "excludePatterns",
+            "aggregateStopRecursion",
+            "countHardLinks",
+            "packedTree",
+            "compactTree",
+            "splitDirEntries",
+            "inodeOrder",
+            "deviceWorkers",
+            "networkWorkers",
+            "dirTimeout",
+            "maxIops",
+            "ioClass",
             "patterns",
         }
         assert set(d.keys()) == expected_keys
@@ -111,6 +129,36 @@ class TestFromDict:
         result = AppConfig.from_dict({"scanWorkers": 0}, defaults)
         assert result.scan_workers == 1
 
+    def test_scan_workers_auto(self) -> None:
+        defaults = AppConfig()
+        result = AppConfig.from_dict({"scanWorkers": "auto"}, defaults)
+        assert result.adaptive_workers is True
+        assert result.scan_workers == defaults.scan_workers
+        assert result.to_dict()["scanWorkers"] == "auto"
+
+    def test_inode_order_auto(self) -> None:
+        defaults = AppConfig()
+        assert AppConfig.from_dict({}, defaults).inode_order is None
+        assert AppConfig.from_dict({"inodeOrder": False}, defaults).inode_order is False
+        result = AppConfig.from_dict({"inodeOrder": True}, defaults)
+        assert result.inode_order is True
+        assert AppConfig(inode_order=None).to_dict()["inodeOrder"] == "auto"
+
+    def test_device_workers_clamped(self) -> None:
+        defaults = AppConfig()
+        result = AppConfig.from_dict({"deviceWorkers": {"network": 0, "/mnt/raid": "3"}}, defaults)
+        assert result.device_workers == {"network": 1, "/mnt/raid": 3}
+        assert result.to_dict()["deviceWorkers"] == {"network": 1, "/mnt/raid": 3}
+
+    def test_network_workers_clamped(self) -> None:
+        assert AppConfig.from_dict({"networkWorkers": -5}, AppConfig()).network_workers == 0
+        assert AppConfig.from_dict({}, AppConfig()).network_workers == 64
+
+    def test_dir_timeout_clamped(self) -> None:
+        assert AppConfig.from_dict({"dirTimeout": -1}, AppConfig()).dir_timeout == 0.0
+        assert AppConfig.from_dict({"dirTimeout": "2.5"}, AppConfig()).dir_timeout == 2.5
+        assert AppConfig.from_dict({}, AppConfig()).dir_timeout == 0.0
+
     def test_numeric_clamping_page_size(self) -> None:
         defaults = AppConfig()
         result = AppConfig.from_dict({"pageSize": 1}, defaults)
@@ -131,6 +179,21 @@ class TestFromDict:
         result = AppConfig.from_dict({"scrollStep": 0}, defaults)
         assert result.scroll_step == 1
 
+    def test_numeric_clamping_uring_queue_depth(self) -> None:
+        defaults = AppConfig()
+        assert AppConfig.from_dict({"uringQueueDepth": 0}, defaults).uring_queue_depth == 1
+        assert AppConfig.from_dict({"uringQueueDepth": 100000}, defaults).uring_queue_depth == 4096
+
+    def test_scan_scheduler(self) -> None:
+        defaults = AppConfig()
+        assert defaults.to_dict()["scanScheduler"] == "fifo"
+        assert AppConfig.from_dict({"scanScheduler": "steal"}, defaults).scan_scheduler is ScanScheduler.WORK_STEALING
+
+    def test_exclude_patterns(self) -> None:
+        result = AppConfig.from_dict({"excludePatterns": ["**/.snapshot", "/mnt/backup"]}, AppConfig())
+        assert result.exclude_patterns == ["**/.snapshot", "/mnt/backup"]
+        assert result.to_dict()["excludePatterns"] == ["**/.snapshot", "/mnt/backup"]
+
     def test_patterns_present(self) -> None:
         payload = {
             "patterns": [{"name": "t", "pattern": "**/t", "category": "temp"}],
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import PurePosixPath
 
-from dux.services.fs import DirEntry, StatResult
+from dux.services.fs import DirEntry, FileSystem, StatResult
 
 
 @dataclass
@@ -12,14 +14,17 @@ class _MockEntry:
     size: int
     content: str
     disk_usage: int = 0
+    dev: int = 0
+    ino: int = 0
+    nlink: int = 1
 
 
 class MemoryFileSystem:
     def __init__(self) -> None:
         self._entries: dict[str, _MockEntry] = {}
 
-    def add_dir(self, path: str) -> MemoryFileSystem:
-        self._entries[self._normalize(path)] = _MockEntry(is_dir=True, size=0, content="")
+    def add_dir(self, path: str, dev: int = 0) -> MemoryFileSystem:
+        self._entries[self._normalize(path)] = _MockEntry(is_dir=True, size=0, content="", dev=dev)
         return self
 
     def add_file(
@@ -30,11 +35,7 @@ class MemoryFileSystem:
         disk_usage: int | None = None,
     ) -> MemoryFileSystem:
         key = self._normalize(path)
-        # auto-create parent dirs
-        for parent in reversed(PurePosixPath(key).parents):
-            pk = str(parent)
-            if pk not in self._entries:
-                self._entries[pk] = _MockEntry(is_dir=True, size=0, content="")
+        self._add_parents(key)
         self._entries[key] = _MockEntry(
             is_dir=False,
             size=size,
@@ -43,6 +44,24 @@ class MemoryFileSystem:
         )
         return self
 
+    def add_link(self, path: str, target: str) -> MemoryFileSystem:
+        """Hard-link *path* to the existing file *target* (they share one entry)."""
+        key = self._normalize(path)
+        entry = self._entries[self._normalize(target)]
+        if not entry.ino:
+            entry.ino = len(self._entries) + 1
+        entry.nlink += 1
+        self._add_parents(key)
+        self._entries[key] = entry
+        return self
+
+    def _add_parents(self, key: str) -> None:
+        # auto-create parent dirs
+        for parent in reversed(PurePosixPath(key).parents):
+            pk = str(parent)
+            if pk not in self._entries:
+                self._entries[pk] = _MockEntry(is_dir=True, size=0, content="")
+
     def expanduser(self, path: str) -> str:
         return path.replace("~", "/mock/home")
 
@@ -57,7 +76,14 @@ class MemoryFileSystem:
         entry = self._entries.get(key)
         if entry is None:
             raise OSError(f"No such file or directory: '{key}'")
-        return StatResult(size=entry.size, is_dir=entry.is_dir, disk_usage=entry.disk_usage)
+        return StatResult(
+            size=entry.size,
+            is_dir=entry.is_dir,
+            disk_usage=entry.disk_usage,
+            dev=entry.dev,
+            ino=entry.ino,
+            nlink=entry.nlink,
+        )
 
     def read_text(self, path: str, encoding: str = "utf-8") -> str:
         key = self._normalize(path)
@@ -92,6 +118,9 @@ class MemoryFileSystem:
                         size=child_entry.size,
                         is_dir=child_entry.is_dir,
                         disk_usage=child_entry.disk_usage,
+                        dev=child_entry.dev,
+                        ino=child_entry.ino,
+                        nlink=child_entry.nlink,
                     )
                     if child_entry is not None
                     else None
@@ -102,3 +131,55 @@ class MemoryFileSystem:
     @staticmethod
     def _normalize(path: str) -> str:
         return path.rstrip("/")
+
+
+class LatencyFileSystem:
+    """Wraps a FileSystem, adding a network round trip to every call that reads metadata.
+
+    Each ``scandir`` sleeps *latency* seconds before its listing plus
+    *entry_latency* per entry (an ``lstat`` per file, as without
+    READDIRPLUS); each ``stat`` sleeps *latency*.  Sleeping releases the
+    GIL, so concurrent calls overlap as real network I/O would.
+    *peak_in_flight* records the most calls that were waiting at once.
+    """
+
+    def __init__(self, inner: FileSystem, latency: float = 0.002, entry_latency: float = 0.0) -> None:
+        self._inner = inner
+        self._latency = latency
+        self._entry_latency = entry_latency
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+
+    def _wait(self, seconds: float) -> None:
+        with self._lock:
+            self._in_flight += 1
+            self.calls += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+        try:
+            time.sleep(seconds)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def expanduser(self, path: str) -> str:
+        return self._inner.expanduser(path)
+
+    def exists(self, path: str) -> bool:
+        return self._inner.exists(path)
+
+    def absolute(self, path: str) -> str:
+        return self._inner.absolute(path)
+
+    def stat(self, path: str) -> StatResult:
+        self._wait(self._latency)
+        return self._inner.stat(path)
+
+    def scandir(self, path: str) -> list[DirEntry]:
+        entries = list(self._inner.scandir(path))
+        self._wait(self._latency + self._entry_latency * len(entries))
+        return entries
+
+    def read_text(self, path: str, encoding: str = "utf-8") -> str:
+        return self._inner.read_text(path, encoding)
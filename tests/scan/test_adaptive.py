@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from result import Ok
+
+from dux.models.enums import ScanScheduler
+from dux.models.scan import ScanOptions
+from dux.scan import PythonScanner
+from dux.scan._adaptive import WorkerController, adaptive_bounds, cgroup_cpu_limit, effective_cpu_count
+from tests.fs_mock import MemoryFileSystem
+
+
+def _controller(initial: int = 4, bounds: tuple[int, int] = (1, 16)) -> WorkerController:
+    return WorkerController(initial, bounds, entries=lambda: 0, depth=lambda: 0)
+
+
+class TestCgroupCpuLimit:
+    def test_v2_quota(self, tmp_path: Path) -> None:
+        (tmp_path / "cpu.max").write_text("250000 100000\n")
+        assert cgroup_cpu_limit(str(tmp_path)) == 2.5
+
+    def test_v2_unlimited(self, tmp_path: Path) -> None:
+        (tmp_path / "cpu.max").write_text("max 100000\n")
+        assert cgroup_cpu_limit(str(tmp_path)) is None
+
+    def test_v1_quota(self, tmp_path: Path) -> None:
+        cpu = tmp_path / "cpu"
+        cpu.mkdir()
+        (cpu / "cpu.cfs_quota_us").write_text("150000\n")
+        (cpu / "cpu.cfs_period_us").write_text("100000\n")
+        assert cgroup_cpu_limit(str(tmp_path)) == 1.5
+
+    def test_v1_unlimited(self, tmp_path: Path) -> None:
+        (tmp_path / "cpu.cfs_quota_us").write_text("-1\n")
+        (tmp_path / "cpu.cfs_period_us").write_text("100000\n")
+        assert cgroup_cpu_limit(str(tmp_path)) is None
+
+    def test_missing(self, tmp_path: Path) -> None:
+        assert cgroup_cpu_limit(str(tmp_path)) is None
+
+    def test_v2_quota_of_own_slice(self, tmp_path: Path) -> None:
+        (tmp_path / "cgroup.controllers").write_text("cpu io memory\n")
+        slice_dir = tmp_path / "system.slice"
+        scope = slice_dir / "dux.scope"
+        scope.mkdir(parents=True)
+        (slice_dir / "cpu.max").write_text("300000 100000\n")
+        (scope / "cpu.max").write_text("max 100000\n")
+        proc = tmp_path / "proc-cgroup"
+        proc.write_text("0::/system.slice/dux.scope\n")
+        assert cgroup_cpu_limit(str(tmp_path), str(proc)) == 3.0
+
+    def test_v1_quota_of_own_group(self, tmp_path: Path) -> None:
+        group = tmp_path / "cpu,cpuacct" / "docker" / "abc"
+        group.mkdir(parents=True)
+        (group / "cpu.cfs_quota_us").write_text("200000\n")
+        (group / "cpu.cfs_period_us").write_text("100000\n")
+        proc = tmp_path / "proc-cgroup"
+        proc.write_text("4:memory:/docker/abc\n3:cpu,cpuacct:/docker/abc\n")
+        assert cgroup_cpu_limit(str(tmp_path), str(proc)) == 2.0
+
+    def test_effective_cpu_count_rounds_quota_up(self, tmp_path: Path) -> None:
+        (tmp_path / "cpu.max").write_text("50000 100000\n")
+        assert effective_cpu_count(str(tmp_path)) == 1
+
+
+class TestAdaptiveBounds:
+    def test_scales_with_cpus(self) -> None:
+        assert adaptive_bounds(2) == (1, 8)
+
+    def test_single_cpu_allows_two(self) -> None:
+        assert adaptive_bounds(1) == (1, 4)
+
+    def test_capped(self) -> None:
+        assert adaptive_bounds(256) == (1, 64)
+
+
+class TestDecide:
+    def test_first_sample_with_backlog_grows(self) -> None:
+        c = _controller(initial=4)
+        assert c.decide(rate=1000.0, depth=100) == 5
+
+    def test_starved_shrinks(self) -> None:
+        c = _controller(initial=4)
+        assert c.decide(rate=1000.0, depth=1) == 3
+
+    def test_improvement_continues(self) -> None:
+        c = _controller(initial=8)
+        c.active = c.decide(rate=1000.0, depth=100)
+        assert c.active == 10
+        assert c.decide(rate=1500.0, depth=100) == 12
+
+    def test_regression_reverses(self) -> None:
+        c = _controller(initial=8)
+        c.active = c.decide(rate=1000.0, depth=100)
+        assert c.decide(rate=500.0, depth=100) == 8
+
+    def test_flat_holds(self) -> None:
+        c = _controller(initial=8)
+        c.active = c.decide(rate=1000.0, depth=100)
+        assert c.decide(rate=1010.0, depth=100) == c.active
+
+    def test_clamped_to_bounds(self) -> None:
+        c = _controller(initial=16, bounds=(1, 16))
+        assert c.decide(rate=1000.0, depth=100) == 16
+        c = _controller(initial=1, bounds=(1, 16))
+        assert c.decide(rate=1000.0, depth=0) == 1
+
+    def test_initial_clamped(self) -> None:
+        assert _controller(initial=100, bounds=(1, 8)).active == 8
+
+
+class TestAdmit:
+    def test_parked_worker_released_on_stop(self) -> None:
+        c = _controller(initial=1)
+        admitted: list[bool] = []
+        t = threading.Thread(target=lambda: admitted.append(c.admit(3)))
+        t.start()
+        c.stop()
+        t.join(timeout=1)
+        assert admitted == [False]
+
+    def test_parked_worker_released_on_grow(self) -> None:
+        c = _controller(initial=1)
+        admitted: list[bool] = []
+        t = threading.Thread(target=lambda: admitted.append(c.admit(2)))
+        t.start()
+        c._set_active(3)
+        t.join(timeout=1)
+        assert admitted == [True]
+        assert c.usage().peak == 3
+
+
+def _make_fs() -> MemoryFileSystem:
+    fs = MemoryFileSystem().add_dir("/root")
+    for idx in range(10):
+        for jdx in range(5):
+            fs.add_file(f"/root/d{idx}/s{jdx}/f.bin", size=idx + 1)
+    return fs
+
+
+def test_adaptive_scan_matches_fixed() -> None:
+    fs = _make_fs()
+    fixed = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions())
+    auto = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions(adaptive_workers=True))
+
+    assert isinstance(fixed, Ok) and isinstance(auto, Ok)
+    assert auto.unwrap().stats == fixed.unwrap().stats
+    assert auto.unwrap().root.size_bytes == fixed.unwrap().root.size_bytes
+    usage = auto.unwrap().workers
+    assert usage is not None and usage.adaptive
+    assert usage.low <= usage.final <= usage.high
+    assert fixed.unwrap().workers is not None and fixed.unwrap().workers.final == 2  # type: ignore[union-attr]
+
+
+def test_adaptive_scan_with_work_stealing() -> None:
+    fs = _make_fs()
+    options = ScanOptions(adaptive_workers=True, scheduler=ScanScheduler.WORK_STEALING)
+    result = PythonScanner(workers=2, fs=fs).scan("/root", options)
+
+    assert isinstance(result, Ok)
+    assert result.unwrap().stats.files == 50
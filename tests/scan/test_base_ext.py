@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import os
+import threading
+import time
+from pathlib import Path
 from typing import override
 
-from dux.models.scan import ScanErrorCode, ScanNode, ScanOptions
-from dux.scan._base import resolve_root
+import pytest
+
+from dux.models.enums import ScanScheduler
+from dux.models.scan import NodeKind, ScanErrorCode, ScanNode, ScanOptions
+from dux.scan import _base
+from dux.scan._base import Task, _device_pools, _DevicePool, _DeviceQueue, _SplitDir, resolve_root
 from dux.scan.python_scanner import PythonScanner
-from tests.fs_mock import MemoryFileSystem
+from dux.services.devices import Mount
+from dux.services.fs import DirEntry
+from tests.fs_mock import LatencyFileSystem, MemoryFileSystem
 
 
 class TestResolveRoot:
@@ -60,3 +70,233 @@ class TestScanDirError:
         result = scanner.scan("/root", ScanOptions())
         snapshot = result.unwrap()
         assert snapshot.stats.access_errors >= 1
+
+
+class _SplittingScanner(PythonScanner):
+    """Stats every directory through _stat_split, recording the chunks."""
+
+    def __init__(self, fs: MemoryFileSystem) -> None:
+        super().__init__(workers=4, fs=fs)
+        self.chunks: list[tuple[int, int]] = []
+        self.threads: set[int] = set()
+
+    @override
+    def _scan_dir(self, parent: ScanNode, path: str) -> tuple[list[ScanNode], int, int, int]:
+        def stat_range(start: int, stop: int) -> int:
+            self.chunks.append((start, stop))
+            self.threads.add(threading.get_ident())
+            return stop - start if start == 0 else 0
+
+        errs = self._stat_split(parent, path, 10, stat_range)
+        dirs, files, dir_count, list_errs = super()._scan_dir(parent, path)
+        return dirs, files, dir_count, list_errs + errs
+
+
+class TestSplitDir:
+    def test_chunks_cover_every_entry_once(self) -> None:
+        taken: list[tuple[int, int]] = []
+        split = _SplitDir(lambda start, stop: taken.append((start, stop)) or 1, 10, 3)
+        helpers = [threading.Thread(target=split.help) for _ in range(3)]
+        for thread in helpers:
+            thread.start()
+        errors = split.wait()
+        for thread in helpers:
+            thread.join()
+        assert sorted(taken) == [(0, 3), (3, 6), (6, 9), (9, 10)]
+        assert errors == 4
+
+    def test_scan_shares_chunks_with_helper_tasks(self) -> None:
+        fs = MemoryFileSystem()
+        fs.add_file("/root/a.txt", size=10)
+        scanner = _SplittingScanner(fs)
+        snapshot = scanner.scan("/root", ScanOptions(split_dir_entries=2)).unwrap()
+        # One directory of 10 entries in chunks of 2; the first chunk "fails" twice.
+        assert sorted(scanner.chunks) == [(0, 2), (2, 4), (4, 6), (6, 8), (8, 10)]
+        assert snapshot.stats.access_errors == 2
+        assert snapshot.stats.files == 1
+
+
+def _fake_mounts(monkeypatch: pytest.MonkeyPatch) -> None:
+    mounts = [
+        Mount("/", os.makedev(259, 0), "ext4"),
+        Mount("/data", os.makedev(8, 1), "xfs"),
+        Mount("/data/share", os.makedev(0, 42), "nfs4"),
+        Mount("/srv", os.makedev(259, 1), "ext4"),
+    ]
+    classes = {"/data": "rotational", "/data/share": "network"}
+    monkeypatch.setattr(_base, "mount_table", lambda: mounts)
+    monkeypatch.setattr(_base, "device_class", lambda mount: classes.get(mount.path, "local"))
+
+
+class TestDeviceQueue:
+    def test_pools_cover_mounts_below_root(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        _fake_mounts(monkeypatch)
+        pools = _device_pools("/data/projects", [("network", 2), ("/data", 3)], 8)
+        # /data owns the root; /data/share is outside it and /srv elsewhere.
+        assert [(p.mount, p.device_class, p.limit) for p in pools] == [("/data/projects", "rotational", 3)]
+        pools = _device_pools("/data", [("network", 2)], 8)
+        assert [(p.mount, p.device_class, p.limit) for p in pools] == [
+            ("/data/share", "network", 2),
+            ("/data", "rotational", 8),
+        ]
+
+    def test_pool_never_exceeds_its_limit(self) -> None:
+        slow = _DevicePool("/mnt/slow", "network", 1)
+        fast = _DevicePool("/", "local", 4)
+        q = _DeviceQueue([slow, fast])
+        node = ScanNode("x", NodeKind.DIRECTORY, 0, 0, path="/")
+        q.put_many(Task(node, f"/mnt/slow/{i}", 1) for i in range(3))
+        q.put_many(Task(node, f"/home/{i}", 1) for i in range(3))
+        ports = [q.worker(i) for i in range(4)]
+        taken = [port.get() for port in ports]
+        # One slow task at a time; the other workers go to the fast pool.
+        assert [t.path for t in taken if t is not None] == ["/mnt/slow/0", "/home/0", "/home/1", "/home/2"]
+        assert slow.active == 1 and slow.peak == 1
+        ports[0].task_done()
+        assert ports[0].get().path == "/mnt/slow/1"  # type: ignore[union-attr]
+        assert q.pending() == 1
+
+    def test_scan_reports_device_usage(self, tmp_path: Path) -> None:
+        for d in ("a", "b", "a/c"):
+            os.makedirs(os.path.join(tmp_path, d))
+            with open(os.path.join(tmp_path, d, "f"), "wb") as f:
+                f.write(b"x" * 100)
+        plain = PythonScanner(workers=3).scan(str(tmp_path), ScanOptions()).unwrap()
+        pooled = PythonScanner(workers=3).scan(str(tmp_path), ScanOptions(device_workers=(("local", 2),))).unwrap()
+        assert pooled.root.disk_usage == plain.root.disk_usage
+        assert pooled.stats.files == plain.stats.files == 3
+        assert sum(u.directories for u in pooled.devices) == 4
+        assert all(u.peak <= u.limit for u in pooled.devices)
+        assert plain.devices == ()
+
+
+def _network_tree(root: str) -> MemoryFileSystem:
+    fs = MemoryFileSystem()
+    for i in range(6):
+        for j in range(6):
+            fs.add_file(f"{root}/d{i}/e{j}/f.txt", size=10)
+    return fs
+
+
+class TestNetworkMode:
+    def test_network_root_runs_many_reads_at_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        _fake_mounts(monkeypatch)
+        fs = LatencyFileSystem(_network_tree("/data/share/home"), latency=0.01)
+        options = ScanOptions(network_workers=16)
+        snapshot = PythonScanner(workers=2, fs=fs).scan("/data/share/home", options).unwrap()
+        plain = PythonScanner(workers=2, fs=_network_tree("/data/share/home")).scan("/data/share/home", ScanOptions())
+        assert snapshot.network
+        assert snapshot.root == plain.unwrap().root
+        assert snapshot.stats.files == 36
+        assert 2 < fs.peak_in_flight <= 16
+        assert [(u.mount, u.limit) for u in snapshot.devices] == [("/data/share/home", 16)]
+
+    def test_local_root_keeps_worker_count(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        _fake_mounts(monkeypatch)
+        fs = LatencyFileSystem(_network_tree("/srv/home"), latency=0.005)
+        snapshot = PythonScanner(workers=2, fs=fs).scan("/srv/home", ScanOptions(network_workers=16)).unwrap()
+        assert not snapshot.network
+        assert snapshot.devices == ()
+        assert fs.peak_in_flight <= 2
+
+
+class _HungFileSystem(MemoryFileSystem):
+    """scandir of *hung* blocks until *release* is set, like a stale NFS mount."""
+
+    def __init__(self, hung: str) -> None:
+        super().__init__()
+        self._hung = hung
+        self.release = threading.Event()
+
+    @override
+    def scandir(self, path: str) -> list[DirEntry]:
+        if path == self._hung:
+            self.release.wait()
+        return super().scandir(path)
+
+
+class TestDirTimeout:
+    @pytest.mark.parametrize("scheduler", [ScanScheduler.FIFO, ScanScheduler.WORK_STEALING])
+    def test_hung_directory_is_abandoned(self, scheduler: ScanScheduler) -> None:
+        fs = _HungFileSystem("/root/nfs")
+        fs.add_file("/root/nfs/a.txt", size=10)
+        for i in range(4):
+            fs.add_file(f"/root/d{i}/b.txt", size=20)
+        scanner = PythonScanner(workers=2, fs=fs)
+        snapshot = scanner.scan("/root", ScanOptions(scheduler=scheduler, dir_timeout=0.2)).unwrap()
+        try:
+            assert snapshot.timed_out == ("/root/nfs",)
+            assert snapshot.stats.files == 4
+            hung = next(c for c in snapshot.root.children if c.name == "nfs")
+            assert hung.children == []
+        finally:
+            fs.release.set()
+        # The abandoned worker returns into a detached node.
+        time.sleep(0.1)
+        assert hung.children == []
+        assert snapshot.root.disk_usage == 80
+
+    def test_fast_scan_times_nothing_out(self) -> None:
+        fs = MemoryFileSystem()
+        fs.add_file("/root/a/b.txt", size=10)
+        snapshot = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions(dir_timeout=5)).unwrap()
+        assert snapshot.timed_out == ()
+        assert snapshot.stats.files == 1
+
+
+def _budget_tree() -> MemoryFileSystem:
+    fs = MemoryFileSystem()
+    fs.add_file("/root/top.txt", size=5)
+    for i in range(3):
+        fs.add_file(f"/root/d{i}/sub/a.txt", size=10)
+    return fs
+
+
+class TestBudgets:
+    @pytest.mark.parametrize("packed", [False, True])
+    def test_entry_budget_returns_partial_tree(self, packed: bool) -> None:
+        scanner = PythonScanner(workers=1, fs=_budget_tree())
+        snapshot = scanner.scan("/root", ScanOptions(max_entries=1, packed=packed)).unwrap()
+        # The root is always read; the budget is spent by then.
+        assert snapshot.partial
+        assert snapshot.unscanned == ("/root/d0", "/root/d1", "/root/d2")
+        assert snapshot.stats.files == 1
+        assert snapshot.root.disk_usage == 5
+        assert all(not child.children for child in snapshot.root.children if child.is_dir)
+
+    def test_subtree_scanner_stops_at_entry_budget(self, tmp_path: Path) -> None:
+        from dux._walker import scan_subtree_nodes
+        from dux.scan.native_scanner import SubtreeScanner
+
+        (tmp_path / "top.txt").write_bytes(b"x" * 5)
+        for i in range(3):
+            (tmp_path / f"d{i}" / "sub").mkdir(parents=True)
+            (tmp_path / f"d{i}" / "sub" / "a.txt").write_bytes(b"x" * 10)
+        scanner = SubtreeScanner(scan_subtree_nodes, workers=1)
+        snapshot = scanner.scan(str(tmp_path), ScanOptions(max_entries=1)).unwrap()
+        # One walker call would read the whole tree; it is cut at the budget.
+        assert snapshot.unscanned == tuple(str(tmp_path / f"d{i}") for i in range(3))
+        assert snapshot.stats.files == 1
+
+    def test_time_budget_returns_partial_tree(self) -> None:
+        scanner = PythonScanner(workers=2, fs=_budget_tree())
+        snapshot = scanner.scan("/root", ScanOptions(time_limit=1e-9)).unwrap()
+        assert snapshot.unscanned == ("/root/d0", "/root/d1", "/root/d2")
+
+    def test_generous_budget_scans_everything(self) -> None:
+        scanner = PythonScanner(workers=2, fs=_budget_tree())
+        snapshot = scanner.scan("/root", ScanOptions(time_limit=60, max_entries=1000)).unwrap()
+        assert not snapshot.partial
+        assert snapshot.stats.files == 4
+
+    def test_partial_on_cancel_keeps_result(self) -> None:
+        scanner = PythonScanner(workers=1, fs=_budget_tree())
+        calls = iter([False])
+        # Cancelled after the first directory: its subdirectories are left.
+        result = scanner.scan(
+            "/root", ScanOptions(partial_on_cancel=True), cancel_check=lambda: next(calls, True)
+        ).unwrap()
+        assert result.partial
+        assert result.stats.files >= 1
+        cancelled = scanner.scan("/root", ScanOptions(), cancel_check=lambda: True)
+        assert cancelled.unwrap_err().code is ScanErrorCode.CANCELLED
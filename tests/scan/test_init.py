@@ -4,7 +4,7 @@ import sys
 
 import pytest
 
-from dux.scan import default_scanner
+from dux.scan import default_scanner, uring_scanner
 from dux.scan._base import ThreadedScannerBase
 
 
@@ -17,3 +17,28 @@ class TestDefaultScanner:
         from dux.scan.native_scanner import NativeScanner
 
         assert isinstance(scanner, NativeScanner)
+
+
+class TestUringScanner:
+    def test_falls_back_to_posix_when_uring_unavailable(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        import dux._walker
+
+        if not hasattr(dux._walker, "uring_available"):
+            pytest.skip("io_uring not compiled in")
+        monkeypatch.setattr(dux._walker, "uring_available", lambda: False)
+        scanner = uring_scanner(workers=2)
+        from dux.scan.native_scanner import NativeScanner
+
+        assert isinstance(scanner, NativeScanner)
+        assert scanner.label == "posix/readdir"
+
+    def test_uses_uring_when_available(self) -> None:
+        import dux._walker
+
+        if not getattr(dux._walker, "uring_available", lambda: False)():
+            pytest.skip("io_uring unavailable")
+        from dux.scan.native_scanner import UringScanner
+
+        scanner = uring_scanner(workers=2, queue_depth=8)
+        assert isinstance(scanner, UringScanner)
+        assert "io_uring" in scanner.label
@@ -3,12 +3,17 @@ from __future__ import annotations
 import os
 import sys
 import tempfile
+from collections.abc import Callable
 
 import pytest
 from result import Ok
 
-from dux.models.scan import ScanOptions
-from dux.scan.native_scanner import NativeScanner
+from dux.models.enums import NodeKind, ScanScheduler
+from dux.models.scan import ScanNode, ScanOptions
+from dux.scan import ThreadedScannerBase
+from dux.scan._names import _PyNameTable
+from dux.scan.native_scanner import NativeScanner, PipelinedScanner, SubtreeScanner
+from dux.services.tree import iter_nodes
 
 
 def _posix_scanner(workers: int = 4) -> NativeScanner:
@@ -52,7 +57,8 @@ def test_posix_scanner_max_depth() -> None:
         assert isinstance(result, Ok)
         snapshot = result.unwrap()
         lvl1 = next(c for c in snapshot.root.children if c.name == "lvl1")
-        assert lvl1.children == []
+        assert [(c.kind, c.size_bytes) for c in lvl1.children] == [(NodeKind.AGGREGATE, 50)]
+        assert snapshot.root.size_bytes == 50
 
 
 @pytest.mark.skipif(sys.platform != "darwin", reason="macOS only")
@@ -86,4 +92,611 @@ def test_macos_scanner_max_depth() -> None:
         assert isinstance(result, Ok)
         snapshot = result.unwrap()
         lvl1 = next(c for c in snapshot.root.children if c.name == "lvl1")
-        assert lvl1.children == []
+        assert [(c.kind, c.size_bytes) for c in lvl1.children] == [(NodeKind.AGGREGATE, 50)]
+
+
+def _openat_scanner(workers: int = 4) -> NativeScanner:
+    from dux._walker import scan_dir_at_nodes
+
+    return NativeScanner(scan_dir_at_nodes, workers=workers)
+
+
+def test_openat_scanner_basic() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.makedirs(os.path.join(tmpdir, "sub"))
+        with open(os.path.join(tmpdir, "a.txt"), "wb") as f:
+            f.write(b"x" * 100)
+        with open(os.path.join(tmpdir, "sub", "b.txt"), "wb") as f:
+            f.write(b"y" * 200)
+
+        result = _openat_scanner().scan(tmpdir, ScanOptions())
+
+        assert isinstance(result, Ok)
+        snapshot = result.unwrap()
+        assert snapshot.stats.files == 2
+        assert snapshot.stats.directories >= 2
+        assert snapshot.root.size_bytes == 300
+        sub = next(c for c in snapshot.root.children if c.name == "sub")
+        assert sub.path == os.path.join(tmpdir, "sub")
+        assert sub.children[0].path == os.path.join(tmpdir, "sub", "b.txt")
+
+
+def test_openat_scanner_does_not_follow_symlinks() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.makedirs(os.path.join(tmpdir, "real"))
+        with open(os.path.join(tmpdir, "real", "big.bin"), "wb") as f:
+            f.write(b"x" * 4096)
+        os.symlink(os.path.join(tmpdir, "real"), os.path.join(tmpdir, "link"))
+
+        result = _openat_scanner().scan(tmpdir, ScanOptions())
+
+        assert isinstance(result, Ok)
+        link = next(c for c in result.unwrap().root.children if c.name == "link")
+        assert not link.is_dir
+
+
+def test_openat_scanner_matches_posix_scanner() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for d in range(5):
+            os.makedirs(os.path.join(tmpdir, f"d{d}", "nested"))
+            for i in range(40):
+                with open(os.path.join(tmpdir, f"d{d}", "nested", f"file-{i}.bin"), "wb") as f:
+                    f.write(b"z" * (i * 37))
+
+        posix = _posix_scanner().scan(tmpdir, ScanOptions()).unwrap()
+        openat = _openat_scanner().scan(tmpdir, ScanOptions()).unwrap()
+
+        assert openat.stats == posix.stats
+        assert openat.root.size_bytes == posix.root.size_bytes
+        assert openat.root.disk_usage == posix.root.disk_usage
+
+
+def _getdents_scanner(workers: int = 4) -> NativeScanner:
+    from dux._walker import scan_dir_getdents_nodes
+
+    return NativeScanner(scan_dir_getdents_nodes, workers=workers)
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+def test_getdents_scanner_matches_posix_scanner() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for d in range(5):
+            os.makedirs(os.path.join(tmpdir, f"d{d}", "nested", "empty"))
+            for i in range(40):
+                with open(os.path.join(tmpdir, f"d{d}", "nested", f"file-{i}.bin"), "wb") as f:
+                    f.write(b"z" * (i * 37))
+
+        posix = _posix_scanner().scan(tmpdir, ScanOptions()).unwrap()
+        getdents = _getdents_scanner().scan(tmpdir, ScanOptions()).unwrap()
+
+        assert getdents.stats == posix.stats
+        assert getdents.root.size_bytes == posix.root.size_bytes
+        assert getdents.root.disk_usage == posix.root.disk_usage
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+def test_getdents_scanner_classifies_symlinks_as_leaves() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.makedirs(os.path.join(tmpdir, "real"))
+        with open(os.path.join(tmpdir, "real", "big.bin"), "wb") as f:
+            f.write(b"x" * 4096)
+        os.symlink(os.path.join(tmpdir, "real"), os.path.join(tmpdir, "link"))
+
+        result = _getdents_scanner().scan(tmpdir, ScanOptions())
+
+        assert isinstance(result, Ok)
+        snapshot = result.unwrap()
+        link = next(c for c in snapshot.root.children if c.name == "link")
+        assert not link.is_dir
+        assert link.size_bytes == 0
+        assert snapshot.stats.files == 2
+
+
+def _uring_available() -> bool:
+    import dux._walker
+
+    return getattr(dux._walker, "uring_available", lambda: False)()
+
+
+@pytest.mark.skipif(not _uring_available(), reason="io_uring unavailable")
+@pytest.mark.parametrize("queue_depth", [1, 4, 64])
+def test_uring_scanner_matches_posix_scanner(queue_depth: int) -> None:
+    from dux._walker import scan_dir_uring_nodes
+    from dux.scan.native_scanner import UringScanner
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for d in range(3):
+            os.makedirs(os.path.join(tmpdir, f"d{d}", "nested"))
+            for i in range(50):
+                with open(os.path.join(tmpdir, f"d{d}", "nested", f"file-{i}.bin"), "wb") as f:
+                    f.write(b"z" * (i * 91))
+        os.symlink("d0", os.path.join(tmpdir, "link"))
+
+        posix = _posix_scanner().scan(tmpdir, ScanOptions()).unwrap()
+        uring = UringScanner(scan_dir_uring_nodes, queue_depth=queue_depth).scan(tmpdir, ScanOptions()).unwrap()
+
+        assert uring.stats == posix.stats
+        assert uring.root.disk_usage == posix.root.disk_usage
+        names = sorted(c.name for c in uring.root.children)
+        assert names == ["d0", "d1", "d2", "link"]
+
+
+def _subtree_scanner(entry_budget: int = 10_000, depth_budget: int | None = None) -> SubtreeScanner:
+    from dux._walker import scan_subtree_nodes
+
+    return SubtreeScanner(scan_subtree_nodes, entry_budget=entry_budget, depth_budget=depth_budget)
+
+
+def _make_wide_tree(tmpdir: str) -> None:
+    for d in range(4):
+        for s in range(3):
+            os.makedirs(os.path.join(tmpdir, f"d{d}", f"s{s}", "leaf"))
+            for i in range(10):
+                with open(os.path.join(tmpdir, f"d{d}", f"s{s}", f"f{i}.bin"), "wb") as f:
+                    f.write(b"q" * (i * 53 + d))
+
+
+@pytest.mark.parametrize(("entry_budget", "depth_budget"), [(10_000, None), (5, None), (1, None), (10_000, 1)])
+def test_subtree_scanner_matches_posix_scanner(entry_budget: int, depth_budget: int | None) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+
+        posix = _posix_scanner().scan(tmpdir, ScanOptions()).unwrap()
+        subtree = _subtree_scanner(entry_budget, depth_budget).scan(tmpdir, ScanOptions()).unwrap()
+
+        assert subtree.stats == posix.stats
+        assert subtree.root.disk_usage == posix.root.disk_usage
+        leaf = next(c for c in next(c for c in subtree.root.children if c.name == "d2").children if c.name == "s1")
+        assert leaf.path == os.path.join(tmpdir, "d2", "s1")
+        assert len(leaf.children) == 11
+
+
+def test_subtree_scanner_respects_max_depth() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+
+        posix = _posix_scanner().scan(tmpdir, ScanOptions(max_depth=1)).unwrap()
+        subtree = _subtree_scanner().scan(tmpdir, ScanOptions(max_depth=1)).unwrap()
+
+        assert subtree.stats == posix.stats
+        assert subtree.root.disk_usage == posix.root.disk_usage
+        s0 = next(c for c in next(c for c in subtree.root.children if c.name == "d0").children if c.name == "s0")
+        assert [c.kind for c in s0.children] == [NodeKind.AGGREGATE]
+
+
+def test_subtree_walker_stops_at_device_boundary() -> None:
+    from dux._walker import scan_subtree_nodes
+    from dux.models.enums import NodeKind
+    from dux.models.scan import ScanNode
+    from dux.services.tree import LEAF_CHILDREN
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+        root = ScanNode("root", NodeKind.DIRECTORY, 0, 0, [], path=tmpdir)
+        other_dev = os.lstat(tmpdir).st_dev + 1
+        mounts: list[ScanNode] = []
+
+        frontier, files, dirs, _, _ = scan_subtree_nodes(
+            tmpdir,
+            root,
+            LEAF_CHILDREN,
+            NodeKind.DIRECTORY,
+            NodeKind.FILE,
+            ScanNode,
+            10_000,
+            -1,
+            other_dev,
+            (),
+            (),
+            None,
+            None,
+            False,
+            mounts,
+        )
+
+        # Every subdirectory looks like a mount point: none is entered.
+        assert frontier == []
+        assert sorted(node.name for node in mounts) == ["d0", "d1", "d2", "d3"]
+        assert (files, dirs) == (0, 4)
+
+
+@pytest.mark.parametrize("exclude", [("**/s1",), ("**/s1", "**/f3.bin"), (os.sep + "d2",)])
+def test_subtree_scanner_exclude_matches_posix_scanner(exclude: tuple[str, ...]) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+        if exclude[0].startswith(os.sep):
+            exclude = (tmpdir + exclude[0],)
+        options = ScanOptions(exclude=exclude)
+
+        posix = _posix_scanner().scan(tmpdir, options).unwrap()
+        subtree = _subtree_scanner().scan(tmpdir, options).unwrap()
+
+        assert posix.stats.excluded > 0
+        assert subtree.stats == posix.stats
+        assert subtree.root.disk_usage == posix.root.disk_usage
+
+
+@pytest.mark.parametrize("aggregate", [("**/s1/**",), ("**/d*/s1",)])
+def test_subtree_scanner_aggregate_matches_posix_scanner(aggregate: tuple[str, ...]) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+        options = ScanOptions(aggregate=aggregate)
+
+        full = _posix_scanner().scan(tmpdir, ScanOptions()).unwrap()
+        posix = _posix_scanner().scan(tmpdir, options).unwrap()
+        subtree = _subtree_scanner().scan(tmpdir, options).unwrap()
+
+        assert posix.stats == full.stats
+        assert subtree.stats == full.stats
+        assert subtree.root.disk_usage == posix.root.disk_usage == full.root.disk_usage
+        s1 = next(c for c in next(c for c in subtree.root.children if c.name == "d3").children if c.name == "s1")
+        assert [(c.kind, c.name) for c in s1.children] == [(NodeKind.AGGREGATE, "[10 files, 1 dirs]")]
+
+
+def _pipeline_scanner(io_threads: int = 4, builders: int = 1) -> PipelinedScanner:
+    return PipelinedScanner(io_threads=io_threads, builders=builders)
+
+
+@pytest.mark.parametrize(("io_threads", "builders"), [(1, 1), (4, 1), (3, 2)])
+@pytest.mark.parametrize("options", [ScanOptions(), ScanOptions(max_depth=1), ScanOptions(aggregate=("**/s1",))])
+def test_pipeline_scanner_matches_posix_scanner(io_threads: int, builders: int, options: ScanOptions) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+
+        posix = _posix_scanner().scan(tmpdir, options).unwrap()
+        pipeline = _pipeline_scanner(io_threads, builders).scan(tmpdir, options).unwrap()
+
+        assert pipeline.stats == posix.stats
+        assert pipeline.root == posix.root
+        assert pipeline.pipeline is not None
+        assert (pipeline.pipeline.io_threads, pipeline.pipeline.builders) == (io_threads, builders)
+        if options == ScanOptions():
+            # Every directory is handed over exactly once.
+            assert pipeline.pipeline.batches == posix.stats.directories
+
+
+def test_dir_reader_hands_over_batches() -> None:
+    from dux._walker import DirReader, build_batch_nodes
+    from dux.services.tree import LEAF_CHILDREN
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+        reader = DirReader(2)
+        reader.submit(os.path.join(tmpdir, "d0", "s0"), "read")
+        reader.submit(os.path.join(tmpdir, "missing"), "missing")
+        reader.submit(tmpdir, "skipped", read=False)
+
+        taken = {}
+        for _ in range(3):
+            item = reader.take()
+            assert item is not None
+            token, batch = item
+            taken[token] = batch
+        assert taken["skipped"] is None
+        assert reader.pending == 0
+
+        parent = ScanNode("s0", NodeKind.DIRECTORY, 0, 0, [])
+        dirs, files, dir_count, errors = build_batch_nodes(
+            taken["read"], parent, LEAF_CHILDREN, NodeKind.DIRECTORY, NodeKind.FILE, ScanNode
+        )
+        assert len(taken["read"]) == 11
+        assert ([d.name for d in dirs], files, dir_count, errors) == (["leaf"], 10, 1, 0)
+        assert len(parent.children) == 11
+        missing = ScanNode("missing", NodeKind.DIRECTORY, 0, 0, [])
+        _, *counts = build_batch_nodes(
+            taken["missing"], missing, LEAF_CHILDREN, NodeKind.DIRECTORY, NodeKind.FILE, ScanNode
+        )
+        assert counts == [0, 0, 1]
+
+        assert reader.stats()[0] == 3
+        reader.close()
+        assert reader.take() is None
+
+
+def test_aggregate_subtree_totals() -> None:
+    from dux._walker import aggregate_subtree
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+        full = _posix_scanner().scan(tmpdir, ScanOptions()).unwrap()
+
+        size, disk_usage, files, dirs, errs, skipped, mounts = aggregate_subtree(tmpdir)
+        assert (size, disk_usage) == (full.root.size_bytes, full.root.disk_usage)
+        assert (files, dirs) == (full.stats.files, full.stats.directories - 1)
+        assert (errs, skipped, mounts) == (0, 0, [])
+
+        _, _, files, dirs, _, skipped, _ = aggregate_subtree(tmpdir, -1, ("leaf",))
+        assert (files, dirs, skipped) == (120, 16, 12)
+
+        # Every subdirectory looks like a mount point: none is entered.
+        _, _, files, dirs, _, _, mounts = aggregate_subtree(tmpdir, os.lstat(tmpdir).st_dev + 1)
+        assert (files, dirs) == (0, 4)
+        assert sorted(mounts) == [os.path.join(tmpdir, f"d{d}") for d in range(4)]
+
+
+def _tree_scanners() -> list[Callable[[], ThreadedScannerBase]]:
+    from dux.scan.python_scanner import PythonScanner
+
+    scanners: list[Callable[[], ThreadedScannerBase]] = [
+        PythonScanner,
+        _posix_scanner,
+        _openat_scanner,
+        _subtree_scanner,
+        _pipeline_scanner,
+    ]
+    if sys.platform == "linux":
+        scanners.append(_getdents_scanner)
+    return scanners
+
+
+@pytest.mark.parametrize("split", [0, 1])
+@pytest.mark.parametrize("make_scanner", _tree_scanners())
+def test_one_file_system_skips_other_devices(
+    monkeypatch: pytest.MonkeyPatch, make_scanner: Callable[[], ThreadedScannerBase], split: int
+) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+        scanner = make_scanner()
+        # A root "device" no directory is on: every subdirectory is a mount point.
+        other_dev = os.lstat(tmpdir).st_dev + 1
+        monkeypatch.setattr(scanner, "_device", lambda path: other_dev)
+
+        options = ScanOptions(one_file_system=True, split_dir_entries=split)
+        snapshot = scanner.scan(tmpdir, options).unwrap()
+
+        assert snapshot.skipped_mounts == tuple(os.path.join(tmpdir, f"d{d}") for d in range(4))
+        assert sorted(c.name for c in snapshot.root.children) == ["d0", "d1", "d2", "d3"]
+        assert all(c.children == [] for c in snapshot.root.children)
+        assert (snapshot.stats.files, snapshot.stats.directories) == (0, 5)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        ScanOptions(exclude=("**/s1/**",)),
+        ScanOptions(exclude=("d1/**",)),
+        ScanOptions(aggregate=("d1/**",), max_depth=0),
+        ScanOptions(aggregate=("s1/**",)),
+    ],
+)
+@pytest.mark.parametrize("make_scanner", _tree_scanners())
+def test_path_rules_match_python_scanner(make_scanner: Callable[[], ThreadedScannerBase], options: ScanOptions) -> None:
+    from dux.scan.python_scanner import PythonScanner
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+
+        expected = PythonScanner().scan(tmpdir, options).unwrap()
+        snapshot = make_scanner().scan(tmpdir, options).unwrap()
+
+        assert snapshot.stats == expected.stats
+        assert snapshot.root.disk_usage == expected.root.disk_usage
+
+
+def _split_scanners() -> list[Callable[[], ThreadedScannerBase]]:
+    scanners: list[Callable[[], ThreadedScannerBase]] = [_posix_scanner, _openat_scanner, _getdents_scanner]
+    if _uring_available():
+        from dux._walker import scan_dir_uring_nodes
+        from dux.scan.native_scanner import UringScanner
+
+        scanners.append(lambda: UringScanner(scan_dir_uring_nodes))
+    return scanners
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+@pytest.mark.parametrize("scheduler", [ScanScheduler.FIFO, ScanScheduler.WORK_STEALING])
+@pytest.mark.parametrize("make_scanner", _split_scanners())
+def test_split_directories_match_unsplit(
+    make_scanner: Callable[[], ThreadedScannerBase], scheduler: ScanScheduler
+) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+        os.symlink("d0", os.path.join(tmpdir, "d1", "link"))
+
+        whole = make_scanner().scan(tmpdir, ScanOptions(scheduler=scheduler)).unwrap()
+        split = make_scanner().scan(tmpdir, ScanOptions(scheduler=scheduler, split_dir_entries=3)).unwrap()
+
+        assert split.stats == whole.stats
+        assert split.root == whole.root
+
+
+def _entries(root: ScanNode) -> list[tuple[str, NodeKind, int, int]]:
+    return sorted((n.path, n.kind, n.size_bytes, n.disk_usage) for n in iter_nodes(root))
+
+
+def _inode_order_scanners() -> list[Callable[[], ThreadedScannerBase]]:
+    scanners: list[Callable[[], ThreadedScannerBase]] = [
+        _posix_scanner,
+        _openat_scanner,
+        _subtree_scanner,
+        _pipeline_scanner,
+    ]
+    if sys.platform == "linux":
+        scanners.append(_getdents_scanner)
+    return scanners
+
+
+@pytest.mark.parametrize("split", [0, 3])
+@pytest.mark.parametrize("make_scanner", _inode_order_scanners())
+def test_inode_order_matches_directory_order(make_scanner: Callable[[], ThreadedScannerBase], split: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+        os.symlink("d0", os.path.join(tmpdir, "d1", "link"))
+
+        plain = make_scanner().scan(tmpdir, ScanOptions(inode_order=False, split_dir_entries=split)).unwrap()
+        ordered = make_scanner().scan(tmpdir, ScanOptions(inode_order=True, split_dir_entries=split)).unwrap()
+
+        assert not plain.inode_order
+        assert ordered.inode_order
+        assert ordered.stats == plain.stats
+        # Equal-sized siblings keep their read order, which differs here.
+        assert _entries(ordered.root) == _entries(plain.root)
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+def test_list_dir_stats_chunks_in_inode_order() -> None:
+    from dux._walker import build_batch_nodes, list_dir, stat_batch
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(50):
+            with open(os.path.join(tmpdir, f"f{i}"), "wb") as f:
+                f.write(b"x" * i)
+        listing = {entry.name: entry.inode() for entry in os.scandir(tmpdir)}
+        lowest = set(sorted(listing.values())[:10])
+
+        # Stat only the first chunk: exactly the 10 lowest inodes get sized.
+        batch = list_dir(tmpdir, 1, False, None, True)
+        assert batch.pending == 50
+        assert stat_batch(batch, 0, 10) == 0
+        parent = ScanNode("root", NodeKind.DIRECTORY, 0, 0, [])
+        _, files, _, errs = build_batch_nodes(batch, parent, (), NodeKind.DIRECTORY, NodeKind.FILE, ScanNode)
+
+        assert (files, errs) == (10, 40)
+        # The nodes keep the listing order.
+        assert [c.name for c in parent.children] == [name for name, ino in listing.items() if ino in lowest]
+
+
+def test_scan_dir_columns() -> None:
+    from array import array
+
+    from dux._walker import scan_dir_columns
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_wide_tree(tmpdir)
+        directory = os.path.join(tmpdir, "d1", "s2")
+        parent = ScanNode("s2", NodeKind.DIRECTORY, 0, 0, [])
+        _posix_scanner()._scan_dir(parent, directory)
+        expected = {c.name: (c.size_bytes, c.disk_usage, c.is_dir) for c in parent.children}
+
+        columns = scan_dir_columns(directory)
+        offsets = columns.name_offsets.tolist()
+        names = bytes(columns.names)
+        sizes = array("q", columns.sizes)
+        found = {
+            os.fsdecode(names[offsets[i] : offsets[i + 1]]): (sizes[i], columns.disk_usage[i], columns.kinds[i] == 0)
+            for i in range(len(columns))
+        }
+
+        assert found == expected
+        assert len(offsets) == len(columns) + 1 == 12
+        assert (columns.sizes.format, columns.kinds.format, columns.names.format) == ("q", "b", "B")
+        assert columns.sizes.readonly and columns.sizes.c_contiguous
+        assert columns.errors == 0
+
+        missing = scan_dir_columns(os.path.join(tmpdir, "missing"))
+        assert (len(missing), missing.errors, missing.name_offsets.tolist()) == (0, 1, [0])
+
+
+def test_inode_set() -> None:
+    from dux._walker import InodeSet
+
+    inodes = InodeSet()
+    assert inodes.add(1, 42)
+    assert not inodes.add(1, 42)
+    assert inodes.add(2, 42)
+    # Enough keys to grow every shard several times.
+    assert all(inodes.add(3, ino) for ino in range(20_000))
+    assert len(inodes) == 20_002
+    assert inodes.duplicates == 1
+
+
+def test_native_node_type() -> None:
+    from dux._walker import Node, scan_dir_nodes
+
+    leaf = ScanNode("f", NodeKind.FILE, 2**40, 4096, ())  # type: ignore[arg-type]
+    root = ScanNode(name="r", kind=NodeKind.DIRECTORY, size_bytes=0, disk_usage=0, children=[leaf], path="/r")
+    assert isinstance(root, Node)
+    assert leaf.parent is root and root.parent is None
+    assert (leaf.path, leaf.size_bytes, leaf.is_dir) == ("/r/f", 2**40, False)
+    root.size_bytes += leaf.size_bytes
+    assert root.size_bytes == 2**40
+    assert root == ScanNode("r", NodeKind.DIRECTORY, 2**40, 0, [ScanNode("f", NodeKind.FILE, 2**40, 4096, ())])  # type: ignore[arg-type]
+    assert (
+        repr(leaf)
+        == "ScanNode(name='f', kind=<NodeKind.FILE: 'file'>, size_bytes=1099511627776, disk_usage=4096, children=())"
+    )
+    with pytest.raises(TypeError):
+        hash(root)
+
+    with tempfile.TemporaryDirectory() as tmpdir, pytest.raises(TypeError, match="subclass of Node"):
+        scan_dir_nodes(tmpdir, root, (), NodeKind.DIRECTORY, NodeKind.FILE, object)  # type: ignore[arg-type]
+
+
+def _native_name_table(capacity: int) -> object:
+    from dux._walker import NameTable
+
+    return NameTable(capacity)
+
+
+@pytest.mark.parametrize("make_table", [_native_name_table, _PyNameTable])
+def test_name_table(make_table: Callable[[int], object]) -> None:
+    table = make_table(64)
+    # Distinct str objects, not the one constant: interning must share them.
+    first = table.intern("s" + "rc".strip())  # type: ignore[attr-defined]
+    assert table.intern("s" + "rc".strip()) is first  # type: ignore[attr-defined]
+    assert (table.hits, table.misses, table.capacity, len(table)) == (1, 1, 64, 1)  # type: ignore[attr-defined]
+    # Bounded: colliding names replace each other instead of growing the table.
+    for i in range(1_000):
+        table.intern(f"name-{i}")  # type: ignore[attr-defined]
+    assert len(table) <= 64  # type: ignore[arg-type]
+    # Names that are too long are returned as they are, never stored.
+    long_name = "x" * 200
+    assert table.intern(long_name) is long_name  # type: ignore[attr-defined]
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+@pytest.mark.parametrize("make_scanner", [_posix_scanner, _getdents_scanner, _subtree_scanner, _pipeline_scanner])
+def test_repeated_names_are_shared(make_scanner: Callable[[], ThreadedScannerBase]) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for sub in ("a", "b", "c"):
+            os.makedirs(os.path.join(tmpdir, sub, "src"))
+        snapshot = make_scanner().scan(tmpdir, ScanOptions()).unwrap()
+        names = [child.children[0].name for child in snapshot.root.children]
+        assert names == ["src"] * 3
+        assert len({id(name) for name in names}) == 1
+
+
+def _make_linked_tree(tmpdir: str) -> None:
+    """Three links to one 4000-byte file plus one unlinked file, in two directories."""
+    for sub in ("store", "app"):
+        os.makedirs(os.path.join(tmpdir, sub))
+    store = os.path.join(tmpdir, "store", "pkg.bin")
+    with open(store, "wb") as f:
+        f.write(b"x" * 4000)
+    os.link(store, os.path.join(tmpdir, "app", "pkg.bin"))
+    os.link(store, os.path.join(tmpdir, "app", "pkg-copy.bin"))
+    with open(os.path.join(tmpdir, "app", "own.bin"), "wb") as f:
+        f.write(b"y" * 10)
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+@pytest.mark.parametrize(
+    "make_scanner", [_posix_scanner, _openat_scanner, _getdents_scanner, _subtree_scanner, _pipeline_scanner]
+)
+def test_hard_links_counted_once(make_scanner: Callable[[], ThreadedScannerBase]) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_linked_tree(tmpdir)
+
+        snapshot = make_scanner().scan(tmpdir, ScanOptions()).unwrap()
+        assert snapshot.stats.files == 4
+        assert snapshot.stats.hardlinks == 2
+        assert snapshot.root.size_bytes == 4010
+
+        counted = make_scanner().scan(tmpdir, ScanOptions(count_links=True)).unwrap()
+        assert counted.stats.hardlinks == 0
+        assert counted.root.size_bytes == 12010
+
+        summed = make_scanner().scan(tmpdir, ScanOptions(max_depth=0)).unwrap()
+        assert summed.stats.hardlinks == 2
+        assert summed.root.size_bytes == 4010
+
+
+def test_aggregate_subtree_counts_links_once() -> None:
+    from dux._walker import InodeSet, aggregate_subtree
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _make_linked_tree(tmpdir)
+        inodes = InodeSet()
+        size, _, files, _, _, _, _ = aggregate_subtree(tmpdir, -1, (), inodes)
+        assert (size, files, inodes.duplicates) == (4010, 4, 2)
+        assert aggregate_subtree(tmpdir)[0] == 12010
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from pathlib import Path
+from typing import override
+
+from result import Err, Ok
+
+from dux.config.defaults import default_config
+from dux.models.enums import NodeKind
+from dux.models.scan import CancelCheck, ProgressCallback, ScanErrorCode, ScanNode, ScanOptions, ScanResult, ScanStats
+from dux.scan import PythonScanner
+from dux.scan.process_scanner import ProcessPoolScanner, _decode_into, _encode
+from dux.services.insights import generate_insights
+from dux.services.tree import aggregate_node, iter_nodes
+from tests.factories import make_dir, make_file
+
+
+def _write(path: Path, size: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+
+
+def _make_tree(root: Path) -> None:
+    _write(root / "top.bin", 10)
+    for idx in range(3):
+        _write(root / f"proj{idx}" / "src" / "main.py", 100 + idx)
+        _write(root / f"proj{idx}" / "node_modules" / "pkg" / "index.js", 300)
+        _write(root / f"proj{idx}" / "__pycache__" / "main.cpython-313.pyc", 50)
+        _write(root / f"proj{idx}" / "deep" / "a" / "b" / "c.txt", 7)
+    (root / "empty").mkdir()
+
+
+def _shape(root: ScanNode) -> list[tuple[str, int, int]]:
+    return sorted((n.path, n.size_bytes, len(n.children)) for n in iter_nodes(root))
+
+
+def _pool(**kwargs: object) -> ProcessPoolScanner:
+    return ProcessPoolScanner(processes=2, threads=2, factory=PythonScanner, **kwargs)  # type: ignore[arg-type]
+
+
+class TestShardEncoding:
+    def test_round_trip(self) -> None:
+        tree = make_dir(
+            "/r/a",
+            du=6,
+            children=[
+                make_dir("/r/a/b", du=5, children=[make_file("/r/a/b/x", 2), make_file("/r/a/b/y", 3)]),
+                make_dir("/r/a/empty"),
+                make_file("/r/a/z", 1),
+            ],
+        )
+        shard = _encode(tree, ScanStats(files=3, directories=3), None)
+        target = make_dir("/r/a")
+        _decode_into(target, shard)
+
+        assert _shape(target) == _shape(tree)
+        assert shard.directories == 2
+        assert [c.name for c in target.children] == ["b", "empty", "z"]
+
+
+def test_matches_threaded_scan(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    expected = PythonScanner(workers=2).scan(str(tmp_path), ScanOptions())
+    result = _pool().scan(str(tmp_path), ScanOptions())
+
+    assert isinstance(expected, Ok) and isinstance(result, Ok)
+    assert result.unwrap().stats == expected.unwrap().stats
+    assert _shape(result.unwrap().root) == _shape(expected.unwrap().root)
+
+
+def test_precomputed_insights_match(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+    config = default_config()
+
+    expected = PythonScanner(workers=2).scan(str(tmp_path), ScanOptions())
+    result = _pool(config=config).scan(str(tmp_path), ScanOptions())
+    assert isinstance(expected, Ok) and isinstance(result, Ok)
+    snapshot = result.unwrap()
+    assert snapshot.subtree_insights
+
+    want = generate_insights(expected.unwrap().root, config)
+    got = generate_insights(snapshot.root, config, snapshot.subtree_insights)
+
+    assert [(i.path, i.category, i.disk_usage) for i in got.insights] == [
+        (i.path, i.category, i.disk_usage) for i in want.insights
+    ]
+    for cat, stats in want.by_category.items():
+        assert got.by_category[cat].count == stats.count
+        assert got.by_category[cat].paths == stats.paths
+
+
+def test_max_depth_respected(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    for depth in (0, 1, 2, 3):
+        expected = PythonScanner(workers=2).scan(str(tmp_path), ScanOptions(max_depth=depth))
+        result = _pool().scan(str(tmp_path), ScanOptions(max_depth=depth))
+        assert isinstance(expected, Ok) and isinstance(result, Ok)
+        assert _shape(result.unwrap().root) == _shape(expected.unwrap().root), depth
+
+
+def test_missing_root_returns_error(tmp_path: Path) -> None:
+    result = _pool().scan(os.path.join(tmp_path, "missing"), ScanOptions())
+
+    assert isinstance(result, Err)
+    assert result.unwrap_err().code is ScanErrorCode.NOT_FOUND
+
+
+def test_cancellation_respected(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    result = _pool().scan(str(tmp_path), ScanOptions(), cancel_check=lambda: True)
+
+    assert isinstance(result, Err)
+    assert result.unwrap_err().code is ScanErrorCode.CANCELLED
+
+
+class _StuckShardScanner(PythonScanner):
+    """Scans normally in the parent; hangs in the worker processes."""
+
+    @override
+    def scan(
+        self,
+        path: str,
+        options: ScanOptions,
+        progress_callback: ProgressCallback | None = None,
+        cancel_check: CancelCheck | None = None,
+    ) -> ScanResult:
+        if multiprocessing.parent_process() is not None:
+            time.sleep(60)
+        return super().scan(path, options, progress_callback, cancel_check)
+
+
+def test_cancellation_does_not_wait_for_running_shards(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+    pool = ProcessPoolScanner(processes=2, threads=1, factory=_StuckShardScanner)
+    deadline = time.monotonic() + 1.0
+
+    start = time.monotonic()
+    result = pool.scan(
+        str(tmp_path), ScanOptions(partial_on_cancel=True), cancel_check=lambda: time.monotonic() > deadline
+    )
+
+    assert time.monotonic() - start < 10
+    assert result.unwrap().partial
+
+
+def test_aggregate_patterns_match_threaded_scan(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+    options = ScanOptions(aggregate=("**/node_modules/**", "**/proj1/**"))
+
+    expected = PythonScanner(workers=2).scan(str(tmp_path), options)
+    result = _pool().scan(str(tmp_path), options)
+
+    assert isinstance(expected, Ok) and isinstance(result, Ok)
+    assert result.unwrap().stats == expected.unwrap().stats
+    assert _shape(result.unwrap().root) == _shape(expected.unwrap().root)
+
+
+def test_shard_encoding_keeps_aggregate_leaves() -> None:
+    tree = make_dir("/r/a", du=9)
+    tree.children = [aggregate_node(tree, 9, 9, files=3, dirs=1)]
+    target = make_dir("/r/a")
+    _decode_into(target, _encode(tree, ScanStats(files=3, directories=2), None))
+
+    assert [(c.kind, c.name, c.disk_usage) for c in target.children] == [(NodeKind.AGGREGATE, "[3 files, 1 dirs]", 9)]
+
+
+def test_partial_on_cancel_returns_listed_levels(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    result = _pool().scan(str(tmp_path), ScanOptions(partial_on_cancel=True), cancel_check=lambda: True)
+
+    snapshot = result.unwrap()
+    assert snapshot.partial
+    assert all(path.startswith(str(tmp_path) + "/") for path in snapshot.unscanned)
+    assert snapshot.stats.files == 1
+
+
+def test_entry_budget_returns_partial_tree(tmp_path: Path) -> None:
+    _make_tree(tmp_path)
+
+    snapshot = _pool().scan(str(tmp_path), ScanOptions(max_entries=1)).unwrap()
+
+    assert snapshot.partial
+    assert snapshot.stats.files < 13
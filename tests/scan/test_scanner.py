@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+from dataclasses import replace
+
 from result import Err, Ok
 
-from dux.models.scan import ScanErrorCode, ScanOptions
+from dux.models.enums import NodeKind, ScanScheduler
+from dux.models.packed import PackedNode
+from dux.models.scan import ScanErrorCode, ScanNode, ScanOptions
 from dux.scan import PythonScanner
+from dux.services.tree import iter_nodes, top_nodes
 from tests.fs_mock import MemoryFileSystem
 
 
@@ -26,6 +31,21 @@ def test_scanner_returns_valid_results() -> None:
     assert snapshot.root.size_bytes == 224
 
 
+def test_nodes_link_parents_without_storing_paths() -> None:
+    fs = MemoryFileSystem().add_dir("/root").add_dir("/root/sub").add_file("/root/sub/nested.bin", size=64)
+
+    result = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions())
+
+    assert isinstance(result, Ok)
+    root = result.unwrap().root
+    assert isinstance(root, ScanNode)
+    (sub,) = root.children
+    (nested,) = sub.children
+    assert nested.parent is sub and sub.parent is root and root.parent is None
+    assert sub._path is None and nested._path is None
+    assert nested.path == "/root/sub/nested.bin"
+
+
 def test_missing_path_returns_error() -> None:
     fs = MemoryFileSystem()
 
@@ -67,8 +87,18 @@ def test_max_depth_respected() -> None:
     assert isinstance(result, Ok)
     snapshot = result.unwrap()
 
+    # lvl1 is below max_depth: summarized into a single aggregate leaf.
     lvl1 = next(child for child in snapshot.root.children if child.name == "lvl1")
+    assert [(c.kind, c.size_bytes) for c in lvl1.children] == [(NodeKind.AGGREGATE, 20)]
+    assert lvl1.children[0].name == "[1 files, 1 dirs]"
+    assert snapshot.root.size_bytes == 20
+    assert (snapshot.stats.files, snapshot.stats.directories) == (1, 3)
+
+    result = PythonScanner(workers=1, fs=fs).scan("/root", ScanOptions(max_depth=0, aggregate_below_depth=False))
+    assert isinstance(result, Ok)
+    lvl1 = next(child for child in result.unwrap().root.children if child.name == "lvl1")
     assert lvl1.children == []
+    assert result.unwrap().root.size_bytes == 0
 
 
 def test_access_error_counted() -> None:
@@ -130,3 +160,193 @@ def test_cancellation_respected() -> None:
     error = result.unwrap_err()
     assert error.code is ScanErrorCode.CANCELLED
     assert "cancel" in error.message.lower()
+
+
+def _make_branchy_fs() -> MemoryFileSystem:
+    fs = MemoryFileSystem().add_dir("/root")
+    for idx in range(6):
+        fs.add_dir(f"/root/d{idx}")
+        for jdx in range(4):
+            fs.add_dir(f"/root/d{idx}/s{jdx}")
+            for kdx in range(3):
+                fs.add_file(f"/root/d{idx}/s{jdx}/f{kdx}.bin", size=idx + jdx + kdx + 1)
+    return fs
+
+
+def test_work_stealing_matches_fifo() -> None:
+    fs = _make_branchy_fs()
+
+    fifo = PythonScanner(workers=4, fs=fs).scan("/root", ScanOptions())
+    steal = PythonScanner(workers=4, fs=fs).scan("/root", ScanOptions(scheduler=ScanScheduler.WORK_STEALING))
+
+    assert isinstance(fifo, Ok) and isinstance(steal, Ok)
+    assert steal.unwrap().stats == fifo.unwrap().stats
+    assert steal.unwrap().root.size_bytes == fifo.unwrap().root.size_bytes
+    assert steal.unwrap().stats.files == 72
+
+
+def test_work_stealing_max_depth_respected() -> None:
+    fs = _make_branchy_fs()
+
+    result = PythonScanner(workers=3, fs=fs).scan(
+        "/root", ScanOptions(max_depth=0, scheduler=ScanScheduler.WORK_STEALING)
+    )
+    assert isinstance(result, Ok)
+    snapshot = result.unwrap()
+    assert snapshot.stats.files == 72
+    assert all(
+        [c.kind for c in child.children] == [NodeKind.AGGREGATE] for child in snapshot.root.children if child.is_dir
+    )
+
+
+def test_work_stealing_cancellation_respected() -> None:
+    fs = _make_branchy_fs()
+    calls = 0
+
+    def cancel() -> bool:
+        nonlocal calls
+        calls += 1
+        return calls > 2
+
+    result = PythonScanner(workers=4, fs=fs).scan(
+        "/root", ScanOptions(scheduler=ScanScheduler.WORK_STEALING), cancel_check=cancel
+    )
+    assert isinstance(result, Err)
+    assert result.unwrap_err().code is ScanErrorCode.CANCELLED
+
+
+def test_one_file_system_skips_mount_points() -> None:
+    fs = (
+        MemoryFileSystem()
+        .add_dir("/root")
+        .add_file("/root/local/a.bin", size=10)
+        .add_dir("/root/mnt", dev=7)
+        .add_file("/root/mnt/remote.bin", size=1000)
+    )
+
+    result = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions(one_file_system=True))
+    assert isinstance(result, Ok)
+    snapshot = result.unwrap()
+    assert snapshot.skipped_mounts == ("/root/mnt",)
+    assert snapshot.stats.files == 1
+    assert snapshot.root.size_bytes == 10
+    mnt = next(child for child in snapshot.root.children if child.name == "mnt")
+    assert mnt.children == []
+
+    crossing = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions())
+    assert isinstance(crossing, Ok)
+    assert crossing.unwrap().skipped_mounts == ()
+    assert crossing.unwrap().stats.files == 2
+
+
+def test_exclude_prunes_and_counts() -> None:
+    fs = (
+        MemoryFileSystem()
+        .add_dir("/root")
+        .add_file("/root/keep/a.bin", size=10)
+        .add_file("/root/keep/b.iso", size=500)
+        .add_file("/root/.snapshot/old/c.bin", size=1000)
+    )
+
+    for scheduler in ScanScheduler:
+        options = ScanOptions(exclude=("**/.snapshot", "**/*.iso"), scheduler=scheduler)
+        result = PythonScanner(workers=2, fs=fs).scan("/root", options)
+        assert isinstance(result, Ok)
+        snapshot = result.unwrap()
+        assert snapshot.stats.excluded == 2
+        assert snapshot.stats.files == 1
+        assert snapshot.root.size_bytes == 10
+        assert [child.name for child in snapshot.root.children] == ["keep"]
+
+
+def test_aggregate_patterns_summarize_matching_dirs() -> None:
+    fs = (
+        MemoryFileSystem()
+        .add_dir("/root")
+        .add_file("/root/app/main.js", size=10)
+        .add_file("/root/app/node_modules/a/index.js", size=100)
+        .add_file("/root/app/node_modules/a/lib/util.js", size=50)
+        .add_file("/root/app/node_modules/b/index.js", size=7)
+    )
+
+    full = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions())
+    result = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions(aggregate=("**/node_modules/**",)))
+    assert isinstance(full, Ok) and isinstance(result, Ok)
+    snapshot = result.unwrap()
+
+    assert snapshot.stats == full.unwrap().stats
+    assert snapshot.root.size_bytes == 167
+    app = snapshot.root.children[0]
+    modules = next(child for child in app.children if child.name == "node_modules")
+    assert modules.size_bytes == 157
+    assert [(c.kind, c.name) for c in modules.children] == [(NodeKind.AGGREGATE, "[3 files, 3 dirs]")]
+
+
+def test_hard_links_counted_once() -> None:
+    fs = (
+        MemoryFileSystem()
+        .add_dir("/root")
+        .add_file("/root/store/pkg.tgz", size=100)
+        .add_link("/root/app1/pkg.tgz", "/root/store/pkg.tgz")
+        .add_link("/root/app2/pkg.tgz", "/root/store/pkg.tgz")
+        .add_file("/root/app2/own.bin", size=5)
+    )
+
+    result = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions())
+    assert isinstance(result, Ok)
+    snapshot = result.unwrap()
+    assert snapshot.stats.files == 4
+    assert snapshot.stats.hardlinks == 2
+    assert snapshot.root.size_bytes == 105
+
+    counted = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions(count_links=True))
+    assert isinstance(counted, Ok)
+    assert counted.unwrap().stats.hardlinks == 0
+    assert counted.unwrap().root.size_bytes == 305
+
+    # Aggregated subtrees share the scan's inode set.
+    summed = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions(aggregate=("**/app2",)))
+    assert isinstance(summed, Ok)
+    assert summed.unwrap().root.size_bytes == 105
+
+
+def test_packed_tree_matches_scan_nodes() -> None:
+    fs = _make_branchy_fs().add_file("/root/app/node_modules/x/y.js", size=9)
+
+    def shape(options: ScanOptions) -> list[tuple[str, NodeKind, int]]:
+        result = PythonScanner(workers=3, fs=fs).scan("/root", options)
+        assert isinstance(result, Ok)
+        root = result.unwrap().root
+        assert isinstance(root, PackedNode) is options.packed
+        return sorted((n.path, n.kind, n.size_bytes) for n in iter_nodes(root))
+
+    for scheduler in ScanScheduler:
+        for options in (ScanOptions(), ScanOptions(max_depth=1), ScanOptions(aggregate=("**/node_modules",))):
+            options.scheduler = scheduler
+            expected = shape(options)
+            assert shape(replace(options, packed=True)) == expected
+
+
+def test_streaming_keeps_directories_and_top_files() -> None:
+    fs = _make_branchy_fs().add_file("/root/top.bin", size=7)
+
+    full = PythonScanner(workers=3, fs=fs).scan("/root", ScanOptions()).unwrap()
+    assert full.top_files is None
+    usage = {n.path: n.disk_usage for n in iter_nodes(full.root)}
+    expected = [n.disk_usage for n in top_nodes(full.root, 5, NodeKind.FILE)]
+
+    for packed in (False, True):
+        options = ScanOptions(stream_top_files=5, packed=packed)
+        streamed = PythonScanner(workers=3, fs=fs).scan("/root", options).unwrap()
+        assert streamed.top_files is not None
+        assert [n.disk_usage for n in streamed.top_files] == expected
+        assert all(usage[n.path] == n.disk_usage for n in streamed.top_files)
+        assert streamed.stats == full.stats
+        dirs = [n for n in iter_nodes(streamed.root) if n.is_dir]
+        assert len(dirs) == 31
+        assert all(usage[n.path] == n.disk_usage for n in dirs)
+        # Only the root keeps its file nodes; below it each directory's
+        # files are one AGGREGATE child.
+        assert [n.path for n in iter_nodes(streamed.root) if n.kind is NodeKind.FILE] == ["/root/top.bin"]
+        leaf_dir = next(n for n in dirs if n.path == "/root/d5/s3")
+        assert [(c.kind, c.disk_usage) for c in leaf_dir.children] == [(NodeKind.AGGREGATE, usage["/root/d5/s3"])]
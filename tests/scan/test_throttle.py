@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from typing import override
+
+import pytest
+
+from dux.models.enums import IoClass
+from dux.models.scan import ScanOptions
+from dux.scan import PythonScanner
+from dux.scan._throttle import TokenBucket
+from dux.services.fs import DirEntry
+from tests.fs_mock import MemoryFileSystem
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket:
+    def test_burst_is_free_then_debt_is_waited_out(self) -> None:
+        clock = _FakeClock()
+        bucket = TokenBucket(100, burst=100, clock=clock, sleep=clock.sleep)
+        bucket.charge(100)
+        assert bucket.wait() == 0.0
+        bucket.charge(50)
+        assert bucket.wait() == 0.5
+        assert bucket.wait() == 0.0
+        assert clock.slept == [0.5]
+
+    def test_refill_is_capped_at_burst(self) -> None:
+        clock = _FakeClock()
+        bucket = TokenBucket(10, burst=5, clock=clock, sleep=clock.sleep)
+        clock.now += 60
+        bucket.charge(15)
+        assert bucket.wait() == 1.0
+
+    def test_usage_reports_effective_rate(self) -> None:
+        clock = _FakeClock()
+        bucket = TokenBucket(10, burst=0, clock=clock, sleep=clock.sleep)
+        for _ in range(4):
+            bucket.wait()
+            bucket.charge(5)
+        bucket.wait()
+        usage = bucket.usage()
+        assert usage.limit == 10
+        assert usage.operations == 20
+        assert usage.waited == 2.0
+        assert usage.rate == 10.0
+
+
+class TestThrottledScan:
+    def test_scan_reports_budget_and_matches_plain_scan(self) -> None:
+        fs = MemoryFileSystem()
+        for i in range(5):
+            fs.add_file(f"/root/d{i}/f.txt", size=10)
+        plain = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions()).unwrap()
+        snapshot = PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions(max_iops=1_000_000)).unwrap()
+        assert snapshot.root == plain.root
+        assert plain.throttle is None
+        assert snapshot.throttle is not None
+        # Six listings (root and d0-d4) plus their ten entries.
+        assert snapshot.throttle.operations == 16
+        assert snapshot.throttle.limit == 1_000_000
+
+
+class _NiceRecordingFS(MemoryFileSystem):
+    def __init__(self) -> None:
+        super().__init__()
+        self.nice: set[int] = set()
+
+    @override
+    def scandir(self, path: str) -> list[DirEntry]:
+        self.nice.add(os.getpriority(os.PRIO_PROCESS, threading.get_native_id()))
+        return super().scandir(path)
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="per-thread priorities are Linux-only")
+def test_idle_class_lowers_worker_priority() -> None:
+    fs = _NiceRecordingFS()
+    fs.add_file("/root/a/f.txt", size=1)
+    before = os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+    PythonScanner(workers=2, fs=fs).scan("/root", ScanOptions(io_class=IoClass.IDLE)).unwrap()
+    assert fs.nice == {19}
+    assert os.getpriority(os.PRIO_PROCESS, threading.get_native_id()) == before
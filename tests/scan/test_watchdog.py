@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import time
+
+from dux.models.enums import NodeKind
+from dux.models.scan import ScanNode
+from dux.scan._base import Task, _WorkQueue
+from dux.scan._watchdog import Lease, Watchdog
+
+
+def _task(path: str) -> Task:
+    return Task(ScanNode("x", NodeKind.DIRECTORY, 0, 0, path=path), path, 1)
+
+
+class TestWatchdog:
+    def test_expire_takes_only_stale_leases(self) -> None:
+        dog = Watchdog(10.0, lambda lease: None)
+        q = _WorkQueue()
+        old = dog.begin(0, _task("/a"), q)
+        new = dog.begin(1, _task("/b"), q)
+        new.started = old.started + 3
+        assert dog.expire(old.started + 5) == []
+        assert dog.expire(old.started + 11) == [old]
+        assert old.expired
+        assert not dog.end(old)
+        assert dog.end(new)
+
+    def test_ended_lease_never_expires(self) -> None:
+        dog = Watchdog(0.01, lambda lease: None)
+        lease = dog.begin(0, _task("/a"), _WorkQueue())
+        assert dog.end(lease)
+        assert dog.expire(lease.started + 1) == []
+
+    def test_sampler_hands_over_stale_leases(self) -> None:
+        expired: list[Lease] = []
+        dog = Watchdog(0.05, expired.append)
+        lease = dog.begin(0, _task("/hung"), _WorkQueue())
+        dog.start()
+        deadline = time.monotonic() + 2
+        while not expired and time.monotonic() < deadline:
+            time.sleep(0.01)
+        dog.stop()
+        assert expired == [lease]
+        assert not dog.end(lease)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from dux.services.devices import (
+    Mount,
+    device_class,
+    filesystem_type,
+    is_rotational,
+    is_virtio,
+    mount_of,
+    mount_table,
+    prefers_inode_order,
+)
+
+
+def _fake_sysfs(root: Path) -> Path:
+    # /sys/dev/block/8:0 is a spinning disk and 8:1 its partition; 259:0 is an
+    # SSD; 253:0 is a virtio disk, which reports rotational by default.
+    disk = root / "block" / "sda"
+    (disk / "queue").mkdir(parents=True)
+    (disk / "queue" / "rotational").write_text("1\n")
+    (disk / "sda1").mkdir()
+    ssd = root / "block" / "nvme0n1"
+    (ssd / "queue").mkdir(parents=True)
+    (ssd / "queue" / "rotational").write_text("0\n")
+    vda = root / "devices" / "virtio1" / "block" / "vda"
+    (vda / "queue").mkdir(parents=True)
+    (vda / "queue" / "rotational").write_text("1\n")
+    links = root / "dev" / "block"
+    links.mkdir(parents=True)
+    (links / "8:0").symlink_to(disk)
+    (links / "8:1").symlink_to(disk / "sda1")
+    (links / "259:0").symlink_to(ssd)
+    (links / "253:0").symlink_to(vda)
+    return root
+
+
+def test_is_rotational(tmp_path: Path) -> None:
+    sysfs = str(_fake_sysfs(tmp_path))
+    assert is_rotational(os.makedev(8, 0), sysfs)
+    assert is_rotational(os.makedev(8, 1), sysfs)
+    assert not is_rotational(os.makedev(259, 0), sysfs)
+    assert not is_rotational(os.makedev(0, 42), sysfs)
+    assert is_rotational(os.makedev(253, 0), sysfs)
+    assert is_virtio(os.makedev(253, 0), sysfs)
+    assert not is_virtio(os.makedev(8, 0), sysfs)
+
+
+def test_filesystem_type(tmp_path: Path) -> None:
+    mountinfo = tmp_path / "mountinfo"
+    lines = [
+        "22 1 259:0 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw",
+        "40 22 0:42 / /mnt/share rw,relatime shared:20 - nfs4 server:/export rw,vers=4.2",
+    ]
+    mountinfo.write_text("\n".join(lines) + "\n")
+    assert filesystem_type(os.makedev(259, 0), str(mountinfo)) == "ext4"
+    assert filesystem_type(os.makedev(0, 42), str(mountinfo)) == "nfs4"
+    assert filesystem_type(os.makedev(0, 43), str(mountinfo)) is None
+    assert filesystem_type(os.makedev(0, 42), str(tmp_path / "missing")) is None
+
+    sysfs = str(_fake_sysfs(tmp_path / "sys"))
+    assert prefers_inode_order(os.makedev(0, 42), sysfs, str(mountinfo))
+    assert prefers_inode_order(os.makedev(8, 1), sysfs, str(mountinfo))
+    assert not prefers_inode_order(os.makedev(259, 0), sysfs, str(mountinfo))
+    assert not prefers_inode_order(os.makedev(253, 0), sysfs, str(mountinfo))
+
+
+def test_mount_table_and_device_class(tmp_path: Path) -> None:
+    mountinfo = tmp_path / "mountinfo"
+    lines = [
+        "22 1 259:0 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw",
+        "31 22 8:1 / /mnt/old\\040disk rw,relatime shared:9 - xfs /dev/sda1 rw",
+        "40 22 0:42 / /mnt/share rw,relatime shared:20 - nfs4 server:/export rw,vers=4.2",
+        "garbage",
+    ]
+    mountinfo.write_text("\n".join(lines) + "\n")
+    mounts = mount_table(str(mountinfo))
+    assert mounts == [
+        Mount("/", os.makedev(259, 0), "ext4"),
+        Mount("/mnt/old disk", os.makedev(8, 1), "xfs"),
+        Mount("/mnt/share", os.makedev(0, 42), "nfs4"),
+    ]
+    assert mount_table(str(tmp_path / "missing")) == []
+    sysfs = str(_fake_sysfs(tmp_path / "sys"))
+    assert [device_class(m, sysfs) for m in mounts] == ["local", "rotational", "network"]
+
+
+def test_mount_of() -> None:
+    mounts = [
+        Mount("/", 1, "ext4"),
+        Mount("/mnt/share", 2, "nfs4"),
+        Mount("/mnt/share", 3, "cifs"),
+        Mount("/mnt/sharex", 4, "ext4"),
+    ]
+    assert mount_of("/mnt/share/a/b", mounts) == mounts[2]
+    assert mount_of("/mnt/share", mounts) == mounts[2]
+    assert mount_of("/mnt/sharex/a", mounts) == mounts[3]
+    assert mount_of("/home", mounts) == mounts[0]
+    assert mount_of("/home", []) is None
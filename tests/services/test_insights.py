@@ -4,11 +4,26 @@ from dux.config.defaults import default_config
 from dux.models.enums import InsightCategory
 from dux.models.scan import ScanNode
 from dux.services.insights import generate_insights
+from dux.services.tree import aggregate_node
 from tests.factories import make_dir, make_file
 
 
 def _tree_with(*children: ScanNode) -> ScanNode:
-    return make_dir("/root", du=0, children=list(children))
+    """Return "/root" holding *children*, adding the directories in between.
+
+    generate_insights builds paths from names, so the tree must match them.
+    """
+    root = make_dir("/root", du=0)
+    for child in children:
+        parent = root
+        for name in child.path.split("/")[2:-1]:
+            sub = make_dir(f"{parent.path}/{name}")
+            sub.parent = parent
+            parent.children.append(sub)
+            parent = sub
+        child.parent = parent
+        parent.children.append(child)
+    return root
 
 
 def test_temp_analyzer_path_matching_and_threshold_logic() -> None:
@@ -85,3 +100,15 @@ def test_case_insensitive_directory_matching() -> None:
     bundle = generate_insights(_tree_with(node), config)
 
     assert any(item.category is InsightCategory.BUILD_ARTIFACT for item in bundle.insights)
+
+
+def test_aggregate_leaves_are_not_matched() -> None:
+    config = default_config()
+    # "*.log" would match a file of this name; the aggregate leaf is not a path.
+    node = make_dir("/root/src", du=5 * 1024 * 1024)
+    leaf = aggregate_node(node, 5 * 1024 * 1024, 5 * 1024 * 1024, files=4, dirs=0)
+    leaf.name = "x.log"
+    node.children = [leaf]
+    bundle = generate_insights(_tree_with(node), config)
+
+    assert bundle.insights == []
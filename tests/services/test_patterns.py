@@ -13,8 +13,10 @@ from dux.services.patterns import (
     _STARTSWITH,
     _classify,
     _expand_braces,
+    compile_path_rules,
     compile_ruleset,
     match_all,
+    path_matches,
 )
 
 
@@ -536,3 +538,47 @@ def test_case_insensitive_through_pipeline(default_ruleset: CompiledRuleSet) ->
     path = "/A/NODE_MODULES/foo"
     result = match_all(default_ruleset, path.lower(), "foo", is_dir=False, raw_path=path)
     assert any(r.category == InsightCategory.BUILD_ARTIFACT for r in result)
+
+
+# ── compile_path_rules ──────────────────────────────────────────────
+
+
+class TestCompilePathRules:
+    def test_empty_is_none(self) -> None:
+        assert compile_path_rules([]) is None
+
+    def test_plain_names_are_names_only(self) -> None:
+        rules = compile_path_rules(["**/.snapshot", "Node_Modules"])
+        assert rules is not None
+        assert rules.names == frozenset({".snapshot", "node_modules"})
+        assert rules.names_only
+        assert path_matches(rules, "/a/.snapshot", ".snapshot", is_dir=True)
+        assert not path_matches(rules, "/a/snapshot", "snapshot", is_dir=True)
+
+    def test_recursive_dir_pattern_is_name(self) -> None:
+        rules = compile_path_rules(["**/node_modules/**"])
+        assert rules is not None
+        assert rules.names == frozenset({"node_modules"})
+        assert rules.names_only
+        assert path_matches(rules, "/a/node_modules", "node_modules", is_dir=True)
+
+    def test_anchored_dir_pattern_is_not_name(self) -> None:
+        rules = compile_path_rules(["node_modules/**"])
+        assert rules is not None
+        assert rules.names == frozenset()
+        assert not rules.names_only
+        assert not path_matches(rules, "/a/node_modules", "node_modules", is_dir=True)
+
+    def test_glob_pattern(self) -> None:
+        rules = compile_path_rules(["**/*.iso"])
+        assert rules is not None
+        assert not rules.names_only
+        assert path_matches(rules, "/a/b/disk.ISO", "disk.ISO", is_dir=False)
+        assert not path_matches(rules, "/a/b/disk.img", "disk.img", is_dir=False)
+
+    def test_absolute_path(self) -> None:
+        rules = compile_path_rules(["/mnt/backup/"])
+        assert rules is not None
+        assert not rules.names_only
+        assert path_matches(rules, "/mnt/backup", "backup", is_dir=True)
+        assert not path_matches(rules, "/srv/backup", "backup", is_dir=True)
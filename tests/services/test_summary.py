@@ -126,6 +126,42 @@ class TestRenderSummary:
         out = _output(c)
         assert "Top Level Summary" in out
 
+    def test_excluded_count_shown(self) -> None:
+        root = _dir("/r", "root", [], du=0)
+        c = _console()
+        render_summary(c, root, ScanStats(excluded=3), "/r/")
+        assert "excluded" in _output(c)
+
+    def test_hardlink_count_shown(self) -> None:
+        root = _dir("/r", "root", [], du=0)
+        c = _console()
+        render_summary(c, root, ScanStats(hardlinks=2), "/r/")
+        assert "duplicate hard links" in _output(c)
+        c = _console()
+        render_summary(c, root, ScanStats(), "/r/")
+        assert "hard links" not in _output(c)
+
+    def test_skipped_mounts_listed(self) -> None:
+        root = _dir("/r", "root", [], du=0)
+        c = _console()
+        render_summary(c, root, ScanStats(), "/r/", skipped_mounts=("/r/proc", "/r/nfs"))
+        out = _output(c)
+        assert "mount points skipped" in out
+        assert "/r/proc" in out
+        assert "/r/nfs" in out
+
+    def test_partial_scan_marks_lower_bounds(self) -> None:
+        big = _dir("/r/big", "big", [_dir("/r/big/deep", "deep", [], du=0)], du=4096)
+        small = _dir("/r/small", "small", [], du=1024)
+        root = _dir("/r", "root", [big, small], du=5120)
+        c = _console()
+        render_summary(c, root, ScanStats(), "/r/", unscanned=("/r/big/deep",))
+        lines = _output(c).splitlines()
+        assert any("big" in line and "≥" in line for line in lines)
+        assert not any("small" in line and "≥" in line for line in lines)
+        assert any("Total" in line and "≥" in line for line in lines)
+        assert any("directories not scanned" in line for line in lines)
+
 
 class TestRenderFocusedSummary:
     def _bundle(self) -> InsightBundle:
@@ -170,6 +206,15 @@ class TestRenderFocusedSummary:
         out = _output(c)
         assert "Files" in out
 
+    def test_top_files_from_stream(self) -> None:
+        root = _dir("/r", "root", [_file("/r/small.bin", "small.bin", du=5)], du=505)
+        streamed = [_file("/r/deep/big.bin", "big.bin", du=500)]
+        c = _console()
+        render_focused_summary(c, root, self._bundle(), 10, "/r/", top_files=True, largest_files=streamed)
+        out = _output(c)
+        assert "deep/big.bin" in out
+        assert "small.bin" not in out
+
     def test_no_flags_produces_no_output(self) -> None:
         root = _dir("/r", "root", [], du=0)
         c = _console()
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import pytest
+
 from dux.models.enums import NodeKind
+from dux.models.packed import PackedTree
 from dux.models.scan import ScanNode
-from dux.services.tree import LEAF_CHILDREN, iter_nodes, top_nodes
+from dux.services.memory import memory_report
+from dux.services.tree import (
+    LEAF_CHILDREN,
+    aggregate_node,
+    compact_tree,
+    finalize_sizes,
+    iter_nodes,
+    pack_tree,
+    top_nodes,
+)
 
 
 def _dir(path: str, name: str, children: list[ScanNode] | None = None, du: int = 0) -> ScanNode:
@@ -15,6 +27,24 @@ def _file(path: str, name: str, du: int = 0) -> ScanNode:
     return ScanNode(path=path, name=name, kind=NodeKind.FILE, size_bytes=du, disk_usage=du, children=LEAF_CHILDREN)
 
 
+class TestScanNodePath:
+    def test_built_from_parent_chain(self) -> None:
+        leaf = ScanNode("b.txt", NodeKind.FILE, 1, 1, LEAF_CHILDREN)  # type: ignore[arg-type]
+        sub = ScanNode("sub", NodeKind.DIRECTORY, 0, 0, [leaf])
+        root = ScanNode("root", NodeKind.DIRECTORY, 0, 0, [sub], path="/r")
+        assert leaf.parent is sub and sub.parent is root
+        assert leaf.path == "/r/sub/b.txt"
+        assert sub.path == "/r/sub"
+
+    def test_cached_on_access_only(self) -> None:
+        leaf = ScanNode("b.txt", NodeKind.FILE, 1, 1, LEAF_CHILDREN)  # type: ignore[arg-type]
+        sub = ScanNode("sub", NodeKind.DIRECTORY, 0, 0, [leaf])
+        ScanNode("root", NodeKind.DIRECTORY, 0, 0, [sub], path="/")
+        assert leaf.path == "/sub/b.txt"
+        assert leaf._path == "/sub/b.txt"
+        assert sub._path is None
+
+
 class TestIterNodes:
     def test_single_root(self) -> None:
         root = _dir("/root", "root")
@@ -72,3 +102,96 @@ class TestTopNodes:
         root = _dir("/r", "root", [], du=100)
         result = top_nodes(root, 10, kind=None)
         assert len(result) == 0
+
+
+def _sample_tree() -> ScanNode:
+    sub = _dir("/r/sub", "sub", [_file("/r/sub/b", "b", du=20), _file("/r/sub/caf\udce9", "caf\udce9", du=5)])
+    agg = _dir("/r/nm", "nm")
+    agg.children = [aggregate_node(agg, 70, 70, 3, 1)]
+    root = _dir("/r", "r", [_file("/r/a", "a", du=10), sub, agg, _dir("/r/empty", "empty")])
+    finalize_sizes(root)
+    return root
+
+
+def _shape(node: object) -> list[tuple[str, str, NodeKind, int, int]]:
+    return [(n.path, n.name, n.kind, n.size_bytes, n.disk_usage) for n in iter_nodes(node)]  # type: ignore[arg-type]
+
+
+class TestPackedTree:
+    def test_pack_tree_matches_scan_nodes(self) -> None:
+        root = _sample_tree()
+        packed = pack_tree(root)
+        assert len(packed) == 8
+        assert _shape(packed.root()) == _shape(root)
+        assert [c.name for c in packed.root().children] == ["nm", "sub", "a", "empty"]
+
+    def test_finalize_sums_and_sorts(self) -> None:
+        tree = PackedTree("/", "/")
+        d = tree.add(0, "d", NodeKind.DIRECTORY, 999, 999)
+        tree.add(d, "small", NodeKind.FILE, 1, 1)
+        tree.add(d, "big", NodeKind.FILE, 5, 8)
+        tree.add(0, "top", NodeKind.FILE, 2, 4)
+        finalize_sizes(tree.root())
+        finalize_sizes(tree.root())  # idempotent
+        root = tree.root()
+        assert (root.size_bytes, root.disk_usage) == (8, 13)
+        assert [(c.path, c.disk_usage) for c in root.children] == [("/d", 9), ("/top", 4)]
+        assert [c.path for c in root.children[0].children] == ["/d/big", "/d/small"]
+        with pytest.raises(ValueError, match="finalized"):
+            tree.add(0, "late", NodeKind.FILE, 0, 0)
+
+    def test_node_view(self) -> None:
+        packed = pack_tree(_sample_tree())
+        sub = next(c for c in packed.root().children if c.name == "sub")
+        assert sub.is_dir
+        assert sub == packed.root().children[1]
+        assert len({sub, packed.root().children[1]}) == 1
+        # A view built from an index rebuilds its path from the parent chain.
+        leaf = sub.children[0]
+        assert packed.path(leaf.index) == leaf.path == "/r/sub/b"
+        assert packed.root().children[-1].children == []
+        assert packed.nbytes() > 0
+
+    def test_top_nodes_on_packed_tree(self) -> None:
+        root = _sample_tree()
+        packed = pack_tree(root).root()
+        assert [n.path for n in top_nodes(packed, 3)] == [n.path for n in top_nodes(root, 3)]
+        assert [n.path for n in top_nodes(packed, 10, NodeKind.FILE)] == ["/r/sub/b", "/r/a", "/r/sub/caf\udce9"]
+
+
+class TestCompactTree:
+    def test_children_become_tuples(self) -> None:
+        root = _sample_tree()
+        before = _shape(root)
+        compact_tree(root)
+        assert _shape(root) == before
+        assert all(type(n.children) is tuple for n in iter_nodes(root))
+        assert next(n for n in root.children if n.name == "empty").children is LEAF_CHILDREN
+
+    def test_packed_tree(self) -> None:
+        packed = pack_tree(_sample_tree())
+        before = _shape(packed.root())
+        compact_tree(packed.root())
+        assert _shape(packed.root()) == before
+
+
+class TestMemoryReport:
+    def test_shared_names_counted_once(self) -> None:
+        name = "same-name"
+        root = _dir("/r", "r", [_dir("/r/a", "a", [_file("/r/a/x", name)]), _dir("/r/b", "b", [_file("/r/b/x", name)])])
+        report = memory_report(root)
+        assert report.nodes == 5
+        assert report.names == 4
+        assert report.shared_name_bytes > 0
+        assert report.total_bytes == report.node_bytes + report.name_bytes + report.children_bytes
+
+    def test_compaction_shrinks_children(self) -> None:
+        root = _sample_tree()
+        before = memory_report(root)
+        compact_tree(root)
+        assert memory_report(root).children_bytes < before.children_bytes
+
+    def test_packed_tree(self) -> None:
+        packed = pack_tree(_sample_tree())
+        report = memory_report(packed.root())
+        assert (report.nodes, report.packed_bytes, report.node_bytes) == (8, packed.nbytes(), 0)
@@ -3,18 +3,19 @@ from __future__ import annotations
 from dux.config.schema import AppConfig
 from dux.models.enums import InsightCategory, NodeKind
 from dux.models.insight import CategoryStats, Insight, InsightBundle
-from dux.models.scan import ScanNode, ScanStats
-from dux.services.tree import finalize_sizes
+from dux.models.scan import ScanNode, ScanStats, TreeNode
+from dux.services.tree import finalize_sizes, pack_tree
 from dux.ui.app import DuxApp, _PagedState
 from tests.factories import make_dir, make_file
 
 
 def _make_app(
-    root: ScanNode | None = None,
+    root: TreeNode | None = None,
     stats: ScanStats | None = None,
     bundle: InsightBundle | None = None,
     config: AppConfig | None = None,
     apparent_size: bool = False,
+    unscanned: tuple[str, ...] = (),
 ) -> DuxApp:
     if root is None:
         f1 = make_file("/r/a.txt", du=100)
@@ -34,7 +35,9 @@ def _make_app(
             overview_top_dirs=10,
             scroll_step=5,
         )
-    return DuxApp(root=root, stats=stats, bundle=bundle, config=config, apparent_size=apparent_size)
+    return DuxApp(
+        root=root, stats=stats, bundle=bundle, config=config, apparent_size=apparent_size, unscanned=unscanned
+    )
 
 
 class TestRelativePath:
@@ -47,19 +50,29 @@ class TestRelativePath:
         assert app._relative_path("/other/x.txt") == "/other/x.txt"
 
 
-class TestIndexTree:
-    def test_all_nodes_indexed(self) -> None:
+def _parent_paths(app: DuxApp) -> dict[str, str | None]:
+    parents: dict[str, str | None] = {}
+    for row in app._browse_rows():
+        assert row.node is not None
+        parent = row.node.parent
+        parents[row.path] = None if parent is None else parent.path
+    return parents
+
+
+class TestNodeLinks:
+    def test_browse_rows_reference_nodes(self) -> None:
         app = _make_app()
-        assert "/r" in app.node_by_path
-        assert "/r/a.txt" in app.node_by_path
-        assert "/r/sub" in app.node_by_path
-        assert "/r/sub/c.txt" in app.node_by_path
+        app.expanded.add("/r/sub")
+        paths = [r.path for r in app._browse_rows()]
+        assert sorted(paths) == ["/r", "/r/a.txt", "/r/b.txt", "/r/sub", "/r/sub/c.txt"]
 
-    def test_parent_by_path(self) -> None:
+    def test_parent_links(self) -> None:
         app = _make_app()
-        assert app.parent_by_path["/r/a.txt"] == "/r"
-        assert app.parent_by_path["/r/sub/c.txt"] == "/r/sub"
-        assert "/r" not in app.parent_by_path  # root has no parent
+        app.expanded.add("/r/sub")
+        parents = _parent_paths(app)
+        assert parents["/r/a.txt"] == "/r"
+        assert parents["/r/sub/c.txt"] == "/r/sub"
+        assert parents["/r"] is None  # root has no parent
 
 
 class TestOverviewRows:
@@ -72,8 +85,21 @@ class TestOverviewRows:
         assert any("Directories" in n for n in names)
         assert len(rows) > 7
 
+    def test_partial_scan_total_is_lower_bound(self) -> None:
+        app = _make_app(unscanned=("/r/sub",))
+        names = [str(r.name) for r in app._overview_rows()]
+        assert any("Total Disk: ≥" in n and "partial scan" in n for n in names)
+        assert "Not scanned: 1 directories" in names
+        assert not any("≥" in str(r.name) or "Not scanned" in str(r.name) for r in _make_app()._overview_rows())
+
 
 class TestBrowseRows:
+    def test_unscanned_directory_labelled(self) -> None:
+        app = _make_app(unscanned=("/r/sub",))
+        labels = {r.path: str(r.name) for r in app._browse_rows()}
+        assert labels["/r/sub"].endswith("(not scanned)")
+        assert "not scanned" not in labels["/r"]
+
     def test_collapsed_shows_root_only(self) -> None:
         f = make_file("/r/a.txt", du=10)
         sub = make_dir("/r/sub", du=5)
@@ -106,6 +132,22 @@ class TestBrowseRows:
         assert "▶" in sub_row.name  # collapsed
 
 
+class TestPackedRoot:
+    def test_views_match_scan_nodes(self) -> None:
+        plain = _make_app()
+        assert isinstance(plain.root, ScanNode)
+        packed = _make_app(root=pack_tree(plain.root).root())
+        packed.expanded.add("/r/sub")
+        plain.expanded.add("/r/sub")
+        assert _parent_paths(packed) == _parent_paths(plain)
+        assert [(r.path, r.disk_usage) for r in packed._browse_rows()] == [
+            (r.path, r.disk_usage) for r in plain._browse_rows()
+        ]
+        assert [r.path for r in packed._top_nodes_rows(NodeKind.FILE)] == [
+            r.path for r in plain._top_nodes_rows(NodeKind.FILE)
+        ]
+
+
 class TestInsightRows:
     def test_returns_matching_insights(self) -> None:
         insights = [
@@ -127,7 +169,7 @@ class TestTopNodesRows:
         app = _make_app()
         rows = app._top_nodes_rows(NodeKind.FILE)
         assert len(rows) > 0
-        assert all(app.node_by_path[r.path].kind is NodeKind.FILE for r in rows)
+        assert all(r.node is not None and r.node.kind is NodeKind.FILE for r in rows)
 
     def test_returns_top_dirs(self) -> None:
         app = _make_app()
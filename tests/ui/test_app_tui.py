@@ -182,10 +182,10 @@ async def test_browse_drill_in_out() -> None:
         # Drill in with enter (expand first, then drill)
         await pilot.press("enter")
         await pilot.press("enter")
-        assert app.browse_root_path == "/r/sub"
+        assert app.browse_root.path == "/r/sub"
         # Drill out with backspace
         await pilot.press("backspace")
-        assert app.browse_root_path == "/r"
+        assert app.browse_root.path == "/r"
 
 
 @pytest.mark.asyncio